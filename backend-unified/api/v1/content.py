@@ -8,13 +8,16 @@ Erstellt: 2025-07-04 (Module 3A Phase 1)
 """
 
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Dict, Any, List, Optional
 from uuid import UUID, uuid4
 from datetime import datetime
+import json
 import logging
 
 from backend_unified.core.agents.orchestrator import AgentOrchestrator
+from backend_unified.core.agents.content_matrix import CHECKPOINT_ID_PATTERN, ContentMatrixSpec
 from models.unified_models import (
     ContentOutlineEntity, ContentPieceEntity, VisualAssetEntity, 
     SocialAdaptationEntity, ContentTemplateEntity, ContentPipelineEntity,
@@ -48,6 +51,20 @@ class ContentGenerationResponse(BaseModel):
     performance_metrics: Dict[str, Any] = Field(default_factory=dict, description="Performance metrics")
     error: Optional[str] = Field(default=None, description="Error message if failed")
 
+class ContentMatrixRequest(BaseModel):
+    """Bulk niche × persona × device generation request model"""
+    niches: List[str] = Field(min_length=1, description="Target niches")
+    personas: List[str] = Field(min_length=1, description="Target personas")
+    devices: List[str] = Field(default_factory=lambda: ["mobile", "tablet", "desktop"], description="Target devices")
+    content_type: str = Field(default="guide", description="Type of content to generate")
+    template_id: Optional[str] = Field(default=None, description="Optional template to derive outlines from")
+    include_research: bool = Field(default=True, description="Run one research call per niche")
+    quality_level: str = Field(default="standard", pattern="^(basic|standard|premium|enterprise)$",
+                               description="Quality gate level for generated content")
+    max_workers: Optional[int] = Field(default=None, ge=1, le=64, description="Concurrent matrix items")
+    checkpoint_id: Optional[str] = Field(default=None, pattern=CHECKPOINT_ID_PATTERN,
+                                         description="Run id; reusing it resumes an interrupted run")
+
 class ContentOptimizationRequest(BaseModel):
     """Content optimization request model"""
     content_id: UUID = Field(description="Content piece ID to optimize")
@@ -126,6 +143,39 @@ async def generate_content_pipeline(
         logger.error(f"Content generation failed: {e}")
         raise HTTPException(status_code=500, detail=f"Content generation failed: {str(e)}")
 
+@router.post("/generate/matrix")
+async def generate_content_matrix(
+    request: ContentMatrixRequest,
+    agent_orchestrator: AgentOrchestrator = Depends(get_orchestrator)
+) -> StreamingResponse:
+    """
+    Generate every niche × persona × device combination, streamed as NDJSON
+    
+    Research runs once per niche and outlines once per niche/persona; device
+    variants are derived from the shared outline. Each line is a completed
+    item with progress, the last line is the run summary.
+    """
+    spec = ContentMatrixSpec(
+        niches=request.niches,
+        personas=request.personas,
+        devices=request.devices,
+        content_type=request.content_type,
+        include_research=request.include_research,
+        template_id=request.template_id,
+        quality_level=request.quality_level
+    )
+    
+    async def event_lines():
+        async for event in agent_orchestrator.stream_content_matrix(
+            spec,
+            max_workers=request.max_workers,
+            checkpoint_id=request.checkpoint_id
+        ):
+            yield json.dumps(event, default=str) + "\n"
+    
+    logger.info(f"Starting content matrix generation: {len(spec.items())} items")
+    return StreamingResponse(event_lines(), media_type="application/x-ndjson")
+
 @router.get("/pipeline/{pipeline_id}")
 async def get_pipeline_status(pipeline_id: UUID) -> Dict[str, Any]:
     """Get content generation pipeline status"""
@@ -9,31 +9,56 @@ Date: 2025-07-03
 from fastapi import FastAPI, Request, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 import time
 import logging
 import uvicorn
 from datetime import datetime
+from typing import Any, Dict
+
+from utils.startup import LazyService, StartupProfiler, lazy_services_from_env, run_shutdown_hooks
+from utils.tracing import tracer
+
+# Per-component import/init timings, reported once the app is ready
+startup_profiler = StartupProfiler()
 
 # Import configuration and core modules
-from config.settings import settings
-from config.database import init_database, close_database
+with startup_profiler.measure("config"):
+    from config.settings import settings
+    from config.database import init_database, close_database
 
-# Import Week 2 routers and services
-from app.routers import search_router, learning_router, agent_router
-from app.services.database_service import DatabaseService
-from app.services.rag_service import AdaptiveRAGService
-from app.services.search_service import AdaptiveSearchService
-from app.services.learning_service import ContinuousLearningService
-from app.services.agent_service import AgentCommunicationService
+# Import Week 2 services and routers
+with startup_profiler.measure("week2_services"):
+    from app.services.database_service import DatabaseService
+    from app.services.rag_service import AdaptiveRAGService
+    from app.services.search_service import AdaptiveSearchService
+    from app.services.learning_service import ContinuousLearningService
+    from app.services.agent_service import AgentCommunicationService
+
+with startup_profiler.measure("week2_routers"):
+    from app.routers import search_router, learning_router, agent_router
 
 # Import existing core modules
-from core.agents.orchestrator import AgentOrchestrator
-from core.intelligence.ai_research_client import AIResearchClient
+with startup_profiler.measure("agent_orchestrator"):
+    from core.agents.orchestrator import AgentOrchestrator
+
+with startup_profiler.measure("ai_research_client"):
+    from core.intelligence.ai_research_client import AIResearchClient
+
 from utils.logging import setup_logging
 from core.auth.auth_dependencies import get_current_user
 
+# Import Module 2C: A/B Testing Framework
+with startup_profiler.measure("conversion_routers"):
+    from src.api.conversion.ab_testing_controller import router as ab_testing_router
+    from src.api.conversion.behavioral_tracking_controller import router as behavioral_tracking_router
+
+# Import existing API routers (V1 compatibility)
+with startup_profiler.measure("legacy_routers"):
+    from api.v1 import auth, agents, websites, analytics, intelligence
+    from api import webhooks, websockets
+
 # Setup logging
 setup_logging()
 logger = logging.getLogger(__name__)
@@ -47,6 +72,38 @@ agent_service = None
 agent_orchestrator = None
 ai_research_client = None
 
+async def _create_service(service_class):
+    """Construct and initialize a service"""
+    service = service_class()
+    await service.initialize()
+    return service
+
+# Independent services, initialized concurrently during lifespan (or on first use)
+SERVICE_FACTORIES = {
+    "database_service": lambda: _create_service(DatabaseService),
+    "rag_service": lambda: _create_service(AdaptiveRAGService),
+    "search_service": lambda: _create_service(AdaptiveSearchService),
+    "learning_service": lambda: _create_service(ContinuousLearningService),
+    "agent_service": lambda: _create_service(AgentCommunicationService),
+    "ai_research_client": lambda: _create_service(AIResearchClient),
+    "agent_orchestrator": lambda: _create_service(AgentOrchestrator)
+}
+
+# Services listed in STARTUP_LAZY_SERVICES are created on first use instead
+lazy_services: Dict[str, LazyService] = {}
+
+async def get_service(name: str) -> Any:
+    """Service instance by name, creating lazily configured services on first use"""
+    instance = globals().get(name)
+    if instance is None and name in lazy_services:
+        instance = await lazy_services[name].get()
+        globals()[name] = instance
+    return instance
+
+def is_pending_lazy(name: str) -> bool:
+    """True for a lazily configured service nothing has used yet"""
+    return globals().get(name) is None and name in lazy_services and not lazy_services[name].initialized
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan management with Week 2 services"""
@@ -55,52 +112,29 @@ async def lifespan(app: FastAPI):
     
     try:
         # Initialize database connections
-        await init_database()
+        with startup_profiler.measure("database_connections", "init"):
+            await init_database()
         logger.info("✅ Database connections initialized")
         
-        # Initialize Week 2 services
-        global database_service, rag_service, search_service, learning_service, agent_service
-        
-        # Initialize database service
-        database_service = DatabaseService()
-        await database_service.initialize()
-        logger.info("✅ Database Service initialized")
-        
-        # Initialize RAG service
-        rag_service = AdaptiveRAGService()
-        await rag_service.initialize()
-        logger.info("✅ Adaptive RAG Service initialized")
-        
-        # Initialize search service
-        search_service = AdaptiveSearchService()
-        await search_service.initialize()
-        logger.info("✅ Adaptive Search Service initialized")
-        
-        # Initialize learning service
-        learning_service = ContinuousLearningService()
-        await learning_service.initialize()
-        logger.info("✅ Continuous Learning Service initialized")
-        
-        # Initialize agent communication service
-        agent_service = AgentCommunicationService()
-        await agent_service.initialize()
-        logger.info("✅ Agent Communication Service initialized")
-        
-        # Initialize existing AI Research Client (preserve existing assets)
-        global ai_research_client
-        ai_research_client = AIResearchClient()
-        await ai_research_client.initialize()
-        logger.info("✅ AI Research Engine connected")
-        
-        # Initialize existing Agent Orchestrator
-        global agent_orchestrator
-        agent_orchestrator = AgentOrchestrator()
-        await agent_orchestrator.initialize()
-        logger.info("✅ Agent Orchestrator initialized")
-        
-        # Register core agents
-        await agent_orchestrator.register_core_agents()
-        logger.info("✅ Core AI Agents registered")
+        lazy_names = lazy_services_from_env()
+        if "all" in lazy_names:
+            lazy_names = list(SERVICE_FACTORIES)
+        
+        for name in lazy_names:
+            if name in SERVICE_FACTORIES:
+                lazy_services[name] = LazyService(name, SERVICE_FACTORIES[name], startup_profiler)
+        
+        # Initialize the remaining services concurrently
+        eager_factories = {
+            name: factory for name, factory in SERVICE_FACTORIES.items()
+            if name not in lazy_services
+        }
+        globals().update(await startup_profiler.init_parallel(eager_factories))
+        logger.info(f"✅ Services initialized: {', '.join(eager_factories) or 'none'}"
+                    f" (lazy: {', '.join(lazy_services) or 'none'})")
+        
+        startup_profiler.mark_ready()
+        startup_profiler.log_report()
         
         logger.info("🎯 Week 2 Agentic RAG System ready for production")
         logger.info("📊 Features: Adaptive Search | Continuous Learning | Agent Integration")
@@ -124,13 +158,10 @@ async def lifespan(app: FastAPI):
             # Learning service doesn't need explicit cleanup
             pass
         
-        if search_service:
-            # Search service doesn't need explicit cleanup
-            pass
-        
-        if rag_service:
-            # RAG service doesn't need explicit cleanup
-            pass
+        # Flush write-behind outcome queues (lifespan and router instances)
+        for service in (search_service, rag_service, search_router.search_service, search_router.rag_service):
+            if service:
+                await service.shutdown()
         
         if database_service:
             # Database service doesn't need explicit cleanup
@@ -143,6 +174,9 @@ async def lifespan(app: FastAPI):
         if ai_research_client:
             await ai_research_client.cleanup()
         
+        # Flush process-wide write buffers (coalesced journey session writes, ...)
+        await run_shutdown_hooks()
+        
         # Close database connections
         await close_database()
         
@@ -183,9 +217,17 @@ async def monitor_performance(request: Request, call_next):
     """Monitor API performance and log slow requests"""
     start_time = time.time()
     
-    response = await call_next(request)
+    # Root span; stages annotated with utils.tracing.span nest under it
+    with tracer.span(f"http {request.method}") as root:
+        response = await call_next(request)
+        
+        if root is not None:
+            route = request.scope.get("route")
+            root.name = f"http {request.method} {getattr(route, 'path', 'unmatched')}"
+            root.set_attribute("status", response.status_code)
     
     process_time = time.time() - start_time
+    tracer.finish_request(root)
     
     # Log slow requests (> 1 second)
     if process_time > 1.0:
@@ -231,8 +273,10 @@ async def health_check():
     }
     
     try:
-        # Check Week 2 services
-        if database_service:
+        # Check Week 2 services; lazy ones nothing has used yet are reported, not created
+        if is_pending_lazy("database_service"):
+            health_status["services"]["database"] = "lazy"
+        elif database_service:
             db_health = await database_service.health_check()
             health_status["services"]["database"] = "healthy" if all(
                 status == "healthy" for status in db_health.values()
@@ -240,42 +284,22 @@ async def health_check():
         else:
             health_status["services"]["database"] = "not_initialized"
         
-        if rag_service:
-            rag_health = await rag_service.health_check()
-            health_status["services"]["rag_service"] = "healthy" if rag_health else "unhealthy"
-        else:
-            health_status["services"]["rag_service"] = "not_initialized"
-        
-        if search_service:
-            search_health = await search_service.health_check()
-            health_status["services"]["search_service"] = "healthy" if search_health else "unhealthy"
-        else:
-            health_status["services"]["search_service"] = "not_initialized"
-        
-        if learning_service:
-            learning_health = await learning_service.health_check()
-            health_status["services"]["learning_service"] = "healthy" if learning_health else "unhealthy"
-        else:
-            health_status["services"]["learning_service"] = "not_initialized"
-        
-        if agent_service:
-            agent_health = await agent_service.health_check()
-            health_status["services"]["agent_service"] = "healthy" if agent_health else "unhealthy"
-        else:
-            health_status["services"]["agent_service"] = "not_initialized"
-        
-        # Check existing services
-        if ai_research_client:
-            ai_health = await ai_research_client.health_check()
-            health_status["services"]["ai_research"] = "healthy" if ai_health else "unhealthy"
-        else:
-            health_status["services"]["ai_research"] = "not_initialized"
-        
-        if agent_orchestrator:
-            orchestrator_health = await agent_orchestrator.health_check()
-            health_status["services"]["agent_orchestrator"] = "healthy" if orchestrator_health else "unhealthy"
-        else:
-            health_status["services"]["agent_orchestrator"] = "not_initialized"
+        for service_name, status_key in (
+            ("rag_service", "rag_service"),
+            ("search_service", "search_service"),
+            ("learning_service", "learning_service"),
+            ("agent_service", "agent_service"),
+            ("ai_research_client", "ai_research"),
+            ("agent_orchestrator", "agent_orchestrator")
+        ):
+            service_instance = globals().get(service_name)
+            if is_pending_lazy(service_name):
+                health_status["services"][status_key] = "lazy"
+            elif service_instance:
+                service_health = await service_instance.health_check()
+                health_status["services"][status_key] = "healthy" if service_health else "unhealthy"
+            else:
+                health_status["services"][status_key] = "not_initialized"
         
         # Determine overall status
         unhealthy_services = [
@@ -302,26 +326,27 @@ async def readiness_check():
     services_status = {}
     
     try:
-        # Check all critical Week 2 services
+        # Check all critical Week 2 services; lazy ones are only ready once they exist and pass
         critical_services = [
-            ("database_service", database_service),
-            ("rag_service", rag_service),
-            ("search_service", search_service),
-            ("learning_service", learning_service),
-            ("agent_service", agent_service)
+            "database_service",
+            "rag_service",
+            "search_service",
+            "learning_service",
+            "agent_service"
         ]
         
-        for service_name, service_instance in critical_services:
-            if service_instance:
-                try:
+        for service_name in critical_services:
+            try:
+                service_instance = await get_service(service_name)
+                if service_instance:
                     service_ready = await service_instance.health_check()
                     services_status[service_name] = "ready" if service_ready else "not_ready"
                     ready = ready and service_ready
-                except Exception as e:
-                    services_status[service_name] = f"error: {str(e)}"
+                else:
+                    services_status[service_name] = "not_initialized"
                     ready = False
-            else:
-                services_status[service_name] = "not_initialized"
+            except Exception as e:
+                services_status[service_name] = f"error: {str(e)}"
                 ready = False
         
     except Exception as e:
@@ -341,6 +366,15 @@ async def readiness_check():
         }
     )
 
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Per-span latency histograms in Prometheus text format"""
+    return PlainTextResponse(
+        tracer.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 # API version info
 @app.get("/version")
 async def version_info():
@@ -409,13 +443,6 @@ app.include_router(
 )
 
 # Include existing API routers (V1 compatibility)
-from api.v1 import auth, agents, websites, analytics, intelligence
-from api import webhooks
-
-# Import Module 2C: A/B Testing Framework
-from src.api.conversion.ab_testing_controller import router as ab_testing_router
-from src.api.conversion.behavioral_tracking_controller import router as behavioral_tracking_router
-
 app.include_router(
     auth.router,
     prefix="/api/v1/auth",
@@ -453,7 +480,6 @@ app.include_router(
 )
 
 # WebSocket endpoints for real-time agent communication
-from api import websockets
 app.include_router(websockets.websocket_router)
 
 # Week 2 specific endpoints
@@ -474,16 +500,19 @@ async def get_system_status(current_user = Depends(get_current_user)):
         }
         
         # Get service statuses
-        if database_service:
-            db_stats = await database_service.get_database_stats()
+        database = await get_service("database_service")
+        if database:
+            db_stats = await database.get_database_stats()
             system_status["services"]["database"] = db_stats
         
-        if search_service:
-            search_performance = await search_service.analyze_search_performance(7)
+        search = await get_service("search_service")
+        if search:
+            search_performance = await search.analyze_search_performance(7)
             system_status["performance_metrics"]["search"] = search_performance
         
-        if learning_service:
-            learning_velocity = await learning_service.calculate_learning_velocity()
+        learning = await get_service("learning_service")
+        if learning:
+            learning_velocity = await learning.calculate_learning_velocity()
             system_status["performance_metrics"]["learning"] = learning_velocity
         
         return system_status
@@ -513,20 +542,24 @@ async def get_metrics_dashboard(current_user = Depends(get_current_user)):
         }
         
         # Gather metrics from all services
-        if database_service:
-            db_stats = await database_service.get_database_stats()
+        database = await get_service("database_service")
+        if database:
+            db_stats = await database.get_database_stats()
             dashboard["overview"]["total_queries_processed"] = db_stats.get("outcome_count", 0)
         
-        if search_service:
-            search_metrics = await search_service.get_strategy_performance_metrics()
+        search = await get_service("search_service")
+        if search:
+            search_metrics = await search.get_strategy_performance_metrics()
             dashboard["search_performance"] = search_metrics
         
-        if learning_service:
-            learning_trends = await learning_service.analyze_performance_trends(7)
+        learning = await get_service("learning_service")
+        if learning:
+            learning_trends = await learning.analyze_performance_trends(7)
             dashboard["learning_metrics"] = learning_trends
         
-        if agent_service:
-            agent_registry = await agent_service.get_agent_registry()
+        agents_service = await get_service("agent_service")
+        if agents_service:
+            agent_registry = await agents_service.get_agent_registry()
             dashboard["agent_performance"] = {
                 "total_agents": len(agent_registry),
                 "active_agents": len([a for a in agent_registry if a.get("status") == "active"])
@@ -553,14 +586,15 @@ if settings.ENVIRONMENT == "development":
         }
         
         services = [
-            ("database_service", database_service),
-            ("rag_service", rag_service),
-            ("search_service", search_service),
-            ("learning_service", learning_service),
-            ("agent_service", agent_service)
+            "database_service",
+            "rag_service",
+            "search_service",
+            "learning_service",
+            "agent_service"
         ]
         
-        for service_name, service_instance in services:
+        for service_name in services:
+            service_instance = await get_service(service_name)
             debug_info["services_initialized"][service_name] = service_instance is not None
             if service_instance:
                 try:
@@ -570,6 +604,16 @@ if settings.ENVIRONMENT == "development":
                     debug_info["service_health"][service_name] = f"error: {str(e)}"
         
         return debug_info
+    
+    @app.get("/debug/startup")
+    async def debug_startup():
+        """Per-component import and init cost of this worker's startup"""
+        return {
+            **startup_profiler.report(),
+            "lazy_services": {
+                name: service.initialized for name, service in lazy_services.items()
+            }
+        }
 
 # Main execution
 if __name__ == "__main__":
@@ -8,6 +8,7 @@ Date: 2025-07-03
 
 import asyncio
 import logging
+import os
 from typing import Dict, List, Any, Optional, Tuple
 from contextlib import asynccontextmanager
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -17,28 +18,98 @@ from datetime import datetime, timedelta
 from config.neon_database import get_neon_session, get_neon_engine
 from config.database import get_sqlite_session, get_sqlite_engine
 from models.unified_models import DocumentEntity, ChunkEntity, QueryEntity, ResponseEntity, OutcomeEvent
+from app.services.vector_index import VectorIndex
+from app.services.sync_listeners import attach_sync_listeners
+from utils.startup import register_shutdown_hook
+from utils.tracing import traced
 
 logger = logging.getLogger(__name__)
 
 class DatabaseService:
     """Strategic database operations for Agentic RAG system"""
     
+    VECTOR_BACKEND_PGVECTOR = "pgvector"
+    VECTOR_BACKEND_LOCAL = "local"
+    
     def __init__(self):
         self.neon_engine = None
         self.sqlite_engine = None
+        self.vector_backend = os.getenv("VECTOR_SEARCH_BACKEND", self.VECTOR_BACKEND_PGVECTOR).lower()
+        self.vector_index_path = os.getenv("VECTOR_INDEX_PATH")
+        self.vector_index: Optional[VectorIndex] = None
+        self.vector_index_persist_seconds = float(os.getenv("VECTOR_INDEX_PERSIST_SECONDS", "300"))
+        self._vector_index_dirty = False
+        self._persist_task: Optional[asyncio.Task] = None
+        self._persist_lock = asyncio.Lock()
+        self._train_task: Optional[asyncio.Task] = None
         self._initialized = False
     
+    @property
+    def uses_local_vector_index(self) -> bool:
+        return self.vector_backend == self.VECTOR_BACKEND_LOCAL
+    
     async def initialize(self):
         """Initialize database connections"""
         try:
-            self.neon_engine = await get_neon_engine()
-            self.sqlite_engine = await get_sqlite_engine()
+            if self.uses_local_vector_index and self.vector_index is None:
+                self.vector_index = self._load_vector_index()
+                self._start_vector_index_upkeep()
+            
+            try:
+                self.neon_engine = await get_neon_engine()
+                self.sqlite_engine = await get_sqlite_engine()
+            except Exception as e:
+                # The local vector backend can serve searches without Postgres
+                if not self.uses_local_vector_index:
+                    raise
+                logger.warning(f"Database engines unavailable, running vector search locally only: {e}")
+            
             self._initialized = True
-            logger.info("✅ Database service initialized")
+            logger.info(f"✅ Database service initialized (vector backend: {self.vector_backend})")
         except Exception as e:
             logger.error(f"❌ Database service initialization failed: {e}")
             raise
     
+    def _load_vector_index(self) -> VectorIndex:
+        """Load the persisted local index (memory-mapped) or start an empty one"""
+        if self.vector_index_path and os.path.exists(os.path.join(self.vector_index_path, VectorIndex.STATE_FILE)):
+            try:
+                index = VectorIndex.load(self.vector_index_path, mmap=True, auto_train=False)
+                logger.info(f"Loaded local vector index with {len(index)} vectors from {self.vector_index_path}")
+                return index
+            except Exception as e:
+                logger.error(f"Failed to load local vector index from {self.vector_index_path}: {e}")
+        
+        # Training is k-means over the whole corpus; _train_vector_index runs it off the loop
+        return VectorIndex(dimension=int(os.getenv("VECTOR_INDEX_DIMENSION", "1536")), auto_train=False)
+    
+    def _start_vector_index_upkeep(self):
+        """Follow document syncs, persist changes periodically and once more on shutdown"""
+        attach_sync_listeners(self.index_synced_entities)
+        if not self.vector_index_path:
+            return
+        
+        register_shutdown_hook(f"vector_index:{self.vector_index_path}", self.shutdown)
+        if self.vector_index_persist_seconds > 0 and self._persist_task is None:
+            self._persist_task = asyncio.ensure_future(self._persist_loop())
+    
+    async def _persist_loop(self):
+        while True:
+            await asyncio.sleep(self.vector_index_persist_seconds)
+            if self._vector_index_dirty:
+                await self.persist_vector_index()
+    
+    async def shutdown(self):
+        """Stop periodic persistence and write pending index changes"""
+        if self._persist_task is not None:
+            self._persist_task.cancel()
+            self._persist_task = None
+        if self._train_task is not None:
+            self._train_task.cancel()
+            self._train_task = None
+        if self._vector_index_dirty:
+            await self.persist_vector_index()
+    
     @asynccontextmanager
     async def get_vector_session(self):
         """Get Neon PostgreSQL session for vector operations"""
@@ -74,14 +145,23 @@ class DatabaseService:
         query_embedding: List[float], 
         match_threshold: float = 0.8,
         match_count: int = 10,
-        boost_performance: bool = True
+        boost_performance: bool = True,
+        filters: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
         """
         Execute vector similarity search using Week 1 search_chunks_weighted function
         
-        Leverages existing Neon PostgreSQL functions for optimal performance
+        Leverages existing Neon PostgreSQL functions for optimal performance.
+        With the local backend the in-process ANN index serves the search instead.
         """
         try:
+            if self.uses_local_vector_index:
+                if not self._initialized:
+                    await self.initialize()
+                return self._local_vector_search(
+                    query_embedding, match_threshold, match_count, boost_performance, filters
+                )
+            
             async with self.get_vector_session() as session:
                 # Use Week 1 search_chunks_weighted function
                 query = text("""
@@ -109,6 +189,170 @@ class DatabaseService:
             logger.error(f"Vector search failed: {e}")
             raise
     
+    def _local_vector_search(
+        self,
+        query_embedding: List[float],
+        match_threshold: float,
+        match_count: int,
+        boost_performance: bool,
+        filters: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """search_chunks_weighted semantics over the local vector index"""
+        # Over-fetch so performance re-ranking can promote rows beyond the raw top-k
+        fetch_count = match_count * 3 if boost_performance else match_count
+        hits = self.vector_index.search(
+            query_embedding, k=fetch_count, filters=filters, min_score=match_threshold
+        )
+        
+        results = []
+        for entry_id, similarity, payload in hits:
+            # float32 dot products of unit vectors can land just above 1.0
+            similarity = min(float(similarity), 1.0)
+            if boost_performance:
+                performance_score = (
+                    float(payload.get("relevance_score", 0.0)) * 0.3 +
+                    float(payload.get("click_through_rate", 0.0)) * 0.4 +
+                    float(payload.get("confidence_score", 0.0)) * 0.3
+                )
+                final_score = similarity * 0.7 + performance_score * 0.3
+            else:
+                performance_score = 0.0
+                final_score = similarity
+            
+            results.append({
+                "id": entry_id,
+                "chunk_id": payload.get("chunk_id"),
+                "document_id": payload.get("document_id"),
+                "content": payload.get("content", ""),
+                "similarity": similarity,
+                "confidence": float(payload.get("confidence_score", 0.0)),
+                "performance_score": performance_score,
+                "final_score": final_score,
+                "metadata": payload.get("metadata", {})
+            })
+        
+        results.sort(key=lambda row: row["final_score"], reverse=True)
+        return results[:match_count]
+    
+    def index_chunks(self, chunks: List[Dict[str, Any]]) -> int:
+        """
+        Incrementally add or replace chunks in the local vector index
+        
+        Each chunk needs 'id' and 'embedding'; content, chunk_id (defaults to id),
+        document_id, metadata and relevance_score/click_through_rate/confidence_score
+        are stored as payload. Entries with is_active False are removed.
+        """
+        if self.vector_index is None:
+            return 0
+        
+        try:
+            inactive = {str(chunk["id"]) for chunk in chunks if chunk.get("is_active") is False}
+            if inactive and self.vector_index.remove(inactive):
+                self._vector_index_dirty = True
+            
+            ids, vectors, payloads = [], [], []
+            for chunk in chunks:
+                chunk_id = str(chunk["id"])
+                if chunk_id in inactive:
+                    continue
+                
+                payload = {
+                    key: value for key, value in chunk.items()
+                    if key not in ("id", "embedding", "is_active")
+                }
+                payload.setdefault("chunk_id", chunk_id)
+                if chunk.get("embedding") is not None:
+                    ids.append(chunk_id)
+                    vectors.append(chunk["embedding"])
+                    payloads.append(payload)
+                elif self.vector_index.update_payload(chunk_id, payload):
+                    # Metadata-only change for an already indexed chunk
+                    self._vector_index_dirty = True
+            
+            if not ids:
+                return 0
+            
+            self._vector_index_dirty = True
+            added = self.vector_index.add(ids, vectors, payloads)
+            self._schedule_vector_index_training()
+            return added
+            
+        except Exception as e:
+            logger.error(f"Local vector indexing failed: {e}")
+            return 0
+    
+    def _schedule_vector_index_training(self):
+        """Start background training once the index needs it (one run at a time)"""
+        if not self.vector_index.needs_training or self._train_task is not None:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop to hand the work to, e.g. a synchronous bulk load
+            self.vector_index.train()
+            return
+        self._train_task = asyncio.ensure_future(self._train_vector_index())
+    
+    async def _train_vector_index(self):
+        """k-means in a worker thread on a snapshot; the result is installed on the loop"""
+        try:
+            snapshot = self.vector_index.training_snapshot()
+            trained = await asyncio.to_thread(self.vector_index.fit, snapshot)
+            self.vector_index.apply_training(trained)
+            self._vector_index_dirty = True
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Local vector index training failed: {e}")
+        finally:
+            self._train_task = None
+    
+    async def index_synced_entities(self, entities: List[Any]) -> int:
+        """
+        Sync listener: keep the local index current with DatabaseSyncManager writes
+        
+        The sync streams whole documents, so entries are keyed by document id and
+        carry no chunk_id; deactivated documents are removed from the index.
+        """
+        chunks = []
+        for entity in entities:
+            performance = getattr(entity, "performance", None)
+            chunks.append({
+                "id": str(entity.id),
+                "embedding": getattr(entity, "embedding", None),
+                "is_active": getattr(entity, "is_active", True),
+                "content": getattr(entity, "content", None) or "",
+                "chunk_id": None,
+                "document_id": str(entity.id),
+                "metadata": getattr(entity, "metadata", {}) or {},
+                "relevance_score": getattr(performance, "relevance_score", 0.0),
+                "click_through_rate": getattr(performance, "click_through_rate", 0.0),
+                "confidence_score": getattr(performance, "confidence_score", 0.0)
+            })
+        return self.index_chunks(chunks)
+    
+    async def persist_vector_index(self) -> bool:
+        """Write the local vector index to VECTOR_INDEX_PATH"""
+        if self.vector_index is None or not self.vector_index_path:
+            return False
+        
+        # Shielded: cancelling the persist loop must not release the lock while a write is still running
+        return await asyncio.shield(self._persist_vector_index())
+    
+    async def _persist_vector_index(self) -> bool:
+        async with self._persist_lock:
+            try:
+                self._vector_index_dirty = False
+                # Copied on the loop, where every index write happens; the thread only serializes the copy
+                snapshot = self.vector_index.snapshot()
+                await asyncio.to_thread(VectorIndex.save_snapshot, snapshot, self.vector_index_path)
+                return True
+            except Exception as e:
+                self._vector_index_dirty = True
+                logger.error(f"Failed to persist local vector index: {e}")
+                return False
+    
+    @traced("db.hybrid_search")
     async def execute_hybrid_search(
         self,
         query_embedding: List[float],
@@ -173,6 +417,37 @@ class DatabaseService:
             logger.error(f"Performance analysis failed: {e}")
             raise
     
+    OUTCOME_INSERT_SQL = """
+        INSERT INTO search_outcomes (
+            id, query_id, response_id, strategy_used, user_satisfaction,
+            relevance_scores, response_time, conversion_occurred,
+            confidence_score, created_at
+        ) VALUES (
+            gen_random_uuid(), :query_id, :response_id, :strategy_used,
+            :user_satisfaction, :relevance_scores, :response_time,
+            :conversion_occurred, :confidence_score, NOW()
+        )
+    """
+    
+    @staticmethod
+    def build_outcome_row(
+        query_id: str,
+        response_id: str,
+        outcome_data: Dict[str, Any],
+        confidence_score: float
+    ) -> Dict[str, Any]:
+        """Bind parameters for one search_outcomes row"""
+        return {
+            "query_id": query_id,
+            "response_id": response_id,
+            "strategy_used": outcome_data.get("strategy_used", "unknown"),
+            "user_satisfaction": outcome_data.get("user_satisfaction", 0.5),
+            "relevance_scores": outcome_data.get("relevance_scores", []),
+            "response_time": outcome_data.get("response_time", 0),
+            "conversion_occurred": outcome_data.get("conversion_occurred", False),
+            "confidence_score": confidence_score
+        }
+    
     async def store_query_outcome(
         self,
         query_id: str,
@@ -184,28 +459,10 @@ class DatabaseService:
         try:
             async with self.get_vector_session() as session:
                 # Insert into search_outcomes table (from Week 1 schema)
-                query = text("""
-                    INSERT INTO search_outcomes (
-                        id, query_id, response_id, strategy_used, user_satisfaction,
-                        relevance_scores, response_time, conversion_occurred,
-                        confidence_score, created_at
-                    ) VALUES (
-                        gen_random_uuid(), :query_id, :response_id, :strategy_used,
-                        :user_satisfaction, :relevance_scores, :response_time,
-                        :conversion_occurred, :confidence_score, NOW()
-                    )
-                """)
-                
-                await session.execute(query, {
-                    "query_id": query_id,
-                    "response_id": response_id,
-                    "strategy_used": outcome_data.get("strategy_used", "unknown"),
-                    "user_satisfaction": outcome_data.get("user_satisfaction", 0.5),
-                    "relevance_scores": outcome_data.get("relevance_scores", []),
-                    "response_time": outcome_data.get("response_time", 0),
-                    "conversion_occurred": outcome_data.get("conversion_occurred", False),
-                    "confidence_score": confidence_score
-                })
+                await session.execute(
+                    text(self.OUTCOME_INSERT_SQL),
+                    self.build_outcome_row(query_id, response_id, outcome_data, confidence_score)
+                )
                 
                 await session.commit()
                 return True
@@ -214,6 +471,21 @@ class DatabaseService:
             logger.error(f"Outcome storage failed: {e}")
             return False
     
+    async def store_query_outcomes_batch(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Insert many search_outcomes rows in one executemany round trip
+        
+        Rows come from build_outcome_row; raises so write-behind callers can retry.
+        """
+        if not rows:
+            return 0
+        
+        async with self.get_vector_session() as session:
+            await session.execute(text(self.OUTCOME_INSERT_SQL), rows)
+            await session.commit()
+        
+        return len(rows)
+    
     async def get_strategy_performance(self) -> Dict[str, Dict[str, float]]:
         """Get performance metrics by search strategy"""
         try:
@@ -276,6 +548,9 @@ class DatabaseService:
             "learning_system": "unknown"
         }
         
+        if self.vector_index is not None:
+            health_status["local_vector_index"] = "healthy"
+        
         # Check Neon PostgreSQL
         try:
             async with self.get_vector_session() as session:
@@ -0,0 +1,288 @@
+"""
+Embedding Cache - content-hash keyed embedding reuse for the RAG services
+
+Embeddings are keyed by sha256(model + normalized text) and kept in a
+bounded in-memory LRU of float32 vectors. An optional on-disk store
+(one .npy file per key) survives restarts. Batch lookups collect all
+uncached texts into a single provider call, and concurrent requests for
+the same text share one in-flight future instead of calling the
+provider twice.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_DIMENSION = 1536  # OpenAI embedding size
+
+_WHITESPACE = re.compile(r"\s+")
+
+BatchEmbedFunction = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share a cache entry"""
+    return _WHITESPACE.sub(" ", text or "").strip()
+
+
+def embedding_key(text: str, model: str = "default") -> str:
+    """Content hash used as cache key"""
+    payload = f"{model}\x00{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class EmbeddingCache:
+    """Bounded LRU of float32 embeddings with an optional on-disk store"""
+
+    def __init__(self, max_entries: int = 10000, disk_path: Optional[str] = None):
+        self.max_entries = max(1, max_entries)
+        self.disk_path = Path(disk_path) if disk_path else None
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "disk_writes": 0,
+            "disk_errors": 0
+        }
+
+        if self.disk_path is not None:
+            try:
+                self.disk_path.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                logger.error(f"Embedding disk store unavailable at {self.disk_path}: {e}")
+                self.disk_path = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries or (
+            self.disk_path is not None and self._disk_file(key).exists()
+        )
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Return cached vector (memory first, then disk) or None"""
+        vector = self._entries.get(key)
+        if vector is not None:
+            self._entries.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return vector
+
+        vector = self._load_from_disk(key)
+        if vector is not None:
+            self.stats["disk_hits"] += 1
+            self._remember(key, vector)
+            return vector
+
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, key: str, embedding: Sequence[float]) -> np.ndarray:
+        """Store an embedding as float32 in memory and (if enabled) on disk"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        vector.setflags(write=False)
+        self._remember(key, vector)
+        self._save_to_disk(key, vector)
+        return vector
+
+    def clear(self, include_disk: bool = False):
+        """Drop in-memory entries (and optionally the disk store)"""
+        self._entries.clear()
+        if include_disk and self.disk_path is not None:
+            for file in self.disk_path.glob("*.npy"):
+                try:
+                    file.unlink()
+                except OSError as e:
+                    logger.error(f"Failed to remove cached embedding {file}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and occupancy"""
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "disk_enabled": self.disk_path is not None
+        }
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _disk_file(self, key: str) -> Path:
+        return self.disk_path / f"{key}.npy"
+
+    def _load_from_disk(self, key: str) -> Optional[np.ndarray]:
+        if self.disk_path is None:
+            return None
+
+        file = self._disk_file(key)
+        if not file.exists():
+            return None
+
+        try:
+            vector = np.load(file, allow_pickle=False).astype(np.float32, copy=False)
+            vector.setflags(write=False)
+            return vector
+        except (OSError, ValueError) as e:
+            self.stats["disk_errors"] += 1
+            logger.error(f"Failed to read cached embedding {file}: {e}")
+            return None
+
+    def _save_to_disk(self, key: str, vector: np.ndarray):
+        if self.disk_path is None:
+            return
+
+        file = self._disk_file(key)
+        tmp_file = file.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(tmp_file, "wb") as handle:
+                np.save(handle, vector, allow_pickle=False)
+            os.replace(tmp_file, file)
+            self.stats["disk_writes"] += 1
+        except OSError as e:
+            self.stats["disk_errors"] += 1
+            logger.error(f"Failed to persist embedding {file}: {e}")
+
+
+class CachedEmbedder:
+    """Embedding front-end with caching, batching and request coalescing"""
+
+    def __init__(
+        self,
+        batch_embed: BatchEmbedFunction,
+        cache: Optional[EmbeddingCache] = None,
+        model: str = "default",
+        batch_size: int = 64,
+        dimension: int = DEFAULT_EMBEDDING_DIMENSION
+    ):
+        self.batch_embed = batch_embed
+        self.cache = cache or EmbeddingCache()
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.dimension = dimension
+
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+        self.stats = {
+            "requests": 0,
+            "coalesced": 0,
+            "provider_calls": 0,
+            "provider_texts": 0,
+            "provider_errors": 0
+        }
+
+    async def embed(self, text: str) -> List[float]:
+        """Embedding for a single text"""
+        embeddings = await self.embed_many([text])
+        return embeddings[0]
+
+    async def embed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embeddings for many texts; all cache misses go out in one batch"""
+        self.stats["requests"] += len(texts)
+
+        keys = [embedding_key(text, self.model) for text in texts]
+        resolved: Dict[str, np.ndarray] = {}
+        waiting: Dict[str, asyncio.Future] = {}
+        to_generate: Dict[str, str] = {}
+
+        for key, text in zip(keys, texts):
+            if key in resolved or key in waiting or key in to_generate:
+                continue
+
+            cached = self.cache.get(key)
+            if cached is not None:
+                resolved[key] = cached
+            elif key in self._in_flight:
+                self.stats["coalesced"] += 1
+                waiting[key] = self._in_flight[key]
+            else:
+                to_generate[key] = text
+
+        if to_generate:
+            loop = asyncio.get_running_loop()
+            owned = {key: loop.create_future() for key in to_generate}
+            self._in_flight.update(owned)
+            try:
+                generated = await self._generate(to_generate)
+                for key, vector in generated.items():
+                    resolved[key] = vector
+                    owned[key].set_result(vector)
+            except BaseException as e:
+                for future in owned.values():
+                    if not future.done():
+                        future.set_exception(e)
+                        # Mark retrieved so an unawaited failure is not logged twice
+                        future.exception()
+                raise
+            finally:
+                for key in owned:
+                    self._in_flight.pop(key, None)
+
+        for key, future in waiting.items():
+            resolved[key] = await future
+
+        return [resolved[key].tolist() for key in keys]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Embedder and cache statistics"""
+        return {
+            **self.stats,
+            "in_flight": len(self._in_flight),
+            "cache": self.cache.get_stats()
+        }
+
+    async def _generate(self, pending: Dict[str, str]) -> Dict[str, np.ndarray]:
+        """Call the provider in batch_size chunks and populate the cache"""
+        keys = list(pending.keys())
+        generated: Dict[str, np.ndarray] = {}
+
+        for start in range(0, len(keys), self.batch_size):
+            chunk_keys = keys[start:start + self.batch_size]
+            chunk_texts = [pending[key] for key in chunk_keys]
+
+            self.stats["provider_calls"] += 1
+            self.stats["provider_texts"] += len(chunk_texts)
+
+            try:
+                embeddings = await self.batch_embed(chunk_texts)
+                if len(embeddings) != len(chunk_texts):
+                    raise ValueError(
+                        f"Provider returned {len(embeddings)} embeddings for {len(chunk_texts)} texts"
+                    )
+            except Exception as e:
+                # Fallback vectors are returned but never cached
+                self.stats["provider_errors"] += 1
+                logger.error(f"Embedding generation failed: {e}")
+                fallback = self.fallback_embedding()
+                for key in chunk_keys:
+                    generated[key] = fallback
+                continue
+
+            for key, embedding in zip(chunk_keys, embeddings):
+                generated[key] = self.cache.put(key, embedding)
+
+        return generated
+
+    def fallback_embedding(self) -> np.ndarray:
+        """Dummy embedding used when the provider is unavailable"""
+        vector = np.full(self.dimension, 0.1, dtype=np.float32)
+        vector.setflags(write=False)
+        return vector
@@ -0,0 +1,224 @@
+"""
+Outcome Write-Behind Logger - batched persistence of query outcomes
+
+Search requests enqueue outcome rows instead of spawning one task and one
+INSERT per query. A single background flusher drains the bounded queue and
+batch-inserts rows whenever the batch size is reached or the flush interval
+elapses. When the queue is full new rows are dropped (enqueue_nowait) or the
+caller waits for space (enqueue), and both cases are counted. A batch whose
+write still fails after max_retries goes back to the head of the queue for
+the next flush; after max_requeues failed flushes in a row it is dropped.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BatchWriter = Callable[[List[Dict[str, Any]]], Awaitable[int]]
+
+
+class OutcomeWriteBehindLogger:
+    """Bounded write-behind queue with size/interval triggered batch flushes"""
+
+    def __init__(
+        self,
+        write_batch: BatchWriter,
+        name: str = "outcomes",
+        max_queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval_seconds: float = 1.0,
+        max_retries: int = 2,
+        max_requeues: int = 3
+    ):
+        self.write_batch = write_batch
+        self.name = name
+        self.max_queue_size = max(1, max_queue_size)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_retries = max_retries
+        self.max_requeues = max_requeues
+
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._flusher: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._space_available: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._closed = False
+        self._failed_flushes = 0
+
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "backpressure_waits": 0,
+            "batches": 0,
+            "flush_errors": 0,
+            "retries": 0,
+            "requeued": 0,
+            "queue_high_water": 0,
+            "last_flush_ms": 0.0
+        }
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def enqueue_nowait(self, row: Dict[str, Any]) -> bool:
+        """Queue a row without waiting; returns False (and counts a drop) when full"""
+        if self._closed or len(self._queue) >= self.max_queue_size:
+            self.stats["dropped"] += 1
+            return False
+
+        self._append(row)
+        return True
+
+    async def enqueue(self, row: Dict[str, Any], timeout: Optional[float] = None) -> bool:
+        """Queue a row, waiting up to timeout for space (backpressure)"""
+        self._ensure_started()
+
+        if len(self._queue) >= self.max_queue_size and not self._closed:
+            self.stats["backpressure_waits"] += 1
+            self._wakeup.set()
+            deadline = time.monotonic() + timeout if timeout is not None else None
+
+            while len(self._queue) >= self.max_queue_size and not self._closed:
+                self._space_available.clear()
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._space_available.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+
+        return self.enqueue_nowait(row)
+
+    async def flush(self) -> int:
+        """Write everything currently queued; returns rows written"""
+        self._ensure_started()
+        written = 0
+        async with self._flush_lock:
+            while self._queue:
+                batch_written = await self._flush_batch()
+                if batch_written is None:
+                    break
+                written += batch_written
+        return written
+
+    async def stop(self, timeout: float = 10.0):
+        """Stop accepting rows and flush the remaining queue"""
+        if self._closed:
+            return
+        self._closed = True
+
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+
+        if self._queue:
+            try:
+                await asyncio.wait_for(self.flush(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"Write-behind '{self.name}' shutdown flush timed out")
+
+        # Rows left after the final flush (timed out or requeued) cannot be written any more
+        if self._queue:
+            logger.error(f"Write-behind '{self.name}' dropping {len(self._queue)} unwritten rows on shutdown")
+            self.stats["dropped"] += len(self._queue)
+            self._queue.clear()
+
+        logger.info(f"Write-behind '{self.name}' stopped: {self.stats}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth plus write, drop and backpressure counters"""
+        return {
+            **self.stats,
+            "queue_depth": len(self._queue),
+            "max_queue_size": self.max_queue_size,
+            "running": self._flusher is not None and not self._flusher.done()
+        }
+
+    def _append(self, row: Dict[str, Any]):
+        self._ensure_started()
+        self._queue.append(row)
+        self.stats["enqueued"] += 1
+        self.stats["queue_high_water"] = max(self.stats["queue_high_water"], len(self._queue))
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def _ensure_started(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+            self._space_available = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+
+        if not self._closed and (self._flusher is None or self._flusher.done()):
+            self._flusher = asyncio.create_task(self._run(), name=f"write-behind-{self.name}")
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            if not self._queue:
+                continue
+
+            try:
+                async with self._flush_lock:
+                    # Drain full batches, then whatever is left on the interval tick;
+                    # a requeued batch waits for the next tick
+                    while self._queue:
+                        if await self._flush_batch() is None:
+                            break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Write-behind '{self.name}' flusher error: {e}")
+
+    async def _flush_batch(self) -> Optional[int]:
+        """Write one batch; None when it failed and went back to the queue"""
+        batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+        self._space_available.set()
+
+        started = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            try:
+                written = await self.write_batch(batch)
+                self.stats["written"] += written
+                self.stats["batches"] += 1
+                self.stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                self._failed_flushes = 0
+                return written
+            except Exception as e:
+                self.stats["flush_errors"] += 1
+                if attempt < self.max_retries:
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(min(2.0, 0.1 * (2 ** attempt)))
+                    continue
+                return self._requeue(batch, e)
+
+    def _requeue(self, batch: List[Dict[str, Any]], error: Exception) -> Optional[int]:
+        """Put a failed batch back at the head of the queue, or drop it after max_requeues"""
+        self._failed_flushes += 1
+        if self._failed_flushes > self.max_requeues:
+            logger.error(f"Write-behind '{self.name}' dropped batch of {len(batch)} rows: {error}")
+            self.stats["dropped"] += len(batch)
+            self._failed_flushes = 0
+            return 0
+
+        # Rows enqueued during the retries may have taken the space; the newest failed rows give way
+        kept = batch[:max(0, self.max_queue_size - len(self._queue))]
+        self._queue.extendleft(reversed(kept))
+        self.stats["requeued"] += len(kept)
+        self.stats["dropped"] += len(batch) - len(kept)
+        logger.warning(f"Write-behind '{self.name}' requeued {len(kept)} of {len(batch)} rows "
+                       f"after a failed write: {error}")
+        return None
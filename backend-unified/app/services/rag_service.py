@@ -8,6 +8,7 @@ Date: 2025-07-03
 
 import asyncio
 import logging
+import os
 import uuid
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
@@ -15,25 +16,58 @@ import time
 import json
 
 from app.services.database_service import DatabaseService
+from app.services.embedding_cache import CachedEmbedder, EmbeddingCache, DEFAULT_EMBEDDING_DIMENSION
+from app.services.rank_fusion import RankFusionEngine, RetrieverSpec, FusionMethod
+from app.services.response_cache import SearchResponseCache, search_response_cache
+from app.services.sync_listeners import attach_sync_listeners
+from app.services.outcome_writer import OutcomeWriteBehindLogger
 from app.models.rag_models import (
     QueryRequest, SearchResponse, SearchResult, SearchStrategy,
     QueryContext, BulkQueryRequest
 )
 from core.intelligence.ai_research_client import AIResearchClient
+from utils.tracing import span, traced
 
 logger = logging.getLogger(__name__)
 
 class AdaptiveRAGService:
     """Strategic RAG coordination with multiple search strategies"""
     
-    def __init__(self):
+    def __init__(self, response_cache: Optional[SearchResponseCache] = None):
         self.db_service = DatabaseService()
         self.ai_client = None
+        self.response_cache = response_cache or search_response_cache
         self._strategy_weights = {
             "vector": 0.4,      # 40% vector similarity
             "semantic": 0.3,    # 30% semantic search  
             "performance": 0.3  # 30% performance weighting
         }
+        self.fusion_engine = RankFusionEngine(
+            weights=self._strategy_weights,
+            method=os.getenv("RAG_FUSION_METHOD", FusionMethod.RECIPROCAL_RANK),
+            default_deadline_seconds=float(os.getenv("RAG_RETRIEVER_DEADLINE_SECONDS", "2.0"))
+        )
+        self._retriever_deadlines = {
+            "vector": float(os.getenv("RAG_VECTOR_DEADLINE_SECONDS", "1.0")),
+            "semantic": float(os.getenv("RAG_SEMANTIC_DEADLINE_SECONDS", "2.0")),
+            "performance": float(os.getenv("RAG_PERFORMANCE_DEADLINE_SECONDS", "1.0"))
+        }
+        self.embedder = CachedEmbedder(
+            batch_embed=self._batch_generate_embeddings,
+            cache=EmbeddingCache(
+                max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "10000")),
+                disk_path=os.getenv("EMBEDDING_CACHE_DIR") or None
+            ),
+            model=os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002"),
+            batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+        )
+        self.outcome_writer = OutcomeWriteBehindLogger(
+            write_batch=self.db_service.store_query_outcomes_batch,
+            name="rag_outcomes",
+            max_queue_size=int(os.getenv("OUTCOME_QUEUE_MAX_SIZE", "10000")),
+            batch_size=int(os.getenv("OUTCOME_BATCH_SIZE", "500")),
+            flush_interval_seconds=float(os.getenv("OUTCOME_FLUSH_INTERVAL_SECONDS", "1.0"))
+        )
         self._initialized = False
     
     async def initialize(self):
@@ -42,12 +76,19 @@ class AdaptiveRAGService:
             await self.db_service.initialize()
             self.ai_client = AIResearchClient()
             await self.ai_client.initialize()
+            self._attach_sync_listeners()
             self._initialized = True
             logger.info("✅ Adaptive RAG Service initialized")
         except Exception as e:
             logger.error(f"❌ RAG Service initialization failed: {e}")
             raise
     
+    def _attach_sync_listeners(self):
+        """Invalidate cached responses when a document they returned is synced"""
+        if not attach_sync_listeners(self.response_cache.on_entities_synced):
+            logger.warning("Response cache invalidation relies on TTL only")
+    
+    @traced("rag.hybrid_search")
     async def execute_hybrid_search(
         self,
         query: str,
@@ -69,8 +110,20 @@ class AdaptiveRAGService:
         try:
             logger.info(f"Executing hybrid search for query: {query[:50]}...")
             
+            # Exact cache tier: skips embedding and retrieval entirely
+            requested_strategy = strategy.value
+            cached = self.response_cache.get_exact(query, requested_strategy, context)
+            if cached is not None:
+                return self._cached_response(cached, query_id, start_time, user_id, "exact")
+            
             # Generate query embedding using AI client
-            query_embedding = await self._generate_embedding(query)
+            with span("rag.embed_query"):
+                query_embedding = await self._generate_embedding(query)
+            
+            # Semantic cache tier: near-identical recent query in the same scope
+            cached = self.response_cache.get_semantic(query_embedding, requested_strategy, context)
+            if cached is not None:
+                return self._cached_response(cached, query_id, start_time, user_id, "semantic")
             
             # Strategy selection based on request
             if strategy == SearchStrategy.ADAPTIVE:
@@ -79,12 +132,15 @@ class AdaptiveRAGService:
                 selected_strategy = strategy.value
             
             # Execute search based on selected strategy
-            search_results = await self._execute_strategy(
-                selected_strategy, query, query_embedding, context
-            )
+            retrieval_report: Dict[str, Any] = {}
+            with span("rag.retrieve", {"strategy": selected_strategy}):
+                search_results = await self._execute_strategy(
+                    selected_strategy, query, query_embedding, context, retrieval_report
+                )
             
             # Calculate overall confidence score
-            confidence_score = await self._calculate_confidence(search_results, context)
+            with span("rag.confidence"):
+                confidence_score = await self._calculate_confidence(search_results, context)
             
             # Create response
             response = SearchResponse(
@@ -93,11 +149,16 @@ class AdaptiveRAGService:
                 confidence_score=confidence_score,
                 strategy_used=selected_strategy,
                 query_id=query_id,
-                processing_time_ms=int((time.time() - start_time) * 1000)
+                processing_time_ms=int((time.time() - start_time) * 1000),
+                debug_info={"retrieval": retrieval_report} if retrieval_report else None
             )
             
-            # Store for learning (background task)
-            asyncio.create_task(self._store_query_outcome(query_id, response, user_id))
+            # Partial (timed out) or empty results are not worth replaying
+            if search_results and not retrieval_report.get("partial"):
+                self.response_cache.put(query, requested_strategy, context, response, query_embedding)
+            
+            # Store for learning (write-behind, batched)
+            self._store_query_outcome(query_id, response, user_id)
             
             logger.info(f"Search completed: {response.processing_time_ms}ms, confidence: {confidence_score:.2f}")
             
@@ -107,6 +168,27 @@ class AdaptiveRAGService:
             logger.error(f"Hybrid search failed: {e}")
             raise
     
+    def _cached_response(
+        self,
+        cached: SearchResponse,
+        query_id: str,
+        start_time: float,
+        user_id: Optional[str],
+        tier: str
+    ) -> SearchResponse:
+        """Re-issue a cached response under a fresh query id"""
+        response = cached.model_copy(update={
+            "query_id": query_id,
+            "processing_time_ms": int((time.time() - start_time) * 1000),
+            "timestamp": datetime.utcnow(),
+            "debug_info": {**(cached.debug_info or {}), "cache": tier}
+        })
+        
+        self._store_query_outcome(query_id, response, user_id)
+        logger.info(f"Search served from {tier} cache: {response.processing_time_ms}ms")
+        
+        return response
+    
     async def execute_bulk_search(
         self,
         queries: List[QueryRequest],
@@ -122,6 +204,14 @@ class AdaptiveRAGService:
         results = []
         
         try:
+            if not self._initialized:
+                await self.initialize()
+            
+            # Embed all distinct uncached queries in a single batch call;
+            # the per-query searches below then hit the embedding cache
+            if batch_optimization:
+                await self.prewarm_embeddings([query.query for query in queries])
+            
             if batch_optimization and len(queries) > 5:
                 # Parallel execution for batch optimization
                 tasks = [
@@ -182,21 +272,22 @@ class AdaptiveRAGService:
         strategy: str,
         query: str,
         query_embedding: List[float],
-        context: Optional[QueryContext]
+        context: Optional[QueryContext],
+        report: Optional[Dict[str, Any]] = None
     ) -> List[SearchResult]:
         """Execute specific search strategy"""
         
         if strategy == "vector":
             return await self._vector_search(query_embedding, context)
         elif strategy == "semantic":
-            return await self._semantic_search(query, context)
+            return await self._semantic_search(query, context, query_embedding)
         elif strategy == "hybrid":
-            return await self._hybrid_search(query, query_embedding, context)
+            return await self._hybrid_search(query, query_embedding, context, report)
         elif strategy == "performance_weighted":
             return await self._performance_weighted_search(query_embedding, context)
         else:
             # Default to hybrid for unknown strategies
-            return await self._hybrid_search(query, query_embedding, context)
+            return await self._hybrid_search(query, query_embedding, context, report)
     
     async def _vector_search(
         self, 
@@ -235,12 +326,14 @@ class AdaptiveRAGService:
     async def _semantic_search(
         self, 
         query: str, 
-        context: Optional[QueryContext]
+        context: Optional[QueryContext],
+        query_embedding: Optional[List[float]] = None
     ) -> List[SearchResult]:
         """Semantic search with full-text capabilities"""
         try:
-            # Generate embedding for hybrid search
-            query_embedding = await self._generate_embedding(query)
+            # Reuse the caller's embedding; fall back to the (cached) generator
+            if query_embedding is None:
+                query_embedding = await self._generate_embedding(query)
             
             # Use hybrid search from database service
             raw_results = await self.db_service.execute_hybrid_search(
@@ -273,36 +366,42 @@ class AdaptiveRAGService:
         self,
         query: str,
         query_embedding: List[float],
-        context: Optional[QueryContext]
+        context: Optional[QueryContext],
+        report: Optional[Dict[str, Any]] = None
     ) -> List[SearchResult]:
         """
         Strategic hybrid search coordination
         
-        Combines vector (40%) + semantic (30%) + performance (30%)
+        Runs vector, semantic and performance retrievers concurrently (each with
+        its own deadline) and fuses the ranked lists with the configured method
         """
         try:
-            # Execute searches in parallel
-            vector_task = self._vector_search(query_embedding, context)
-            semantic_task = self._semantic_search(query, context)
+            retrievers = [
+                RetrieverSpec(
+                    name="vector",
+                    search=lambda: self._vector_search(query_embedding, context),
+                    deadline_seconds=self._retriever_deadlines["vector"]
+                ),
+                RetrieverSpec(
+                    name="semantic",
+                    search=lambda: self._semantic_search(query, context, query_embedding),
+                    deadline_seconds=self._retriever_deadlines["semantic"]
+                ),
+                RetrieverSpec(
+                    name="performance",
+                    search=lambda: self._performance_weighted_search(query_embedding, context),
+                    deadline_seconds=self._retriever_deadlines["performance"]
+                )
+            ]
             
-            vector_results, semantic_results = await asyncio.gather(
-                vector_task, semantic_task, return_exceptions=True
-            )
+            outcome = await self.fusion_engine.run(retrievers, top_k=10)
             
-            # Handle exceptions
-            if isinstance(vector_results, Exception):
-                logger.error(f"Vector search in hybrid failed: {vector_results}")
-                vector_results = []
-            if isinstance(semantic_results, Exception):
-                logger.error(f"Semantic search in hybrid failed: {semantic_results}")
-                semantic_results = []
-            
-            # Coordinate results with strategic weighting
-            coordinated_results = await self._coordinate_results(
-                vector_results, semantic_results, context
-            )
+            if outcome.partial:
+                logger.warning(f"Hybrid search returned partial results: {outcome.to_dict()['retrievers']}")
+            if report is not None:
+                report.update(outcome.to_dict())
             
-            return coordinated_results
+            return outcome.results
             
         except Exception as e:
             logger.error(f"Hybrid search failed: {e}")
@@ -350,81 +449,6 @@ class AdaptiveRAGService:
             logger.error(f"Performance weighted search failed: {e}")
             return []
     
-    async def _coordinate_results(
-        self,
-        vector_results: List[SearchResult],
-        semantic_results: List[SearchResult],
-        context: Optional[QueryContext]
-    ) -> List[SearchResult]:
-        """Strategic result coordination with confidence scoring"""
-        try:
-            # Create result map by chunk_id for deduplication
-            result_map = {}
-            
-            # Add vector results with 40% weight
-            for result in vector_results:
-                chunk_id = result.chunk_id or result.source_id
-                if chunk_id:
-                    result_map[chunk_id] = {
-                        "result": result,
-                        "vector_score": result.relevance_score * 0.4,
-                        "semantic_score": 0.0,
-                        "sources": ["vector"]
-                    }
-            
-            # Add semantic results with 30% weight
-            for result in semantic_results:
-                chunk_id = result.chunk_id or result.source_id
-                if chunk_id:
-                    if chunk_id in result_map:
-                        # Update existing result
-                        result_map[chunk_id]["semantic_score"] = result.relevance_score * 0.3
-                        result_map[chunk_id]["sources"].append("semantic")
-                    else:
-                        # New result from semantic only
-                        result_map[chunk_id] = {
-                            "result": result,
-                            "vector_score": 0.0,
-                            "semantic_score": result.relevance_score * 0.3,
-                            "sources": ["semantic"]
-                        }
-            
-            # Calculate coordinated scores and create final results
-            coordinated_results = []
-            for chunk_id, data in result_map.items():
-                # Calculate combined score with performance weighting (30%)
-                performance_weight = 0.3
-                base_score = data["vector_score"] + data["semantic_score"]
-                performance_score = data["result"].confidence_score * performance_weight
-                
-                final_score = base_score + performance_score
-                
-                # Update result with coordinated scoring
-                final_result = SearchResult(
-                    content=data["result"].content,
-                    relevance_score=min(final_score, 1.0),
-                    confidence_score=data["result"].confidence_score,
-                    source_id=data["result"].source_id,
-                    chunk_id=data["result"].chunk_id,
-                    metadata={
-                        **data["result"].metadata,
-                        "coordination_sources": data["sources"],
-                        "vector_contribution": data["vector_score"],
-                        "semantic_contribution": data["semantic_score"],
-                        "performance_contribution": performance_score
-                    }
-                )
-                coordinated_results.append(final_result)
-            
-            # Sort by relevance score and return top results
-            coordinated_results.sort(key=lambda x: x.relevance_score, reverse=True)
-            return coordinated_results[:10]
-            
-        except Exception as e:
-            logger.error(f"Result coordination failed: {e}")
-            # Return vector results as fallback
-            return vector_results[:10] if vector_results else semantic_results[:10]
-    
     async def _select_optimal_strategy(
         self,
         query: str,
@@ -435,6 +459,11 @@ class AdaptiveRAGService:
             # Get strategy performance data
             strategy_performance = await self.db_service.get_strategy_performance()
             
+            # Let observed outcomes tune the fusion weights
+            self.fusion_engine.update_learned_weights(
+                strategy_performance, name_map={"performance_weighted": "performance"}
+            )
+            
             # Analyze query characteristics
             query_length = len(query.split())
             has_technical_terms = any(term in query.lower() for term in [
@@ -490,27 +519,61 @@ class AdaptiveRAGService:
         return min(final_confidence, 1.0)
     
     async def _generate_embedding(self, text: str) -> List[float]:
-        """Generate text embedding using AI client"""
+        """Generate text embedding using AI client (cached by content hash)"""
         try:
             if self.ai_client:
-                embedding = await self.ai_client.generate_embedding(text)
-                return embedding
+                return await self.embedder.embed(text)
             else:
                 # Fallback: create dummy embedding
                 logger.warning("AI client not available, using dummy embedding")
-                return [0.1] * 1536  # OpenAI embedding size
+                return [0.1] * DEFAULT_EMBEDDING_DIMENSION
                 
         except Exception as e:
             logger.error(f"Embedding generation failed: {e}")
-            return [0.1] * 1536  # Fallback
+            return [0.1] * DEFAULT_EMBEDDING_DIMENSION  # Fallback
     
-    async def _store_query_outcome(
+    async def prewarm_embeddings(self, texts: List[str]) -> int:
+        """Embed all uncached texts in one batch; returns the number of distinct texts"""
+        try:
+            if not self.ai_client or not texts:
+                return 0
+            
+            await self.embedder.embed_many(texts)
+            return len(set(texts))
+            
+        except Exception as e:
+            logger.error(f"Embedding prewarm failed: {e}")
+            return 0
+    
+    async def _batch_generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Provider call used by the embedding cache for all misses"""
+        if hasattr(self.ai_client, "generate_embeddings"):
+            return await self.ai_client.generate_embeddings(texts)
+        
+        # Client without a batch endpoint: issue the calls concurrently
+        return await asyncio.gather(*[
+            self.ai_client.generate_embedding(text) for text in texts
+        ])
+    
+    def get_embedding_cache_stats(self) -> Dict[str, Any]:
+        """Embedding cache hit rate and provider call counters"""
+        return self.embedder.get_stats()
+    
+    def get_response_cache_stats(self) -> Dict[str, Any]:
+        """Exact/semantic response cache hit rates"""
+        return self.response_cache.get_stats()
+    
+    def get_fusion_stats(self) -> Dict[str, Any]:
+        """Per-retriever latency/timeout counters and current fusion weights"""
+        return self.fusion_engine.get_stats()
+    
+    def _store_query_outcome(
         self,
         query_id: str,
         response: SearchResponse,
         user_id: Optional[str]
     ):
-        """Store query outcome for learning system"""
+        """Queue query outcome for the learning system (never blocks the request)"""
         try:
             outcome_data = {
                 "strategy_used": response.strategy_used,
@@ -521,16 +584,24 @@ class AdaptiveRAGService:
                 "user_id": user_id
             }
             
-            await self.db_service.store_query_outcome(
+            self.outcome_writer.enqueue_nowait(self.db_service.build_outcome_row(
                 query_id=query_id,
                 response_id=str(uuid.uuid4()),
                 outcome_data=outcome_data,
                 confidence_score=response.confidence_score
-            )
+            ))
             
         except Exception as e:
             logger.error(f"Outcome storage failed: {e}")
     
+    async def shutdown(self):
+        """Flush queued query outcomes"""
+        await self.outcome_writer.stop()
+    
+    def get_outcome_writer_stats(self) -> Dict[str, Any]:
+        """Write-behind queue depth, drop and backpressure counters"""
+        return self.outcome_writer.get_stats()
+    
     async def health_check(self) -> bool:
         """Health check for RAG service"""
         try:
@@ -0,0 +1,289 @@
+"""
+Rank Fusion Engine - concurrent multi-retriever search with result fusion
+
+Runs the selected retrievers concurrently, each with its own deadline, and
+merges their ranked lists with:
+1. Reciprocal rank fusion (default): score = sum(weight / (k + rank))
+2. Weighted score fusion: min-max normalized relevance * retriever weight
+
+Retrievers that time out or fail are reported and skipped, so callers get
+partial results and end-to-end latency is bounded by the slowest retriever
+that finished within its deadline.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.models.rag_models import SearchResult
+
+logger = logging.getLogger(__name__)
+
+Retriever = Callable[[], Awaitable[List[SearchResult]]]
+
+
+class FusionMethod:
+    RECIPROCAL_RANK = "rrf"
+    WEIGHTED = "weighted"
+
+
+@dataclass
+class RetrieverSpec:
+    """A named retriever invocation with its deadline"""
+    name: str
+    search: Retriever
+    deadline_seconds: Optional[float] = None
+
+
+@dataclass
+class RetrieverReport:
+    """Outcome of one retriever within a fusion run"""
+    name: str
+    status: str
+    latency_ms: float
+    result_count: int = 0
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "latency_ms": round(self.latency_ms, 2),
+            "result_count": self.result_count,
+            "error": self.error
+        }
+
+
+@dataclass
+class FusionOutcome:
+    """Fused results plus per-retriever diagnostics"""
+    results: List[SearchResult]
+    reports: Dict[str, RetrieverReport] = field(default_factory=dict)
+    method: str = FusionMethod.RECIPROCAL_RANK
+    total_latency_ms: float = 0.0
+
+    @property
+    def partial(self) -> bool:
+        return any(report.status != "ok" for report in self.reports.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "partial": self.partial,
+            "total_latency_ms": round(self.total_latency_ms, 2),
+            "retrievers": {name: report.to_dict() for name, report in self.reports.items()}
+        }
+
+
+class RankFusionEngine:
+    """Concurrent retriever execution with reciprocal rank or weighted fusion"""
+
+    def __init__(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        method: str = FusionMethod.RECIPROCAL_RANK,
+        rrf_k: int = 60,
+        default_deadline_seconds: float = 2.0,
+        learning_rate: float = 0.2,
+        min_queries_for_learning: int = 20
+    ):
+        self.prior_weights = dict(weights or {})
+        self.weights = dict(self.prior_weights)
+        self.method = method
+        self.rrf_k = rrf_k
+        self.default_deadline_seconds = default_deadline_seconds
+        self.learning_rate = learning_rate
+        self.min_queries_for_learning = min_queries_for_learning
+
+        self.retriever_stats: Dict[str, Dict[str, float]] = {}
+
+    async def run(
+        self,
+        retrievers: List[RetrieverSpec],
+        top_k: int = 10,
+        method: Optional[str] = None
+    ) -> FusionOutcome:
+        """Run all retrievers concurrently and fuse whatever finished in time"""
+        started = time.perf_counter()
+
+        outcomes = await asyncio.gather(*(self._run_retriever(spec) for spec in retrievers))
+
+        ranked_lists: Dict[str, List[SearchResult]] = {}
+        reports: Dict[str, RetrieverReport] = {}
+        for spec, (report, results) in zip(retrievers, outcomes):
+            reports[spec.name] = report
+            self._record(report)
+            if results:
+                ranked_lists[spec.name] = results
+
+        method = method or self.method
+        fused = self.fuse(ranked_lists, top_k=top_k, method=method)
+
+        return FusionOutcome(
+            results=fused,
+            reports=reports,
+            method=method,
+            total_latency_ms=(time.perf_counter() - started) * 1000
+        )
+
+    def fuse(
+        self,
+        ranked_lists: Dict[str, List[SearchResult]],
+        top_k: int = 10,
+        method: Optional[str] = None
+    ) -> List[SearchResult]:
+        """Merge ranked result lists into a single list of at most top_k results"""
+        method = method or self.method
+        if not ranked_lists:
+            return []
+
+        weights = {name: self.weights.get(name, 1.0) for name in ranked_lists}
+        candidates: Dict[str, Dict[str, Any]] = {}
+
+        for name, results in ranked_lists.items():
+            if method == FusionMethod.WEIGHTED:
+                contributions = self._normalized_scores(results)
+            else:
+                contributions = [1.0 / (self.rrf_k + rank) for rank in range(1, len(results) + 1)]
+
+            for rank, (result, contribution) in enumerate(zip(results, contributions), start=1):
+                key = result.chunk_id or result.source_id or result.content
+                entry = candidates.get(key)
+                if entry is None:
+                    entry = candidates[key] = {
+                        "result": result,
+                        "score": 0.0,
+                        "ranks": {},
+                        "contributions": {}
+                    }
+                entry["score"] += weights[name] * contribution
+                entry["ranks"][name] = rank
+                entry["contributions"][name] = round(weights[name] * contribution, 6)
+
+        # Normalize to 0-1 against the best achievable score
+        if method == FusionMethod.WEIGHTED:
+            max_score = sum(weights.values())
+        else:
+            max_score = sum(weight / (self.rrf_k + 1) for weight in weights.values())
+        max_score = max_score or 1.0
+
+        ordered = sorted(candidates.values(), key=lambda entry: entry["score"], reverse=True)[:top_k]
+
+        fused_results = []
+        for entry in ordered:
+            result = entry["result"]
+            fused_results.append(SearchResult(
+                content=result.content,
+                relevance_score=min(entry["score"] / max_score, 1.0),
+                confidence_score=result.confidence_score,
+                source_id=result.source_id,
+                chunk_id=result.chunk_id,
+                metadata={
+                    **(result.metadata or {}),
+                    "coordination_sources": list(entry["ranks"].keys()),
+                    "retriever_ranks": entry["ranks"],
+                    "retriever_contributions": entry["contributions"],
+                    "fusion_method": method
+                }
+            ))
+
+        return fused_results
+
+    def update_learned_weights(
+        self,
+        strategy_performance: Dict[str, Dict[str, float]],
+        name_map: Optional[Dict[str, str]] = None
+    ):
+        """Move weights toward observed satisfaction/conversion per retriever"""
+        name_map = name_map or {}
+        observed = {}
+        for strategy, metrics in strategy_performance.items():
+            name = name_map.get(strategy, strategy)
+            if name not in self.prior_weights:
+                continue
+            if metrics.get("total_queries", 0) < self.min_queries_for_learning:
+                continue
+            observed[name] = metrics.get("avg_satisfaction", 0.0) * (1.0 + metrics.get("conversion_rate", 0.0))
+
+        if not observed:
+            return
+
+        # Rescale so learned weights keep the prior total mass
+        prior_total = sum(self.prior_weights[name] for name in observed)
+        observed_total = sum(observed.values()) or 1.0
+        for name, value in observed.items():
+            target = prior_total * value / observed_total
+            self.weights[name] = (1 - self.learning_rate) * self.weights.get(name, target) + self.learning_rate * target
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-retriever latency, timeout and error counters plus current weights"""
+        retrievers = {}
+        for name, stats in self.retriever_stats.items():
+            calls = stats["calls"]
+            retrievers[name] = {
+                **stats,
+                "avg_latency_ms": round(stats["total_latency_ms"] / calls, 2) if calls else 0.0,
+                "timeout_rate": stats["timeouts"] / calls if calls else 0.0
+            }
+
+        return {
+            "method": self.method,
+            "weights": dict(self.weights),
+            "retrievers": retrievers
+        }
+
+    async def _run_retriever(self, spec: RetrieverSpec):
+        deadline = spec.deadline_seconds or self.default_deadline_seconds
+        started = time.perf_counter()
+
+        try:
+            results = await asyncio.wait_for(spec.search(), timeout=deadline)
+            report = RetrieverReport(
+                name=spec.name,
+                status="ok",
+                latency_ms=(time.perf_counter() - started) * 1000,
+                result_count=len(results)
+            )
+            return report, results
+
+        except asyncio.TimeoutError:
+            logger.warning(f"Retriever '{spec.name}' exceeded its {deadline}s deadline")
+            return RetrieverReport(
+                name=spec.name,
+                status="timeout",
+                latency_ms=(time.perf_counter() - started) * 1000
+            ), []
+
+        except Exception as e:
+            logger.error(f"Retriever '{spec.name}' failed: {e}")
+            return RetrieverReport(
+                name=spec.name,
+                status="error",
+                latency_ms=(time.perf_counter() - started) * 1000,
+                error=str(e)
+            ), []
+
+    def _record(self, report: RetrieverReport):
+        stats = self.retriever_stats.setdefault(report.name, {
+            "calls": 0,
+            "timeouts": 0,
+            "errors": 0,
+            "total_latency_ms": 0.0,
+            "max_latency_ms": 0.0
+        })
+        stats["calls"] += 1
+        stats["total_latency_ms"] += report.latency_ms
+        stats["max_latency_ms"] = max(stats["max_latency_ms"], report.latency_ms)
+        if report.status == "timeout":
+            stats["timeouts"] += 1
+        elif report.status == "error":
+            stats["errors"] += 1
+
+    @staticmethod
+    def _normalized_scores(results: List[SearchResult]) -> List[float]:
+        scores = [result.relevance_score for result in results]
+        low, high = min(scores), max(scores)
+        if high - low <= 1e-12:
+            return [1.0 for _ in scores]
+        return [(score - low) / (high - low) for score in scores]
@@ -0,0 +1,336 @@
+"""
+Search Response Cache - exact and semantic caching of RAG search responses
+
+Two tiers in front of the embed -> retrieve -> fuse -> confidence pipeline:
+1. Exact: normalized query + requested strategy + context fingerprint
+2. Semantic: cosine match of the query embedding against recently cached
+   queries of the same strategy/context scope above a similarity threshold
+
+Entries expire after a TTL and are invalidated when DatabaseSyncManager
+reports that a document they returned has changed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from app.models.rag_models import QueryContext, SearchResponse
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class _CacheEntry:
+    response: SearchResponse
+    strategy: str
+    scope: str
+    expires_at: float
+    entity_ids: Set[str] = field(default_factory=set)
+    semantic_slot: Optional[int] = None
+
+
+class SearchResponseCache:
+    """Bounded TTL cache of search responses with an embedding similarity tier"""
+
+    def __init__(
+        self,
+        max_entries: int = 5000,
+        ttl_seconds: float = 300.0,
+        semantic_threshold: float = 0.97,
+        semantic_window: int = 1000,
+        semantic_enabled: bool = True
+    ):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.semantic_threshold = semantic_threshold
+        self.semantic_window = max(1, semantic_window)
+        self.semantic_enabled = semantic_enabled
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._entity_index: Dict[str, Set[str]] = defaultdict(set)
+
+        # Ring buffer of recent query embeddings for the semantic tier
+        self._semantic_vectors: Optional[np.ndarray] = None
+        self._semantic_keys: List[Optional[str]] = [None] * self.semantic_window
+        self._semantic_scopes: List[Optional[str]] = [None] * self.semantic_window
+        self._semantic_cursor = 0
+
+        self.stats = {
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+            "full_invalidations": 0
+        }
+        self.strategy_stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"lookups": 0, "exact_hits": 0, "semantic_hits": 0, "stores": 0}
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return _WHITESPACE.sub(" ", query or "").strip().lower()
+
+    @staticmethod
+    def context_fingerprint(context: Optional[QueryContext]) -> str:
+        """Context fields that change ranking or confidence"""
+        if context is None:
+            return "-"
+
+        def _value(item):
+            return getattr(item, "value", item)
+
+        return json.dumps({
+            "domain": context.domain,
+            "user_persona": _value(context.user_persona),
+            "device_type": _value(context.device_type)
+        }, sort_keys=True)
+
+    def scope_for(self, strategy: str, context: Optional[QueryContext]) -> str:
+        return f"{strategy}|{self.context_fingerprint(context)}"
+
+    def key_for(self, query: str, strategy: str, context: Optional[QueryContext]) -> str:
+        payload = f"{self.scope_for(strategy, context)}|{self.normalize_query(query)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def get_exact(self, query: str, strategy: str, context: Optional[QueryContext]) -> Optional[SearchResponse]:
+        """Exact-tier lookup; counts a lookup for the strategy"""
+        stats = self.strategy_stats[strategy]
+        stats["lookups"] += 1
+
+        entry = self._live_entry(self.key_for(query, strategy, context))
+        if entry is None:
+            return None
+
+        stats["exact_hits"] += 1
+        return entry.response
+
+    def get_semantic(
+        self,
+        embedding: List[float],
+        strategy: str,
+        context: Optional[QueryContext]
+    ) -> Optional[SearchResponse]:
+        """Semantic-tier lookup, meant to follow an exact miss for the same query"""
+        entry = self._semantic_match(embedding, self.scope_for(strategy, context))
+        if entry is None:
+            return None
+
+        self.strategy_stats[strategy]["semantic_hits"] += 1
+        return entry.response
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def put(
+        self,
+        query: str,
+        strategy: str,
+        context: Optional[QueryContext],
+        response: SearchResponse,
+        embedding: Optional[List[float]] = None
+    ):
+        """Cache a response under its exact key (and embedding, if given)"""
+        key = self.key_for(query, strategy, context)
+        self._drop(key)
+
+        entity_ids = set()
+        for result in response.results:
+            if result.chunk_id:
+                entity_ids.add(str(result.chunk_id))
+            if result.source_id:
+                entity_ids.add(str(result.source_id))
+
+        entry = _CacheEntry(
+            response=response,
+            strategy=strategy,
+            scope=self.scope_for(strategy, context),
+            expires_at=time.monotonic() + self.ttl_seconds,
+            entity_ids=entity_ids
+        )
+        self._entries[key] = entry
+        for entity_id in entity_ids:
+            self._entity_index[entity_id].add(key)
+
+        if self.semantic_enabled and embedding is not None:
+            entry.semantic_slot = self._remember_embedding(key, entry.scope, embedding)
+
+        self.strategy_stats[strategy]["stores"] += 1
+
+        while len(self._entries) > self.max_entries:
+            oldest_key = next(iter(self._entries))
+            self._drop(oldest_key)
+            self.stats["evictions"] += 1
+
+    def invalidate_entities(self, entity_ids: Iterable[str]) -> int:
+        """Drop every cached response that returned one of the given entities"""
+        keys = set()
+        for entity_id in entity_ids:
+            keys |= self._entity_index.get(str(entity_id), set())
+
+        for key in keys:
+            self._drop(key)
+
+        self.stats["invalidations"] += len(keys)
+        return len(keys)
+
+    def invalidate_all(self):
+        """Drop every cached response"""
+        self._entries.clear()
+        self._entity_index.clear()
+        self._semantic_keys = [None] * self.semantic_window
+        self._semantic_scopes = [None] * self.semantic_window
+        self.stats["full_invalidations"] += 1
+
+    async def on_entities_synced(self, entities: List[Any]):
+        """DatabaseSyncManager listener: invalidate responses built on changed documents"""
+        ids = []
+        for entity in entities:
+            ids.append(str(entity.id))
+            source_id = getattr(entity, "source_id", None)
+            if source_id:
+                ids.append(str(source_id))
+
+        invalidated = self.invalidate_entities(ids)
+        if invalidated:
+            logger.debug(f"Invalidated {invalidated} cached search responses after sync")
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def get_strategy_stats(self, strategy: str) -> Dict[str, Any]:
+        """Hit-rate metrics for one strategy"""
+        stats = dict(self.strategy_stats.get(strategy, {
+            "lookups": 0, "exact_hits": 0, "semantic_hits": 0, "stores": 0
+        }))
+        hits = stats["exact_hits"] + stats["semantic_hits"]
+        stats["misses"] = max(0, stats["lookups"] - hits)
+        stats["hit_rate"] = hits / stats["lookups"] if stats["lookups"] else 0.0
+        stats["semantic_hit_rate"] = stats["semantic_hits"] / stats["lookups"] if stats["lookups"] else 0.0
+        return stats
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Global cache counters plus per-strategy hit rates"""
+        lookups = sum(stats["lookups"] for stats in self.strategy_stats.values())
+        hits = sum(stats["exact_hits"] + stats["semantic_hits"] for stats in self.strategy_stats.values())
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "semantic_threshold": self.semantic_threshold,
+            "lookups": lookups,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "strategies": {strategy: self.get_strategy_stats(strategy) for strategy in self.strategy_stats}
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _live_entry(self, key: str) -> Optional[_CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        if entry.expires_at <= time.monotonic():
+            self._drop(key)
+            self.stats["expirations"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        for entity_id in entry.entity_ids:
+            keys = self._entity_index.get(entity_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._entity_index[entity_id]
+
+        slot = entry.semantic_slot
+        if slot is not None and self._semantic_keys[slot] == key:
+            self._semantic_keys[slot] = None
+            self._semantic_scopes[slot] = None
+
+    def _remember_embedding(self, key: str, scope: str, embedding: List[float]) -> Optional[int]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+
+        if self._semantic_vectors is None or self._semantic_vectors.shape[1] != len(vector):
+            self._semantic_vectors = np.zeros((self.semantic_window, len(vector)), dtype=np.float32)
+            self._semantic_keys = [None] * self.semantic_window
+            self._semantic_scopes = [None] * self.semantic_window
+
+        slot = self._semantic_cursor
+        self._semantic_cursor = (self._semantic_cursor + 1) % self.semantic_window
+
+        # The slot's previous occupant stays in the exact tier only
+        previous_key = self._semantic_keys[slot]
+        if previous_key is not None and previous_key in self._entries:
+            self._entries[previous_key].semantic_slot = None
+
+        self._semantic_vectors[slot] = vector / norm
+        self._semantic_keys[slot] = key
+        self._semantic_scopes[slot] = scope
+        return slot
+
+    def _semantic_match(self, embedding: List[float], scope: str) -> Optional[_CacheEntry]:
+        if not self.semantic_enabled or self._semantic_vectors is None:
+            return None
+
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0 or len(vector) != self._semantic_vectors.shape[1]:
+            return None
+
+        slots = [slot for slot, slot_scope in enumerate(self._semantic_scopes) if slot_scope == scope]
+        if not slots:
+            return None
+
+        scores = self._semantic_vectors[slots] @ (vector / norm)
+        for position in np.argsort(-scores):
+            if scores[position] < self.semantic_threshold:
+                break
+            entry = self._live_entry(self._semantic_keys[slots[position]])
+            if entry is not None:
+                return entry
+
+        return None
+
+
+# Shared instance so search metrics and sync invalidation see the same cache
+search_response_cache = SearchResponseCache(
+    max_entries=int(os.getenv("RAG_RESPONSE_CACHE_MAX_ENTRIES", "5000")),
+    ttl_seconds=float(os.getenv("RAG_RESPONSE_CACHE_TTL_SECONDS", "300")),
+    semantic_threshold=float(os.getenv("RAG_RESPONSE_CACHE_SEMANTIC_THRESHOLD", "0.97")),
+    semantic_enabled=os.getenv("RAG_RESPONSE_CACHE_SEMANTIC", "true").lower() == "true"
+)
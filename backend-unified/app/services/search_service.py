@@ -8,11 +8,14 @@ Date: 2025-07-03
 
 import asyncio
 import logging
+import os
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import json
 
 from app.services.database_service import DatabaseService
+from app.services.response_cache import SearchResponseCache, search_response_cache
+from app.services.outcome_writer import OutcomeWriteBehindLogger
 from app.models.rag_models import (
     QueryRequest, SearchResponse, FeedbackRequest, PerformanceMetrics
 )
@@ -22,11 +25,19 @@ logger = logging.getLogger(__name__)
 class AdaptiveSearchService:
     """Self-optimizing search strategy selection and performance management"""
     
-    def __init__(self):
+    def __init__(self, response_cache: Optional[SearchResponseCache] = None):
         self.db_service = DatabaseService()
+        self.response_cache = response_cache or search_response_cache
         self._strategy_cache = {}
         self._cache_expiry = datetime.now()
         self._cache_duration_minutes = 15
+        self.signal_writer = OutcomeWriteBehindLogger(
+            write_batch=self.db_service.store_query_outcomes_batch,
+            name="learning_signals",
+            max_queue_size=int(os.getenv("OUTCOME_QUEUE_MAX_SIZE", "10000")),
+            batch_size=int(os.getenv("OUTCOME_BATCH_SIZE", "500")),
+            flush_interval_seconds=float(os.getenv("OUTCOME_FLUSH_INTERVAL_SECONDS", "1.0"))
+        )
         self._initialized = False
     
     async def initialize(self):
@@ -120,6 +131,8 @@ class AdaptiveSearchService:
                 "strategy_performance": strategy_performance,
                 "improvement_trends": improvement_trends,
                 "recommendations": await self._generate_performance_recommendations(strategy_performance),
+                # Totals include adaptive requests answered before a strategy was selected
+                "response_cache": self.response_cache.get_stats(),
                 "timestamp": datetime.utcnow().isoformat()
             }
             
@@ -224,6 +237,7 @@ class AdaptiveSearchService:
                     "name": strategy_name,
                     "display_name": strategy_name.replace("_", " ").title(),
                     "metrics": metrics,
+                    "cache": self.response_cache.get_strategy_stats(strategy_name),
                     "recommended_for": self._get_strategy_recommendations(strategy_name, metrics),
                     "last_updated": datetime.utcnow().isoformat()
                 }
@@ -382,12 +396,13 @@ class AdaptiveSearchService:
                 "timestamp": datetime.utcnow().isoformat()
             }
             
-            await self.db_service.store_query_outcome(
+            # Runs as a background task, so wait briefly for queue space instead of dropping
+            await self.signal_writer.enqueue(self.db_service.build_outcome_row(
                 query_id=query_id,
                 response_id=f"learning_{query_id}",
                 outcome_data=outcome_data,
                 confidence_score=signals.get("strategy_confidence", 0.5)
-            )
+            ), timeout=1.0)
             
         except Exception as e:
             logger.error(f"Learning signal storage failed: {e}")
@@ -535,6 +550,14 @@ class AdaptiveSearchService:
         
         return strategy_guides.get(strategy_name, ["General purpose"])
     
+    async def shutdown(self):
+        """Flush queued learning signals"""
+        await self.signal_writer.stop()
+    
+    def get_signal_writer_stats(self) -> Dict[str, Any]:
+        """Write-behind queue depth, drop and backpressure counters"""
+        return self.signal_writer.get_stats()
+    
     async def health_check(self) -> bool:
         """Health check for search service"""
         try:
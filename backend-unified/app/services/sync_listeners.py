@@ -0,0 +1,53 @@
+"""
+Sync Listeners - keep search caches and indexes current with document syncs
+
+DatabaseSyncManager lives in the repository-level database package
+(database/sync_manager.py, next to backend-unified/). backend-unified's own
+database directory only holds migrations and has no __init__, so both are
+portions of one namespace package once the repository root is on sys.path.
+The shared entity models it imports (models.unified_models) are served from
+the repository-level models directory by backend-unified's models package.
+"""
+
+import logging
+import os
+import sys
+from typing import Any, Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# app/services -> app -> backend-unified -> repository root
+REPOSITORY_ROOT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+
+SyncListener = Callable[[List[Any]], Awaitable[Any]]
+
+
+def ensure_repository_root_on_path():
+    """Make the repository-level database and models packages importable"""
+    if REPOSITORY_ROOT not in sys.path:
+        sys.path.append(REPOSITORY_ROOT)
+
+
+def load_sync_manager() -> Optional[Any]:
+    """The process-wide DatabaseSyncManager, or None when it cannot be imported"""
+    ensure_repository_root_on_path()
+    try:
+        from database.sync_manager import sync_manager
+    except Exception as e:
+        logger.warning(f"Sync manager unavailable, sync listeners not attached: {e}")
+        return None
+    return sync_manager
+
+
+def attach_sync_listeners(*listeners: SyncListener, sync_manager: Optional[Any] = None) -> bool:
+    """Register listeners for every batch of synced entities; False if there is no sync manager"""
+    if sync_manager is None:
+        sync_manager = load_sync_manager()
+    if sync_manager is None:
+        return False
+
+    for listener in listeners:
+        sync_manager.add_sync_listener(listener)
+    return True
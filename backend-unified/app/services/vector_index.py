@@ -0,0 +1,546 @@
+"""
+Local Vector Index - in-process approximate nearest neighbor search
+
+IVF (inverted file) index over NumPy float32 arrays for cosine similarity:
+1. Vectors are L2-normalized and kept in a growable float32 matrix
+2. Once the corpus is large enough, k-means centroids partition it into lists
+3. A query scores the n_probe closest lists instead of the full matrix
+4. Metadata filters use an inverted (field, value) -> rows map; highly
+   selective filters are answered exactly over the matching rows
+
+Indexes persist to a directory (vectors.npy + JSON payloads) and are
+memory-mapped on load, so hot corpora start without reading every vector.
+
+The index is not thread-safe. Saving and training are split so their slow
+parts can run off the event loop: snapshot()/training_snapshot() copy state
+on the owning thread, save_snapshot()/fit() work only on that copy, and
+apply_training() installs the result back on the owning thread.
+"""
+
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SearchHit = Tuple[str, float, Dict[str, Any]]
+
+_FILTERABLE_TYPES = (str, int, float, bool)
+
+
+class VectorIndex:
+    """IVF-flat cosine similarity index with incremental adds and metadata filters"""
+
+    VECTORS_FILE = "vectors.npy"
+    CENTROIDS_FILE = "centroids.npy"
+    ASSIGNMENTS_FILE = "assignments.npy"
+    STATE_FILE = "index.json"
+
+    def __init__(
+        self,
+        dimension: int = 1536,
+        n_lists: Optional[int] = None,
+        n_probe: int = 8,
+        min_train_size: int = 2048,
+        exact_filter_threshold: int = 4096,
+        kmeans_iterations: int = 10,
+        seed: int = 42,
+        auto_train: bool = True
+    ):
+        self.dimension = dimension
+        self.n_lists = n_lists
+        self.n_probe = max(1, n_probe)
+        self.min_train_size = min_train_size
+        self.exact_filter_threshold = exact_filter_threshold
+        self.kmeans_iterations = kmeans_iterations
+        self.seed = seed
+        # When False, add() never trains inline; the owner checks needs_training
+        self.auto_train = auto_train
+
+        self._vectors = np.zeros((0, dimension), dtype=np.float32)
+        self._size = 0
+        self._ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._payloads: List[Optional[Dict[str, Any]]] = []
+        self._free_rows: List[int] = []
+
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._lists: List[Set[int]] = []
+        self._list_arrays: Dict[int, np.ndarray] = {}
+        self._trained_size = 0
+        # Rows written or freed since the last training_snapshot(), None when not training
+        self._rows_since_snapshot: Optional[Set[int]] = None
+
+        self._filter_rows: Dict[Tuple[str, Any], Set[int]] = defaultdict(set)
+
+        self.stats = {
+            "searches": 0,
+            "exact_searches": 0,
+            "candidates_scored": 0,
+            "adds": 0,
+            "removals": 0,
+            "trainings": 0
+        }
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._rows
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    @property
+    def needs_training(self) -> bool:
+        """Large enough to train and untrained, or doubled since the last training"""
+        size = len(self._rows)
+        if size < self.min_train_size:
+            return False
+        return not self.is_trained or size >= 2 * self._trained_size
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def add(
+        self,
+        ids: Sequence[str],
+        vectors: Any,
+        payloads: Optional[Sequence[Dict[str, Any]]] = None
+    ) -> int:
+        """Insert or replace vectors by id; returns the number of rows written"""
+        matrix = self._normalize(np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimension))
+        if len(ids) != len(matrix):
+            raise ValueError(f"Got {len(ids)} ids for {len(matrix)} vectors")
+
+        payloads = payloads or [{} for _ in ids]
+        if len(payloads) != len(ids):
+            raise ValueError(f"Got {len(payloads)} payloads for {len(ids)} vectors")
+
+        if isinstance(self._vectors, np.memmap):
+            # Loaded indexes are read-only maps; copy into RAM on first write
+            self._grow(max(64, self._size * 2))
+
+        rows = np.empty(len(ids), dtype=np.int64)
+        for position, item_id in enumerate(ids):
+            item_id = str(item_id)
+            row = self._rows.get(item_id)
+            if row is not None:
+                self._unindex_row(row)
+            else:
+                row = self._allocate_row()
+                self._rows[item_id] = row
+                self._ids[row] = item_id
+
+            self._payloads[row] = dict(payloads[position])
+            self._index_payload(row)
+            rows[position] = row
+
+        self._vectors[rows] = matrix
+
+        if self.is_trained:
+            self._assign_rows(rows, matrix)
+        if self._rows_since_snapshot is not None:
+            self._rows_since_snapshot.update(rows.tolist())
+
+        self.stats["adds"] += len(ids)
+        if self.auto_train:
+            self._maybe_train()
+        return len(ids)
+
+    def update_payload(self, item_id: str, payload: Dict[str, Any]) -> bool:
+        """Replace the payload of an indexed id without touching its vector"""
+        row = self._rows.get(str(item_id))
+        if row is None:
+            return False
+
+        self._unindex_row(row, keep_assignment=True)
+        self._payloads[row] = dict(payload)
+        self._index_payload(row)
+        return True
+
+    def remove(self, ids: Iterable[str]) -> int:
+        """Remove vectors by id; freed rows are reused by later adds"""
+        removed = 0
+        for item_id in ids:
+            row = self._rows.pop(str(item_id), None)
+            if row is None:
+                continue
+
+            self._unindex_row(row)
+            self._ids[row] = None
+            self._payloads[row] = None
+            self._free_rows.append(row)
+            if self._rows_since_snapshot is not None:
+                self._rows_since_snapshot.add(row)
+            removed += 1
+
+        self.stats["removals"] += removed
+        return removed
+
+    def train(self):
+        """(Re)build the IVF partition with k-means over the live vectors"""
+        snapshot = self.training_snapshot()
+        if len(snapshot["rows"]) == 0:
+            self._rows_since_snapshot = None
+            return
+        self.apply_training(self.fit(snapshot))
+
+    def training_snapshot(self) -> Dict[str, Any]:
+        """Copy the live vectors for fit(); writes from here on are tracked for apply_training()"""
+        live_rows = self._live_rows()
+        self._rows_since_snapshot = set()
+        return {"rows": live_rows, "vectors": self._vectors[live_rows]}
+
+    def fit(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        """k-means centroids and list labels for a training snapshot; reads nothing else"""
+        rows, vectors = snapshot["rows"], snapshot["vectors"]
+        n_lists = self.n_lists or max(1, int(np.sqrt(len(rows))))
+        n_lists = min(n_lists, len(rows))
+
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(len(rows), n_lists * 256)
+        sample = vectors[rng.choice(len(rows), size=sample_size, replace=False)]
+
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(self.kmeans_iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=n_lists)
+
+            # Empty lists keep their previous centroid
+            filled = counts > 0
+            centroids[filled] = sums[filled]
+            centroids = self._normalize(centroids)
+
+        centroids = centroids.astype(np.float32)
+        return {"rows": rows, "labels": np.argmax(vectors @ centroids.T, axis=1), "centroids": centroids}
+
+    def apply_training(self, trained: Dict[str, Any]):
+        """Install a fit() result; rows written or freed since the snapshot are reassigned"""
+        changed = self._rows_since_snapshot or set()
+        self._rows_since_snapshot = None
+
+        rows, labels = trained["rows"], trained["labels"]
+        if changed:
+            unchanged = ~np.isin(rows, np.fromiter(changed, dtype=np.int64, count=len(changed)))
+            rows, labels = rows[unchanged], labels[unchanged]
+
+        self._centroids = trained["centroids"]
+        self._lists = [set() for _ in range(len(self._centroids))]
+        self._list_arrays.clear()
+        self._assignments = np.full(len(self._vectors), -1, dtype=np.int32)
+        self._assignments[rows] = labels
+        for row, label in zip(rows.tolist(), labels.tolist()):
+            self._lists[label].add(row)
+
+        live_changed = np.fromiter(
+            sorted(row for row in changed if self._ids[row] is not None), dtype=np.int64
+        )
+        if len(live_changed):
+            self._assign_rows(live_changed, self._vectors[live_changed])
+
+        self._trained_size = len(self._rows)
+        self.stats["trainings"] += 1
+
+        logger.info(f"Vector index trained: {len(self._rows)} vectors in {len(self._centroids)} lists")
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        query: Any,
+        k: int = 10,
+        filters: Optional[Dict[str, Any]] = None,
+        min_score: Optional[float] = None,
+        n_probe: Optional[int] = None,
+        exact: bool = False
+    ) -> List[SearchHit]:
+        """Top-k (id, cosine similarity, payload) hits for a query vector"""
+        if not self._rows or k <= 0:
+            return []
+
+        query_vector = self._normalize(np.asarray(query, dtype=np.float32).reshape(1, self.dimension))[0]
+
+        filtered_rows = self._rows_matching(filters) if filters else None
+        if filtered_rows is not None and len(filtered_rows) == 0:
+            return []
+
+        use_exact = exact or not self.is_trained or (
+            filtered_rows is not None and len(filtered_rows) <= self.exact_filter_threshold
+        )
+
+        if use_exact:
+            candidates = filtered_rows if filtered_rows is not None else self._live_rows()
+            self.stats["exact_searches"] += 1
+        else:
+            candidates = self._probe_rows(query_vector, n_probe or self.n_probe)
+            if filtered_rows is not None:
+                candidates = np.intersect1d(candidates, filtered_rows, assume_unique=True)
+
+        self.stats["searches"] += 1
+        self.stats["candidates_scored"] += len(candidates)
+
+        return self._top_k(query_vector, candidates, k, min_score)
+
+    def get_payload(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Stored payload for an id"""
+        row = self._rows.get(str(item_id))
+        return self._payloads[row] if row is not None else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Index occupancy and search counters"""
+        return {
+            **self.stats,
+            "vectors": len(self._rows),
+            "dimension": self.dimension,
+            "trained": self.is_trained,
+            "lists": len(self._lists),
+            "n_probe": self.n_probe,
+            "memory_mapped": isinstance(self._vectors, np.memmap)
+        }
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: str):
+        """Persist the index to a directory"""
+        self.save_snapshot(self.snapshot(), path)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of everything save() writes, for save_snapshot() on another thread"""
+        return {
+            "vectors": np.array(self._vectors[:self._size]),
+            "centroids": self._centroids,
+            "assignments": self._assignments[:self._size].copy() if self.is_trained else None,
+            "state": {
+                "dimension": self.dimension,
+                "n_lists": self.n_lists,
+                "n_probe": self.n_probe,
+                "min_train_size": self.min_train_size,
+                "trained_size": self._trained_size,
+                "trained": self.is_trained,
+                "ids": list(self._ids[:self._size]),
+                # Payload dicts are replaced on write, never mutated, so a shallow copy is stable
+                "payloads": list(self._payloads[:self._size])
+            }
+        }
+
+    @classmethod
+    def save_snapshot(cls, snapshot: Dict[str, Any], path: str):
+        """Write a snapshot() to a directory"""
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        cls._atomic_save(directory / cls.VECTORS_FILE, snapshot["vectors"])
+        if snapshot["state"]["trained"]:
+            cls._atomic_save(directory / cls.CENTROIDS_FILE, snapshot["centroids"])
+            cls._atomic_save(directory / cls.ASSIGNMENTS_FILE, snapshot["assignments"])
+
+        tmp_file = directory / f"{cls.STATE_FILE}.{os.getpid()}.tmp"
+        with open(tmp_file, "w") as handle:
+            json.dump(snapshot["state"], handle, default=str)
+        os.replace(tmp_file, directory / cls.STATE_FILE)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True, auto_train: bool = True) -> "VectorIndex":
+        """Load a persisted index; vectors are memory-mapped read-only by default"""
+        directory = Path(path)
+        with open(directory / cls.STATE_FILE) as handle:
+            state = json.load(handle)
+
+        index = cls(
+            dimension=state["dimension"],
+            n_lists=state.get("n_lists"),
+            n_probe=state.get("n_probe", 8),
+            min_train_size=state.get("min_train_size", 2048),
+            auto_train=auto_train
+        )
+
+        index._vectors = np.load(directory / cls.VECTORS_FILE, mmap_mode="r" if mmap else None)
+        index._size = len(index._vectors)
+        index._ids = state["ids"]
+        index._payloads = state["payloads"]
+
+        for row, item_id in enumerate(index._ids):
+            if item_id is None:
+                index._free_rows.append(row)
+            else:
+                index._rows[item_id] = row
+                index._index_payload(row)
+
+        if state.get("trained"):
+            index._centroids = np.load(directory / cls.CENTROIDS_FILE)
+            index._assignments = np.load(directory / cls.ASSIGNMENTS_FILE).astype(np.int32)
+            index._lists = [set() for _ in range(len(index._centroids))]
+            for row in index._rows.values():
+                index._lists[index._assignments[row]].add(row)
+            index._trained_size = state.get("trained_size", len(index._rows))
+
+        return index
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).astype(np.float32, copy=False)
+
+    @staticmethod
+    def _atomic_save(file: Path, array: np.ndarray):
+        tmp_file = file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "wb") as handle:
+            np.save(handle, array, allow_pickle=False)
+        os.replace(tmp_file, file)
+
+    def _allocate_row(self) -> int:
+        if self._free_rows:
+            return self._free_rows.pop()
+
+        if self._size == len(self._vectors):
+            self._grow(max(64, self._size * 2))
+
+        row = self._size
+        self._size += 1
+        self._ids.append(None)
+        self._payloads.append(None)
+        return row
+
+    def _grow(self, capacity: int):
+        """Double capacity; also copies a read-only memory map into RAM"""
+        capacity = max(capacity, self._size + 1)
+        vectors = np.zeros((capacity, self.dimension), dtype=np.float32)
+        vectors[:self._size] = self._vectors[:self._size]
+        self._vectors = vectors
+
+        if self.is_trained:
+            assignments = np.full(capacity, -1, dtype=np.int32)
+            assignments[:self._size] = self._assignments[:self._size]
+            self._assignments = assignments
+
+    def _live_rows(self) -> np.ndarray:
+        return np.fromiter(self._rows.values(), dtype=np.int64, count=len(self._rows))
+
+    def _assign_rows(self, rows: np.ndarray, matrix: np.ndarray):
+        labels = np.argmax(matrix @ self._centroids.T, axis=1)
+        for row, label in zip(rows.tolist(), labels.tolist()):
+            self._assignments[row] = label
+            self._lists[label].add(row)
+            self._list_arrays.pop(label, None)
+
+    def _unindex_row(self, row: int, keep_assignment: bool = False):
+        payload = self._payloads[row] or {}
+        for key in self._filter_keys(payload):
+            rows = self._filter_rows.get(key)
+            if rows is not None:
+                rows.discard(row)
+                if not rows:
+                    del self._filter_rows[key]
+
+        if not keep_assignment and self.is_trained and self._assignments[row] >= 0:
+            label = int(self._assignments[row])
+            self._lists[label].discard(row)
+            self._list_arrays.pop(label, None)
+            self._assignments[row] = -1
+
+    def _index_payload(self, row: int):
+        for key in self._filter_keys(self._payloads[row] or {}):
+            self._filter_rows[key].add(row)
+
+    @staticmethod
+    def _filter_keys(payload: Dict[str, Any]) -> List[Tuple[str, Any]]:
+        """Scalar top-level and metadata fields are filterable"""
+        keys = []
+        for field, value in payload.items():
+            if isinstance(value, _FILTERABLE_TYPES):
+                keys.append((field, value))
+        metadata = payload.get("metadata")
+        if isinstance(metadata, dict):
+            for field, value in metadata.items():
+                if isinstance(value, _FILTERABLE_TYPES):
+                    keys.append((f"metadata.{field}", value))
+        return keys
+
+    def _rows_matching(self, filters: Dict[str, Any]) -> np.ndarray:
+        """Rows whose payload matches every filter (lists mean 'any of')"""
+        matched: Optional[Set[int]] = None
+        for field, expected in filters.items():
+            values = expected if isinstance(expected, (list, tuple, set)) else [expected]
+            rows: Set[int] = set()
+            for value in values:
+                rows |= self._filter_rows.get((field, value), set())
+                if not field.startswith("metadata."):
+                    rows |= self._filter_rows.get((f"metadata.{field}", value), set())
+
+            matched = rows if matched is None else matched & rows
+            if not matched:
+                return np.zeros(0, dtype=np.int64)
+
+        return np.fromiter(sorted(matched), dtype=np.int64, count=len(matched))
+
+    def _probe_rows(self, query_vector: np.ndarray, n_probe: int) -> np.ndarray:
+        scores = self._centroids @ query_vector
+        n_probe = min(n_probe, len(scores))
+        nearest = np.argpartition(-scores, n_probe - 1)[:n_probe]
+
+        arrays = []
+        for label in nearest.tolist():
+            array = self._list_arrays.get(label)
+            if array is None:
+                array = np.fromiter(sorted(self._lists[label]), dtype=np.int64, count=len(self._lists[label]))
+                self._list_arrays[label] = array
+            arrays.append(array)
+
+        return np.concatenate(arrays) if arrays else np.zeros(0, dtype=np.int64)
+
+    def _top_k(
+        self,
+        query_vector: np.ndarray,
+        candidates: np.ndarray,
+        k: int,
+        min_score: Optional[float]
+    ) -> List[SearchHit]:
+        if len(candidates) == 0:
+            return []
+
+        scores = self._vectors[candidates] @ query_vector
+
+        if min_score is not None:
+            keep = scores > min_score
+            candidates, scores = candidates[keep], scores[keep]
+            if len(candidates) == 0:
+                return []
+
+        if len(candidates) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(candidates))
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        return [
+            (self._ids[row], float(score), self._payloads[row])
+            for row, score in zip(candidates[top].tolist(), scores[top].tolist())
+        ]
+
+    def _maybe_train(self):
+        """Train once the corpus is large enough; retrain after it doubles"""
+        if self.needs_training:
+            started = time.perf_counter()
+            self.train()
+            logger.debug(f"Vector index training took {time.perf_counter() - started:.3f}s")
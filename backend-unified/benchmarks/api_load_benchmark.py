@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+"""
+API Load Benchmark - throughput and latency of the journey, tracking, RAG and quality paths
+
+Drives the real service code against local stand-ins (SQLite, the in-memory
+Redis backend and a fake AI client) at a fixed concurrency and reports
+ops/sec and p50/p95/p99 per scenario. Responses a service produced by
+falling back after an internal error count as errors, not as served
+requests. Scenarios whose service code is incomplete in this tree are
+skipped with the reason. Results are written as JSON and can be compared
+against a previous run to catch regressions between commits.
+
+Usage:
+    python -m benchmarks.api_load_benchmark --output results.json
+    python -m benchmarks.api_load_benchmark --scenarios behavioral_event events_batch --concurrency 32
+    python -m benchmarks.api_load_benchmark --baseline main.json --regression-threshold 0.1
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.local_stand_ins import (
+    FakeAIClient, SQLiteConnection, configure_environment, create_journey_database, install_module_stand_ins
+)
+
+DEVICE_TYPES = ["mobile", "desktop", "tablet"]
+JOURNEY_STAGES = ["awareness", "consideration", "decision"]
+JOURNEY_PATHS = [
+    "mobile_tiktok_fast_track",
+    "desktop_research_deep",
+    "returning_visitor_personalized",
+    "standard_conversion_funnel"
+]
+PERSONAS = ["TechEarlyAdopter", "RemoteDad", "StudentHustler", "BusinessOwner"]
+EVENT_TYPES = [("page_view", "navigation"), ("scroll", "engagement"), ("click", "interaction"),
+               ("hover", "interaction"), ("form_interaction", "interaction"), ("exit_intent", "engagement")]
+
+
+class FallbackResponse(Exception):
+    """The service answered with its error fallback; counted as a failed request"""
+
+
+class ScenarioUnavailable(Exception):
+    """The service code a scenario drives is incomplete; the scenario is skipped"""
+
+
+def require_methods(cls: type, *names: str):
+    """Skip the scenario up front instead of measuring a path that always falls back"""
+    missing = [name for name in names if not hasattr(cls, name)]
+    if missing:
+        raise ScenarioUnavailable(f"{cls.__name__} does not implement {', '.join(missing)}")
+
+
+@dataclass
+class Scenario:
+    """A prepared benchmark target: operation(i) performs request number i"""
+    operation: Callable[[int], Awaitable[Any]]
+    cleanup: Optional[Callable[[], Awaitable[None]]] = None
+    items_per_op: int = 1
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples) * 1000.0
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 4),
+        "p95_ms": round(float(np.percentile(values, 95)), 4),
+        "p99_ms": round(float(np.percentile(values, 99)), 4),
+        "mean_ms": round(float(values.mean()), 4)
+    }
+
+
+def make_event(index: int, sessions: int) -> Dict[str, Any]:
+    """Behavioral event payload; sessions accumulate history as the run progresses"""
+    rng = random.Random(index)
+    event_type, category = EVENT_TYPES[index % len(EVENT_TYPES)]
+    return {
+        "session_id": f"bench-session-{index % sessions}",
+        "user_id": f"bench-user-{index % sessions}",
+        "event_type": event_type,
+        "event_category": category,
+        "event_action": f"{event_type}_action",
+        "page_url": f"https://example.com/products/{index % 40}",
+        "page_title": "Benchmark product page",
+        "viewport": {"width": 390 if index % 2 else 1440, "height": 844 if index % 2 else 900},
+        "element_id": f"cta-{index % 5}",
+        "element_position": {"x": rng.randint(0, 1000), "y": rng.randint(0, 3000)},
+        "interaction_type": "click" if event_type == "click" else None,
+        "time_on_page": rng.randint(1, 600),
+        "scroll_depth": round(rng.random(), 3),
+        "engagement_score": round(rng.random(), 3),
+        "custom_properties": {"campaign": f"bench-{index % 3}"}
+    }
+
+
+# =============================================================================
+# SCENARIOS
+# =============================================================================
+
+async def setup_behavioral_event(args: argparse.Namespace) -> Scenario:
+    from src.api.conversion.behavioral_tracking_controller import (
+        BehavioralEventRequest, BehavioralTrackingService
+    )
+
+    conn = SQLiteConnection(latency_ms=args.db_latency_ms)
+    conn.create_schema()
+
+    async def operation(index: int):
+        # The route builds a service per request
+        service = BehavioralTrackingService(conn)
+        event = BehavioralEventRequest(**make_event(index, args.sessions))
+        return await service.process_behavioral_event(event)
+
+    async def cleanup():
+        conn.close()
+
+    return Scenario(operation, cleanup)
+
+
+async def setup_events_batch(args: argparse.Namespace) -> Scenario:
+    import httpx
+    from fastapi import FastAPI
+
+    from src.api.conversion.behavioral_tracking_controller import router
+    from src.database.connection import get_database_connection
+
+    conn = SQLiteConnection(latency_ms=args.db_latency_ms)
+    conn.create_schema()
+
+    async def database_override():
+        yield conn
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_database_connection] = database_override
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark")
+
+    async def operation(index: int):
+        start = index * args.batch_size
+        events = [make_event(start + offset, args.sessions) for offset in range(args.batch_size)]
+        response = await client.post("/api/v1/behavioral/events/batch", json=events)
+        response.raise_for_status()
+        body = response.json()
+        if body["failed_count"]:
+            raise RuntimeError(f"{body['failed_count']} events failed in batch")
+        return body
+
+    async def cleanup():
+        await client.aclose()
+        conn.close()
+
+    return Scenario(operation, cleanup, items_per_op=args.batch_size)
+
+
+async def _seed_journey_sessions(session_factory, count: int) -> List[Any]:
+    from src.api.journey.database_models import JourneySession
+
+    ids = []
+    async with session_factory() as db:
+        for index in range(count):
+            session = JourneySession(
+                id=uuid.uuid4(),
+                session_id=f"bench-journey-{index}",
+                persona_type=PERSONAS[index % len(PERSONAS)],
+                persona_confidence=0.8,
+                device_type=DEVICE_TYPES[index % len(DEVICE_TYPES)],
+                current_stage=JOURNEY_STAGES[index % len(JOURNEY_STAGES)],
+                journey_path=JOURNEY_PATHS[index % len(JOURNEY_PATHS)],
+                conversion_probability=0.2,
+                entry_point={"referrer": "tiktok" if index % 2 else "google"}
+            )
+            db.add(session)
+            ids.append(session.id)
+        await db.commit()
+    return ids
+
+
+async def setup_personalization(args: argparse.Namespace) -> Scenario:
+    from src.api.journey.database_models import JourneySession
+    from src.api.journey.personalization_engine import PersonalizationEngine
+
+    # Content generators the tiktok, research and returning-visitor paths call
+    require_methods(PersonalizationEngine, "_generate_tiktok_default_content", "_generate_research_default_content",
+                    "_generate_loyalty_content", "_generate_welcome_back_content")
+    engine, session_factory, _ = await create_journey_database(os.path.join(args.workdir, "personalization.db"))
+    session_ids = await _seed_journey_sessions(session_factory, args.sessions)
+
+    async def operation(index: int):
+        async with session_factory() as db:
+            session = await db.get(JourneySession, session_ids[index % len(session_ids)])
+            personalization = PersonalizationEngine(db)
+            content = await personalization.generate_personalized_content(
+                session, {"referrer_video": None, "page_url": "/products"}
+            )
+            # generate_personalized_content logs failures and returns generic content instead
+            if content.personalization_strategy == "fallback_content":
+                raise FallbackResponse(f"fallback content for {session.journey_path}")
+            return content
+
+    async def cleanup():
+        await engine.dispose()
+
+    return Scenario(operation, cleanup)
+
+
+async def setup_ab_assignment(args: argparse.Namespace) -> Scenario:
+    from src.api.journey.ab_testing_framework import ABTestingFramework
+    from src.api.journey.database_models import JourneySession
+
+    # Helpers assign_user_to_test_variant calls on the way to a variant
+    require_methods(ABTestingFramework, "_get_active_tests_for_session", "_select_primary_test",
+                    "_get_existing_assignment", "_assign_to_variant", "_record_variant_assignment",
+                    "_generate_variant_content", "_record_test_exposure")
+
+    engine, session_factory, _ = await create_journey_database(os.path.join(args.workdir, "ab_assignment.db"))
+    session_ids = await _seed_journey_sessions(session_factory, args.sessions)
+
+    async with session_factory() as db:
+        await ABTestingFramework(db).create_ab_test({
+            "test_name": "benchmark_hero_message",
+            "test_type": "content_variant",
+            "optimization_goal": "conversion_rate",
+            "start_date": datetime.utcnow().isoformat(),
+            "variants": [
+                {"name": "Control", "is_control": True, "traffic_allocation": 0.5},
+                {"name": "Urgency", "traffic_allocation": 0.5, "content_config": {"headline": "Only today"}}
+            ]
+        })
+
+    async def operation(index: int):
+        async with session_factory() as db:
+            session = await db.get(JourneySession, session_ids[index % len(session_ids)])
+            framework = ABTestingFramework(db)
+            assignment = await framework.assign_user_to_test_variant(
+                session, {"device_type": session.device_type}, {"page_url": "/products"}
+            )
+            # The benchmark test targets every session, so None means assignment failed and was logged
+            if assignment is None:
+                raise FallbackResponse(f"no variant assigned for {session.session_id}")
+            return assignment
+
+    async def cleanup():
+        await engine.dispose()
+
+    return Scenario(operation, cleanup)
+
+
+async def setup_hybrid_search(args: argparse.Namespace) -> Scenario:
+    from app.models.rag_models import SearchStrategy
+    from app.services.embedding_cache import DEFAULT_EMBEDDING_DIMENSION
+    from app.services.rag_service import AdaptiveRAGService
+    from app.services.response_cache import SearchResponseCache
+    from app.services.vector_index import VectorIndex
+
+    ai_client = FakeAIClient(DEFAULT_EMBEDDING_DIMENSION, latency_ms=args.ai_latency_ms)
+    index = VectorIndex(dimension=DEFAULT_EMBEDDING_DIMENSION)
+    ids = [f"chunk-{i}" for i in range(args.corpus_size)]
+    texts = [f"benchmark document chunk {i} about topic {i % 50}" for i in range(args.corpus_size)]
+    payloads = [{
+        "document_id": f"doc-{i % 500}",
+        "content": texts[i],
+        "relevance_score": 0.5,
+        "click_through_rate": 0.1,
+        "confidence_score": 0.7
+    } for i in range(args.corpus_size)]
+    index.add(ids, np.stack([ai_client.embed(text) for text in texts]), payloads)
+
+    service = AdaptiveRAGService(response_cache=SearchResponseCache())
+    service.db_service.vector_index = index
+    service.db_service._initialized = True
+    service.ai_client = ai_client
+    service._initialized = True
+
+    async def discard_outcomes(rows):
+        return None
+    service.outcome_writer.write_batch = discard_outcomes
+
+    strategy = SearchStrategy(args.rag_strategy)
+    distinct = max(1, args.rag_distinct_queries or args.requests + args.warmup)
+
+    async def operation(request_index: int):
+        # Fake embeddings only match identical text, so queries reuse indexed chunk texts
+        query = texts[(request_index % distinct) % len(texts)]
+        response = await service.execute_hybrid_search(query, strategy=strategy)
+        # Every query is an indexed text; retrieval errors are logged and come back as no results
+        if not response.results:
+            raise FallbackResponse(f"no results for {query!r}")
+        return response
+
+    return Scenario(operation)
+
+
+async def setup_validate_content(args: argparse.Namespace) -> Scenario:
+    from core.quality.quality_gates import ContentQualityValidator, QualityLevel
+
+    validator = ContentQualityValidator()
+    level = QualityLevel(args.quality_level)
+    paragraph = ("Remote teams ship faster when async updates replace status meetings. "
+                 "Our checklist shows how to set it up in one afternoon. ")
+
+    async def operation(index: int):
+        content = {
+            "id": f"bench-content-{index}",
+            "full_content": f"# Async Work Guide {index}\n\n## Why it works\n\n" + paragraph * 40
+                            + "\n\n## Get started\n\n[Download the checklist](/checklist)",
+            "target_length": 1000,
+            "conversion_elements": ["cta_button", "newsletter_signup"],
+            "seo_analysis": {"keyword_density": 0.015, "meta_description": "Async work guide"},
+            "seo_strategy": {"semantic_keywords": ["async", "remote teams", "checklist"]},
+            "quality_score": 0.8
+        }
+        return await validator.validate_content(content, level)
+
+    return Scenario(operation)
+
+
+SCENARIOS: Dict[str, Callable[[argparse.Namespace], Awaitable[Scenario]]] = {
+    "behavioral_event": setup_behavioral_event,
+    "events_batch": setup_events_batch,
+    "ab_assignment": setup_ab_assignment,
+    "personalization": setup_personalization,
+    "hybrid_search": setup_hybrid_search,
+    "validate_content": setup_validate_content
+}
+
+
+# =============================================================================
+# RUNNER
+# =============================================================================
+
+async def measure(scenario: Scenario, requests: int, concurrency: int, warmup: int) -> Dict[str, Any]:
+    for index in range(warmup):
+        try:
+            await scenario.operation(index)
+        except FallbackResponse:
+            pass
+
+    pending = iter(range(warmup, warmup + requests))
+    latencies: List[float] = []
+    outcome = {"errors": 0, "fallbacks": 0, "empty": 0, "last_error": None}
+
+    async def worker():
+        for index in pending:
+            started = time.perf_counter()
+            try:
+                result = await scenario.operation(index)
+            except Exception as e:
+                outcome["errors"] += 1
+                if isinstance(e, FallbackResponse):
+                    outcome["fallbacks"] += 1
+                outcome["last_error"] = f"{type(e).__name__}: {e}"
+            else:
+                if result is None:
+                    outcome["empty"] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    ops_per_sec = requests / elapsed if elapsed > 0 else 0.0
+    result = {
+        "status": "ok",
+        "requests": requests,
+        "concurrency": concurrency,
+        "elapsed_seconds": round(elapsed, 3),
+        "ops_per_sec": round(ops_per_sec, 2),
+        **percentiles(latencies),
+        "errors": outcome["errors"],
+        "fallbacks": outcome["fallbacks"],
+        "empty": outcome["empty"]
+    }
+    if scenario.items_per_op > 1:
+        result["items_per_op"] = scenario.items_per_op
+        result["items_per_sec"] = round(ops_per_sec * scenario.items_per_op, 2)
+    if outcome["last_error"]:
+        result["last_error"] = outcome["last_error"]
+    return result
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="api-benchmark-") as workdir:
+        args.workdir = workdir
+        for name in args.scenarios:
+            try:
+                scenario = await SCENARIOS[name](args)
+            except ScenarioUnavailable as e:
+                results[name] = {"status": "skipped", "reason": str(e)}
+                continue
+            except Exception as e:
+                # Missing optional modules or backends: record why instead of aborting the run
+                results[name] = {"status": "skipped", "reason": f"{type(e).__name__}: {e}"}
+                continue
+
+            try:
+                results[name] = await measure(scenario, args.requests, args.concurrency, args.warmup)
+            except Exception as e:
+                # Only warmup failures get here; measured requests count errors instead
+                results[name] = {"status": "failed", "reason": f"{type(e).__name__}: {e}"}
+            finally:
+                if scenario.cleanup:
+                    await scenario.cleanup()
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "commit": git_commit(),
+        "stand_ins": args.stand_ins,
+        "parameters": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "sessions": args.sessions,
+            "batch_size": args.batch_size,
+            "corpus_size": args.corpus_size,
+            "db_latency_ms": args.db_latency_ms,
+            "ai_latency_ms": args.ai_latency_ms
+        },
+        "scenarios": results
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Per-scenario throughput and p95 change; regressed when either moves past threshold"""
+    comparisons = []
+    for name, result in current["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if result.get("status") != "ok" or not previous or previous.get("status") != "ok":
+            continue
+
+        throughput_change = result["ops_per_sec"] / previous["ops_per_sec"] - 1 if previous["ops_per_sec"] else 0.0
+        p95_change = result["p95_ms"] / previous["p95_ms"] - 1 if previous["p95_ms"] else 0.0
+        comparisons.append({
+            "scenario": name,
+            "ops_per_sec_change": round(throughput_change, 4),
+            "p95_change": round(p95_change, 4),
+            "regressed": throughput_change < -threshold or p95_change > threshold
+        })
+    return comparisons
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Journey/tracking API load benchmark against local stand-ins")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--sessions", type=int, default=200, help="Distinct sessions the requests spread over")
+    parser.add_argument("--batch-size", type=int, default=25, help="Events per /events/batch request")
+    parser.add_argument("--corpus-size", type=int, default=20000, help="Chunks in the local vector index")
+    parser.add_argument("--rag-strategy", type=str, default="vector")
+    parser.add_argument("--rag-distinct-queries", type=int, default=0,
+                        help="Distinct search queries (0 = all unique, i.e. no response cache hits)")
+    parser.add_argument("--quality-level", type=str, default="standard")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="Simulated database round-trip")
+    parser.add_argument("--ai-latency-ms", type=float, default=0.0, help="Simulated embedding provider call")
+    parser.add_argument("--output", type=str, default=None, help="Write results as JSON")
+    parser.add_argument("--baseline", type=str, default=None, help="Compare against a previous JSON result")
+    parser.add_argument("--regression-threshold", type=float, default=0.1,
+                        help="Relative throughput drop or p95 increase that counts as a regression")
+    parser.add_argument("--log-level", type=str, default="WARNING")
+    args = parser.parse_args()
+
+    configure_environment()
+    args.stand_ins = install_module_stand_ins()
+    logging.basicConfig(level=args.log_level.upper())
+    logging.getLogger().setLevel(args.log_level.upper())
+
+    results = asyncio.run(run_benchmark(args))
+
+    print(f"Commit {results['commit']}: {args.requests} requests per scenario, concurrency {args.concurrency}")
+    for name, result in results["scenarios"].items():
+        if result["status"] != "ok":
+            print(f"{name:<18} {result['status']} ({result['reason']})")
+            continue
+        line = (f"{name:<18} {result['ops_per_sec']:>9.1f} ops/s  p50 {result['p50_ms']}ms  "
+                f"p95 {result['p95_ms']}ms  p99 {result['p99_ms']}ms")
+        if result.get("items_per_sec"):
+            line += f"  ({result['items_per_sec']:.1f} items/s)"
+        if result["errors"] or result["empty"]:
+            line += f"  errors {result['errors']} (fallbacks {result['fallbacks']})  empty {result['empty']}"
+        if result.get("last_error"):
+            line += f"  last error: {result['last_error']}"
+        print(line)
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        comparisons = compare_results(baseline, results, args.regression_threshold)
+        print(f"Compared with {baseline.get('commit')} (threshold {args.regression_threshold:.0%}):")
+        if baseline.get("parameters") != results["parameters"]:
+            print("Warning: baseline was run with different parameters, changes are not comparable")
+        for comparison in comparisons:
+            flag = "REGRESSION" if comparison["regressed"] else "ok"
+            print(f"{comparison['scenario']:<18} ops/s {comparison['ops_per_sec_change']:+.1%}  "
+                  f"p95 {comparison['p95_change']:+.1%}  {flag}")
+        if any(comparison["regressed"] for comparison in comparisons):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
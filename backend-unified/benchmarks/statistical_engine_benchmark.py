@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Statistical Engine Benchmark - time, allocations and accuracy of the A/B test math
+
+Times StatisticalEngine (sample size, frequentist/Bayesian tests, power,
+fixed/random-effects and Bayesian meta-analysis, also grouped by category)
+and the RealTimeOptimizer traffic allocation over parametrized workloads,
+measures peak memory allocated per call, and checks every result against
+an independent reference implementation. Results are written as JSON and
+can be compared against a previous run before landing changes to the math.
+
+Usage:
+    python -m benchmarks.statistical_engine_benchmark --output stats.json
+    python -m benchmarks.statistical_engine_benchmark --participants 100 1000000 --arms 2 20
+    python -m benchmarks.statistical_engine_benchmark --baseline stats.json --regression-threshold 0.15
+"""
+
+import argparse
+import importlib.util
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from statistics import NormalDist
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from scipy import integrate, stats
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.api_load_benchmark import git_commit, percentiles
+from src.services.statistical_engine import StatisticalEngine
+
+BASELINE_RATE = 0.05
+VARIANT_LIFT = 0.1
+NORMAL = NormalDist()
+CATEGORIES = ("device", "persona", "content", "timing", "interaction", "trigger")
+COUNT_FIELDS = ("control_participants", "control_conversions", "variant_participants", "variant_conversions")
+
+
+@dataclass
+class Case:
+    """One timed call plus the check of its result against a reference"""
+    name: str
+    params: Dict[str, Any]
+    call: Callable[[], Any]
+    error: Callable[[Any], float]
+    tolerance: float
+
+
+def load_real_time_optimizer():
+    """RealTimeOptimizer class; the module has no intra-repo imports
+
+    The core.testing package __init__ imports the whole testing framework, so
+    fall back to loading the module file directly when that fails.
+    """
+    try:
+        from core.testing.real_time_optimizer import RealTimeOptimizer
+        return RealTimeOptimizer
+    except ImportError:
+        path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "core", "testing", "real_time_optimizer.py")
+        spec = importlib.util.spec_from_file_location("real_time_optimizer", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module.RealTimeOptimizer
+
+
+def run_coroutine(coroutine) -> Any:
+    """Drive a coroutine that never suspends (pure computation) without an event loop"""
+    try:
+        coroutine.send(None)
+    except StopIteration as done:
+        return done.value
+    coroutine.close()
+    raise RuntimeError("Coroutine suspended; only pure computations can be benchmarked this way")
+
+
+# =============================================================================
+# WORKLOADS
+# =============================================================================
+
+def make_counts(participants: int, rng: np.random.Generator) -> Dict[str, int]:
+    """Control/variant counts for a test with participants per arm"""
+    return {
+        "control_participants": participants,
+        "control_conversions": int(rng.binomial(participants, BASELINE_RATE)),
+        "variant_participants": participants,
+        "variant_conversions": int(rng.binomial(participants, BASELINE_RATE * (1 + VARIANT_LIFT)))
+    }
+
+
+def make_test_results(count: int, rng: np.random.Generator) -> List[Dict[str, Any]]:
+    """Completed tests as meta_analysis expects them"""
+    results = []
+    for index, participants in enumerate(rng.integers(1_000, 100_000, size=count)):
+        counts = make_counts(int(participants), rng)
+        p1 = counts["control_conversions"] / counts["control_participants"]
+        p2 = counts["variant_conversions"] / counts["variant_participants"]
+        results.append({
+            **counts,
+            "effect_size": 2 * (math.asin(math.sqrt(p2)) - math.asin(math.sqrt(p1))),
+            "category": CATEGORIES[index % len(CATEGORIES)]
+        })
+    return results
+
+
+def make_variant_performance(arms: int, rng: np.random.Generator) -> Dict[str, Dict[str, float]]:
+    """Alternating strong and weak arms, spread enough for the optimizer to reallocate"""
+    performance = {}
+    for arm in range(arms):
+        low, high = (0.6, 1.0) if arm % 2 == 0 else (0.0, 0.3)
+        performance[f"variant_{arm}"] = {
+            "conversion_rate": float(rng.uniform(low, high)),
+            "engagement_score": float(rng.uniform(low, high)),
+            "bounce_rate": float(1 - rng.uniform(low, high))
+        }
+    return performance
+
+
+# =============================================================================
+# REFERENCE IMPLEMENTATIONS
+# =============================================================================
+
+def reference_sample_size(baseline_rate: float, mde: float, alpha: float = 0.05, power: float = 0.8) -> int:
+    p2 = min(baseline_rate * (1 + mde), 0.99)
+    h = 2 * (math.asin(math.sqrt(p2)) - math.asin(math.sqrt(baseline_rate)))
+    n = ((NORMAL.inv_cdf(1 - alpha / 2) + NORMAL.inv_cdf(power)) / h) ** 2
+    return max(math.ceil(n * 1.1), 100)
+
+
+def reference_z_test(counts: Dict[str, int], alpha: float = 0.05) -> Dict[str, float]:
+    """Two-proportion z-test; erfc keeps tiny p-values exact"""
+    n1, n2 = counts["control_participants"], counts["variant_participants"]
+    p1 = counts["control_conversions"] / n1
+    p2 = counts["variant_conversions"] / n2
+    pooled = (counts["control_conversions"] + counts["variant_conversions"]) / (n1 + n2)
+    z = (p2 - p1) / math.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n2))
+    margin = NORMAL.inv_cdf(1 - alpha / 2) * math.sqrt(p1 * (1 - p1) / n1 + p2 * (1 - p2) / n2)
+    return {
+        "p_value": math.erfc(abs(z) / math.sqrt(2)),
+        "z_statistic": z,
+        "ci_lower": p2 - p1 - margin,
+        "ci_upper": p2 - p1 + margin
+    }
+
+
+def reference_probability_variant_better(counts: Dict[str, int]) -> float:
+    """P(variant rate > control rate) under Beta(1, 1) priors, by numerical integration"""
+    a1 = 1 + counts["control_conversions"]
+    b1 = 1 + counts["control_participants"] - counts["control_conversions"]
+    a2 = 1 + counts["variant_conversions"]
+    b2 = 1 + counts["variant_participants"] - counts["variant_conversions"]
+    low, high = stats.beta.ppf([1e-12, 1 - 1e-12], a2, b2)
+    value, _ = integrate.quad(
+        lambda x: stats.beta.pdf(x, a2, b2) * stats.beta.cdf(x, a1, b1),
+        low, high, points=[a2 / (a2 + b2)], limit=200
+    )
+    return value
+
+
+def reference_power(effect_size: float, sample_size: int, alpha: float = 0.05) -> float:
+    return NORMAL.cdf(effect_size * math.sqrt(sample_size / 2) - NORMAL.inv_cdf(1 - alpha / 2))
+
+
+def reference_meta_analysis(test_results: List[Dict[str, Any]]) -> Dict[str, float]:
+    effects = np.array([r["effect_size"] for r in test_results])
+    totals = np.array([r["control_participants"] + r["variant_participants"] for r in test_results], dtype=float)
+    weights = totals / 2  # 1 / SE^2 with SE = sqrt(2 / n)
+    pooled = float(np.dot(weights, effects) / weights.sum())
+    standard_error = float(1 / math.sqrt(weights.sum()))
+    q = float(np.dot(weights, (effects - pooled) ** 2))
+    return {
+        "pooled_effect_size": pooled,
+        "standard_error": standard_error,
+        "p_value": math.erfc(abs(pooled / standard_error) / math.sqrt(2)),
+        "q_statistic": q,
+        "heterogeneity_p": float(stats.chi2.sf(q, len(effects) - 1)) if len(effects) > 1 else 1.0
+    }
+
+
+def reference_allocation(variant_performance: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+    scores = {
+        variant: metrics["conversion_rate"] * 0.5 + metrics["engagement_score"] * 0.3
+        + (1 - metrics["bounce_rate"]) * 0.2
+        for variant, metrics in variant_performance.items()
+    }
+    total = sum(scores.values())
+    return {variant: score / total for variant, score in scores.items()}
+
+
+def max_difference(actual: Dict[str, float], expected: Dict[str, float]) -> float:
+    return max(abs(actual[key] - value) for key, value in expected.items())
+
+
+def allocation_error(result: Dict[str, Any], expected: Dict[str, float]) -> float:
+    # Below the sensitivity thresholds the optimizer leaves allocation unchanged
+    if not result.get("optimized"):
+        return 0.0 if "error" not in result else float("inf")
+    return max_difference(result["new_allocation"], expected)
+
+
+# =============================================================================
+# CASES
+# =============================================================================
+
+def build_cases(args: argparse.Namespace) -> List[Case]:
+    engine = StatisticalEngine()
+    optimizer = load_real_time_optimizer()()
+    rng = np.random.default_rng(args.seed)
+    cases = []
+
+    for mde in (0.01, 0.05, 0.2):
+        expected = reference_sample_size(BASELINE_RATE, mde)
+        cases.append(Case(
+            f"calculate_sample_size[mde={mde}]", {"mde": mde},
+            lambda mde=mde: engine.calculate_sample_size(BASELINE_RATE, mde),
+            lambda result, expected=expected: abs(result - expected),
+            tolerance=0
+        ))
+
+    for participants in args.participants:
+        counts = make_counts(participants, rng)
+        z_expected = reference_z_test(counts)
+        cases.append(Case(
+            f"frequentist_test[n={participants}]", {"participants": participants},
+            lambda counts=counts: engine._frequentist_test(
+                counts["control_conversions"], counts["control_participants"],
+                counts["variant_conversions"], counts["variant_participants"], 0.95
+            ),
+            lambda result, expected=z_expected: max(
+                abs(result["p_value"] - expected["p_value"]),
+                abs(result["z_statistic"] - expected["z_statistic"]),
+                abs(result["confidence_interval"][0] - expected["ci_lower"]),
+                abs(result["confidence_interval"][1] - expected["ci_upper"])
+            ),
+            tolerance=1e-9
+        ))
+
+        probability = reference_probability_variant_better(counts)
+        cases.append(Case(
+            f"bayesian_test[n={participants}]", {"participants": participants},
+            lambda counts=counts: engine._bayesian_test(
+                counts["control_conversions"], counts["control_participants"],
+                counts["variant_conversions"], counts["variant_participants"], 0.95
+            ),
+            lambda result, expected=probability: abs(result["probability_variant_better"] - expected),
+            # Monte Carlo estimate with 10k draws: ~4 standard errors
+            tolerance=0.02
+        ))
+
+        effect_size = 2 * (math.asin(math.sqrt(BASELINE_RATE * (1 + VARIANT_LIFT))) - math.asin(math.sqrt(BASELINE_RATE)))
+        power = reference_power(effect_size, participants)
+        cases.append(Case(
+            f"calculate_power[n={participants}]", {"participants": participants},
+            lambda participants=participants, effect_size=effect_size: engine.calculate_power(effect_size, participants),
+            lambda result, expected=power: abs(result - expected),
+            tolerance=1e-9
+        ))
+
+    for tests in args.concurrent_tests:
+        test_results = make_test_results(tests, rng)
+        meta_expected = reference_meta_analysis(test_results)
+        cases.append(Case(
+            f"meta_analysis[tests={tests}]", {"tests": tests},
+            lambda test_results=test_results: engine.meta_analysis(test_results),
+            lambda result, expected=meta_expected: max(
+                abs(result["pooled_effect_size"] - expected["pooled_effect_size"]),
+                abs(result["standard_error"] - expected["standard_error"]),
+                abs(result["p_value"] - expected["p_value"]),
+                abs(result["heterogeneity"]["q_statistic"] - expected["q_statistic"]) / max(1.0, expected["q_statistic"]),
+                abs(result["heterogeneity"]["p_value"] - expected["heterogeneity_p"])
+            ),
+            tolerance=1e-9
+        ))
+
+        grouped_expected = {
+            category: reference_meta_analysis([r for r in test_results if r["category"] == category])
+            for category in {r["category"] for r in test_results}
+        }
+        cases.append(Case(
+            f"meta_analysis_grouped[tests={tests}]", {"tests": tests, "groups": len(grouped_expected)},
+            lambda test_results=test_results: engine.meta_analysis(test_results, group_by="category"),
+            lambda result, expected=grouped_expected: max(
+                max(abs(result[category]["pooled_effect_size"] - values["pooled_effect_size"]),
+                    abs(result[category]["p_value"] - values["p_value"]))
+                for category, values in expected.items()
+            ),
+            tolerance=1e-9
+        ))
+
+        pooled_counts = {key: sum(r[key] for r in test_results) for key in COUNT_FIELDS}
+        pooled_probability = reference_probability_variant_better(pooled_counts)
+        cases.append(Case(
+            f"bayesian_meta_analysis[tests={tests}]", {"tests": tests},
+            lambda test_results=test_results: engine.bayesian_meta_analysis(test_results),
+            lambda result, expected=pooled_probability: abs(result["probability_variant_better"] - expected),
+            tolerance=0.02
+        ))
+
+        # One optimizer pass over every active test
+        performances = [make_variant_performance(args.tick_arms, rng) for _ in range(tests)]
+        expected_allocations = [reference_allocation(performance) for performance in performances]
+        cases.append(Case(
+            f"allocation_tick[tests={tests},arms={args.tick_arms}]", {"tests": tests, "arms": args.tick_arms},
+            lambda performances=performances: [
+                run_coroutine(optimizer.optimize_traffic_allocation(f"test_{index}", performance))
+                for index, performance in enumerate(performances)
+            ],
+            lambda results, expected=expected_allocations: max(
+                allocation_error(result, allocation) for result, allocation in zip(results, expected)
+            ),
+            tolerance=1e-12
+        ))
+
+    for arms in args.arms:
+        performance = make_variant_performance(arms, rng)
+        expected = reference_allocation(performance)
+        cases.append(Case(
+            f"optimize_traffic_allocation[arms={arms}]", {"arms": arms},
+            lambda performance=performance: run_coroutine(optimizer.optimize_traffic_allocation("test", performance)),
+            lambda result, expected=expected: allocation_error(result, expected),
+            tolerance=1e-12
+        ))
+
+    return cases
+
+
+# =============================================================================
+# RUNNER
+# =============================================================================
+
+def measure_case(case: Case, calls: int, allocation_calls: int, time_budget: float) -> Dict[str, Any]:
+    result = case.call()
+    error = float(case.error(result))
+
+    latencies = []
+    deadline = time.perf_counter() + time_budget
+    for _ in range(calls):
+        started = time.perf_counter()
+        case.call()
+        latencies.append(time.perf_counter() - started)
+        if started > deadline and len(latencies) >= 5:
+            break
+
+    # Separate pass: tracing slows every allocation down
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(allocation_calls):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            case.call()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+    finally:
+        tracemalloc.stop()
+
+    mean_seconds = sum(latencies) / len(latencies)
+    return {
+        "params": case.params,
+        "calls": len(latencies),
+        "calls_per_sec": round(1 / mean_seconds, 2) if mean_seconds > 0 else None,
+        **percentiles(latencies),
+        "peak_bytes_per_call": int(np.median(peaks)) if peaks else None,
+        "max_abs_error": error,
+        "tolerance": case.tolerance,
+        "accurate": error <= case.tolerance
+    }
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    results = {}
+    for case in build_cases(args):
+        results[case.name] = measure_case(case, args.calls, args.allocation_calls, args.time_budget)
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "commit": git_commit(),
+        "parameters": {
+            "arms": args.arms,
+            "participants": args.participants,
+            "concurrent_tests": args.concurrent_tests,
+            "tick_arms": args.tick_arms,
+            "calls": args.calls,
+            "seed": args.seed
+        },
+        "cases": results
+    }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Per-case change in mean time and peak allocation; regressed when either grows past threshold"""
+    comparisons = []
+    for name, result in current["cases"].items():
+        previous = baseline.get("cases", {}).get(name)
+        if not previous:
+            continue
+
+        time_change = result["mean_ms"] / previous["mean_ms"] - 1 if previous["mean_ms"] else 0.0
+        memory_change = (result["peak_bytes_per_call"] / previous["peak_bytes_per_call"] - 1
+                         if previous.get("peak_bytes_per_call") else 0.0)
+        comparisons.append({
+            "case": name,
+            "time_change": round(time_change, 4),
+            "memory_change": round(memory_change, 4),
+            "regressed": time_change > threshold or memory_change > threshold
+        })
+    return comparisons
+
+
+def main():
+    parser = argparse.ArgumentParser(description="StatisticalEngine and allocation micro-benchmarks")
+    parser.add_argument("--arms", type=int, nargs="+", default=[2, 5, 10, 20])
+    parser.add_argument("--participants", type=int, nargs="+", default=[100, 10_000, 1_000_000, 10_000_000],
+                        help="Participants per arm")
+    parser.add_argument("--concurrent-tests", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--tick-arms", type=int, default=5, help="Arms per test in the allocation tick workload")
+    parser.add_argument("--calls", type=int, default=200, help="Timed calls per case")
+    parser.add_argument("--allocation-calls", type=int, default=5, help="Calls traced for peak allocation")
+    parser.add_argument("--time-budget", type=float, default=5.0, help="Max seconds of timed calls per case")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=str, default=None, help="Write results as JSON")
+    parser.add_argument("--baseline", type=str, default=None, help="Compare against a previous JSON result")
+    parser.add_argument("--regression-threshold", type=float, default=0.15,
+                        help="Relative increase in mean time or peak allocation that counts as a regression")
+    args = parser.parse_args()
+
+    results = run_benchmark(args)
+
+    print(f"Commit {results['commit']}")
+    for name, result in results["cases"].items():
+        accuracy = "ok" if result["accurate"] else f"INACCURATE (tolerance {result['tolerance']})"
+        print(f"{name:<42} mean {result['mean_ms']:>10.4f}ms  p99 {result['p99_ms']:>10.4f}ms  "
+              f"peak {result['peak_bytes_per_call']:>10}B  error {result['max_abs_error']:.2e} {accuracy}")
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+        print(f"Results written to {args.output}")
+
+    failed = not all(result["accurate"] for result in results["cases"].values())
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        comparisons = compare_results(baseline, results, args.regression_threshold)
+        print(f"Compared with {baseline.get('commit')} (threshold {args.regression_threshold:.0%}):")
+        if baseline.get("parameters") != results["parameters"]:
+            print("Warning: baseline was run with different parameters, changes are not comparable")
+        for comparison in comparisons:
+            flag = "REGRESSION" if comparison["regressed"] else "ok"
+            print(f"{comparison['case']:<42} time {comparison['time_change']:+.1%}  "
+                  f"memory {comparison['memory_change']:+.1%}  {flag}")
+        failed = failed or any(comparison["regressed"] for comparison in comparisons)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
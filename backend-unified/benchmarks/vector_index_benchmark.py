@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Vector Index Benchmark - recall and latency of the local ANN index vs brute force
+
+Usage:
+    python -m benchmarks.vector_index_benchmark --vectors 100000 --dimension 256
+    python -m benchmarks.vector_index_benchmark --n-probe 4 8 16 --output results.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.vector_index import VectorIndex
+
+
+def generate_corpus(n_vectors: int, dimension: int, n_clusters: int, seed: int) -> np.ndarray:
+    """Clustered synthetic embeddings (real corpora are far from uniform)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dimension)).astype(np.float32)
+    labels = rng.integers(0, n_clusters, size=n_vectors)
+    noise = rng.normal(scale=0.35, size=(n_vectors, dimension)).astype(np.float32)
+    return centers[labels] + noise
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples) * 1000.0
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 4),
+        "p95_ms": round(float(np.percentile(values, 95)), 4),
+        "p99_ms": round(float(np.percentile(values, 99)), 4),
+        "mean_ms": round(float(values.mean()), 4)
+    }
+
+
+def run_benchmark(
+    n_vectors: int,
+    dimension: int,
+    n_queries: int,
+    k: int,
+    n_probes: List[int],
+    n_clusters: int,
+    seed: int
+) -> Dict[str, Any]:
+    corpus = generate_corpus(n_vectors, dimension, n_clusters, seed)
+    rng = np.random.default_rng(seed + 1)
+    queries = corpus[rng.integers(0, n_vectors, size=n_queries)]
+    queries = queries + rng.normal(scale=0.2, size=queries.shape).astype(np.float32)
+
+    index = VectorIndex(dimension=dimension)
+    ids = [f"chunk-{i}" for i in range(n_vectors)]
+    payloads = [{"document_id": f"doc-{i % 1000}"} for i in range(n_vectors)]
+
+    started = time.perf_counter()
+    for start in range(0, n_vectors, 5000):
+        end = start + 5000
+        index.add(ids[start:end], corpus[start:end], payloads[start:end])
+    build_seconds = time.perf_counter() - started
+
+    exact_results = []
+    exact_latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        hits = index.search(query, k=k, exact=True)
+        exact_latencies.append(time.perf_counter() - started)
+        exact_results.append({hit[0] for hit in hits})
+
+    runs = []
+    for n_probe in n_probes:
+        latencies = []
+        recall = 0.0
+        for query, truth in zip(queries, exact_results):
+            started = time.perf_counter()
+            hits = index.search(query, k=k, n_probe=n_probe)
+            latencies.append(time.perf_counter() - started)
+            recall += len({hit[0] for hit in hits} & truth) / max(1, len(truth))
+
+        runs.append({
+            "n_probe": n_probe,
+            f"recall_at_{k}": round(recall / n_queries, 4),
+            **percentiles(latencies)
+        })
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "parameters": {
+            "vectors": n_vectors,
+            "dimension": dimension,
+            "queries": n_queries,
+            "k": k,
+            "clusters": n_clusters,
+            "seed": seed
+        },
+        "index": index.get_stats(),
+        "build_seconds": round(build_seconds, 3),
+        "brute_force": percentiles(exact_latencies),
+        "ann": runs
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local vector index recall/latency benchmark")
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--n-probe", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--clusters", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=str, default=None, help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(
+        args.vectors, args.dimension, args.queries, args.k,
+        args.n_probe, args.clusters, args.seed
+    )
+
+    print(f"Vectors: {args.vectors} x {args.dimension}, build {results['build_seconds']}s")
+    print(f"Brute force: p50 {results['brute_force']['p50_ms']}ms  p99 {results['brute_force']['p99_ms']}ms")
+    for run in results["ann"]:
+        print(f"ANN n_probe={run['n_probe']:>3}: recall@{args.k} {run[f'recall_at_{args.k}']:.4f}  "
+              f"p50 {run['p50_ms']}ms  p99 {run['p99_ms']}ms")
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Configuration Package - application settings and database engines
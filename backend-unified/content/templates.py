@@ -470,6 +470,57 @@ class ContentTemplateEngine:
         
         return outline
     
+    def generate_outline_variants(self, template_id: str, niche: str,
+                                  personas: List[PersonaType],
+                                  devices: List[DeviceType]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Generate outlines for every persona × device, sharing one base outline per persona"""
+        template = self.get_template(template_id)
+        if not template:
+            raise ValueError(f"Template {template_id} not found")
+        
+        variants: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for persona in personas:
+            # Persona-specific base, computed once and shared by all device variants
+            base_sections = []
+            for section in template.sections:
+                persona_config = section.persona_adaptations.get(persona, {})
+                base_sections.append((section, persona_config, {
+                    "title": section.title,
+                    "description": section.description,
+                    "word_count_target": section.word_count_target,
+                    "persona_focus": persona_config.get("focus", "general"),
+                    "tone": persona_config.get("tone", "neutral"),
+                    "seo_keywords": section.seo_keywords,
+                    "conversion_elements": section.conversion_elements
+                }))
+            
+            variants[persona.value] = {}
+            for device in devices:
+                sections = []
+                for section, persona_config, base in base_sections:
+                    device_config = section.device_optimizations.get(device, {})
+                    sections.append({
+                        **base,
+                        "device_format": device_config.get("format", "standard"),
+                        "optimization_rules": {
+                            "persona_adaptations": persona_config,
+                            "device_optimizations": device_config
+                        }
+                    })
+                
+                variants[persona.value][device.value] = {
+                    "template_id": template_id,
+                    "template_name": template.name,
+                    "niche": niche,
+                    "persona": persona.value,
+                    "device": device.value,
+                    "sections": sections,
+                    "meta_data": template.meta_structure.copy(),
+                    "performance_benchmarks": template.performance_benchmarks.copy()
+                }
+        
+        return variants
+    
     def get_persona_device_matrix(self) -> Dict[str, Any]:
         """Get the complete persona × device optimization matrix"""
         return {
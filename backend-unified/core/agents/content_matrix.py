@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Content Matrix Generator - bulk niche × persona × device content generation
+
+Generates every combination of a matrix spec without running N independent
+pipelines:
+1. Shared work is deduplicated: one research call per niche, one outline per
+   niche/persona, device variants derived from that base outline
+2. Items run through a bounded worker pool; writer tasks go through the
+   orchestrator scheduler so they respect agent capacity
+3. Completed items are streamed with progress and appended to a JSONL
+   checkpoint file, so an interrupted run resumes where it stopped.
+   Checkpoints are addressed by run id and always live under
+   CONTENT_MATRIX_CHECKPOINT_DIR
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import product
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_ID_PATTERN = r"^[A-Za-z0-9_-]{1,64}$"
+
+
+def persona_agent_key(persona: str) -> str:
+    """tech_early_adopter -> TechEarlyAdopter (agents use CamelCase persona keys)"""
+    if "_" not in persona and persona[:1].isupper():
+        return persona
+    return "".join(part.capitalize() for part in persona.split("_"))
+
+
+def persona_template_key(persona: str) -> str:
+    """TechEarlyAdopter -> tech_early_adopter (templates use snake_case persona keys)"""
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", persona).lower()
+
+
+def checkpoint_directory() -> str:
+    return os.getenv("CONTENT_MATRIX_CHECKPOINT_DIR") or os.path.join(
+        tempfile.gettempdir(), "content_matrix_checkpoints"
+    )
+
+
+def checkpoint_path_for(checkpoint_id: str, directory: Optional[str] = None) -> str:
+    """Checkpoint file of a run id, confined to the checkpoint directory"""
+    if not re.match(CHECKPOINT_ID_PATTERN, checkpoint_id or ""):
+        raise ValueError(f"Invalid checkpoint id: {checkpoint_id!r}")
+
+    root = os.path.realpath(directory or checkpoint_directory())
+    path = os.path.realpath(os.path.join(root, f"{checkpoint_id}.jsonl"))
+    if os.path.dirname(path) != root:
+        raise ValueError(f"Invalid checkpoint id: {checkpoint_id!r}")
+    return path
+
+
+@dataclass
+class ContentMatrixSpec:
+    """Matrix of niches × personas × devices to generate"""
+    niches: List[str]
+    personas: List[str]
+    devices: List[str]
+    content_type: str = "guide"
+    include_research: bool = True
+    template_id: Optional[str] = None
+    quality_level: str = "standard"
+
+    def items(self) -> List["MatrixItem"]:
+        return [
+            MatrixItem(niche=niche, persona=persona_agent_key(persona), device=device,
+                       content_type=self.content_type)
+            for niche, persona, device in product(self.niches, self.personas, self.devices)
+        ]
+
+
+@dataclass(frozen=True)
+class MatrixItem:
+    """One niche/persona/device combination"""
+    niche: str
+    persona: str
+    device: str
+    content_type: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.niche}|{self.persona}|{self.device}|{self.content_type}"
+
+
+@dataclass
+class MatrixProgress:
+    """Progress counters for a matrix run"""
+    total: int
+    completed: int = 0
+    failed: int = 0
+    resumed: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def to_dict(self) -> Dict[str, Any]:
+        done = self.completed + self.failed + self.resumed
+        elapsed = time.monotonic() - self.started_at
+        generated = self.completed + self.failed
+        return {
+            "total": self.total,
+            "done": done,
+            "completed": self.completed,
+            "failed": self.failed,
+            "resumed": self.resumed,
+            "percent": round(done / self.total * 100, 1) if self.total else 100.0,
+            "elapsed_seconds": round(elapsed, 2),
+            "items_per_second": round(generated / elapsed, 3) if elapsed > 0 else 0.0
+        }
+
+
+class _SharedWork:
+    """Memoizes coroutine results by key; concurrent callers share one call"""
+
+    def __init__(self):
+        self._futures: Dict[Any, asyncio.Future] = {}
+        self.calls = 0
+        self.reused = 0
+
+    async def get(self, key: Any, factory: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._futures.get(key)
+        if future is not None:
+            self.reused += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._futures[key] = future
+        self.calls += 1
+        try:
+            result = await factory()
+        except Exception as e:
+            # Failed work is not cached, a later item may retry it
+            self._futures.pop(key, None)
+            future.set_exception(e)
+            future.exception()
+            raise
+        future.set_result(result)
+        return result
+
+
+class ContentMatrixGenerator:
+    """Bulk content generation over a niche × persona × device matrix"""
+
+    def __init__(self, orchestrator, max_workers: int = 8, checkpoint_id: Optional[str] = None,
+                 checkpoint_dir: Optional[str] = None):
+        self.orchestrator = orchestrator
+        self.max_workers = max(1, max_workers)
+        self.checkpoint_id = checkpoint_id
+        self.checkpoint_path = checkpoint_path_for(checkpoint_id, checkpoint_dir) if checkpoint_id else None
+        self._niche_research: Dict[str, Any] = {}
+
+        self._research = _SharedWork()
+        self._outlines = _SharedWork()
+        self._variants = _SharedWork()
+        self._template_outlines = _SharedWork()
+
+    async def stream(self, spec: ContentMatrixSpec) -> AsyncIterator[Dict[str, Any]]:
+        """Yield one event per finished item, then a summary event"""
+        items = spec.items()
+        progress = MatrixProgress(total=len(items))
+
+        done_keys = self._load_checkpoint()
+        pending = [item for item in items if item.key not in done_keys]
+        progress.resumed = len(items) - len(pending)
+        if progress.resumed:
+            logger.info(f"Resuming content matrix: {progress.resumed}/{len(items)} items already completed")
+
+        work_queue: asyncio.Queue = asyncio.Queue()
+        for item in pending:
+            work_queue.put_nowait(item)
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def worker():
+            while True:
+                try:
+                    item = work_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await results.put(await self._generate_item(spec, item))
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.max_workers, len(pending)))]
+
+        try:
+            for _ in range(len(pending)):
+                event = await results.get()
+                if event["status"] == "completed":
+                    progress.completed += 1
+                    self._append_checkpoint(event)
+                else:
+                    progress.failed += 1
+                event["progress"] = progress.to_dict()
+                yield event
+
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        yield {
+            "type": "summary",
+            "status": "completed" if progress.failed == 0 else "partial",
+            "progress": progress.to_dict(),
+            "shared_work": self.get_shared_work_stats(),
+            "research": self._niche_research,
+            "checkpoint_id": self.checkpoint_id
+        }
+
+    async def run(self, spec: ContentMatrixSpec) -> Dict[str, Any]:
+        """Generate the whole matrix and return items plus the summary"""
+        items = []
+        summary: Dict[str, Any] = {}
+        async for event in self.stream(spec):
+            if event["type"] == "summary":
+                summary = event
+            else:
+                items.append(event)
+        return {**summary, "items": items}
+
+    def get_shared_work_stats(self) -> Dict[str, Any]:
+        """How much shared work was executed versus reused"""
+        return {
+            "research_calls": self._research.calls,
+            "research_reused": self._research.reused,
+            "outline_calls": self._outlines.calls,
+            "outline_reused": self._outlines.reused,
+            "device_variants": self._variants.calls,
+            "template_outline_calls": self._template_outlines.calls
+        }
+
+    # ------------------------------------------------------------------
+    # Item generation
+    # ------------------------------------------------------------------
+
+    async def _generate_item(self, spec: ContentMatrixSpec, item: MatrixItem) -> Dict[str, Any]:
+        started = time.perf_counter()
+        event = {
+            "type": "item",
+            "key": item.key,
+            "niche": item.niche,
+            "persona": item.persona,
+            "device": item.device,
+            "content_type": item.content_type
+        }
+
+        try:
+            research = None
+            if spec.include_research:
+                research = await self._research.get(
+                    item.niche, lambda: self.orchestrator.conduct_research(
+                        niche=item.niche,
+                        research_type="market_analysis",
+                        keywords=[item.niche, item.content_type]
+                    )
+                )
+                if research and "error" not in research:
+                    # Reported once per niche in the summary, not with every item
+                    self._niche_research[item.niche] = research
+                else:
+                    research = None
+
+            outline = await self._device_outline(item, research)
+
+            template_outline = None
+            if spec.template_id:
+                template_outline = await self._template_outline(spec, item)
+
+            content = await self.orchestrator.execute_task(
+                self._writer_task(item, outline.dict(), research, spec.quality_level)
+            )
+
+            event.update({
+                "status": "completed",
+                "research_id": research.get("research_id") if research else None,
+                "outline": outline.dict(),
+                "template_outline": template_outline,
+                "content": content,
+                "generation_time_seconds": round(time.perf_counter() - started, 3)
+            })
+
+        except Exception as e:
+            logger.error(f"Content matrix item {item.key} failed: {e}")
+            event.update({"status": "failed", "error": str(e)})
+
+        return event
+
+    async def _device_outline(self, item: MatrixItem, research: Optional[Dict[str, Any]] = None):
+        """Device variant of the shared niche/persona outline, informed by the niche research"""
+        agent = self.orchestrator.content_outline_agent
+
+        base = await self._outlines.get(
+            (item.niche, item.persona, item.content_type),
+            lambda: agent.generate_outline(
+                niche=item.niche,
+                persona=item.persona,
+                device=item.device,
+                content_type=item.content_type,
+                additional_context={"research": research} if research else None
+            )
+        )
+
+        return await self._variants.get(
+            (item.niche, item.persona, item.content_type, item.device),
+            lambda: agent.derive_device_variant(base, item.niche, item.device, item.content_type)
+        )
+
+    async def _template_outline(self, spec: ContentMatrixSpec, item: MatrixItem) -> Dict[str, Any]:
+        """Template outline for the item; all personas × devices of a niche are built at once"""
+        from content.templates import DeviceType, PersonaType, template_engine
+
+        variants = await self._template_outlines.get(
+            (spec.template_id, item.niche),
+            self._as_coroutine(lambda: template_engine.generate_outline_variants(
+                spec.template_id,
+                item.niche,
+                [PersonaType(persona_template_key(persona_agent_key(p))) for p in spec.personas],
+                [DeviceType(device) for device in spec.devices]
+            ))
+        )
+        return variants[persona_template_key(item.persona)][item.device]
+
+    @staticmethod
+    def _as_coroutine(function: Callable[[], Any]) -> Callable[[], Awaitable[Any]]:
+        async def call():
+            return function()
+        return call
+
+    @staticmethod
+    def _writer_task(item: MatrixItem, outline: Dict[str, Any], research: Optional[Dict[str, Any]],
+                     quality_level: str):
+        from .orchestrator import AgentTask, AgentType, TaskPriority
+
+        return AgentTask(
+            id=uuid4(),
+            agent_type=AgentType.CONTENT_WRITER,
+            task_type="generate_content",
+            priority=TaskPriority.MEDIUM,
+            data={
+                "outline": outline,
+                "niche": item.niche,
+                "persona": item.persona,
+                "device": item.device,
+                "context": {"research": research} if research else {},
+                "quality_level": quality_level
+            },
+            expected_output="formatted_content",
+            created_at=datetime.now()
+        )
+
+    # ------------------------------------------------------------------
+    # Checkpoint
+    # ------------------------------------------------------------------
+
+    def _load_checkpoint(self) -> Set[str]:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return set()
+
+        keys = set()
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as handle:
+                for line in handle:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn last line from an interrupted write
+                        continue
+                    if record.get("status") == "completed":
+                        keys.add(record["key"])
+        except Exception as e:
+            logger.error(f"Failed to read content matrix checkpoint: {e}")
+        return keys
+
+    def _append_checkpoint(self, event: Dict[str, Any]):
+        if not self.checkpoint_path:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+            with open(self.checkpoint_path, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps(event, default=str) + "\n")
+                handle.flush()
+        except Exception as e:
+            logger.error(f"Failed to write content matrix checkpoint: {e}")
@@ -228,6 +228,43 @@ class ContentOutlineAgent:
             logger.error(f"Outline generation failed: {e}")
             raise
     
+    async def derive_device_variant(self, base_outline: ContentOutline, niche: str,
+                                    device: str, content_type: str) -> ContentOutline:
+        """Derive a device variant from an outline, reusing its SEO strategy, title and meta"""
+        try:
+            persona = base_outline.persona_targeting.get("persona")
+            persona_profile = self.persona_database.get(persona)
+            device_profile = self.device_profiles.get(device)
+            
+            if not persona_profile or not device_profile:
+                raise ValueError(f"Invalid persona ({persona}) or device ({device})")
+            
+            if base_outline.device_optimization.get("device") == device:
+                return base_outline
+            
+            # Only the device-dependent layout is rebuilt
+            sections = await self._create_content_sections(
+                niche, persona_profile, device_profile, base_outline.seo_strategy, content_type
+            )
+            
+            outline = base_outline.model_copy(update={
+                "sections": sections,
+                "device_optimization": {
+                    "device": device,
+                    "reading_pattern": device_profile.reading_pattern,
+                    "optimal_length": device_profile.optimal_section_length,
+                    "visual_ratio": device_profile.visual_ratio
+                },
+                "estimated_reading_time": self._calculate_reading_time(sections, device_profile),
+                "conversion_elements": self._identify_conversion_elements(persona_profile, device_profile)
+            })
+            outline.quality_score = await self._calculate_quality_score(outline)
+            return outline
+        
+        except Exception as e:
+            logger.error(f"Outline device variant failed: {e}")
+            raise
+    
     async def _create_seo_strategy(self, niche: str, content_type: str, 
                                  context: Optional[Dict]) -> Dict[str, Any]:
         """Create SEO optimization strategy"""
@@ -255,6 +292,14 @@ class ContentOutlineAgent:
         
         semantic_keywords = await self._generate_semantic_keywords(niche, search_intent)
         
+        # Emerging trends from the niche research extend the semantic set
+        research = (context or {}).get("research") or {}
+        trends = ((research.get("data") or {}).get("opportunity_analysis") or {}).get("emerging_trends", [])
+        for trend in trends[:5]:
+            keyword = str(trend).lower()
+            if keyword not in semantic_keywords:
+                semantic_keywords.append(keyword)
+        
         return {
             "primary_keyword": primary_keyword,
             "secondary_keywords": secondary_keywords,
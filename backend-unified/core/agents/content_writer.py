@@ -200,8 +200,9 @@ class ContentWriterAgent:
         }
     
     async def generate_content(self, outline: Dict[str, Any], niche: str, 
-                             persona: str, device: str) -> GeneratedContent:
-        """Generate complete content from outline"""
+                             persona: str, device: str,
+                             context: Optional[Dict[str, Any]] = None) -> GeneratedContent:
+        """Generate complete content from outline (context may carry niche research)"""
         start_time = datetime.now()
         
         try:
@@ -215,6 +216,9 @@ class ContentWriterAgent:
             sections = outline.get("sections", [])
             seo_strategy = outline.get("seo_strategy", {})
             device_optimization = outline.get("device_optimization", {})
+            research = (context or {}).get("research") or {}
+            if research.get("insights"):
+                seo_strategy = {**seo_strategy, "research_insights": list(research["insights"])[:3]}
             
             # Generate content sections
             content_sections = []
@@ -398,6 +402,13 @@ class ContentWriterAgent:
         for point in points:
             content += f"\n• {point}"
         
+        # Ground the introduction in the niche research when available
+        insights = seo.get("research_insights") or []
+        if insights:
+            content += "\n\nWhat the research shows:"
+            for insight in insights:
+                content += f"\n• {insight}"
+        
         return content
     
     async def _generate_hook_content(self, title: str, points: List[str],
@@ -10,7 +10,8 @@ Updated: 2025-07-04 (Module 3A Phase 2 - Complete Integration)
 
 import logging
 import asyncio
-from typing import Dict, Any, List, Optional, Union
+import os
+from typing import Dict, Any, AsyncIterator, List, Optional, Union
 from datetime import datetime
 from enum import Enum
 from uuid import UUID, uuid4
@@ -21,6 +22,9 @@ from pydantic import BaseModel, Field
 from .content_outline import ContentOutlineAgent
 from .content_writer import ContentWriterAgent
 from .research_engine import AIResearchEngine, ResearchQuery, ResearchType, ResearchPriority
+from .task_scheduler import AgentTaskScheduler
+from .task_retention import TaskResultStore, TaskRetention, default_task_store_path
+from .content_matrix import ContentMatrixGenerator, ContentMatrixSpec
 from ..quality.quality_gates import ContentQualityValidator, QualityLevel
 from ..tracking.performance_tracker import PerformanceTracker
 
@@ -45,6 +49,9 @@ class AgentStatus(str, Enum):
     ERROR = "error"
     OFFLINE = "offline"
 
+# Agents in these states accept tasks
+DISPATCHABLE_STATUSES = (AgentStatus.READY, AgentStatus.BUSY)
+
 class TaskPriority(str, Enum):
     """Task priority levels"""
     LOW = "low"
@@ -67,10 +74,17 @@ class AgentTask:
     status: str = "pending"
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+    dependency_inputs: Dict[str, UUID] = None
     
     def __post_init__(self):
         if self.dependencies is None:
             self.dependencies = []
+        if self.dependency_inputs is None:
+            self.dependency_inputs = {}
+        # Every injected input is also a scheduling dependency
+        for dependency_id in self.dependency_inputs.values():
+            if dependency_id not in self.dependencies:
+                self.dependencies.append(dependency_id)
 
 class AgentRegistration(BaseModel):
     """Agent registration model"""
@@ -115,63 +129,57 @@ class ContentGenerationPipeline:
                 created_at=datetime.now()
             )
             
-            outline_result = await self.orchestrator.execute_task(outline_task)
-            
-            # Stage 2: Content Writing
+            # Stage 2: Content Writing (outline result injected by the scheduler)
             writing_task = AgentTask(
                 id=uuid4(),
                 agent_type=AgentType.CONTENT_WRITER,
                 task_type="generate_content",
                 priority=TaskPriority.HIGH,
                 data={
-                    "outline": outline_result,
                     "niche": niche,
                     "persona": persona,
                     "device": device
                 },
                 expected_output="formatted_content",
                 created_at=datetime.now(),
-                dependencies=[outline_task.id]
+                dependency_inputs={"outline": outline_task.id}
             )
             
-            content_result = await self.orchestrator.execute_task(writing_task)
-            
-            # Stage 3: Visual Content (Parallel)
+            # Stage 3: Visual Content (parallel with stage 4)
             visual_task = AgentTask(
                 id=uuid4(),
                 agent_type=AgentType.VISUAL_CONTENT,
                 task_type="generate_visuals",
                 priority=TaskPriority.MEDIUM,
                 data={
-                    "content": content_result,
                     "device": device,
                     "persona": persona
                 },
                 expected_output="visual_assets",
                 created_at=datetime.now(),
-                dependencies=[writing_task.id]
+                dependency_inputs={"content": writing_task.id}
             )
             
-            # Stage 4: Social Media Adaptation (Parallel)
+            # Stage 4: Social Media Adaptation (parallel with stage 3)
             social_task = AgentTask(
                 id=uuid4(),
                 agent_type=AgentType.SOCIAL_MEDIA,
                 task_type="adapt_content",
                 priority=TaskPriority.MEDIUM,
                 data={
-                    "content": content_result,
                     "platforms": ["instagram", "linkedin", "tiktok"]
                 },
                 expected_output="social_adaptations",
                 created_at=datetime.now(),
-                dependencies=[writing_task.id]
+                dependency_inputs={"content": writing_task.id}
             )
             
-            # Execute parallel tasks
-            visual_result, social_result = await asyncio.gather(
-                self.orchestrator.execute_task(visual_task),
-                self.orchestrator.execute_task(social_task)
+            results = await self.orchestrator.execute_task_graph(
+                [outline_task, writing_task, visual_task, social_task]
             )
+            content_result = results[writing_task.id]
+            visual_result = results[visual_task.id]
+            social_result = results[social_task.id]
             
             pipeline_duration = (datetime.now() - pipeline_start).total_seconds()
             
@@ -201,11 +209,30 @@ class AgentOrchestrator:
     
     def __init__(self):
         self.agents: Dict[str, AgentRegistration] = {}
-        self.tasks: Dict[UUID, AgentTask] = {}
-        self.task_queue: List[AgentTask] = []
+        # Bounded task map; finished tasks are spilled to the on-disk result store
+        task_ttl = float(os.getenv("AGENT_TASK_TTL_SECONDS", "3600"))
+        self.tasks = TaskRetention(
+            max_tasks=int(os.getenv("AGENT_TASK_MAX_IN_MEMORY", "1000")),
+            ttl_seconds=task_ttl if task_ttl > 0 else None,
+            store=TaskResultStore(
+                default_task_store_path(),
+                retention_days=float(os.getenv("AGENT_TASK_STORE_RETENTION_DAYS", "7"))
+            ) if os.getenv("AGENT_TASK_STORE_ENABLED", "true").lower() == "true" else None
+        )
         self.initialized = False
         self.content_pipeline = ContentGenerationPipeline(self)
         
+        # Priority queue + dependency DAG scheduler; tasks wait for agent capacity
+        default_timeout = float(os.getenv("AGENT_TASK_TIMEOUT_SECONDS", "300"))
+        self.scheduler = AgentTaskScheduler(
+            acquire_agent=self._acquire_agent,
+            release_agent=self._release_agent,
+            run_task=self._run_task_on_agent,
+            type_limits=self._load_type_limits(),
+            default_timeout_seconds=default_timeout if default_timeout > 0 else None,
+            completed_results=self._completed_task_result
+        )
+        
         # Phase 2 Components
         self.content_outline_agent = ContentOutlineAgent()
         self.content_writer_agent = ContentWriterAgent()
@@ -294,57 +321,121 @@ class AgentOrchestrator:
             self.agents[agent.name] = agent
             logger.info(f"Registered agent: {agent.name} ({agent.agent_type})")
     
-    async def execute_task(self, task: AgentTask) -> Dict[str, Any]:
-        """Execute a task using appropriate agent"""
-        start_time = datetime.now()
-        
+    async def execute_task(self, task: AgentTask, timeout_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Execute a task using appropriate agent, waiting in the priority queue for capacity"""
         try:
-            # Find available agent
-            agent = self._find_available_agent(task.agent_type)
-            if not agent:
-                raise Exception(f"No available agent for type: {task.agent_type}")
-            
-            # Update agent status
-            agent.status = AgentStatus.BUSY
-            agent.current_task_count += 1
-            
-            # Store task
+            self._ensure_agent_type(task.agent_type)
             self.tasks[task.id] = task
-            task.status = "executing"
-            
-            # Execute actual task using Phase 2 AI agents
-            await self._execute_actual_task(task)
-            
-            # Update metrics
-            execution_time = (datetime.now() - start_time).total_seconds()
-            self._update_performance_metrics(agent, execution_time, True)
-            
-            task.status = "completed"
-            agent.status = AgentStatus.READY
-            agent.current_task_count -= 1
-            
-            return task.result or {"status": "completed", "task_id": str(task.id)}
+            result = await self.scheduler.submit(task, timeout_seconds)
+            self.tasks.touch(task.id)
+            return result
             
         except Exception as e:
             task.status = "failed"
-            task.error = str(e)
-            if 'agent' in locals():
-                agent.status = AgentStatus.READY
-                agent.current_task_count -= 1
-                self._update_performance_metrics(agent, 0, False)
-            
+            task.error = task.error or str(e)
             logger.error(f"Task execution failed: {e}")
             raise
     
-    def _find_available_agent(self, agent_type: AgentType) -> Optional[AgentRegistration]:
-        """Find available agent of specified type"""
-        for agent in self.agents.values():
-            if (agent.agent_type == agent_type and 
-                agent.status == AgentStatus.READY and
-                agent.current_task_count < agent.max_concurrent_tasks):
-                return agent
+    async def execute_task_graph(self, tasks: List[AgentTask],
+                                 timeout_seconds: Optional[float] = None) -> Dict[UUID, Dict[str, Any]]:
+        """Execute a task dependency DAG; independent tasks run in parallel"""
+        try:
+            for task in tasks:
+                self._ensure_agent_type(task.agent_type)
+                self.tasks[task.id] = task
+            results = await self.scheduler.run_graph(tasks, timeout_seconds)
+            for task in tasks:
+                self.tasks.touch(task.id)
+            return results
+            
+        except Exception as e:
+            logger.error(f"Task graph execution failed: {e}")
+            raise
+    
+    def cancel_task(self, task_id: UUID) -> bool:
+        """Cancel a queued or running task; its dependents fail"""
+        return self.scheduler.cancel(task_id)
+    
+    def get_task_result(self, task_id: UUID) -> Optional[Dict[str, Any]]:
+        """Task record by id, from memory or from the on-disk result store"""
+        return self.tasks.lookup(task_id)
+    
+    def get_memory_metrics(self) -> Dict[str, Any]:
+        """Retained tasks, result bytes, result store size and process RSS"""
+        return {
+            "tasks": self.tasks.get_memory_metrics(),
+            "performance_tracker": self.performance_tracker.get_memory_metrics(),
+            "research_cache_entries": len(self.research_engine.research_cache)
+        }
+    
+    def get_scheduler_metrics(self) -> Dict[str, Any]:
+        """Queue depth, wait time and outcome counters of the task scheduler"""
+        return self.scheduler.get_metrics()
+    
+    async def _run_task_on_agent(self, task: AgentTask, agent: AgentRegistration) -> Dict[str, Any]:
+        """Scheduler callback: run one task on an acquired agent"""
+        task.status = "executing"
+        await self._execute_actual_task(task)
+        return task.result or {"status": "completed", "task_id": str(task.id)}
+    
+    def _acquire_agent(self, agent_type: AgentType) -> Optional[AgentRegistration]:
+        """Scheduler callback: reserve a slot on an agent with spare capacity"""
+        agent = self._find_available_agent(agent_type)
+        if agent is None:
+            return None
+        
+        agent.current_task_count += 1
+        if agent.current_task_count >= agent.max_concurrent_tasks:
+            agent.status = AgentStatus.BUSY
+        return agent
+    
+    def _release_agent(self, agent: AgentRegistration, success: bool, execution_time: float):
+        """Scheduler callback: free the agent slot and record the outcome"""
+        agent.current_task_count = max(0, agent.current_task_count - 1)
+        if agent.status == AgentStatus.BUSY:
+            agent.status = AgentStatus.READY
+        self._update_performance_metrics(agent, execution_time, success)
+        self.total_tasks_executed += 1
+    
+    def _completed_task_result(self, task_id: UUID) -> Optional[Dict[str, Any]]:
+        """Scheduler callback: results of dependencies that finished earlier"""
+        record = self.tasks.lookup(task_id)
+        if record is not None and record["status"] == "completed":
+            return record["result"] or {"status": "completed", "task_id": str(task_id)}
         return None
     
+    def _ensure_agent_type(self, agent_type: AgentType):
+        """Fail fast instead of queueing forever when no agent of the type accepts tasks"""
+        if not any(agent.agent_type == agent_type and agent.status in DISPATCHABLE_STATUSES
+                   for agent in self.agents.values()):
+            raise Exception(f"No available agent for type: {agent_type}")
+    
+    @staticmethod
+    def _load_type_limits() -> Dict[AgentType, int]:
+        """Per-agent-type concurrency limits, e.g. AGENT_TYPE_LIMITS=content_writer:2,visual_content:1"""
+        limits = {}
+        for item in os.getenv("AGENT_TYPE_LIMITS", "").split(","):
+            if ":" not in item:
+                continue
+            name, limit = item.split(":", 1)
+            try:
+                limits[AgentType(name.strip())] = int(limit)
+            except ValueError:
+                logger.warning(f"Ignoring invalid agent type limit: {item}")
+        return limits
+    
+    def _find_available_agent(self, agent_type: AgentType) -> Optional[AgentRegistration]:
+        """Find the least loaded agent of specified type with spare capacity"""
+        candidates = [
+            agent for agent in self.agents.values()
+            if agent.agent_type == agent_type
+            and agent.status in DISPATCHABLE_STATUSES
+            and agent.current_task_count < agent.max_concurrent_tasks
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda agent: agent.current_task_count / agent.max_concurrent_tasks)
+    
     async def _execute_actual_task(self, task: AgentTask):
         """Execute actual task using Phase 2 AI agents"""
         start_time = datetime.now()
@@ -371,13 +462,14 @@ class AgentOrchestrator:
                     outline=outline_data,
                     niche=task.data.get("niche", ""),
                     persona=task.data.get("persona", ""),
-                    device=task.data.get("device", "")
+                    device=task.data.get("device", ""),
+                    context=task.data.get("context")
                 )
                 
                 # Run quality validation
                 quality_report = await self.quality_validator.validate_content(
                     content=result.dict(),
-                    quality_level=QualityLevel.STANDARD
+                    quality_level=QualityLevel(task.data.get("quality_level", QualityLevel.STANDARD.value))
                 )
                 
                 task.result = {
@@ -545,6 +637,27 @@ class AgentOrchestrator:
         """Main content generation pipeline entry point"""
         return await self.content_pipeline.generate_content(niche, persona, device, content_type)
     
+    async def stream_content_matrix(self, spec: ContentMatrixSpec, max_workers: Optional[int] = None,
+                                    checkpoint_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Bulk generation over niche × persona × device, streaming items as they complete"""
+        generator = ContentMatrixGenerator(
+            self,
+            max_workers=max_workers or int(os.getenv("CONTENT_MATRIX_MAX_WORKERS", "8")),
+            checkpoint_id=checkpoint_id
+        )
+        async for event in generator.stream(spec):
+            yield event
+    
+    async def generate_content_matrix(self, spec: ContentMatrixSpec, max_workers: Optional[int] = None,
+                                      checkpoint_id: Optional[str] = None) -> Dict[str, Any]:
+        """Bulk generation over niche × persona × device, returning all items and a summary"""
+        generator = ContentMatrixGenerator(
+            self,
+            max_workers=max_workers or int(os.getenv("CONTENT_MATRIX_MAX_WORKERS", "8")),
+            checkpoint_id=checkpoint_id
+        )
+        return await generator.run(spec)
+    
     async def health_check(self) -> bool:
         """Check orchestrator health"""
         return self.initialized and len(self.agents) > 0
@@ -556,6 +669,8 @@ class AgentOrchestrator:
             "agents_count": len(self.agents),
             "active_tasks": len([t for t in self.tasks.values() if t.status == "executing"]),
             "total_tasks_executed": self.total_tasks_executed,
+            "scheduler": self.scheduler.get_metrics(),
+            "memory": self.get_memory_metrics(),
             "phase2_components": {
                 "content_outline_agent": await self.content_outline_agent.health_check(),
                 "content_writer_agent": await self.content_writer_agent.health_check(),
@@ -721,9 +836,10 @@ class AgentOrchestrator:
         """Shutdown orchestrator"""
         logger.info("Agent Orchestrator shutting down...")
         
-        # Cancel pending tasks
+        # Cancel queued and running tasks
+        await self.scheduler.shutdown()
         for task in self.tasks.values():
-            if task.status == "executing":
+            if task.status in ("pending", "queued", "executing"):
                 task.status = "cancelled"
         
         # Reset agent statuses
@@ -732,7 +848,9 @@ class AgentOrchestrator:
         
         self.initialized = False
         self.agents.clear()
+        self.tasks.spill_all()
         self.tasks.clear()
-        self.task_queue.clear()
+        if self.tasks.store is not None:
+            self.tasks.store.close()
         
         logger.info("Agent Orchestrator shutdown complete")
\ No newline at end of file
@@ -17,6 +17,7 @@ from dataclasses import dataclass, asdict
 from pydantic import BaseModel, Field
 from enum import Enum
 import re
+from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
@@ -111,7 +112,8 @@ class AIResearchEngine:
     
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         self.config = config or {}
-        self.research_cache = {}
+        self.research_cache = OrderedDict()
+        self.max_cache_entries = self.config.get("max_cache_entries", 1000)
         self.knowledge_base = self._initialize_knowledge_base()
         self.research_patterns = self._load_research_patterns()
         self.performance_metrics = {}
@@ -234,8 +236,10 @@ class AIResearchEngine:
             if cache_key in self.research_cache:
                 cached_result = self.research_cache[cache_key]
                 if cached_result.expires_at > datetime.now():
+                    self.research_cache.move_to_end(cache_key)
                     logger.info(f"Returning cached research for {query.type}")
                     return cached_result
+                del self.research_cache[cache_key]
             
             # Route to appropriate research method
             if query.type == ResearchType.MARKET_ANALYSIS:
@@ -279,8 +283,11 @@ class AIResearchEngine:
                 expires_at=datetime.now() + timedelta(hours=24)  # Cache for 24 hours
             )
             
-            # Cache result
+            # Cache result (LRU bounded)
+            self.research_cache.pop(cache_key, None)
             self.research_cache[cache_key] = result
+            while len(self.research_cache) > self.max_cache_entries:
+                self.research_cache.popitem(last=False)
             
             # Update metrics
             await self._update_research_metrics(query.type, research_time, confidence_score)
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Task Retention - bounded in-memory agent tasks with an on-disk result store
+
+AgentOrchestrator.tasks used to keep every AgentTask and its full result
+forever. TaskRetention keeps at most max_tasks tasks in memory, evicts
+finished tasks by LRU order or after a TTL, and spills their results to a
+compact SQLite store (zlib-compressed JSON) where they stay retrievable by
+task id. Queued and running tasks are never evicted.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+
+def process_rss_bytes() -> Optional[int]:
+    """Current resident set size of this process, when the platform exposes it"""
+    try:
+        with open("/proc/self/statm", "r") as handle:
+            resident_pages = int(handle.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        pass
+
+    try:
+        import resource
+        # Peak RSS; kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except Exception:
+        return None
+
+
+class TaskResultStore:
+    """SQLite store of finished task records, compressed and keyed by task id"""
+
+    def __init__(self, path: str, retention_days: float = 7.0, batch_size: int = 100):
+        self.path = path
+        self.retention_days = retention_days
+        self.batch_size = max(1, batch_size)
+
+        self._pending: List[tuple] = []
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+        self.stats = {
+            "spilled": 0,
+            "lookups": 0,
+            "hits": 0,
+            "pruned": 0,
+            "write_errors": 0,
+            "compressed_bytes": 0,
+            "raw_bytes": 0
+        }
+
+    def put(self, record: Dict[str, Any]):
+        """Buffer a finished task record; written in batches"""
+        raw = json.dumps(record, default=str).encode("utf-8")
+        payload = zlib.compress(raw, 6)
+
+        with self._lock:
+            self._pending.append((record["task_id"], record.get("status"), time.time(), payload))
+            self.stats["raw_bytes"] += len(raw)
+            self.stats["compressed_bytes"] += len(payload)
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def get(self, task_id: UUID) -> Optional[Dict[str, Any]]:
+        """Look up a spilled task record"""
+        key = str(task_id)
+        with self._lock:
+            self.stats["lookups"] += 1
+            for pending_id, _, _, payload in reversed(self._pending):
+                if pending_id == key:
+                    self.stats["hits"] += 1
+                    return json.loads(zlib.decompress(payload))
+
+            try:
+                row = self._db().execute(
+                    "SELECT payload FROM task_results WHERE task_id = ?", (key,)
+                ).fetchone()
+            except Exception as e:
+                logger.error(f"Task result lookup failed for {key}: {e}")
+                return None
+
+        if row is None:
+            return None
+        self.stats["hits"] += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def flush(self):
+        """Write all buffered records"""
+        with self._lock:
+            self._flush_locked()
+
+    def prune(self) -> int:
+        """Delete records older than the retention window"""
+        cutoff = time.time() - self.retention_days * 86400
+        with self._lock:
+            self._flush_locked()
+            try:
+                connection = self._db()
+                deleted = connection.execute(
+                    "DELETE FROM task_results WHERE stored_at < ?", (cutoff,)
+                ).rowcount
+                connection.commit()
+            except Exception as e:
+                logger.error(f"Task result store prune failed: {e}")
+                return 0
+
+        self.stats["pruned"] += deleted
+        return deleted
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Row count, file size and compression ratio"""
+        rows = None
+        with self._lock:
+            try:
+                rows = self._db().execute("SELECT COUNT(*) FROM task_results").fetchone()[0]
+            except Exception as e:
+                logger.error(f"Task result store stats failed: {e}")
+
+        try:
+            file_bytes = os.path.getsize(self.path) if self.path != ":memory:" else None
+        except OSError:
+            file_bytes = None
+
+        return {
+            **self.stats,
+            "path": self.path,
+            "rows": rows,
+            "pending": len(self._pending),
+            "file_bytes": file_bytes,
+            "compression_ratio": round(self.stats["raw_bytes"] / self.stats["compressed_bytes"], 2)
+            if self.stats["compressed_bytes"] else None
+        }
+
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory and self.path != ":memory:":
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS task_results ("
+                "task_id TEXT PRIMARY KEY, status TEXT, stored_at REAL, payload BLOB)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_task_results_stored_at ON task_results (stored_at)"
+            )
+        return self._connection
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        try:
+            connection = self._db()
+            connection.executemany(
+                "INSERT OR REPLACE INTO task_results (task_id, status, stored_at, payload) VALUES (?, ?, ?, ?)",
+                self._pending
+            )
+            connection.commit()
+            self.stats["spilled"] += len(self._pending)
+        except Exception as e:
+            self.stats["write_errors"] += 1
+            logger.error(f"Failed to spill {len(self._pending)} task results: {e}")
+        self._pending = []
+
+
+class TaskRetention:
+    """Mapping of task id -> AgentTask bounded by LRU size and TTL"""
+
+    def __init__(
+        self,
+        max_tasks: int = 1000,
+        ttl_seconds: Optional[float] = 3600.0,
+        store: Optional[TaskResultStore] = None,
+        sweep_interval: int = 100,
+        store_prune_interval_seconds: float = 3600.0
+    ):
+        self.max_tasks = max(1, max_tasks)
+        self.ttl_seconds = ttl_seconds
+        self.store = store
+        self.sweep_interval = max(1, sweep_interval)
+        self.store_prune_interval_seconds = store_prune_interval_seconds
+        self._last_store_prune = time.monotonic()
+
+        self._tasks: "OrderedDict[UUID, Any]" = OrderedDict()
+        self._touched_at: Dict[UUID, float] = {}
+        self._writes_since_sweep = 0
+
+        self.stats = {"evicted": 0, "expired": 0, "store_hits": 0}
+
+    # Mapping interface used by the orchestrator
+
+    def __setitem__(self, task_id: UUID, task: Any):
+        self._tasks[task_id] = task
+        self._tasks.move_to_end(task_id)
+        self._touched_at[task_id] = time.monotonic()
+
+        self._writes_since_sweep += 1
+        if len(self._tasks) > self.max_tasks or self._writes_since_sweep >= self.sweep_interval:
+            self.sweep()
+
+    def __getitem__(self, task_id: UUID) -> Any:
+        return self._tasks[task_id]
+
+    def __contains__(self, task_id: UUID) -> bool:
+        return task_id in self._tasks
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __iter__(self) -> Iterator[UUID]:
+        return iter(self._tasks)
+
+    def get(self, task_id: UUID, default: Any = None) -> Any:
+        return self._tasks.get(task_id, default)
+
+    def values(self):
+        return self._tasks.values()
+
+    def items(self):
+        return self._tasks.items()
+
+    def clear(self):
+        self._tasks.clear()
+        self._touched_at.clear()
+
+    def touch(self, task_id: UUID):
+        """Restart the TTL and mark the task most recently used"""
+        if task_id in self._tasks:
+            self._tasks.move_to_end(task_id)
+            self._touched_at[task_id] = time.monotonic()
+
+    # Retention
+
+    def lookup(self, task_id: UUID) -> Optional[Dict[str, Any]]:
+        """Task record from memory or, once evicted, from the on-disk store"""
+        task = self._tasks.get(task_id)
+        if task is not None:
+            return self._record(task)
+
+        if self.store is None:
+            return None
+        record = self.store.get(task_id)
+        if record is not None:
+            self.stats["store_hits"] += 1
+        return record
+
+    def sweep(self) -> int:
+        """Expire finished tasks past the TTL, then evict LRU finished tasks over the bound"""
+        self._writes_since_sweep = 0
+        removed = 0
+        now = time.monotonic()
+
+        if self.ttl_seconds is not None:
+            for task_id in list(self._tasks):
+                task = self._tasks[task_id]
+                if task.status in TERMINAL_STATUSES and now - self._touched_at[task_id] > self.ttl_seconds:
+                    self._evict(task_id)
+                    self.stats["expired"] += 1
+                    removed += 1
+
+        if len(self._tasks) > self.max_tasks:
+            for task_id in list(self._tasks):
+                if len(self._tasks) <= self.max_tasks:
+                    break
+                if self._tasks[task_id].status in TERMINAL_STATUSES:
+                    self._evict(task_id)
+                    self.stats["evicted"] += 1
+                    removed += 1
+
+        if self.store is not None and now - self._last_store_prune > self.store_prune_interval_seconds:
+            self._last_store_prune = now
+            self.store.prune()
+
+        return removed
+
+    def spill_all(self):
+        """Spill every finished task (shutdown)"""
+        for task_id in list(self._tasks):
+            if self._tasks[task_id].status in TERMINAL_STATUSES:
+                self._evict(task_id)
+        if self.store is not None:
+            self.store.flush()
+
+    def get_memory_metrics(self) -> Dict[str, Any]:
+        """In-memory task counts and approximate retained result size"""
+        by_status: Dict[str, int] = {}
+        result_bytes = 0
+        for task in self._tasks.values():
+            by_status[task.status] = by_status.get(task.status, 0) + 1
+            if task.result is not None:
+                result_bytes += len(json.dumps(task.result, default=str))
+
+        return {
+            **self.stats,
+            "tasks_in_memory": len(self._tasks),
+            "max_tasks": self.max_tasks,
+            "ttl_seconds": self.ttl_seconds,
+            "by_status": by_status,
+            "result_bytes_in_memory": result_bytes,
+            "process_rss_bytes": process_rss_bytes(),
+            "store": self.store.get_stats() if self.store is not None else None
+        }
+
+    def _evict(self, task_id: UUID):
+        task = self._tasks.pop(task_id)
+        self._touched_at.pop(task_id, None)
+        if self.store is not None:
+            self.store.put(self._record(task))
+
+    @staticmethod
+    def _record(task: Any) -> Dict[str, Any]:
+        def _value(item):
+            return getattr(item, "value", item)
+
+        return {
+            "task_id": str(task.id),
+            "agent_type": _value(task.agent_type),
+            "task_type": task.task_type,
+            "priority": _value(task.priority),
+            "status": task.status,
+            "created_at": task.created_at.isoformat() if task.created_at else None,
+            "dependencies": [str(dependency) for dependency in task.dependencies or []],
+            "result": task.result,
+            "error": task.error
+        }
+
+
+def default_task_store_path() -> str:
+    return os.getenv("AGENT_TASK_STORE_PATH") or os.path.join(tempfile.gettempdir(), "agent_task_results.sqlite3")
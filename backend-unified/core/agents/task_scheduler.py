@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+Agent Task Scheduler - priority queue and dependency DAG execution
+
+Replaces "fail when every agent is busy" with a real scheduler:
+1. Tasks wait in per-agent-type priority queues (critical > high > medium > low, FIFO within)
+2. A task only becomes ready once all of its dependencies completed; results of
+   dependencies can be injected into its data via `dependency_inputs`
+3. Dispatch is bounded by agent capacity and optional per-agent-type limits
+4. Tasks can be cancelled and time out; the timeout clock starts once a task is
+   dispatchable (its dependencies completed), and a periodic sweep expires tasks
+   still waiting for an agent
+5. Queue depth, wait time and run time metrics are tracked per agent type
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Set
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_RANK = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+
+AcquireAgent = Callable[[Any], Optional[Any]]
+ReleaseAgent = Callable[[Any, bool, float], None]
+RunTask = Callable[[Any, Any], Awaitable[Dict[str, Any]]]
+
+
+class TaskDependencyError(Exception):
+    """A dependency failed, was cancelled or does not exist"""
+
+
+class TaskTimeoutError(asyncio.TimeoutError):
+    """Task exceeded its deadline while queued or running"""
+
+
+@dataclass
+class _ScheduledTask:
+    task: Any
+    future: asyncio.Future
+    enqueued_at: float
+    timeout_seconds: Optional[float]
+    deadline: Optional[float] = None
+    remaining_dependencies: Set[UUID] = field(default_factory=set)
+    ready_at: Optional[float] = None
+    dispatched_at: Optional[float] = None
+    runner: Optional[asyncio.Task] = None
+    cancelled: bool = False
+
+
+class AgentTaskScheduler:
+    """Capacity-aware priority scheduler for AgentTask graphs"""
+
+    def __init__(
+        self,
+        acquire_agent: AcquireAgent,
+        release_agent: ReleaseAgent,
+        run_task: RunTask,
+        type_limits: Optional[Dict[Any, int]] = None,
+        default_timeout_seconds: Optional[float] = 300.0,
+        completed_results: Optional[Callable[[UUID], Optional[Dict[str, Any]]]] = None,
+        wait_sample_size: int = 1000,
+        sweep_interval_seconds: float = 1.0
+    ):
+        self.acquire_agent = acquire_agent
+        self.release_agent = release_agent
+        self.run_task = run_task
+        self.type_limits = dict(type_limits or {})
+        self.default_timeout_seconds = default_timeout_seconds
+        self.completed_results = completed_results
+        self.sweep_interval_seconds = sweep_interval_seconds
+
+        self._sequence = itertools.count()
+        self._entries: Dict[UUID, _ScheduledTask] = {}
+        self._ready: Dict[Any, List] = defaultdict(list)
+        self._dependents: Dict[UUID, Set[UUID]] = defaultdict(set)
+        self._results: Dict[UUID, Dict[str, Any]] = {}
+        self._failed: Dict[UUID, str] = {}
+        self._running: Dict[Any, int] = defaultdict(int)
+        self._sweeper: Optional[asyncio.Task] = None
+
+        self._wait_samples: Dict[Any, Deque[float]] = defaultdict(lambda: deque(maxlen=wait_sample_size))
+        self.metrics = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "timed_out": 0,
+            "dependency_failures": 0
+        }
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+
+    def submit_nowait(self, task: Any, timeout_seconds: Optional[float] = None) -> asyncio.Future:
+        """Queue a task; the returned future resolves with its result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        now = time.monotonic()
+        entry = _ScheduledTask(
+            task=task,
+            future=future,
+            enqueued_at=now,
+            timeout_seconds=self._timeout_for(task, timeout_seconds),
+            deadline=self._deadline_for(task, timeout_seconds, now)
+        )
+        self._entries[task.id] = entry
+        self.metrics["submitted"] += 1
+        task.status = "queued"
+
+        for dependency_id in task.dependencies or []:
+            if dependency_id in self._results:
+                continue
+            if dependency_id in self._failed:
+                self._fail(entry, TaskDependencyError(
+                    f"Dependency {dependency_id} failed: {self._failed[dependency_id]}"
+                ), dependency=True)
+                return future
+            if dependency_id in self._entries:
+                entry.remaining_dependencies.add(dependency_id)
+                self._dependents[dependency_id].add(task.id)
+                continue
+
+            external = self.completed_results(dependency_id) if self.completed_results else None
+            if external is None:
+                self._fail(entry, TaskDependencyError(f"Unknown dependency {dependency_id}"), dependency=True)
+                return future
+            self._results[dependency_id] = external
+
+        if not entry.remaining_dependencies:
+            self._make_ready(entry)
+
+        self._dispatch()
+        self._ensure_sweeper()
+        return future
+
+    async def submit(self, task: Any, timeout_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Queue a task and wait for its result (raises on failure/timeout)"""
+        return await self.submit_nowait(task, timeout_seconds)
+
+    async def run_graph(
+        self,
+        tasks: Iterable[Any],
+        timeout_seconds: Optional[float] = None,
+        return_exceptions: bool = False
+    ) -> Dict[UUID, Any]:
+        """Submit a dependency DAG; independent tasks run concurrently"""
+        tasks = self._topological_order(list(tasks))
+        futures = {task.id: self.submit_nowait(task, timeout_seconds) for task in tasks}
+
+        outcomes = await asyncio.gather(*futures.values(), return_exceptions=True)
+        results = dict(zip(futures.keys(), outcomes))
+
+        if not return_exceptions:
+            for outcome in outcomes:
+                if isinstance(outcome, BaseException):
+                    raise outcome
+        return results
+
+    def cancel(self, task_id: UUID) -> bool:
+        """Cancel a queued or running task (dependents fail)"""
+        entry = self._entries.get(task_id)
+        if entry is None or entry.future.done():
+            return False
+
+        entry.cancelled = True
+        if entry.runner is not None:
+            entry.runner.cancel()
+        else:
+            self._finish(entry, cancelled=True)
+        return True
+
+    async def shutdown(self):
+        """Cancel everything still queued or running"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+        for task_id in list(self._entries):
+            self.cancel(task_id)
+
+        runners = [entry.runner for entry in self._entries.values() if entry.runner is not None]
+        if runners:
+            await asyncio.gather(*runners, return_exceptions=True)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for entry in self._entries.values()
+                   if entry.runner is None and not entry.future.done())
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth, running tasks and wait times per agent type"""
+        per_type: Dict[str, Dict[str, Any]] = {}
+        blocked = 0
+
+        for entry in self._entries.values():
+            if entry.remaining_dependencies and not entry.future.done():
+                blocked += 1
+
+        agent_types = set(self._ready) | set(self._running) | set(self._wait_samples)
+        for agent_type in agent_types:
+            samples = sorted(self._wait_samples.get(agent_type, ()))
+            per_type[str(getattr(agent_type, "value", agent_type))] = {
+                "queued": sum(1 for _, _, task_id in self._ready.get(agent_type, ())
+                              if task_id in self._entries),
+                "running": self._running.get(agent_type, 0),
+                "limit": self.type_limits.get(agent_type),
+                "avg_wait_ms": round(sum(samples) / len(samples) * 1000, 2) if samples else 0.0,
+                "p95_wait_ms": round(samples[int(0.95 * (len(samples) - 1))] * 1000, 2) if samples else 0.0,
+                "max_wait_ms": round(samples[-1] * 1000, 2) if samples else 0.0
+            }
+
+        return {
+            **self.metrics,
+            "queue_depth": self.queue_depth,
+            "blocked_on_dependencies": blocked,
+            "running": sum(self._running.values()),
+            "agent_types": per_type
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _timeout_for(self, task: Any, timeout_seconds: Optional[float]) -> Optional[float]:
+        """Relative timeout, counted from when the task becomes dispatchable"""
+        if timeout_seconds is not None:
+            return timeout_seconds
+        if getattr(task, "deadline", None) is not None:
+            return None
+        return self.default_timeout_seconds
+
+    @staticmethod
+    def _deadline_for(task: Any, timeout_seconds: Optional[float], now: float) -> Optional[float]:
+        """A task's absolute deadline on the monotonic clock (an explicit timeout overrides it)"""
+        deadline = getattr(task, "deadline", None)
+        if timeout_seconds is not None or deadline is None:
+            return None
+        return now + max(0.0, (deadline - datetime.now()).total_seconds())
+
+    @staticmethod
+    def _expires_at(entry: _ScheduledTask) -> Optional[float]:
+        if entry.deadline is not None:
+            return entry.deadline
+        if entry.timeout_seconds is None or entry.ready_at is None:
+            return None
+        return entry.ready_at + entry.timeout_seconds
+
+    def _make_ready(self, entry: _ScheduledTask):
+        task = entry.task
+        entry.ready_at = time.monotonic()
+        priority = getattr(task.priority, "value", task.priority)
+        heapq.heappush(
+            self._ready[task.agent_type],
+            (PRIORITY_RANK.get(priority, len(PRIORITY_RANK)), next(self._sequence), task.id)
+        )
+
+    def _has_capacity(self, agent_type: Any) -> bool:
+        limit = self.type_limits.get(agent_type)
+        return limit is None or self._running[agent_type] < limit
+
+    def _dispatch(self):
+        """Start every ready task that has agent capacity"""
+        for agent_type, heap in list(self._ready.items()):
+            while heap and self._has_capacity(agent_type):
+                _, _, task_id = heap[0]
+                entry = self._entries.get(task_id)
+
+                if entry is None or entry.future.done():
+                    heapq.heappop(heap)
+                    continue
+
+                expires_at = self._expires_at(entry)
+                if expires_at is not None and time.monotonic() > expires_at:
+                    heapq.heappop(heap)
+                    self._fail(entry, TaskTimeoutError(f"Task {task_id} timed out in queue"), timeout=True)
+                    continue
+
+                agent = self.acquire_agent(agent_type)
+                if agent is None:
+                    break
+
+                heapq.heappop(heap)
+                self._start(entry, agent)
+
+    def _start(self, entry: _ScheduledTask, agent: Any):
+        task = entry.task
+        entry.dispatched_at = time.monotonic()
+        wait = entry.dispatched_at - entry.enqueued_at
+        self._wait_samples[task.agent_type].append(wait)
+        self._running[task.agent_type] += 1
+
+        # Inject dependency results declared via dependency_inputs
+        for data_key, dependency_id in (getattr(task, "dependency_inputs", None) or {}).items():
+            if dependency_id in self._results:
+                task.data[data_key] = self._results[dependency_id]
+
+        remaining = None
+        expires_at = self._expires_at(entry)
+        if expires_at is not None:
+            remaining = max(0.0, expires_at - entry.dispatched_at)
+
+        entry.runner = asyncio.create_task(
+            self._run(entry, agent, remaining),
+            name=f"agent-task-{task.id}"
+        )
+        entry.runner.add_done_callback(lambda runner: self._runner_done(entry, agent, runner))
+
+    def _runner_done(self, entry: _ScheduledTask, agent: Any, runner: asyncio.Task):
+        """Settle a task cancelled before its runner started (_run never executed)"""
+        if not runner.cancelled() or entry.future.done():
+            return
+        self._running[entry.task.agent_type] -= 1
+        self.release_agent(agent, False, 0.0)
+        self._finish(entry, cancelled=True)
+        self._dispatch()
+
+    async def _run(self, entry: _ScheduledTask, agent: Any, timeout: Optional[float]):
+        task = entry.task
+        started = time.monotonic()
+        success = False
+
+        try:
+            if timeout is not None:
+                result = await asyncio.wait_for(self.run_task(task, agent), timeout=timeout)
+            else:
+                result = await self.run_task(task, agent)
+            success = True
+            self._finish(entry, result=result)
+
+        except asyncio.TimeoutError:
+            self._fail(entry, TaskTimeoutError(f"Task {task.id} exceeded its {entry.timeout_seconds}s timeout"),
+                       timeout=True)
+        except asyncio.CancelledError:
+            self._finish(entry, cancelled=True)
+        except Exception as e:
+            self._fail(entry, e)
+        finally:
+            self._running[task.agent_type] -= 1
+            self.release_agent(agent, success, time.monotonic() - started)
+            self._dispatch()
+
+    def _ensure_sweeper(self):
+        if self.sweep_interval_seconds > 0 and (self._sweeper is None or self._sweeper.done()):
+            self._sweeper = asyncio.ensure_future(self._sweep_loop())
+
+    async def _sweep_loop(self):
+        """Expire tasks waiting past their timeout and retry dispatch while anything is queued"""
+        while self._entries:
+            await asyncio.sleep(self.sweep_interval_seconds)
+            try:
+                self._expire_waiting()
+                self._dispatch()
+            except Exception as e:
+                logger.error(f"Task scheduler sweep failed: {e}")
+
+    def _expire_waiting(self) -> int:
+        """Fail tasks that are not running and have passed their timeout or deadline"""
+        now = time.monotonic()
+        expired = 0
+        for entry in list(self._entries.values()):
+            if entry.runner is not None or entry.future.done():
+                continue
+            expires_at = self._expires_at(entry)
+            if expires_at is not None and now > expires_at:
+                self._fail(entry, TaskTimeoutError(f"Task {entry.task.id} timed out in queue"), timeout=True)
+                expired += 1
+        return expired
+
+    def _finish(self, entry: _ScheduledTask, result: Optional[Dict[str, Any]] = None, cancelled: bool = False):
+        task = entry.task
+        self._entries.pop(task.id, None)
+        self._prune_dependencies(task)
+
+        if cancelled:
+            task.status = "cancelled"
+            self.metrics["cancelled"] += 1
+            self._failed[task.id] = "cancelled"
+            if not entry.future.done():
+                entry.future.cancel()
+            self._release_dependents(task.id, failed=True)
+            return
+
+        task.status = "completed"
+        self.metrics["completed"] += 1
+        self._results[task.id] = result
+        if not entry.future.done():
+            entry.future.set_result(result)
+        self._release_dependents(task.id, failed=False)
+
+    def _fail(self, entry: _ScheduledTask, error: Exception, timeout: bool = False, dependency: bool = False):
+        task = entry.task
+        self._entries.pop(task.id, None)
+        self._prune_dependencies(task)
+
+        task.status = "failed"
+        task.error = str(error)
+        self.metrics["failed"] += 1
+        if timeout:
+            self.metrics["timed_out"] += 1
+        if dependency:
+            self.metrics["dependency_failures"] += 1
+
+        self._failed[task.id] = str(error)
+        if not entry.future.done():
+            entry.future.set_exception(error)
+            # Graph callers may never await dependents of a failed task
+            entry.future.add_done_callback(lambda future: future.exception())
+
+        self._release_dependents(task.id, failed=True)
+
+    def _release_dependents(self, task_id: UUID, failed: bool):
+        for dependent_id in self._dependents.pop(task_id, set()):
+            dependent = self._entries.get(dependent_id)
+            if dependent is None or dependent.future.done():
+                continue
+
+            if failed:
+                self._fail(dependent, TaskDependencyError(
+                    f"Dependency {task_id} failed: {self._failed.get(task_id)}"
+                ), dependency=True)
+                continue
+
+            dependent.remaining_dependencies.discard(task_id)
+            if not dependent.remaining_dependencies:
+                self._make_ready(dependent)
+
+        self._prune(task_id)
+
+    def _prune_dependencies(self, task: Any):
+        for dependency_id in task.dependencies or []:
+            self._prune(dependency_id)
+
+    def _prune(self, task_id: UUID):
+        """Results are only kept while a queued task still depends on them"""
+        still_needed = any(task_id in (entry.task.dependencies or []) for entry in self._entries.values())
+        if not still_needed:
+            self._results.pop(task_id, None)
+            self._failed.pop(task_id, None)
+
+    @staticmethod
+    def _topological_order(tasks: List[Any]) -> List[Any]:
+        """Order a task list so dependencies are submitted first; rejects cycles"""
+        by_id = {task.id: task for task in tasks}
+        ordered, visiting, done = [], set(), set()
+
+        def visit(task):
+            if task.id in done:
+                return
+            if task.id in visiting:
+                raise TaskDependencyError(f"Dependency cycle at task {task.id}")
+            visiting.add(task.id)
+            for dependency_id in task.dependencies or []:
+                if dependency_id in by_id:
+                    visit(by_id[dependency_id])
+            visiting.discard(task.id)
+            done.add(task.id)
+            ordered.append(task)
+
+        for task in tasks:
+            visit(task)
+        return ordered
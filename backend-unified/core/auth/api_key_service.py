@@ -17,7 +17,9 @@ from pydantic import BaseModel, Field
 import logging
 
 from config.settings import settings
+from src.utils.redis_client import redis_from_url
 from .permissions import AgentPermissions
+from .rate_limit_engine import RateLimitEngine, local_fraction_from_env, local_ttl_from_env
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +44,7 @@ class APIKeyService:
     
     def __init__(self):
         self.redis_client: Optional[redis.Redis] = None
+        self.rate_limit_engine: Optional[RateLimitEngine] = None
         self.key_prefix = "mfm_agent_"
         self.metadata_prefix = "api_key_meta:"
         self.rate_limit_prefix = "rate_limit:"
@@ -49,13 +52,18 @@ class APIKeyService:
     async def initialize_redis(self):
         """Initialize Redis connection"""
         try:
-            self.redis_client = redis.from_url(
+            self.redis_client = redis_from_url(
                 settings.REDIS_URL,
                 encoding="utf-8",
                 decode_responses=True
             )
             # Test connection
             await self.redis_client.ping()
+            self.rate_limit_engine = RateLimitEngine(
+                self.redis_client,
+                local_fraction=local_fraction_from_env(),
+                local_ttl_seconds=local_ttl_from_env()
+            )
             logger.info("✅ API Key Service Redis connection established")
         except Exception as e:
             logger.error(f"❌ API Key Service Redis connection failed: {e}")
@@ -219,58 +227,31 @@ class APIKeyService:
         """Check if API key is within rate limits"""
         
         rate_limits = metadata["rate_limits"]
-        current_time = datetime.utcnow()
-        
-        # Check requests per minute
-        minute_key = f"{self.rate_limit_prefix}minute:{key_id}:{int(current_time.timestamp() // 60)}"
-        minute_count = await self.redis_client.get(minute_key)
-        minute_count = int(minute_count) if minute_count else 0
-        
-        if minute_count >= rate_limits["requests_per_minute"]:
-            logger.warning(f"❌ Minute rate limit exceeded for key: {key_id}")
-            return False
         
-        # Check requests per hour
-        hour_key = f"{self.rate_limit_prefix}hour:{key_id}:{int(current_time.timestamp() // 3600)}"
-        hour_count = await self.redis_client.get(hour_key)
-        hour_count = int(hour_count) if hour_count else 0
-        
-        if hour_count >= rate_limits["requests_per_hour"]:
-            logger.warning(f"❌ Hour rate limit exceeded for key: {key_id}")
-            return False
-        
-        # Check concurrent requests
-        concurrent_key = f"{self.rate_limit_prefix}concurrent:{key_id}"
-        concurrent_count = await self.redis_client.get(concurrent_key)
-        concurrent_count = int(concurrent_count) if concurrent_count else 0
+        # Minute, hour and concurrent limits checked and counted in one atomic call
+        decision = await self.rate_limit_engine.hit(
+            f"{self.rate_limit_prefix}sw:key:{key_id}",
+            {
+                "minute": (60, rate_limits["requests_per_minute"]),
+                "hour": (3600, rate_limits["requests_per_hour"])
+            },
+            concurrent_key=f"{self.rate_limit_prefix}concurrent:{key_id}",
+            max_concurrent=rate_limits["concurrent_requests"]
+        )
         
-        if concurrent_count >= rate_limits["concurrent_requests"]:
-            logger.warning(f"❌ Concurrent request limit exceeded for key: {key_id}")
+        if not decision.allowed:
+            if decision.denied_window == "concurrent":
+                logger.warning(f"❌ Concurrent request limit exceeded for key: {key_id}")
+            else:
+                logger.warning(f"❌ {decision.denied_window.capitalize()} rate limit exceeded for key: {key_id}")
             return False
         
-        # Increment counters
-        pipe = self.redis_client.pipeline()
-        
-        # Increment minute counter
-        pipe.incr(minute_key)
-        pipe.expire(minute_key, 60)
-        
-        # Increment hour counter
-        pipe.incr(hour_key)
-        pipe.expire(hour_key, 3600)
-        
-        # Increment concurrent counter (will be decremented when request completes)
-        pipe.incr(concurrent_key)
-        pipe.expire(concurrent_key, 300)  # 5 minute safety timeout
-        
-        await pipe.execute()
-        
         return True
     
     async def decrement_concurrent_requests(self, key_id: str):
         """Decrement concurrent request counter when request completes"""
         concurrent_key = f"{self.rate_limit_prefix}concurrent:{key_id}"
-        await self.redis_client.decr(concurrent_key)
+        await self.rate_limit_engine.release_concurrent(concurrent_key)
     
     async def check_agent_permissions(
         self, 
@@ -18,6 +18,7 @@ from pydantic import BaseModel, Field
 import logging
 
 from config.settings import settings
+from src.utils.redis_client import redis_from_url
 
 logger = logging.getLogger(__name__)
 
@@ -54,7 +55,7 @@ class JWTService:
     async def initialize_redis(self):
         """Initialize Redis connection"""
         try:
-            self.redis_client = redis.from_url(
+            self.redis_client = redis_from_url(
                 settings.REDIS_URL,
                 encoding="utf-8",
                 decode_responses=True
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Rate Limit Engine
+Sliding-window counters for all windows checked and updated in one atomic script call
+
+Executor: Claude Code
+Erstellt: 2025-07-03
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# window name -> (period seconds, request limit)
+RateWindows = Dict[str, Tuple[int, int]]
+
+# Concurrent counters expire in case a request never decrements
+CONCURRENT_SAFETY_TTL = 300
+
+# Sliding-window counter per window: the previous bucket's count is weighted
+# by how much of it still overlaps the sliding window, so a caller cannot
+# burst 2x the limit across a bucket edge. All windows share one hash.
+#
+# KEYS[1] = window hash, KEYS[2] = concurrent counter
+# ARGV    = now, pending (already admitted locally, charged unconditionally),
+#           max_concurrent (0 = unchecked), then (name, period, limit) triples
+# Returns {allowed, denied window, retry after ms, remaining}
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local pending = tonumber(ARGV[2])
+local max_concurrent = tonumber(ARGV[3])
+
+local windows = {}
+local denied = ""
+local retry_after = 0
+local max_period = 0
+
+for i = 4, #ARGV, 3 do
+    local name = ARGV[i]
+    local period = tonumber(ARGV[i + 1])
+    local limit = tonumber(ARGV[i + 2])
+    local bucket = math.floor(now / period)
+
+    local stored = redis.call("HMGET", key, name .. ":b", name .. ":c", name .. ":p")
+    local stored_bucket = tonumber(stored[1])
+    local current = 0
+    local previous = 0
+    if stored_bucket == bucket then
+        current = tonumber(stored[2]) or 0
+        previous = tonumber(stored[3]) or 0
+    elseif stored_bucket == bucket - 1 then
+        previous = tonumber(stored[2]) or 0
+    end
+    current = current + pending
+
+    local elapsed = now - bucket * period
+    local estimate = previous * (1 - elapsed / period) + current
+    if denied == "" and estimate + 1 > limit then
+        denied = name
+        if current + 1 > limit or previous == 0 then
+            retry_after = period - elapsed
+        else
+            retry_after = period * (1 - (limit - current - 1) / previous) - elapsed
+        end
+    end
+
+    table.insert(windows, {name, bucket, current, previous, limit, estimate})
+    if period > max_period then
+        max_period = period
+    end
+end
+
+if denied == "" and max_concurrent > 0 then
+    local running = tonumber(redis.call("GET", KEYS[2])) or 0
+    if running >= max_concurrent then
+        denied = "concurrent"
+    end
+end
+
+local allowed = denied == ""
+local cost = allowed and 1 or 0
+local remaining = -1
+
+for _, window in ipairs(windows) do
+    redis.call("HSET", key, window[1] .. ":b", window[2], window[1] .. ":c", window[3] + cost, window[1] .. ":p", window[4])
+    local left = math.floor(window[5] - window[6] - cost)
+    if remaining < 0 or left < remaining then
+        remaining = left
+    end
+end
+if max_period > 0 then
+    redis.call("EXPIRE", key, max_period * 2)
+end
+
+if allowed and max_concurrent > 0 then
+    redis.call("INCR", KEYS[2])
+    redis.call("EXPIRE", KEYS[2], %d)
+end
+
+return {allowed and 1 or 0, denied, math.ceil(retry_after * 1000), math.max(remaining, 0)}
+""" % CONCURRENT_SAFETY_TTL
+
+@dataclass
+class RateLimitDecision:
+    """Outcome of one rate limit check"""
+    allowed: bool
+    denied_window: Optional[str] = None
+    retry_after_seconds: float = 0.0
+    remaining: int = 0
+    local: bool = False
+
+@dataclass
+class _LocalAllowance:
+    budget: int
+    used: int
+    expires_at: float
+
+class RateLimitEngine:
+    """One round-trip sliding-window rate limiting over any set of windows
+
+    An optional local pre-filter admits callers that are obviously under
+    their limits without a Redis call: after each script call the caller may
+    use local_fraction of its remaining headroom locally for local_ttl
+    seconds. Those locally admitted requests are charged to Redis with the
+    caller's next script call, so counts stay exact; the overshoot is bounded
+    by local_fraction of the headroom per worker. Checks that include a
+    concurrent limit always go to Redis.
+    """
+
+    def __init__(self, redis_client: Any, local_fraction: float = 0.0,
+                 local_ttl_seconds: float = 1.0, max_local_entries: int = 10000):
+        self.redis_client = redis_client
+        self.local_fraction = local_fraction
+        self.local_ttl_seconds = local_ttl_seconds
+        self.max_local_entries = max_local_entries
+
+        self._scripted = hasattr(redis_client, "register_script")
+        self._script = redis_client.register_script(SLIDING_WINDOW_SCRIPT) if self._scripted else None
+
+        self._local: "OrderedDict[str, _LocalAllowance]" = OrderedDict()
+
+        # In-process fallback for clients without scripting
+        self._memory: Dict[str, Dict[str, float]] = {}
+        self._memory_lock = asyncio.Lock()
+
+        self.stats = {"checks": 0, "local_admits": 0, "script_calls": 0, "denied": 0}
+
+    async def hit(
+        self,
+        window_key: str,
+        windows: RateWindows,
+        concurrent_key: Optional[str] = None,
+        max_concurrent: int = 0,
+        now: Optional[float] = None
+    ) -> RateLimitDecision:
+        """Check every window (and the concurrent limit) and count the request if allowed"""
+        now = time.time() if now is None else now
+        self.stats["checks"] += 1
+
+        check_concurrent = bool(concurrent_key) and max_concurrent > 0
+        allowance = self._local.get(window_key)
+        if allowance is not None and not check_concurrent:
+            if now < allowance.expires_at and allowance.used < allowance.budget:
+                allowance.used += 1
+                self.stats["local_admits"] += 1
+                return RateLimitDecision(True, remaining=allowance.budget - allowance.used, local=True)
+
+        pending = self._local.pop(window_key).used if allowance is not None else 0
+
+        args: List[Any] = [now, pending, max_concurrent if check_concurrent else 0]
+        for name, (period, limit) in windows.items():
+            args.extend([name, period, limit])
+        keys = [window_key, concurrent_key or f"{window_key}:concurrent"]
+
+        self.stats["script_calls"] += 1
+        if self._scripted:
+            result = await self._script(keys=keys, args=args)
+        else:
+            async with self._memory_lock:
+                result = self._run_in_memory(keys, args)
+
+        allowed, denied, retry_after_ms, remaining = result
+        denied = denied.decode() if isinstance(denied, bytes) else denied
+        decision = RateLimitDecision(
+            allowed=bool(int(allowed)),
+            denied_window=denied or None,
+            retry_after_seconds=int(retry_after_ms) / 1000,
+            remaining=int(remaining)
+        )
+
+        if not decision.allowed:
+            self.stats["denied"] += 1
+        elif self.local_fraction > 0 and windows:
+            budget = int(decision.remaining * self.local_fraction)
+            if budget > 0:
+                self._remember_local(window_key, _LocalAllowance(budget, 0, now + self.local_ttl_seconds))
+
+        return decision
+
+    async def release_concurrent(self, concurrent_key: str):
+        """Decrement the concurrent counter when the request completes"""
+        if self._scripted:
+            await self.redis_client.decr(concurrent_key)
+        else:
+            async with self._memory_lock:
+                running = self._memory.setdefault(concurrent_key, {})
+                running["count"] = max(0, running.get("count", 0) - 1)
+
+    async def usage(self, window_key: str, windows: RateWindows, now: Optional[float] = None) -> Dict[str, int]:
+        """Current sliding-window estimate per window (read only, one round-trip)"""
+        now = time.time() if now is None else now
+        if self._scripted:
+            stored = await self.redis_client.hgetall(window_key)
+        else:
+            stored = dict(self._memory.get(window_key, {}))
+        stored = {
+            (k.decode() if isinstance(k, bytes) else k): float(v) for k, v in (stored or {}).items()
+        }
+
+        pending = self._local[window_key].used if window_key in self._local else 0
+        usage = {}
+        for name, (period, _) in windows.items():
+            current, previous = _window_counts(stored, name, period, now)
+            elapsed = now - math.floor(now / period) * period
+            usage[name] = int(round(previous * (1 - elapsed / period) + current + pending))
+        return usage
+
+    def forget_local(self, window_key: str):
+        self._local.pop(window_key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "local_entries": len(self._local)}
+
+    def _remember_local(self, window_key: str, allowance: _LocalAllowance):
+        self._local[window_key] = allowance
+        self._local.move_to_end(window_key)
+        while len(self._local) > self.max_local_entries:
+            self._local.popitem(last=False)
+
+    def _run_in_memory(self, keys: List[str], args: List[Any]) -> Tuple[int, str, int, int]:
+        """Same semantics as SLIDING_WINDOW_SCRIPT over a dict"""
+        window_key, concurrent_key = keys
+        now, pending, max_concurrent = float(args[0]), int(args[1]), int(args[2])
+        stored = self._memory.setdefault(window_key, {})
+
+        windows = []
+        denied, retry_after = "", 0.0
+        for index in range(3, len(args), 3):
+            name, period, limit = args[index], int(args[index + 1]), int(args[index + 2])
+            current, previous = _window_counts(stored, name, period, now)
+            current += pending
+
+            elapsed = now - math.floor(now / period) * period
+            estimate = previous * (1 - elapsed / period) + current
+            if not denied and estimate + 1 > limit:
+                denied = name
+                if current + 1 > limit or previous == 0:
+                    retry_after = period - elapsed
+                else:
+                    retry_after = period * (1 - (limit - current - 1) / previous) - elapsed
+            windows.append((name, math.floor(now / period), current, previous, limit, estimate))
+
+        running = self._memory.setdefault(concurrent_key, {})
+        if not denied and max_concurrent > 0 and running.get("count", 0) >= max_concurrent:
+            denied = "concurrent"
+
+        cost = 0 if denied else 1
+        remaining = -1
+        for name, bucket, current, previous, limit, estimate in windows:
+            stored[f"{name}:b"], stored[f"{name}:c"], stored[f"{name}:p"] = bucket, current + cost, previous
+            left = math.floor(limit - estimate - cost)
+            remaining = left if remaining < 0 or left < remaining else remaining
+
+        if cost and max_concurrent > 0:
+            running["count"] = running.get("count", 0) + 1
+
+        return cost, denied, math.ceil(retry_after * 1000), max(remaining, 0)
+
+def _window_counts(stored: Dict[str, float], name: str, period: int, now: float) -> Tuple[float, float]:
+    """(current, previous) bucket counts for the bucket containing now"""
+    bucket = math.floor(now / period)
+    stored_bucket = stored.get(f"{name}:b")
+    if stored_bucket == bucket:
+        return stored.get(f"{name}:c", 0), stored.get(f"{name}:p", 0)
+    if stored_bucket == bucket - 1:
+        return 0, stored.get(f"{name}:c", 0)
+    return 0, 0
+
+def local_fraction_from_env() -> float:
+    """Share of remaining headroom a worker may admit without Redis (opt-in; 0 disables the pre-filter)"""
+    return float(os.getenv("RATE_LIMIT_LOCAL_FRACTION", "0"))
+
+def local_ttl_from_env() -> float:
+    return float(os.getenv("RATE_LIMIT_LOCAL_TTL_SECONDS", "1"))
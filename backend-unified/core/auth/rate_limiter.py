@@ -16,6 +16,8 @@ from dataclasses import dataclass
 from enum import Enum
 
 from config.settings import settings
+from src.utils.redis_client import redis_from_url
+from .rate_limit_engine import RateLimitEngine, local_fraction_from_env, local_ttl_from_env
 
 logger = logging.getLogger(__name__)
 
@@ -40,18 +42,24 @@ class RateLimiter:
     
     def __init__(self):
         self.redis_client: Optional[redis.Redis] = None
+        self.engine: Optional[RateLimitEngine] = None
         self.rate_limit_prefix = "rate_limit:"
         
     async def initialize_redis(self):
         """Initialize Redis connection"""
         try:
-            self.redis_client = redis.from_url(
+            self.redis_client = redis_from_url(
                 settings.REDIS_URL,
                 encoding="utf-8",
                 decode_responses=True
             )
             # Test connection
             await self.redis_client.ping()
+            self.engine = RateLimitEngine(
+                self.redis_client,
+                local_fraction=local_fraction_from_env(),
+                local_ttl_seconds=local_ttl_from_env()
+            )
             logger.info("✅ Rate Limiter Redis connection established")
         except Exception as e:
             logger.error(f"❌ Rate Limiter Redis connection failed: {e}")
@@ -74,32 +82,19 @@ class RateLimiter:
             await self.initialize_redis()
         
         try:
-            current_time = datetime.utcnow()
-            
-            # Check minute rate limit
-            if not await self._check_sliding_window(
-                user_id, endpoint, "minute", requests_per_minute, 60, current_time
-            ):
-                logger.warning(f"❌ Minute rate limit exceeded for user {user_id} on {endpoint}")
-                return False
-            
-            # Check hour rate limit
-            if not await self._check_sliding_window(
-                user_id, endpoint, "hour", requests_per_hour, 3600, current_time
-            ):
-                logger.warning(f"❌ Hour rate limit exceeded for user {user_id} on {endpoint}")
-                return False
+            # Check and count all windows in one atomic call
+            decision = await self.engine.hit(
+                self._window_key(user_id, endpoint),
+                self._windows(requests_per_minute, requests_per_hour, requests_per_day)
+            )
             
-            # Check day rate limit
-            if not await self._check_sliding_window(
-                user_id, endpoint, "day", requests_per_day, 86400, current_time
-            ):
-                logger.warning(f"❌ Day rate limit exceeded for user {user_id} on {endpoint}")
+            if not decision.allowed:
+                logger.warning(
+                    f"❌ {decision.denied_window.capitalize()} rate limit exceeded for user {user_id} on {endpoint} "
+                    f"(retry after {decision.retry_after_seconds:.1f}s)"
+                )
                 return False
             
-            # Increment all counters
-            await self._increment_counters(user_id, endpoint, current_time)
-            
             return True
             
         except Exception as e:
@@ -110,19 +105,22 @@ class RateLimiter:
     async def check_concurrent_limit(self, user_id: str, max_concurrent: int = 10) -> bool:
         """Check concurrent request limit"""
         
+        if not self.redis_client:
+            await self.initialize_redis()
+        
         try:
-            concurrent_key = f"{self.rate_limit_prefix}concurrent:{user_id}"
-            current_count = await self.redis_client.get(concurrent_key)
-            current_count = int(current_count) if current_count else 0
+            # Check and increment atomically (decremented when the request completes)
+            decision = await self.engine.hit(
+                self._window_key(user_id, "concurrent"),
+                {},
+                concurrent_key=f"{self.rate_limit_prefix}concurrent:{user_id}",
+                max_concurrent=max_concurrent
+            )
             
-            if current_count >= max_concurrent:
+            if not decision.allowed:
                 logger.warning(f"❌ Concurrent limit exceeded for user {user_id}")
                 return False
             
-            # Increment counter (will be decremented when request completes)
-            await self.redis_client.incr(concurrent_key)
-            await self.redis_client.expire(concurrent_key, 300)  # 5 minute safety timeout
-            
             return True
             
         except Exception as e:
@@ -133,7 +131,7 @@ class RateLimiter:
         """Decrement concurrent request counter"""
         try:
             concurrent_key = f"{self.rate_limit_prefix}concurrent:{user_id}"
-            await self.redis_client.decr(concurrent_key)
+            await self.engine.release_concurrent(concurrent_key)
         except Exception as e:
             logger.error(f"❌ Error decrementing concurrent requests: {e}")
     
@@ -144,13 +142,15 @@ class RateLimiter:
     ) -> Dict[str, any]:
         """Get current rate limit status for user"""
         
+        if not self.redis_client:
+            await self.initialize_redis()
+        
         try:
             current_time = datetime.utcnow()
             
-            # Get current counts
-            minute_count = await self._get_window_count(user_id, endpoint, "minute", current_time)
-            hour_count = await self._get_window_count(user_id, endpoint, "hour", current_time)
-            day_count = await self._get_window_count(user_id, endpoint, "day", current_time)
+            # Get current sliding-window counts
+            usage = await self.engine.usage(self._window_key(user_id, endpoint), self._windows(60, 1000, 10000))
+            minute_count, hour_count, day_count = usage["minute"], usage["hour"], usage["day"]
             
             # Get concurrent count
             concurrent_key = f"{self.rate_limit_prefix}concurrent:{user_id}"
@@ -188,97 +188,25 @@ class RateLimiter:
         
         try:
             # Clear all rate limit keys for user
-            keys_to_delete = [
-                f"{self.rate_limit_prefix}minute:{user_id}:{endpoint}",
-                f"{self.rate_limit_prefix}hour:{user_id}:{endpoint}", 
-                f"{self.rate_limit_prefix}day:{user_id}:{endpoint}",
-                f"{self.rate_limit_prefix}concurrent:{user_id}"
-            ]
-            
-            for key in keys_to_delete:
-                await self.redis_client.delete(key)
+            window_key = self._window_key(user_id, endpoint)
+            await self.redis_client.delete(window_key, f"{self.rate_limit_prefix}concurrent:{user_id}")
+            self.engine.forget_local(window_key)
             
             logger.info(f"✅ Rate limits reset for user {user_id} on {endpoint}")
             
         except Exception as e:
             logger.error(f"❌ Error resetting rate limits: {e}")
     
-    async def _check_sliding_window(
-        self,
-        user_id: str,
-        endpoint: str,
-        window_type: str,
-        limit: int,
-        window_seconds: int,
-        current_time: datetime
-    ) -> bool:
-        """Check sliding window rate limit"""
-        
-        window_key = f"{self.rate_limit_prefix}{window_type}:{user_id}:{endpoint}"
-        
-        # Get current window count
-        current_count = await self._get_window_count(user_id, endpoint, window_type, current_time)
-        
-        return current_count < limit
-    
-    async def _get_window_count(
-        self,
-        user_id: str,
-        endpoint: str,
-        window_type: str,
-        current_time: datetime
-    ) -> int:
-        """Get current count for a time window"""
-        
-        window_key = f"{self.rate_limit_prefix}{window_type}:{user_id}:{endpoint}"
-        
-        # For simplicity, using basic counters with expiration
-        # In production, you might want to use more sophisticated sliding window
-        if window_type == "minute":
-            time_bucket = int(current_time.timestamp() // 60)
-        elif window_type == "hour":
-            time_bucket = int(current_time.timestamp() // 3600)
-        elif window_type == "day":
-            time_bucket = int(current_time.timestamp() // 86400)
-        else:
-            time_bucket = int(current_time.timestamp())
-        
-        bucket_key = f"{window_key}:{time_bucket}"
-        count = await self.redis_client.get(bucket_key)
-        
-        return int(count) if count else 0
+    def _window_key(self, user_id: str, endpoint: str) -> str:
+        """Hash holding the sliding-window counters of all windows"""
+        return f"{self.rate_limit_prefix}sw:{user_id}:{endpoint}"
     
-    async def _increment_counters(self, user_id: str, endpoint: str, current_time: datetime):
-        """Increment all rate limit counters"""
-        
-        # Minute counter
-        minute_bucket = int(current_time.timestamp() // 60)
-        minute_key = f"{self.rate_limit_prefix}minute:{user_id}:{endpoint}:{minute_bucket}"
-        
-        # Hour counter
-        hour_bucket = int(current_time.timestamp() // 3600)
-        hour_key = f"{self.rate_limit_prefix}hour:{user_id}:{endpoint}:{hour_bucket}"
-        
-        # Day counter
-        day_bucket = int(current_time.timestamp() // 86400)
-        day_key = f"{self.rate_limit_prefix}day:{user_id}:{endpoint}:{day_bucket}"
-        
-        # Use pipeline for atomic operations
-        pipe = self.redis_client.pipeline()
-        
-        # Increment minute counter
-        pipe.incr(minute_key)
-        pipe.expire(minute_key, 120)  # Keep for 2 minutes
-        
-        # Increment hour counter
-        pipe.incr(hour_key)
-        pipe.expire(hour_key, 7200)  # Keep for 2 hours
-        
-        # Increment day counter
-        pipe.incr(day_key)
-        pipe.expire(day_key, 172800)  # Keep for 2 days
-        
-        await pipe.execute()
+    def _windows(self, per_minute: int, per_hour: int, per_day: int) -> Dict[str, Tuple[int, int]]:
+        return {
+            "minute": (60, per_minute),
+            "hour": (3600, per_hour),
+            "day": (86400, per_day)
+        }
     
     async def get_burst_allowance(self, user_id: str, subscription_tier: str) -> int:
         """Get burst allowance based on subscription tier"""
@@ -21,6 +21,7 @@ import asyncio
 from ipaddress import ip_address, ip_network
 
 from config.settings import settings
+from src.utils.redis_client import redis_from_url
 
 logger = logging.getLogger(__name__)
 
@@ -75,7 +76,7 @@ class SecurityService:
     async def initialize_redis(self):
         """Initialize Redis connection"""
         try:
-            self.redis_client = redis.from_url(
+            self.redis_client = redis_from_url(
                 settings.REDIS_URL,
                 encoding="utf-8",
                 decode_responses=True
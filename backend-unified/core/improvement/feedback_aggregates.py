@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Feedback Aggregates - columnar batch statistics for the feedback system
+
+FeedbackDrivenImprovementSystem processes feedback in groups of one feedback
+type and source. These helpers turn a group's event payloads into float
+columns, aggregate them, and flag z-score anomalies for the whole group
+against the history collected before it. ProcessedFeedbackStore keeps
+processed events for insight generation until their TTL expires, under a
+hard size cap.
+"""
+
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def build_numeric_columns(rows: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Convert row dicts into float64 columns; missing values become NaN"""
+    fields = []
+    seen = set()
+    for row in rows:
+        for key, value in row.items():
+            if key not in seen and _is_number(value):
+                seen.add(key)
+                fields.append(key)
+
+    columns = {}
+    for key in fields:
+        columns[key] = np.fromiter(
+            (row[key] if _is_number(row.get(key)) else np.nan for row in rows),
+            dtype=np.float64,
+            count=len(rows)
+        )
+
+    return columns
+
+
+def compute_group_aggregates(event_count: int, columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Count/mean/std/min/max per numeric field"""
+    fields = {}
+
+    for key, values in columns.items():
+        valid = values[~np.isnan(values)]
+        if valid.size == 0:
+            continue
+
+        fields[key] = {
+            'count': int(valid.size),
+            'mean': float(valid.mean()),
+            'std': float(valid.std(ddof=1)) if valid.size > 1 else 0.0,
+            'min': float(valid.min()),
+            'max': float(valid.max())
+        }
+
+    return {'event_count': event_count, 'fields': fields}
+
+
+def detect_group_anomalies(history: Iterable[Dict[str, Any]], columns: Dict[str, np.ndarray],
+                           z_threshold: float = 2.5) -> List[int]:
+    """Indices of batch rows more than z_threshold standard deviations from the history of any field"""
+    history = list(history)
+    if len(history) < 5 or not columns:
+        return []
+
+    historical_columns = build_numeric_columns([item['data'] for item in history])
+    anomalous = None
+
+    for key, values in columns.items():
+        historical = historical_columns.get(key)
+        if historical is None:
+            continue
+
+        historical = historical[~np.isnan(historical)]
+        if historical.size < 5:
+            continue
+
+        hist_std = historical.std(ddof=1)
+        if hist_std <= 0:
+            continue
+
+        with np.errstate(invalid='ignore'):
+            flags = np.abs(values - historical.mean()) / hist_std > z_threshold
+
+        anomalous = flags if anomalous is None else (anomalous | flags)
+
+    if anomalous is None:
+        return []
+
+    return np.flatnonzero(anomalous).tolist()
+
+
+class ProcessedFeedbackStore:
+    """Processed events by event_id, expiring after ttl_seconds and capped at max_events"""
+
+    def __init__(self, ttl_seconds: float, max_events: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_events = max_events
+        # Insertion-ordered by processing time so expiry pops from the front
+        self._events: Dict[str, Any] = OrderedDict()
+        self._expiry: deque = deque()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __contains__(self, event_id: str) -> bool:
+        return event_id in self._events
+
+    def values(self):
+        return self._events.values()
+
+    def store(self, events: Iterable[Any], now: Optional[datetime] = None):
+        """Mark events processed and keep them until their TTL expires"""
+        expires_at = (now or datetime.utcnow()) + timedelta(seconds=self.ttl_seconds)
+
+        for event in events:
+            event.processed = True
+            self._events[event.event_id] = event
+            self._expiry.append((expires_at, event.event_id))
+
+    def evict_expired(self, now: Optional[datetime] = None):
+        """Drop events past their TTL, then the oldest ones beyond the size cap"""
+        now = now or datetime.utcnow()
+
+        while self._expiry:
+            expires_at, event_id = self._expiry[0]
+            if expires_at > now and len(self._events) <= self.max_events:
+                break
+
+            self._expiry.popleft()
+            self._events.pop(event_id, None)
@@ -27,7 +27,7 @@ from typing import Dict, List, Any, Optional, Tuple, Union
 from enum import Enum
 from dataclasses import dataclass, asdict, field
 from collections import defaultdict, deque
-from statistics import mean, median, stdev
+from statistics import mean, median
 import uuid
 
 # Import core components
@@ -36,6 +36,9 @@ from ...src.api.journey.personalization_engine import PersonalizationEngine
 from ...src.api.journey.models import JourneySession, PersonalizedContent
 from ..agents.orchestrator import AgentOrchestrator
 from ..tracking.performance_tracker import PerformanceTracker
+from .feedback_aggregates import (
+    ProcessedFeedbackStore, build_numeric_columns, compute_group_aggregates, detect_group_anomalies
+)
 
 logger = logging.getLogger(__name__)
 
@@ -142,7 +145,6 @@ class FeedbackDrivenImprovementSystem:
         
         # Feedback collection and processing
         self.feedback_buffer = deque(maxlen=10000)
-        self.processed_feedback: Dict[str, FeedbackEvent] = {}
         
         # Learning and insights
         self.learning_insights: Dict[str, LearningInsight] = {}
@@ -157,7 +159,7 @@ class FeedbackDrivenImprovementSystem:
         self.baseline_metrics: Optional[PerformanceMetrics] = None
         
         # Learning models and patterns
-        self.pattern_database: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.pattern_database: Dict[str, deque] = defaultdict(lambda: deque(maxlen=self.config['pattern_history_size']))
         self.learning_models: Dict[str, Any] = {}
         
         # System configuration
@@ -168,9 +170,19 @@ class FeedbackDrivenImprovementSystem:
             'performance_tracking_interval': 600,  # 10 minutes
             'minimum_confidence_threshold': 0.7,
             'maximum_actions_per_cycle': 3,
-            'learning_retention_days': 30
+            'learning_retention_days': 30,
+            'processed_feedback_ttl_seconds': 86400,  # 24 hours
+            'processed_feedback_max_events': 100000,
+            'pattern_history_size': 1000,
+            'anomaly_z_threshold': 2.5
         }
         
+        # Processed events kept for insight generation until their TTL expires
+        self.processed_feedback = ProcessedFeedbackStore(
+            self.config['processed_feedback_ttl_seconds'],
+            self.config['processed_feedback_max_events']
+        )
+        
         # Background tasks
         self.feedback_processor_task = None
         self.learning_analyzer_task = None
@@ -261,40 +273,38 @@ class FeedbackDrivenImprovementSystem:
             if not events_to_process:
                 return {'processed': 0, 'insights_generated': 0}
             
-            # Process events by type
             processing_results = {
                 'processed': 0,
                 'insights_generated': 0,
                 'patterns_identified': 0,
-                'optimization_actions': 0
+                'optimization_actions': 0,
+                'groups': {}
             }
             
+            # Group events so aggregation and pattern detection run once per group
+            groups: Dict[str, List[FeedbackEvent]] = defaultdict(list)
             for event in events_to_process:
+                groups[f"{event.feedback_type.value}_{event.source_component}"].append(event)
+            
+            for pattern_key, group_events in groups.items():
                 try:
-                    # Process individual event
-                    result = await self._process_feedback_event(event)
-                    processing_results['processed'] += 1
-                    
-                    # Check for insights
-                    if result.get('insights_generated', 0) > 0:
-                        processing_results['insights_generated'] += result['insights_generated']
+                    result = await self._process_feedback_group(pattern_key, group_events)
                     
-                    # Check for patterns
-                    if result.get('patterns_identified', 0) > 0:
-                        processing_results['patterns_identified'] += result['patterns_identified']
+                    processing_results['processed'] += len(group_events)
+                    processing_results['insights_generated'] += result['insights_generated']
+                    processing_results['patterns_identified'] += result['patterns_identified']
+                    processing_results['optimization_actions'] += result['optimization_actions']
+                    processing_results['groups'][pattern_key] = result['aggregates']
                     
-                    # Check for optimization actions
-                    if result.get('optimization_actions', 0) > 0:
-                        processing_results['optimization_actions'] += result['optimization_actions']
-                    
-                    # Store processed event
-                    self.processed_feedback[event.event_id] = event
-                    event.processed = True
+                    # Store processed events
+                    self.processed_feedback.store(group_events)
                     
                 except Exception as e:
-                    logger.error(f"Error processing feedback event {event.event_id}: {e}")
+                    logger.error(f"Error processing feedback group {pattern_key}: {e}")
                     continue
             
+            self.processed_feedback.evict_expired()
+            
             logger.info(f"Processed {processing_results['processed']} feedback events")
             return processing_results
             
@@ -316,6 +326,7 @@ class FeedbackDrivenImprovementSystem:
             logger.info("Generating learning insights from feedback data")
             
             # Get recent feedback events
+            self.processed_feedback.evict_expired()
             cutoff_time = datetime.utcnow() - time_window
             recent_events = [
                 event for event in self.processed_feedback.values()
@@ -712,38 +723,57 @@ class FeedbackDrivenImprovementSystem:
     async def _process_feedback_event(self, event: FeedbackEvent) -> Dict[str, Any]:
         """Process individual feedback event with pattern recognition"""
         try:
-            results = {'insights_generated': 0, 'patterns_identified': 0, 'optimization_actions': 0}
-            
-            # Add to pattern database
             pattern_key = f"{event.feedback_type.value}_{event.source_component}"
-            self.pattern_database[pattern_key].append({
-                'timestamp': event.timestamp.isoformat(),
-                'data': event.data,
-                'context': event.context
-            })
-            
-            # Analyze patterns if we have enough data points
-            if len(self.pattern_database[pattern_key]) >= 10:
-                patterns = await self._detect_patterns(pattern_key)
-                results['patterns_identified'] = len(patterns)
-                
-                # Generate insights from patterns
-                if patterns:
-                    insights = await self._generate_insights_from_patterns(patterns, event)
-                    results['insights_generated'] = len(insights)
-            
-            # Real-time anomaly detection
-            if await self._detect_anomaly(event):
-                anomaly_insight = await self._create_anomaly_insight(event)
-                if anomaly_insight:
-                    results['insights_generated'] += 1
-            
+            results = await self._process_feedback_group(pattern_key, [event])
+            results.pop('aggregates', None)
             return results
             
         except Exception as e:
             logger.error(f"Error processing feedback event: {e}")
             return {'insights_generated': 0, 'patterns_identified': 0, 'optimization_actions': 0}
     
+    async def _process_feedback_group(self, pattern_key: str, events: List[FeedbackEvent]) -> Dict[str, Any]:
+        """Process all events of one feedback type/source in a single pass"""
+        results = {
+            'insights_generated': 0,
+            'patterns_identified': 0,
+            'optimization_actions': 0,
+            'aggregates': {}
+        }
+        
+        history = self.pattern_database[pattern_key]
+        
+        # Columnar view of the batch: one float array per numeric field
+        columns = build_numeric_columns([event.data for event in events])
+        results['aggregates'] = compute_group_aggregates(len(events), columns)
+        
+        # Anomaly detection against history collected before this batch
+        anomalous_indices = detect_group_anomalies(history, columns, self.config['anomaly_z_threshold'])
+        for index in anomalous_indices:
+            anomaly_insight = await self._create_anomaly_insight(events[index])
+            if anomaly_insight:
+                results['insights_generated'] += 1
+        
+        history.extend(
+            {
+                'timestamp': event.timestamp.isoformat(),
+                'data': event.data,
+                'context': event.context
+            }
+            for event in events
+        )
+        
+        # Pattern detection once per group instead of once per event
+        if len(history) >= 10:
+            patterns = await self._detect_patterns(pattern_key)
+            results['patterns_identified'] = len(patterns)
+            
+            if patterns:
+                insights = await self._generate_insights_from_patterns(patterns, events[-1])
+                results['insights_generated'] += len(insights)
+        
+        return results
+    
     async def _analyze_performance_trends(self, events: List[FeedbackEvent]) -> List[LearningInsight]:
         """Analyze performance trends from feedback events"""
         # Implementation would identify performance trends
@@ -1100,40 +1130,6 @@ class FeedbackDrivenImprovementSystem:
             logger.error(f"Error generating insights from patterns: {e}")
             return []
     
-    async def _detect_anomaly(self, event: FeedbackEvent) -> bool:
-        """Detect anomalies in real-time feedback"""
-        try:
-            # Get historical data for the same type
-            pattern_key = f"{event.feedback_type.value}_{event.source_component}"
-            historical_data = self.pattern_database.get(pattern_key, [])
-            
-            if len(historical_data) < 5:
-                return False  # Not enough data for anomaly detection
-            
-            # Check for value anomalies
-            for key, value in event.data.items():
-                if isinstance(value, (int, float)):
-                    historical_values = [
-                        item['data'].get(key) for item in historical_data
-                        if isinstance(item['data'].get(key), (int, float))
-                    ]
-                    
-                    if len(historical_values) >= 5:
-                        hist_mean = mean(historical_values)
-                        hist_std = stdev(historical_values) if len(historical_values) > 1 else 0
-                        
-                        # Z-score anomaly detection
-                        if hist_std > 0:
-                            z_score = abs((value - hist_mean) / hist_std)
-                            if z_score > 2.5:  # 2.5 standard deviations
-                                return True
-            
-            return False
-            
-        except Exception as e:
-            logger.error(f"Error detecting anomaly: {e}")
-            return False
-    
     async def _create_anomaly_insight(self, event: FeedbackEvent) -> Optional[LearningInsight]:
         """Create insight from detected anomaly"""
         try:
@@ -18,6 +18,8 @@ from pydantic import BaseModel, Field
 from enum import Enum
 import json
 
+from utils.tracing import span, traced
+
 logger = logging.getLogger(__name__)
 
 class QualityLevel(str, Enum):
@@ -400,6 +402,7 @@ class ContentQualityValidator:
             }
         }
     
+    @traced("quality.validate_content")
     async def validate_content(self, content: Dict[str, Any], 
                              quality_level: QualityLevel = QualityLevel.STANDARD) -> QualityReport:
         """Run comprehensive quality validation on content"""
@@ -429,7 +432,8 @@ class ContentQualityValidator:
                 if not check.enabled:
                     continue
                 
-                result = await self._run_validation_check(check, content)
+                with span(f"quality.gate.{gate_name}", {"check": check.name}):
+                    result = await self._run_validation_check(check, content)
                 gate_results[gate_name].append(result)
                 all_results.append(result)
                 
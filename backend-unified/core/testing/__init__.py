@@ -25,6 +25,11 @@ from .ab_testing_framework import (
     StatisticalSignificance
 )
 
+from .variant_statistics import (
+    VariantStatistics,
+    VariantStatisticsStore
+)
+
 from .real_time_optimizer import (
     RealTimeOptimizer,
     OptimizationType,
@@ -51,6 +56,8 @@ __all__ = [
     'TestStatus',
     'TestType',
     'StatisticalSignificance',
+    'VariantStatistics',
+    'VariantStatisticsStore',
     
     # Real-time Optimization
     'RealTimeOptimizer',
@@ -14,20 +14,22 @@ Created: 2025-07-04
 import asyncio
 import json
 import logging
+import math
+import os
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple, Union
+from typing import Deque, Dict, List, Any, Optional, Tuple, Union
 from enum import Enum
 from dataclasses import dataclass, asdict
-from collections import defaultdict
+from collections import defaultdict, deque
 import numpy as np
-from statistics import mean, stdev
 
 # Import core components
 from ..agents.orchestrator import AgentOrchestrator
 from ...src.api.journey.personalization_engine import PersonalizationEngine
 from ...src.services.variant_generator import VariantGenerator, VariantSuggestion
 from ...src.api.journey.models import JourneySession, PersonalizedContent
+from .variant_statistics import VariantStatistics, VariantStatisticsStore, default_statistics_path
 
 logger = logging.getLogger(__name__)
 
@@ -65,6 +67,7 @@ class TestMetrics:
     confidence_interval: Tuple[float, float] = (0.0, 0.0)
     statistical_significance: StatisticalSignificance = StatisticalSignificance.NOT_SIGNIFICANT
     p_value: float = 1.0
+    revenue_per_session: float = 0.0
 
 @dataclass
 class TestVariant:
@@ -124,7 +127,8 @@ class ABTestingFramework:
     """
     
     def __init__(self, personalization_engine: PersonalizationEngine, 
-                 variant_generator: VariantGenerator, orchestrator: AgentOrchestrator):
+                 variant_generator: VariantGenerator, orchestrator: AgentOrchestrator,
+                 statistics_store: Optional[VariantStatisticsStore] = None):
         self.personalization_engine = personalization_engine
         self.variant_generator = variant_generator
         self.orchestrator = orchestrator
@@ -132,7 +136,21 @@ class ABTestingFramework:
         # Test storage and tracking
         self.active_tests: Dict[str, ABTest] = {}
         self.test_assignments: Dict[str, Dict[str, str]] = {}  # session_id -> {test_id: variant_id}
-        self.performance_data: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        # Recent raw events per test for cross-test learning; counts come from variant_statistics
+        self.recent_events_limit = int(os.getenv("AB_TEST_RECENT_EVENTS", "1000"))
+        self.performance_data: Dict[str, Deque[Dict[str, Any]]] = defaultdict(
+            lambda: deque(maxlen=self.recent_events_limit)
+        )
+        
+        # Running per-variant statistics; metrics and significance are derived from these
+        if statistics_store is None:
+            persist = os.getenv("AB_TEST_STATS_PERSIST_ENABLED", "true").lower() == "true"
+            statistics_store = VariantStatisticsStore(
+                path=default_statistics_path() if persist else None,
+                worker_id=os.getenv("AB_TEST_STATS_WORKER_ID") or None,
+                persist_interval_seconds=float(os.getenv("AB_TEST_STATS_PERSIST_SECONDS", "30"))
+            )
+        self.variant_statistics = statistics_store
         
         # Real-time optimization
         self.optimization_rules: Dict[str, Any] = {}
@@ -188,7 +206,7 @@ class ABTestingFramework:
             self.active_tests[test_id] = ab_test
             
             # Initialize performance tracking
-            self.performance_data[test_id] = []
+            self.performance_data[test_id] = deque(maxlen=self.recent_events_limit)
             
             logger.info(f"A/B test created successfully: {test_id} with {len(variants)} variants")
             return ab_test
@@ -336,12 +354,14 @@ class ABTestingFramework:
             
             # Store performance data
             self.performance_data[test_id].append(enriched_data)
+            if enriched_data['variant_id']:
+                self.variant_statistics.record(test_id, enriched_data['variant_id'], performance_data)
             
             # Real-time optimization check
             await self._check_real_time_optimization(test_id, enriched_data)
             
             # Update test metrics
-            await self._update_test_metrics(test_id)
+            await self._update_test_metrics(test_id, enriched_data['variant_id'])
             
         except Exception as e:
             logger.error(f"Error tracking performance for test {test_id}: {e}")
@@ -361,17 +381,17 @@ class ABTestingFramework:
                 raise ValueError(f"Test {test_id} not found")
             
             test = self.active_tests[test_id]
-            performance_data = self.performance_data.get(test_id, [])
             
-            # Calculate metrics for each variant
+            # Calculate metrics for each variant from the statistics merged across workers
+            statistics = await self.variant_statistics.merged_async(test_id)
             variant_metrics = {}
             for variant in test.variants:
-                metrics = await self._calculate_variant_metrics(variant.variant_id, performance_data)
+                metrics = self._metrics_from_statistics(statistics.get(variant.variant_id))
                 variant_metrics[variant.variant_id] = metrics
                 variant.metrics = metrics
             
             # Statistical significance analysis
-            significance_analysis = await self._perform_significance_analysis(variant_metrics)
+            significance_analysis = await self._perform_significance_analysis(test, statistics, variant_metrics)
             
             # Generate insights and recommendations
             insights = await self._generate_test_insights(test, variant_metrics, significance_analysis)
@@ -385,7 +405,7 @@ class ABTestingFramework:
                 'test_name': test.name,
                 'status': test.status.value,
                 'duration_days': (datetime.utcnow() - test.start_date).days,
-                'total_sessions': len(performance_data),
+                'total_sessions': sum(s.sessions for s in statistics.values()),
                 'variant_metrics': variant_metrics,
                 'significance_analysis': significance_analysis,
                 'insights': insights,
@@ -481,7 +501,7 @@ class ABTestingFramework:
                     all_test_data.append({
                         'test': test,
                         'results': test.results,
-                        'performance_data': self.performance_data.get(test_id, [])
+                        'performance_data': list(self.performance_data.get(test_id, []))
                     })
             
             if len(all_test_data) < 2:
@@ -698,50 +718,37 @@ class ABTestingFramework:
         except Exception as e:
             logger.error(f"Error checking real-time optimization: {e}")
     
-    async def _update_test_metrics(self, test_id: str) -> None:
-        """Update test metrics based on performance data"""
+    async def _update_test_metrics(self, test_id: str, variant_id: Optional[str] = None) -> None:
+        """Update test metrics from this worker's running statistics (one variant when given)"""
         try:
             test = self.active_tests.get(test_id)
             if not test:
                 return
             
-            performance_data = self.performance_data.get(test_id, [])
-            
             # Update metrics for each variant
             for variant in test.variants:
-                variant_data = [d for d in performance_data if d.get('variant_id') == variant.variant_id]
+                if variant_id is not None and variant.variant_id != variant_id:
+                    continue
                 
-                if variant_data:
-                    metrics = await self._calculate_variant_metrics(variant.variant_id, variant_data)
-                    variant.metrics = metrics
+                statistics = self.variant_statistics.get(test_id, variant.variant_id)
+                if statistics is not None and statistics.sessions > 0:
+                    variant.metrics = self._metrics_from_statistics(statistics)
             
         except Exception as e:
             logger.error(f"Error updating test metrics: {e}")
     
-    async def _calculate_variant_metrics(self, variant_id: str, performance_data: List[Dict[str, Any]]) -> TestMetrics:
-        """Calculate metrics for a specific variant"""
+    def _metrics_from_statistics(self, statistics: Optional[VariantStatistics]) -> TestMetrics:
+        """Derive variant metrics from running sufficient statistics"""
         try:
-            if not performance_data:
+            if statistics is None or statistics.sessions == 0:
                 return TestMetrics(0.0, 0.0, 0.0, 0.0, 0.0, 0)
             
-            # Extract performance values
-            conversions = [d['performance'].get('conversion', 0) for d in performance_data]
-            engagement_scores = [d['performance'].get('engagement_score', 0.5) for d in performance_data]
-            bounce_rates = [d['performance'].get('bounce_rate', 0.5) for d in performance_data]
-            time_on_page = [d['performance'].get('time_on_page', 30) for d in performance_data]
-            click_rates = [d['performance'].get('click_through_rate', 0.1) for d in performance_data]
-            
-            # Calculate metrics
-            conversion_rate = mean(conversions) if conversions else 0.0
-            engagement_score = mean(engagement_scores) if engagement_scores else 0.0
-            bounce_rate = mean(bounce_rates) if bounce_rates else 0.0
-            avg_time_on_page = mean(time_on_page) if time_on_page else 0.0
-            click_through_rate = mean(click_rates) if click_rates else 0.0
-            sample_size = len(performance_data)
+            conversion_rate = statistics.mean('conversion')
+            sample_size = statistics.sessions
             
             # Calculate confidence interval (simplified)
-            if sample_size > 1 and conversions:
-                std_error = stdev(conversions) / (sample_size ** 0.5)
+            if sample_size > 1:
+                std_error = math.sqrt(statistics.variance('conversion')) / (sample_size ** 0.5)
                 margin_of_error = 1.96 * std_error  # 95% confidence
                 confidence_interval = (
                     max(0.0, conversion_rate - margin_of_error),
@@ -752,14 +759,15 @@ class ABTestingFramework:
             
             return TestMetrics(
                 conversion_rate=conversion_rate,
-                engagement_score=engagement_score,
-                bounce_rate=bounce_rate,
-                time_on_page=avg_time_on_page,
-                click_through_rate=click_through_rate,
+                engagement_score=statistics.mean('engagement_score'),
+                bounce_rate=statistics.mean('bounce_rate'),
+                time_on_page=statistics.mean('time_on_page'),
+                click_through_rate=statistics.mean('click_through_rate'),
                 sample_size=sample_size,
                 confidence_interval=confidence_interval,
-                statistical_significance=StatisticalSignificance.NOT_SIGNIFICANT,  # Would be calculated properly
-                p_value=1.0  # Would be calculated properly
+                statistical_significance=StatisticalSignificance.NOT_SIGNIFICANT,  # Set by significance analysis
+                p_value=1.0,
+                revenue_per_session=statistics.revenue.mean
             )
             
         except Exception as e:
@@ -784,10 +792,59 @@ class ABTestingFramework:
         
         return modifications
     
-    # Placeholder methods for advanced functionality
-    async def _perform_significance_analysis(self, variant_metrics: Dict[str, TestMetrics]) -> Dict[str, Any]:
-        """Perform statistical significance analysis"""
-        return {'method': 'placeholder', 'significant': False}
+    async def _perform_significance_analysis(self, test: ABTest, statistics: Dict[str, VariantStatistics],
+                                           variant_metrics: Dict[str, TestMetrics]) -> Dict[str, Any]:
+        """Compare each variant's conversion rate with the control (Welch z-test on running statistics)"""
+        control = next((v for v in test.variants if v.is_control), None)
+        control_stats = statistics.get(control.variant_id) if control else None
+        if control_stats is None or control_stats.sessions < 2:
+            return {'method': 'welch_z_test', 'significant': False, 'reason': 'insufficient_control_data'}
+        
+        threshold = test.significance_threshold
+        comparisons = {}
+        for variant in test.variants:
+            variant_stats = statistics.get(variant.variant_id)
+            if variant.is_control or variant_stats is None or variant_stats.sessions < 2:
+                continue
+            
+            difference = variant_stats.mean('conversion') - control_stats.mean('conversion')
+            standard_error = math.sqrt(
+                variant_stats.variance('conversion') / variant_stats.sessions
+                + control_stats.variance('conversion') / control_stats.sessions
+            )
+            z_score = difference / standard_error if standard_error > 0 else 0.0
+            p_value = math.erfc(abs(z_score) / math.sqrt(2)) if standard_error > 0 else 1.0
+            
+            if p_value < threshold / 5:
+                significance = StatisticalSignificance.HIGHLY_SIGNIFICANT
+            elif p_value < threshold:
+                significance = StatisticalSignificance.SIGNIFICANT
+            elif p_value < threshold * 2:
+                significance = StatisticalSignificance.APPROACHING
+            else:
+                significance = StatisticalSignificance.NOT_SIGNIFICANT
+            
+            metrics = variant_metrics[variant.variant_id]
+            metrics.p_value = p_value
+            metrics.statistical_significance = significance
+            
+            control_rate = control_stats.mean('conversion')
+            comparisons[variant.variant_id] = {
+                'absolute_difference': difference,
+                'relative_lift': difference / control_rate if control_rate > 0 else None,
+                'z_score': z_score,
+                'p_value': p_value,
+                'significance': significance.value
+            }
+        
+        return {
+            'method': 'welch_z_test',
+            'metric': 'conversion_rate',
+            'control_variant_id': control.variant_id,
+            'significance_threshold': threshold,
+            'comparisons': comparisons,
+            'significant': any(c['p_value'] < threshold for c in comparisons.values())
+        }
     
     async def _generate_test_insights(self, test: ABTest, variant_metrics: Dict[str, TestMetrics], 
                                     significance_analysis: Dict[str, Any]) -> List[str]:
@@ -861,10 +918,18 @@ class ABTestingFramework:
             'status': test.status.value,
             'start_date': test.start_date.isoformat(),
             'variant_count': len(test.variants),
-            'total_sessions': len(self.performance_data.get(test_id, [])),
+            'total_sessions': self._local_sessions(test_id),
             'updated_at': test.updated_at.isoformat()
         }
     
+    def _local_sessions(self, test_id: str) -> int:
+        """Sessions this worker has recorded for a test's variants"""
+        sessions = 0
+        for variant in self.active_tests[test_id].variants:
+            statistics = self.variant_statistics.get(test_id, variant.variant_id)
+            sessions += statistics.sessions if statistics is not None else 0
+        return sessions
+    
     async def list_active_tests(self) -> List[Dict[str, Any]]:
         """List all active tests"""
         return [await self.get_test_status(test_id) for test_id in self.active_tests.keys()]
@@ -904,7 +969,7 @@ class ABTestingFramework:
         total_tests = len(self.active_tests)
         active_tests = sum(1 for t in self.active_tests.values() if t.status == TestStatus.ACTIVE)
         completed_tests = sum(1 for t in self.active_tests.values() if t.status == TestStatus.COMPLETED)
-        total_sessions = sum(len(data) for data in self.performance_data.values())
+        total_sessions = sum(self._local_sessions(test_id) for test_id in self.active_tests)
         
         return {
             'framework_stats': {
@@ -917,6 +982,7 @@ class ABTestingFramework:
                 'patterns_identified': len(self.pattern_database.get('cross_test_learnings', [])),
                 'optimization_rules_active': len(self.optimization_rules)
             },
+            'variant_statistics': self.variant_statistics.get_stats(),
             'integration_status': {
                 'personalization_engine': bool(self.personalization_engine),
                 'variant_generator': bool(self.variant_generator),
@@ -21,8 +21,6 @@ from enum import Enum
 from dataclasses import dataclass, asdict
 from collections import defaultdict, Counter
 import statistics
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
 
 logger = logging.getLogger(__name__)
 
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Variant Statistics - running sufficient statistics for A/B test variants
+
+ABTestingFramework used to rebuild every variant's TestMetrics from the full
+performance log after each tracked event, so tracking and analysis slowed
+down as a test collected traffic. VariantStatistics keeps the counts, sums
+and sums of squares the metrics are derived from, plus Welford moments for
+revenue, and updates them in O(1) per event. Statistics from different
+workers merge exactly. VariantStatisticsStore persists each worker's totals
+to SQLite periodically and answers reads with the merge of all workers.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from utils.startup import register_shutdown_hook
+
+logger = logging.getLogger(__name__)
+
+# Metrics averaged per session, with the value assumed when an event omits them
+METRIC_DEFAULTS: Dict[str, float] = {
+    "conversion": 0.0,
+    "engagement_score": 0.5,
+    "bounce_rate": 0.5,
+    "time_on_page": 30.0,
+    "click_through_rate": 0.1
+}
+
+
+def _number(value: Any, default: float) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class RunningMoments:
+    """Count, mean and sum of squared deviations (Welford), mergeable with Chan's update"""
+
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def update(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: "RunningMoments"):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+
+    @property
+    def variance(self) -> float:
+        """Sample variance"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+
+class VariantStatistics:
+    """Sufficient statistics for one variant's session metrics"""
+
+    __slots__ = ("sessions", "sums", "squares", "revenue")
+
+    def __init__(self):
+        self.sessions = 0
+        self.sums = dict.fromkeys(METRIC_DEFAULTS, 0.0)
+        self.squares = dict.fromkeys(METRIC_DEFAULTS, 0.0)
+        self.revenue = RunningMoments()
+
+    def update(self, performance: Dict[str, Any]):
+        """Add one tracked event"""
+        self.sessions += 1
+        for metric, default in METRIC_DEFAULTS.items():
+            value = _number(performance.get(metric, default), default)
+            self.sums[metric] += value
+            self.squares[metric] += value * value
+        self.revenue.update(_number(performance.get("revenue", 0.0), 0.0))
+
+    def merge(self, other: "VariantStatistics"):
+        self.sessions += other.sessions
+        for metric in METRIC_DEFAULTS:
+            self.sums[metric] += other.sums.get(metric, 0.0)
+            self.squares[metric] += other.squares.get(metric, 0.0)
+        self.revenue.merge(other.revenue)
+
+    def mean(self, metric: str) -> float:
+        return self.sums[metric] / self.sessions if self.sessions > 0 else 0.0
+
+    def variance(self, metric: str) -> float:
+        """Sample variance of a per-session metric"""
+        if self.sessions < 2:
+            return 0.0
+        centered = self.squares[metric] - self.sums[metric] * self.sums[metric] / self.sessions
+        return max(0.0, centered / (self.sessions - 1))
+
+    def copy(self) -> "VariantStatistics":
+        statistics = VariantStatistics()
+        statistics.merge(self)
+        return statistics
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sessions": self.sessions,
+            "sums": dict(self.sums),
+            "squares": dict(self.squares),
+            "revenue": [self.revenue.count, self.revenue.mean, self.revenue.m2]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "VariantStatistics":
+        statistics = cls()
+        statistics.sessions = int(data.get("sessions", 0))
+        for metric in METRIC_DEFAULTS:
+            statistics.sums[metric] = float(data.get("sums", {}).get(metric, 0.0))
+            statistics.squares[metric] = float(data.get("squares", {}).get(metric, 0.0))
+        count, mean, m2 = data.get("revenue", (0, 0.0, 0.0))
+        statistics.revenue = RunningMoments(int(count), float(mean), float(m2))
+        return statistics
+
+
+class VariantStatisticsStore:
+    """Per (test, variant) statistics for this worker, persisted and merged across workers
+
+    Each worker writes its own cumulative totals under its worker id, at most
+    every persist_interval_seconds, so rewriting a row never double counts.
+    merged() adds the rows persisted by other workers to this worker's live
+    statistics. A worker restarted with the same worker id resumes from its
+    persisted rows. Without a path the store is in-memory only.
+
+    Inside an event loop, record() only updates memory: a background task
+    writes changed rows from a worker thread every persist_interval_seconds,
+    and a shutdown hook writes the rest. Async callers read with
+    merged_async(). Without a running loop, or with an interval of 0,
+    record() writes through synchronously.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        worker_id: Optional[str] = None,
+        persist_interval_seconds: float = 30.0
+    ):
+        self.path = path
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.persist_interval_seconds = persist_interval_seconds
+
+        self._statistics: Dict[Tuple[str, str], VariantStatistics] = {}
+        self._dirty: Set[Tuple[str, str]] = set()
+        self._last_persist = time.monotonic()
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._persister: Optional[asyncio.Task] = None
+
+        self.stats = {"events": 0, "persists": 0, "rows_written": 0, "write_errors": 0}
+
+        if self.path:
+            self._load_own_rows()
+
+    def record(self, test_id: str, variant_id: str, performance: Dict[str, Any]) -> VariantStatistics:
+        """Add one event to a variant's statistics; persists when the interval has passed"""
+        key = (test_id, variant_id)
+        statistics = self._statistics.get(key)
+        if statistics is None:
+            statistics = self._statistics[key] = VariantStatistics()
+        statistics.update(performance)
+
+        self._dirty.add(key)
+        self.stats["events"] += 1
+        if self.path and not self._ensure_persister() \
+                and time.monotonic() - self._last_persist >= self.persist_interval_seconds:
+            self.persist()
+        return statistics
+
+    def get(self, test_id: str, variant_id: str) -> Optional[VariantStatistics]:
+        """This worker's live statistics for a variant"""
+        return self._statistics.get((test_id, variant_id))
+
+    def merge(self, test_id: str, variant_id: str, statistics: VariantStatistics):
+        """Fold statistics gathered elsewhere into this worker's totals"""
+        key = (test_id, variant_id)
+        self._statistics.setdefault(key, VariantStatistics()).merge(statistics)
+        self._dirty.add(key)
+
+    def merged(self, test_id: str) -> Dict[str, VariantStatistics]:
+        """variant_id -> statistics of this worker plus every other worker's persisted rows"""
+        return self._merge_rows(self._live_copies(test_id), self._other_workers_rows(test_id))
+
+    async def merged_async(self, test_id: str) -> Dict[str, VariantStatistics]:
+        """merged() with the SQLite read in a worker thread"""
+        merged = self._live_copies(test_id)
+        if not self.path:
+            return merged
+        return self._merge_rows(merged, await asyncio.to_thread(self._other_workers_rows, test_id))
+
+    def snapshot(self, test_id: Optional[str] = None) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """test_id -> variant_id -> serialized statistics of this worker"""
+        snapshot: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (stored_test_id, variant_id), statistics in self._statistics.items():
+            if test_id is None or stored_test_id == test_id:
+                snapshot.setdefault(stored_test_id, {})[variant_id] = statistics.to_dict()
+        return snapshot
+
+    def persist(self) -> int:
+        """Write this worker's changed rows"""
+        return self._write_rows(self._take_dirty_rows())
+
+    async def persist_async(self) -> int:
+        """persist() with the SQLite write in a worker thread"""
+        rows = self._take_dirty_rows()
+        return await asyncio.to_thread(self._write_rows, rows) if rows else 0
+
+    async def shutdown(self):
+        """Stop the background persister, write pending rows and close the connection"""
+        if self._persister is not None:
+            self._persister.cancel()
+            self._persister = None
+        await self.persist_async()
+        await asyncio.to_thread(self.close)
+
+    def close(self):
+        """Write pending rows and close the connection (blocking; async callers use shutdown())"""
+        self.persist()
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "path": self.path,
+            "worker_id": self.worker_id,
+            "variants_tracked": len(self._statistics),
+            "pending_rows": len(self._dirty),
+            "background_persist": self._persister is not None and not self._persister.done()
+        }
+
+    def _ensure_persister(self) -> bool:
+        """Start the background persister inside an event loop; False when writes stay inline"""
+        if self._persister is not None and not self._persister.done():
+            return True
+        if self.persist_interval_seconds <= 0:
+            return False
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+
+        self._persister = asyncio.ensure_future(self._persist_loop())
+        register_shutdown_hook(f"variant_statistics:{self.path}:{self.worker_id}", self.shutdown)
+        return True
+
+    async def _persist_loop(self):
+        while True:
+            await asyncio.sleep(self.persist_interval_seconds)
+            try:
+                await self.persist_async()
+            except Exception as e:
+                logger.error(f"Background variant statistics persist failed: {e}")
+
+    def _take_dirty_rows(self) -> List[Tuple[str, str, str, float, str]]:
+        """Serialize and clear the changed rows on the recording thread, so no update is missed"""
+        self._last_persist = time.monotonic()
+        if not self.path or not self._dirty:
+            return []
+
+        now = time.time()
+        rows = [
+            (self.worker_id, test_id, variant_id, now, json.dumps(self._statistics[(test_id, variant_id)].to_dict()))
+            for test_id, variant_id in self._dirty
+        ]
+        self._dirty.clear()
+        return rows
+
+    def _write_rows(self, rows: List[Tuple[str, str, str, float, str]]) -> int:
+        if not rows:
+            return 0
+
+        with self._lock:
+            try:
+                connection = self._db()
+                connection.executemany(
+                    "INSERT OR REPLACE INTO variant_statistics "
+                    "(worker_id, test_id, variant_id, updated_at, payload) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                connection.commit()
+            except Exception as e:
+                self.stats["write_errors"] += 1
+                logger.error(f"Failed to persist {len(rows)} variant statistics rows: {e}")
+                # Rewritten on the next persist
+                self._dirty.update((test_id, variant_id) for _, test_id, variant_id, _, _ in rows)
+                return 0
+
+        self.stats["persists"] += 1
+        self.stats["rows_written"] += len(rows)
+        return len(rows)
+
+    def _live_copies(self, test_id: str) -> Dict[str, VariantStatistics]:
+        return {
+            variant_id: statistics.copy()
+            for (stored_test_id, variant_id), statistics in self._statistics.items()
+            if stored_test_id == test_id
+        }
+
+    def _other_workers_rows(self, test_id: str) -> List[Tuple[str, str]]:
+        if not self.path:
+            return []
+
+        with self._lock:
+            try:
+                return self._db().execute(
+                    "SELECT variant_id, payload FROM variant_statistics WHERE test_id = ? AND worker_id != ?",
+                    (test_id, self.worker_id)
+                ).fetchall()
+            except Exception as e:
+                logger.error(f"Failed to read persisted variant statistics for {test_id}: {e}")
+                return []
+
+    @staticmethod
+    def _merge_rows(merged: Dict[str, VariantStatistics], rows: List[Tuple[str, str]]) -> Dict[str, VariantStatistics]:
+        for variant_id, payload in rows:
+            merged.setdefault(variant_id, VariantStatistics()).merge(VariantStatistics.from_dict(json.loads(payload)))
+        return merged
+
+    def _load_own_rows(self):
+        with self._lock:
+            try:
+                rows = self._db().execute(
+                    "SELECT test_id, variant_id, payload FROM variant_statistics WHERE worker_id = ?",
+                    (self.worker_id,)
+                ).fetchall()
+            except Exception as e:
+                logger.error(f"Failed to load persisted variant statistics: {e}")
+                return
+
+        for test_id, variant_id, payload in rows:
+            self._statistics[(test_id, variant_id)] = VariantStatistics.from_dict(json.loads(payload))
+
+    def _db(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory and self.path != ":memory:":
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS variant_statistics ("
+                "worker_id TEXT, test_id TEXT, variant_id TEXT, updated_at REAL, payload TEXT, "
+                "PRIMARY KEY (worker_id, test_id, variant_id))"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_variant_statistics_test ON variant_statistics (test_id)"
+            )
+        return self._connection
+
+
+def default_statistics_path() -> str:
+    return os.getenv("AB_TEST_STATS_PATH") or os.path.join(tempfile.gettempdir(), "ab_test_variant_statistics.sqlite3")
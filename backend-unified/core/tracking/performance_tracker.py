@@ -17,7 +17,7 @@ from dataclasses import dataclass, asdict
 from pydantic import BaseModel, Field
 from enum import Enum
 import statistics
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
 
 logger = logging.getLogger(__name__)
 
@@ -113,14 +113,18 @@ class PerformanceTracker:
         self.metrics_buffer = deque(maxlen=10000)  # Rolling buffer of metrics
         self.alerts = deque(maxlen=1000)  # Rolling buffer of alerts
         
-        # Performance data stores
+        # Performance data stores (content records are bounded, oldest dropped first)
         self.agent_performance = {}
-        self.content_performance = {}
+        self.content_performance = OrderedDict()
+        self.max_content_records = self.config.get("max_content_records", 5000)
         self.system_health_history = deque(maxlen=100)
         
-        # Aggregated statistics
+        # Aggregated statistics, kept for a rolling window of hours/days
         self.hourly_stats = defaultdict(dict)
         self.daily_stats = defaultdict(dict)
+        self.hourly_retention = self.config.get("hourly_retention", 48)
+        self.daily_retention = self.config.get("daily_retention", 30)
+        self.max_values_per_bucket = self.config.get("max_values_per_bucket", 10000)
         
         # Alert thresholds
         self.alert_thresholds = self._initialize_alert_thresholds()
@@ -260,7 +264,10 @@ class PerformanceTracker:
             )
             
             # Store content performance
+            self.content_performance.pop(content_id, None)
             self.content_performance[content_id] = content_perf
+            while len(self.content_performance) > self.max_content_records:
+                self.content_performance.popitem(last=False)
             
             # Record individual metrics
             await self._record_content_metrics(content_perf)
@@ -395,16 +402,25 @@ class PerformanceTracker:
         
         # Update hourly stats
         if hour_key not in self.hourly_stats:
-            self.hourly_stats[hour_key] = defaultdict(list)
+            self.hourly_stats[hour_key] = defaultdict(lambda: deque(maxlen=self.max_values_per_bucket))
+            self._prune_buckets(self.hourly_stats, self.hourly_retention)
         
         self.hourly_stats[hour_key][f"{metric.type}_{metric.name}"].append(metric.value)
         
         # Update daily stats
         if day_key not in self.daily_stats:
-            self.daily_stats[day_key] = defaultdict(list)
+            self.daily_stats[day_key] = defaultdict(lambda: deque(maxlen=self.max_values_per_bucket))
+            self._prune_buckets(self.daily_stats, self.daily_retention)
         
         self.daily_stats[day_key][f"{metric.type}_{metric.name}"].append(metric.value)
     
+    @staticmethod
+    def _prune_buckets(buckets: Dict[str, Any], keep: int) -> None:
+        """Drop the oldest time buckets beyond the retention window"""
+        # Keys are zero-padded timestamps, so lexical order is chronological
+        for key in sorted(buckets)[:-keep] if len(buckets) > keep else []:
+            del buckets[key]
+    
     async def _calculate_performance_trend(self, agent_name: str) -> str:
         """Calculate performance trend for an agent"""
         try:
@@ -1009,6 +1025,24 @@ class PerformanceTracker:
         else:
             return {"error": "Unsupported format", "supported": ["json", "csv"]}
     
+    def get_memory_metrics(self) -> Dict[str, Any]:
+        """Sizes of the retained performance data stores"""
+        return {
+            "metrics_buffer": len(self.metrics_buffer),
+            "alerts": len(self.alerts),
+            "content_records": len(self.content_performance),
+            "max_content_records": self.max_content_records,
+            "agent_records": len(self.agent_performance),
+            "hourly_buckets": len(self.hourly_stats),
+            "daily_buckets": len(self.daily_stats),
+            "bucket_values": sum(
+                len(values)
+                for buckets in (self.hourly_stats, self.daily_stats)
+                for bucket in buckets.values()
+                for values in bucket.values()
+            )
+        }
+    
     async def health_check(self) -> Dict[str, Any]:
         """Perform system health check"""
         return {
@@ -0,0 +1,9 @@
+-- Migration: Add optimistic-locking version to journey sessions
+-- Module: 2B - Dynamic Customer Journey Engine
+-- Created: 2024-07-04
+-- Description: Version counter checked by the coalesced session-state flush to avoid lost updates
+
+ALTER TABLE journey_sessions
+    ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+COMMENT ON COLUMN journey_sessions.version IS 'Incremented on every session-state write; writers update WHERE version = expected';
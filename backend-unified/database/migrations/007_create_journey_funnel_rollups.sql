@@ -0,0 +1,36 @@
+-- Migration: Funnel rollup tables for journey analytics
+-- Module: 2B - Dynamic Customer Journey Engine
+-- Created: 2024-07-04
+-- Description: Additive hour/day session aggregates by stage, persona, device and path, refreshed incrementally from journey_sessions
+
+CREATE TABLE IF NOT EXISTS journey_funnel_rollups (
+    id SERIAL PRIMARY KEY,
+    resolution VARCHAR(10) NOT NULL CHECK (resolution IN ('hour', 'day')),
+    bucket_start TIMESTAMP NOT NULL, -- UTC
+    
+    -- Cell dimensions (nullable like their journey_sessions columns)
+    current_stage VARCHAR(50),
+    persona_type VARCHAR(50),
+    device_type VARCHAR(20),
+    journey_path VARCHAR(100),
+    
+    -- Sums rather than averages so buckets merge exactly
+    sessions INTEGER NOT NULL DEFAULT 0,
+    session_time DOUBLE PRECISION NOT NULL DEFAULT 0,
+    touchpoints DOUBLE PRECISION NOT NULL DEFAULT 0,
+    probability_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    probability_count INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_journey_funnel_rollups_bucket ON journey_funnel_rollups(resolution, bucket_start);
+
+CREATE TABLE IF NOT EXISTS journey_funnel_rollup_state (
+    name VARCHAR(50) PRIMARY KEY,
+    watermark TIMESTAMP WITH TIME ZONE, -- latest journey_sessions.updated_at folded into the rollups
+    refreshed_at TIMESTAMP -- UTC
+);
+
+-- Refreshes find sessions changed since the watermark
+CREATE INDEX IF NOT EXISTS idx_journey_sessions_updated_at ON journey_sessions(updated_at);
+
+COMMENT ON TABLE journey_funnel_rollups IS 'Per hour/day bucket of start_timestamp; rebuilt bucket by bucket for sessions updated since the watermark';
@@ -11,20 +11,35 @@ Erstellt: 2025-07-03
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 import time
 import logging
 import uvicorn
 from datetime import datetime
+from typing import Any, Dict
+
+from utils.startup import LazyService, StartupProfiler, lazy_services_from_env, run_shutdown_hooks
+from utils.tracing import tracer
+
+# Per-component import/init timings, reported once the app is ready
+startup_profiler = StartupProfiler()
 
 # Import configuration and core modules
-from config.settings import settings
-from config.database import init_database, close_database
-from api.v1 import auth, agents, websites, analytics, intelligence
-from api import webhooks
-from core.agents.orchestrator import AgentOrchestrator
-from core.intelligence.ai_research_client import AIResearchClient
+with startup_profiler.measure("config"):
+    from config.settings import settings
+    from config.database import init_database, close_database
+
+with startup_profiler.measure("api_routers"):
+    from api.v1 import auth, agents, websites, analytics, intelligence
+    from api import webhooks, websockets
+
+with startup_profiler.measure("agent_orchestrator"):
+    from core.agents.orchestrator import AgentOrchestrator
+
+with startup_profiler.measure("ai_research_client"):
+    from core.intelligence.ai_research_client import AIResearchClient
+
 from utils.logging import setup_logging
 
 # Setup logging
@@ -35,6 +50,33 @@ logger = logging.getLogger(__name__)
 agent_orchestrator = None
 ai_research_client = None
 
+async def _create_service(service_class):
+    """Construct and initialize a service"""
+    service = service_class()
+    await service.initialize()
+    return service
+
+# Independent services, initialized concurrently during lifespan (or on first use)
+SERVICE_FACTORIES = {
+    "ai_research_client": lambda: _create_service(AIResearchClient),
+    "agent_orchestrator": lambda: _create_service(AgentOrchestrator)
+}
+
+# Services listed in STARTUP_LAZY_SERVICES are created on first use instead
+lazy_services: Dict[str, LazyService] = {}
+
+async def get_service(name: str) -> Any:
+    """Service instance by name, creating lazily configured services on first use"""
+    instance = globals().get(name)
+    if instance is None and name in lazy_services:
+        instance = await lazy_services[name].get()
+        globals()[name] = instance
+    return instance
+
+def is_pending_lazy(name: str) -> bool:
+    """True for a lazily configured service nothing has used yet"""
+    return globals().get(name) is None and name in lazy_services and not lazy_services[name].initialized
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan management"""
@@ -42,24 +84,29 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Starting MarketingFunnelMaster Unified Backend...")
     
     # Initialize database connections
-    await init_database()
+    with startup_profiler.measure("database_connections", "init"):
+        await init_database()
     logger.info("✅ Database connections initialized")
     
-    # Initialize AI Research Client (preserve existing assets)
-    global ai_research_client
-    ai_research_client = AIResearchClient()
-    await ai_research_client.initialize()
-    logger.info("✅ AI Research Engine connected")
+    lazy_names = lazy_services_from_env()
+    if "all" in lazy_names:
+        lazy_names = list(SERVICE_FACTORIES)
+    
+    for name in lazy_names:
+        if name in SERVICE_FACTORIES:
+            lazy_services[name] = LazyService(name, SERVICE_FACTORIES[name], startup_profiler)
     
-    # Initialize Agent Orchestrator
-    global agent_orchestrator
-    agent_orchestrator = AgentOrchestrator()
-    await agent_orchestrator.initialize()
-    logger.info("✅ Agent Orchestrator initialized")
+    # Initialize AI Research Client and Agent Orchestrator concurrently
+    eager_factories = {
+        name: factory for name, factory in SERVICE_FACTORIES.items()
+        if name not in lazy_services
+    }
+    globals().update(await startup_profiler.init_parallel(eager_factories))
+    logger.info(f"✅ Services initialized: {', '.join(eager_factories) or 'none'}"
+                f" (lazy: {', '.join(lazy_services) or 'none'})")
     
-    # Register core agents
-    await agent_orchestrator.register_core_agents()
-    logger.info("✅ Core AI Agents registered")
+    startup_profiler.mark_ready()
+    startup_profiler.log_report()
     
     logger.info("🎯 MarketingFunnelMaster Backend ready for 1500+ websites")
     
@@ -76,6 +123,9 @@ async def lifespan(app: FastAPI):
     if ai_research_client:
         await ai_research_client.cleanup()
     
+    # Flush process-wide write buffers (coalesced journey session writes, ...)
+    await run_shutdown_hooks()
+    
     # Close database connections
     await close_database()
     
@@ -113,9 +163,17 @@ async def monitor_performance(request: Request, call_next):
     """Monitor API performance and log slow requests"""
     start_time = time.time()
     
-    response = await call_next(request)
+    # Root span; stages annotated with utils.tracing.span nest under it
+    with tracer.span(f"http {request.method}") as root:
+        response = await call_next(request)
+        
+        if root is not None:
+            route = request.scope.get("route")
+            root.name = f"http {request.method} {getattr(route, 'path', 'unmatched')}"
+            root.set_attribute("status", response.status_code)
     
     process_time = time.time() - start_time
+    tracer.finish_request(root)
     
     # Log slow requests (> 1 second)
     if process_time > 1.0:
@@ -150,6 +208,12 @@ async def global_exception_handler(request: Request, exc: Exception):
 @app.get("/health")
 async def health_check():
     """Health check endpoint for load balancer"""
+    # Lazy services nothing has used yet are reported, not created
+    def lazy_or(name: str, up: str, down: str) -> str:
+        if is_pending_lazy(name):
+            return "lazy"
+        return up if globals().get(name) else down
+
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
@@ -157,8 +221,8 @@ async def health_check():
         "environment": settings.ENVIRONMENT,
         "services": {
             "database": "connected",
-            "ai_research": "connected" if ai_research_client else "disconnected",
-            "agent_orchestrator": "running" if agent_orchestrator else "stopped"
+            "ai_research": lazy_or("ai_research_client", "connected", "disconnected"),
+            "agent_orchestrator": lazy_or("agent_orchestrator", "running", "stopped")
         }
     }
 
@@ -180,23 +244,20 @@ async def readiness_check():
         services_status["database"] = f"error: {str(e)}"
         ready = False
     
-    # Check AI research engine
-    if ai_research_client:
-        ai_ready = await ai_research_client.health_check()
-        services_status["ai_research"] = "ready" if ai_ready else "not_ready"
-        ready = ready and ai_ready
-    else:
-        services_status["ai_research"] = "not_initialized"
-        ready = False
-    
-    # Check agent orchestrator
-    if agent_orchestrator:
-        orchestrator_ready = await agent_orchestrator.health_check()
-        services_status["agent_orchestrator"] = "ready" if orchestrator_ready else "not_ready"
-        ready = ready and orchestrator_ready
-    else:
-        services_status["agent_orchestrator"] = "not_initialized"
-        ready = False
+    # Check AI research engine and agent orchestrator; lazy ones are created by the first check
+    for service_name, status_key in (("ai_research_client", "ai_research"), ("agent_orchestrator", "agent_orchestrator")):
+        try:
+            service_instance = await get_service(service_name)
+            if service_instance:
+                service_ready = await service_instance.health_check()
+                services_status[status_key] = "ready" if service_ready else "not_ready"
+                ready = ready and service_ready
+            else:
+                services_status[status_key] = "not_initialized"
+                ready = False
+        except Exception as e:
+            services_status[status_key] = f"error: {str(e)}"
+            ready = False
     
     status_code = 200 if ready else 503
     
@@ -209,6 +270,15 @@ async def readiness_check():
         }
     )
 
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Per-span latency histograms in Prometheus text format"""
+    return PlainTextResponse(
+        tracer.render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 # API version info
 @app.get("/version")
 async def version_info():
@@ -267,7 +337,6 @@ app.include_router(
 )
 
 # WebSocket endpoints for real-time agent communication
-from api import websockets
 app.include_router(websockets.websocket_router)
 
 # Development and debugging endpoints
@@ -275,18 +344,30 @@ if settings.ENVIRONMENT == "development":
     @app.get("/debug/agents")
     async def debug_agents():
         """Debug endpoint to inspect active agents"""
-        if not agent_orchestrator:
+        orchestrator = await get_service("agent_orchestrator")
+        if not orchestrator:
             return {"error": "Agent orchestrator not initialized"}
         
-        return await agent_orchestrator.get_debug_info()
+        return await orchestrator.get_debug_info()
     
     @app.get("/debug/ai-research")
     async def debug_ai_research():
         """Debug endpoint to inspect AI research engine"""
-        if not ai_research_client:
+        research_client = await get_service("ai_research_client")
+        if not research_client:
             return {"error": "AI research client not initialized"}
         
-        return await ai_research_client.get_debug_info()
+        return await research_client.get_debug_info()
+    
+    @app.get("/debug/startup")
+    async def debug_startup():
+        """Per-component import and init cost of this worker's startup"""
+        return {
+            **startup_profiler.report(),
+            "lazy_services": {
+                name: service.initialized for name, service in lazy_services.items()
+            }
+        }
 
 # Main execution
 if __name__ == "__main__":
@@ -7,6 +7,16 @@ Executor: Claude Code
 Erstellt: 2025-07-03
 """
 
+import os
+
+# The shared entity models (unified_models) live in the repository-level
+# models directory; without it on __path__ this package shadows them
+_SHARED_MODELS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "models"
+)
+if os.path.isdir(_SHARED_MODELS_DIR) and _SHARED_MODELS_DIR not in __path__:
+    __path__.append(_SHARED_MODELS_DIR)
+
 # Import only existing models for now
 from .users import User, UserProfile, UserSettings
 from .leads import Lead, LeadQuizAnswer, LeadFunnel
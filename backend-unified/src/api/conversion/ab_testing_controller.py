@@ -18,7 +18,6 @@ import asyncio
 import logging
 from enum import Enum
 import numpy as np
-from scipy import stats
 import hashlib
 
 from ...database.connection import get_database_connection
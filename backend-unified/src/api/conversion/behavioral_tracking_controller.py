@@ -7,7 +7,7 @@ Advanced behavioral tracking with WebSocket streaming, cross-device continuity,
 and real-time trigger automation for conversion optimization.
 """
 
-from fastapi import APIRouter, HTTPException, Depends, WebSocket, WebSocketDisconnect, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, Query, WebSocket, WebSocketDisconnect, BackgroundTasks
 from fastapi.responses import JSONResponse
 from typing import Optional, List, Dict, Any, Union
 from pydantic import BaseModel, Field, validator
@@ -18,6 +18,8 @@ import asyncio
 import logging
 from enum import Enum
 
+from utils.tracing import span, traced
+
 from ...database.connection import get_database_connection
 from ...services.websocket_manager import WebSocketManager
 from ...services.trigger_engine import TriggerEngine
@@ -188,6 +190,7 @@ class BehavioralTrackingService:
         self.db = db_connection
         self.trigger_engine = TriggerEngine(db_connection)
     
+    @traced("behavioral_event.process")
     async def process_behavioral_event(self, event: BehavioralEventRequest) -> BehavioralEventResponse:
         """Process incoming behavioral event and trigger automations"""
         
@@ -196,19 +199,24 @@ class BehavioralTrackingService:
         
         try:
             # 1. Store event in database
-            await self._store_behavioral_event(event_id, event)
+            with span("behavioral_event.store"):
+                await self._store_behavioral_event(event_id, event)
             
             # 2. Calculate real-time insights
-            insights = await self._calculate_real_time_insights(event)
+            with span("behavioral_event.insights"):
+                insights = await self._calculate_real_time_insights(event)
             
             # 3. Check for automation triggers
-            triggers_fired = await self.trigger_engine.check_behavioral_triggers(event, insights)
+            with span("behavioral_event.triggers"):
+                triggers_fired = await self.trigger_engine.check_behavioral_triggers(event, insights)
             
             # 4. Update user engagement metrics
-            await self._update_engagement_metrics(event, insights)
+            with span("behavioral_event.engagement"):
+                await self._update_engagement_metrics(event, insights)
             
             # 5. Stream to WebSocket subscribers
-            await self._stream_to_subscribers(event, insights, triggers_fired)
+            with span("behavioral_event.stream"):
+                await self._stream_to_subscribers(event, insights, triggers_fired)
             
             # Calculate processing time
             processing_time = (datetime.now() - start_time).total_seconds() * 1000
@@ -698,7 +706,7 @@ async def track_behavioral_events_batch(
     for event in events:
         try:
             result = await service.process_behavioral_event(event)
-            results.append(result)
+            results.append(result.dict())
         except Exception as e:
             logger.error(f"Failed to process event in batch: {str(e)}")
             results.append({
@@ -718,7 +726,7 @@ async def track_behavioral_events_batch(
 async def get_behavioral_insights(
     session_id: Optional[str] = None,
     user_id: Optional[str] = None,
-    time_window_minutes: int = Field(default=30, ge=1, le=1440),
+    time_window_minutes: int = Query(default=30, ge=1, le=1440),
     include_predictions: bool = True,
     db=Depends(get_database_connection)
 ):
@@ -800,8 +808,8 @@ async def behavioral_stream(websocket: WebSocket, session_id: str):
 
 @router.get("/analytics/engagement")
 async def get_engagement_analytics(
-    time_range_hours: int = Field(default=24, ge=1, le=168),
-    group_by: str = Field(default="hour", regex="^(hour|day|device|event_type)$"),
+    time_range_hours: int = Query(default=24, ge=1, le=168),
+    group_by: str = Query(default="hour", pattern="^(hour|day|device|event_type)$"),
     db=Depends(get_database_connection)
 ):
     """
@@ -17,14 +17,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, insert, func, and_, or_
 
 from .models import *
-from .database_models import JourneySession, PersonalizationData
+from .database_models import JourneySession, PersonalizationData, OptimizationEvent
 from .ab_testing_framework import (
     ABTestingFramework, ABTest, ABTestVariant, TestStatus, TestType, OptimizationGoal
 )
 from .ab_testing_integration import ABTestingPersonalizationEngine
 from .real_time_optimization_engine import RealTimeOptimizationEngine
 from .cross_test_learning_engine import CrossTestLearningEngine
+from .analytics_executor import analytics_executor, current_analytics_session, session_factory_for
 from ...utils.redis_client import get_redis_client
+from ...utils.time_buckets import bucket_start, dialect_name, time_bucket
 from ...config import settings
 
 logger = logging.getLogger(__name__)
@@ -100,9 +102,12 @@ class ABTestingDashboard:
     """Comprehensive A/B testing dashboard and analytics system"""
     
     def __init__(self, db: AsyncSession):
-        self.db = db
+        self._db = db
         self.redis_client = get_redis_client()
         
+        # Dashboard widgets are independent queries; run them concurrently on pooled sessions
+        self.session_factory = session_factory_for(db)
+        
         # Initialize component engines
         self.ab_testing_framework = ABTestingFramework(db)
         self.personalization_engine = ABTestingPersonalizationEngine(db)
@@ -118,45 +123,54 @@ class ABTestingDashboard:
         self.analytics_batch_size = 1000
         self.real_time_window_minutes = 15
         
+    @property
+    def db(self) -> AsyncSession:
+        """Sub-query session inside the analytics executor, else the request session"""
+        return current_analytics_session(self._db)
+    
     async def get_dashboard_overview(self, time_range: str = "24h") -> Dict[str, Any]:
         """Get comprehensive dashboard overview"""
         try:
             logger.info(f"Getting dashboard overview for time range: {time_range}")
             
-            # Get dashboard summary
-            summary = await self._get_dashboard_summary(time_range)
-            
-            # Get active tests overview
-            active_tests = await self._get_active_tests_overview()
-            
-            # Get performance trends
-            performance_trends = await self._get_performance_trends(time_range)
-            
-            # Get recent optimizations
-            recent_optimizations = await self._get_recent_optimizations(time_range)
-            
-            # Get active alerts
-            active_alerts = await self._get_active_alerts()
-            
-            # Get learning insights summary
-            learning_insights = await self._get_learning_insights_summary()
-            
-            # Calculate real-time metrics
-            real_time_metrics = await self._get_real_time_metrics()
+            # Summary, tests, trends, optimizations, alerts, insights and real-time
+            # metrics are independent; widgets that time out come back empty
+            batch = await analytics_executor.run(
+                {
+                    'summary': lambda: self._get_dashboard_summary(time_range),
+                    'active_tests': self._get_active_tests_overview,
+                    'performance_trends': lambda: self._get_performance_trends(time_range),
+                    'recent_optimizations': lambda: self._get_recent_optimizations(time_range),
+                    'active_alerts': self._get_active_alerts,
+                    'learning_insights': self._get_learning_insights_summary,
+                    'real_time_metrics': self._get_real_time_metrics,
+                    'system_status': self._get_system_status
+                },
+                session_factory=self.session_factory,
+                memo_scope=f"ab_dashboard:{time_range}",
+                fallbacks={
+                    'summary': DashboardSummary(0, 0, 0.0, 0, 0, 0, {}, {}, 0.0),
+                    'active_tests': [],
+                    'recent_optimizations': [],
+                    'active_alerts': []
+                }
+            )
+            values = batch.values
             
             return {
                 'overview': {
-                    'summary': asdict(summary),
-                    'real_time_metrics': real_time_metrics,
-                    'system_status': await self._get_system_status()
+                    'summary': asdict(values['summary']),
+                    'real_time_metrics': values['real_time_metrics'],
+                    'system_status': values['system_status']
                 },
-                'active_tests': active_tests,
-                'performance_trends': performance_trends,
-                'recent_optimizations': recent_optimizations,
-                'alerts': [asdict(alert) for alert in active_alerts],
-                'learning_insights': learning_insights,
+                'active_tests': values['active_tests'],
+                'performance_trends': values['performance_trends'],
+                'recent_optimizations': values['recent_optimizations'],
+                'alerts': [asdict(alert) for alert in values['active_alerts']],
+                'learning_insights': values['learning_insights'],
                 'last_updated': datetime.utcnow().isoformat(),
-                'refresh_interval': self.refresh_interval
+                'refresh_interval': self.refresh_interval,
+                'query_status': batch.status()
             }
             
         except Exception as e:
@@ -503,6 +517,164 @@ class ABTestingDashboard:
             logger.error(f"Error getting real-time metrics: {str(e)}")
             return {}
 
+    async def _get_active_tests_overview(self) -> List[Dict[str, Any]]:
+        """Get one row per active test for the overview table"""
+        try:
+            tests = []
+            for test_config in await self._get_test_configurations():
+                if test_config.get('status') != 'active':
+                    continue
+                
+                tests.append({
+                    'test_id': test_config.get('test_id'),
+                    'test_name': test_config.get('test_name'),
+                    'test_type': test_config.get('test_type'),
+                    'optimization_goal': test_config.get('optimization_goal'),
+                    'variant_count': len(test_config.get('variants', [])),
+                    'traffic_allocation': test_config.get('traffic_allocation', {}),
+                    'target_sample_size': test_config.get('target_sample_size'),
+                    'start_date': test_config.get('start_date'),
+                    'end_date': test_config.get('end_date')
+                })
+            
+            return sorted(tests, key=lambda test: test['start_date'] or '', reverse=True)
+            
+        except Exception as e:
+            logger.error(f"Error getting active tests overview: {str(e)}")
+            return []
+    
+    async def _get_performance_trends(self, time_range: str) -> Dict[str, Any]:
+        """Get session volume and conversion probability per hour (per day beyond 24h)"""
+        try:
+            current_time = datetime.utcnow()
+            since = self._parse_time_range(time_range)
+            interval = 'hour' if current_time - since <= timedelta(hours=24) else 'day'
+            
+            # Bucketed in SQL so one row per period comes back instead of every session
+            period = time_bucket(JourneySession.start_timestamp, interval, dialect_name(self.db))
+            result = await self.db.execute(
+                select(
+                    period,
+                    func.count(JourneySession.id),
+                    func.avg(JourneySession.conversion_probability)
+                )
+                .where(JourneySession.start_timestamp >= since)
+                .group_by(period)
+                .order_by(period)
+            )
+            
+            return {
+                'interval': interval,
+                'points': [
+                    {
+                        'period': bucket_start(bucket).isoformat(),
+                        'sessions': sessions,
+                        'avg_conversion_probability': float(avg_probability or 0.0)
+                    }
+                    for bucket, sessions, avg_probability in result.all()
+                    if bucket is not None
+                ]
+            }
+            
+        except Exception as e:
+            logger.error(f"Error getting performance trends: {str(e)}")
+            return {'interval': None, 'points': []}
+    
+    async def _get_recent_optimizations(self, time_range: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Get the latest optimization events in the time range"""
+        try:
+            result = await self.db.execute(
+                select(OptimizationEvent)
+                .where(OptimizationEvent.optimization_timestamp >= self._parse_time_range(time_range))
+                .order_by(OptimizationEvent.optimization_timestamp.desc())
+                .limit(limit)
+            )
+            
+            return [
+                {
+                    'session_id': event.session_id,
+                    'optimization_type': event.optimization_type,
+                    'optimization_strategy': event.optimization_strategy,
+                    'expected_impact': event.expected_impact,
+                    'actual_impact': event.actual_impact,
+                    'timestamp': event.optimization_timestamp.isoformat() if event.optimization_timestamp else None
+                }
+                for event in result.scalars().all()
+            ]
+            
+        except Exception as e:
+            logger.error(f"Error getting recent optimizations: {str(e)}")
+            return []
+    
+    async def _get_active_alerts(self) -> List[DashboardAlert]:
+        """Load the alerts stored by _store_alert; expired ones are dropped from the active set"""
+        try:
+            alerts = []
+            expired = []
+            for alert_id in await self.redis_client.smembers("active_dashboard_alerts"):
+                alert_data = await self.redis_client.get(f"dashboard_alert:{alert_id}")
+                if not alert_data:
+                    expired.append(alert_id)
+                    continue
+                
+                alert_data = json.loads(alert_data)
+                alert_data['severity'] = AlertSeverity(alert_data['severity'])
+                alert_data['created_at'] = datetime.fromisoformat(alert_data['created_at'])
+                alerts.append(DashboardAlert(**alert_data))
+            
+            if expired:
+                await self.redis_client.srem("active_dashboard_alerts", *expired)
+            
+            return sorted(alerts, key=lambda alert: alert.created_at, reverse=True)
+            
+        except Exception as e:
+            logger.error(f"Error getting active alerts: {str(e)}")
+            return []
+    
+    async def _get_learning_insights_summary(self) -> Dict[str, Any]:
+        """Summarize the latest insights stored by the cross-test learning engine"""
+        try:
+            keys = await self.redis_client.keys("cross_test_insights:*")
+            insights_data = await self.redis_client.get(max(keys)) if keys else None
+            if not insights_data:
+                return {'available': False}
+            
+            insights_data = json.loads(insights_data)
+            return {
+                'available': True,
+                'insights': insights_data.get('insights', {}),
+                'patterns_count': len(insights_data.get('patterns', [])),
+                'stored_at': insights_data.get('stored_at')
+            }
+            
+        except Exception as e:
+            logger.error(f"Error getting learning insights summary: {str(e)}")
+            return {'available': False}
+    
+    async def _get_system_status(self) -> Dict[str, Any]:
+        """Check the stores the dashboard reads from"""
+        components = {}
+        
+        try:
+            await self.db.execute(select(1))
+            components['database'] = 'healthy'
+        except Exception as e:
+            logger.error(f"Dashboard database check failed: {str(e)}")
+            components['database'] = 'unhealthy'
+        
+        try:
+            await self.redis_client.ping()
+            components['redis'] = 'healthy'
+        except Exception as e:
+            logger.error(f"Dashboard redis check failed: {str(e)}")
+            components['redis'] = 'unhealthy'
+        
+        return {
+            'status': 'healthy' if all(state == 'healthy' for state in components.values()) else 'degraded',
+            'components': components,
+            'checked_at': datetime.utcnow().isoformat()
+        }
+    
     # =============================================================================
     # ALERT SYSTEM METHODS
     # =============================================================================
@@ -617,21 +789,35 @@ class ABTestingDashboard:
             logger.error(f"Error getting test configuration: {str(e)}")
             return None
 
+    def _parse_time_range(self, time_range: str) -> datetime:
+        """Parse time range string to datetime"""
+        time_mapping = {
+            "1h": timedelta(hours=1),
+            "24h": timedelta(hours=24),
+            "7d": timedelta(days=7),
+            "30d": timedelta(days=30),
+            "90d": timedelta(days=90)
+        }
+        
+        delta = time_mapping.get(time_range, timedelta(hours=24))
+        return datetime.utcnow() - delta
+    
+    async def _get_test_configurations(self) -> List[Dict[str, Any]]:
+        """Get every stored test configuration"""
+        configurations = []
+        for key in await self.redis_client.keys("ab_test_config:*"):
+            test_data = await self.redis_client.get(key)
+            if test_data:
+                configurations.append(json.loads(test_data))
+        return configurations
+    
     async def _count_active_tests(self) -> int:
         """Count active tests"""
         try:
-            pattern = "ab_test_config:*"
-            keys = await self.redis_client.keys(pattern)
-            
-            active_count = 0
-            for key in keys:
-                test_data = await self.redis_client.get(key)
-                if test_data:
-                    test_config = json.loads(test_data)
-                    if test_config.get('status') == 'active':
-                        active_count += 1
-            
-            return active_count
+            return sum(
+                1 for test_config in await self._get_test_configurations()
+                if test_config.get('status') == 'active'
+            )
         except Exception as e:
             logger.error(f"Error counting active tests: {str(e)}")
             return 0
@@ -642,7 +828,8 @@ class ABTestingDashboard:
             alert_key = f"dashboard_alert:{alert.alert_id}"
             alert_data = asdict(alert)
             
-            # Convert datetime to string for JSON serialization
+            # Convert datetime and enum to strings for JSON serialization
+            alert_data['severity'] = alert.severity.value
             alert_data['created_at'] = alert.created_at.isoformat()
             
             await self.redis_client.setex(
@@ -13,6 +13,8 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 import uuid
 
+from utils.tracing import span, traced
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, insert, func, and_, or_, desc
 from sqlalchemy.orm import selectinload
@@ -203,13 +205,15 @@ class ABTestingFramework:
             logger.error(f"Error creating A/B test: {str(e)}")
             raise
 
+    @traced("ab_test.assign_variant")
     async def assign_user_to_test_variant(self, session: JourneySession, 
                                         request_data: Dict[str, Any],
                                         context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Assign user to appropriate A/B test variant"""
         try:
             # Find active tests for this user
-            active_tests = await self._get_active_tests_for_session(session, request_data)
+            with span("ab_test.active_tests"):
+                active_tests = await self._get_active_tests_for_session(session, request_data)
             
             if not active_tests:
                 return None
@@ -221,27 +225,31 @@ class ABTestingFramework:
                 return None
             
             # Check if user is already assigned to a variant
-            existing_assignment = await self._get_existing_assignment(session.session_id, primary_test.test_id)
+            with span("ab_test.existing_assignment"):
+                existing_assignment = await self._get_existing_assignment(session.session_id, primary_test.test_id)
             
             if existing_assignment:
                 variant = next((v for v in primary_test.variants if v.variant_id == existing_assignment['variant_id']), None)
             else:
                 # Assign to variant based on traffic allocation
-                variant = await self._assign_to_variant(session, primary_test)
-                
-                if variant:
-                    await self._record_variant_assignment(session.session_id, primary_test.test_id, variant.variant_id)
+                with span("ab_test.allocate"):
+                    variant = await self._assign_to_variant(session, primary_test)
+                    
+                    if variant:
+                        await self._record_variant_assignment(session.session_id, primary_test.test_id, variant.variant_id)
             
             if not variant:
                 return None
             
             # Generate optimized content for assigned variant
-            optimized_content = await self._generate_variant_content(
-                session, variant, primary_test, request_data, context
-            )
+            with span("ab_test.variant_content"):
+                optimized_content = await self._generate_variant_content(
+                    session, variant, primary_test, request_data, context
+                )
             
             # Record test exposure
-            await self._record_test_exposure(session.session_id, primary_test.test_id, variant.variant_id)
+            with span("ab_test.record_exposure"):
+                await self._record_test_exposure(session.session_id, primary_test.test_id, variant.variant_id)
             
             # Return test assignment and content
             return {
@@ -671,7 +679,7 @@ class ABTestingFramework:
             'test_type': test.test_type.value,
             'optimization_goal': test.optimization_goal.value,
             'status': test.status.value,
-            'variants': [asdict(v) for v in test.variants],
+            'variants': [{**asdict(v), 'created_at': v.created_at.isoformat()} for v in test.variants],
             'traffic_allocation': test.traffic_allocation,
             'target_sample_size': test.target_sample_size,
             'start_date': test.start_date.isoformat(),
@@ -0,0 +1,196 @@
+# Concurrent Analytics Executor for Dynamic Customer Journey Engine
+# Module: 2B - Dynamic Customer Journey Engine
+# Created: 2024-07-04
+
+import asyncio
+import logging
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+# Session of the sub-query running in the current task, if the executor opened one
+_analytics_session: ContextVar[Optional[AsyncSession]] = ContextVar("analytics_session", default=None)
+
+def current_analytics_session(default: Optional[AsyncSession] = None) -> Optional[AsyncSession]:
+    """Pooled session of the running analytics sub-query, else `default` (the request session)"""
+    return _analytics_session.get() or default
+
+def session_factory_for(db: Optional[AsyncSession]) -> Optional[Callable[[], AsyncSession]]:
+    """Session maker drawing from the same engine pool as the request session"""
+    bind = getattr(db, "bind", None)
+    if bind is None:
+        return None
+    return async_sessionmaker(bind, expire_on_commit=False)
+
+@dataclass
+class AnalyticsBatchResult:
+    """Sub-query results; timed-out or failed entries hold their fallback value"""
+    values: Dict[str, Any]
+    timed_out: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    memo_hits: List[str] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.timed_out or self.failed)
+
+    def status(self) -> Dict[str, Any]:
+        """Completeness block to attach to analytics responses"""
+        return {
+            "partial": self.partial,
+            "timed_out": self.timed_out,
+            "failed": self.failed,
+            "elapsed_ms": self.elapsed_ms
+        }
+
+class _QueryTimeout(Exception):
+    pass
+
+class AnalyticsExecutor:
+    """Runs independent analytics sub-queries concurrently
+
+    Each sub-query runs in its own task with its own pooled session (exposed
+    through current_analytics_session), under a per-query timeout. Results
+    are memoized for memo_ttl_seconds and in-flight computations are shared,
+    so dashboard widgets refreshing together trigger one computation.
+    """
+
+    def __init__(self, query_timeout_seconds: float = 5.0, memo_ttl_seconds: float = 5.0,
+                 max_concurrency: int = 6, max_memo_entries: int = 1000):
+        self.query_timeout_seconds = query_timeout_seconds
+        self.memo_ttl_seconds = memo_ttl_seconds
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_memo_entries = max_memo_entries
+
+        self._memo: Dict[str, Tuple[float, asyncio.Task]] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self.stats = {"queries": 0, "memo_hits": 0, "timeouts": 0, "failures": 0}
+
+    async def run(
+        self,
+        queries: Dict[str, Callable[[], Awaitable[Any]]],
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+        memo_scope: Optional[str] = None,
+        timeout_seconds: Optional[float] = None,
+        fallbacks: Optional[Dict[str, Any]] = None
+    ) -> AnalyticsBatchResult:
+        """Run all sub-queries in parallel and collect whatever finishes in time
+
+        Without a session_factory the sub-queries share the caller's session,
+        which does not allow concurrent use, so they run one at a time.
+        """
+        started = time.perf_counter()
+        timeout = timeout_seconds or self.query_timeout_seconds
+        fallbacks = fallbacks or {}
+        result = AnalyticsBatchResult(values={})
+
+        tasks: Dict[str, asyncio.Task] = {}
+        if session_factory is None:
+            for name, query in queries.items():
+                tasks[name] = asyncio.ensure_future(self._execute(name, query, None, timeout))
+                await asyncio.wait([tasks[name]])
+        else:
+            for name, query in queries.items():
+                memo_key = f"{memo_scope}:{name}" if memo_scope else None
+                task = self._memoized(memo_key)
+                if task is not None:
+                    result.memo_hits.append(name)
+                else:
+                    task = asyncio.ensure_future(self._execute(name, query, session_factory, timeout))
+                    if memo_key:
+                        self._remember(memo_key, task)
+                tasks[name] = task
+
+            await asyncio.wait(list(tasks.values()))
+
+        for name, task in tasks.items():
+            error = task.exception()
+            if error is None:
+                result.values[name] = task.result()
+            elif isinstance(error, _QueryTimeout):
+                result.values[name] = fallbacks.get(name, {})
+                result.timed_out.append(name)
+            else:
+                result.values[name] = fallbacks.get(name, {})
+                result.failed[name] = str(error)
+
+        result.elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+        if result.partial:
+            logger.warning(f"Analytics batch partial after {result.elapsed_ms}ms: "
+                           f"timed out={result.timed_out}, failed={list(result.failed)}")
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "memo_entries": len(self._memo)}
+
+    async def _execute(self, name: str, query: Callable[[], Awaitable[Any]],
+                       session_factory: Optional[Callable[[], AsyncSession]], timeout: float) -> Any:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        self.stats["queries"] += 1
+        try:
+            # Batches nested in a sub-query skip the limit: their parent already holds a slot
+            if _analytics_session.get() is not None:
+                return await self._run_query(query, session_factory, timeout)
+
+            async with self._semaphore:
+                return await self._run_query(query, session_factory, timeout)
+
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            logger.warning(f"Analytics sub-query {name} timed out after {timeout}s")
+            raise _QueryTimeout(name)
+        except Exception as e:
+            self.stats["failures"] += 1
+            logger.error(f"Analytics sub-query {name} failed: {str(e)}")
+            raise
+
+    async def _run_query(self, query: Callable[[], Awaitable[Any]],
+                         session_factory: Optional[Callable[[], AsyncSession]], timeout: float) -> Any:
+        if session_factory is None:
+            return await asyncio.wait_for(query(), timeout)
+
+        async with session_factory() as session:
+            token = _analytics_session.set(session)
+            try:
+                return await asyncio.wait_for(query(), timeout)
+            finally:
+                _analytics_session.reset(token)
+
+    def _memoized(self, memo_key: Optional[str]) -> Optional[asyncio.Task]:
+        if not memo_key or memo_key not in self._memo:
+            return None
+
+        expires_at, task = self._memo[memo_key]
+        if time.monotonic() > expires_at or (task.done() and task.exception() is not None):
+            del self._memo[memo_key]
+            return None
+
+        self.stats["memo_hits"] += 1
+        return task
+
+    def _remember(self, memo_key: str, task: asyncio.Task):
+        if len(self._memo) >= self.max_memo_entries:
+            now = time.monotonic()
+            for key in [key for key, (expires_at, _) in self._memo.items() if expires_at < now]:
+                del self._memo[key]
+            if len(self._memo) >= self.max_memo_entries:
+                self._memo.pop(next(iter(self._memo)))
+
+        self._memo[memo_key] = (time.monotonic() + self.memo_ttl_seconds, task)
+
+# Shared by all analytics engines so concurrent dashboard requests share memoized results
+analytics_executor = AnalyticsExecutor(
+    query_timeout_seconds=float(os.getenv("ANALYTICS_QUERY_TIMEOUT_SECONDS", "5")),
+    memo_ttl_seconds=float(os.getenv("ANALYTICS_MEMO_TTL_SECONDS", "5")),
+    max_concurrency=int(os.getenv("ANALYTICS_MAX_CONCURRENCY", "6"))
+)
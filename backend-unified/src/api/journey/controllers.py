@@ -183,11 +183,12 @@ async def track_touchpoint(
     try:
         logger.debug(f"Tracking touchpoint for session: {touchpoint_data.session_id}")
         
-        # Initialize service (will implement TouchpointService)
+        # Initialize service
         service = JourneySessionService(db)
         
-        # Track touchpoint (placeholder - will implement in TouchpointService)
-        touchpoint_id = str(uuid4())
+        # Track touchpoint (coalesced into the session's next write)
+        tracked = await service.track_touchpoint(touchpoint_data)
+        touchpoint_id = tracked["touchpoint_id"]
         
         # Calculate journey impact
         journey_impact = TouchpointImpact(
@@ -7,7 +7,7 @@ from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from sqlalchemy.sql import func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 import uuid
 
 Base = declarative_base()
@@ -44,6 +44,9 @@ class JourneySession(Base):
     total_touchpoints = Column(Integer, default=0)
     total_session_time = Column(Integer, default=0)  # in seconds
     
+    # Optimistic locking: bumped on every state write, checked by coalesced flushes
+    version = Column(Integer, nullable=False, default=1)
+    
     # JSON data
     entry_point = Column(JSON, nullable=True)
     utm_data = Column(JSON, nullable=True)
@@ -54,7 +57,8 @@ class JourneySession(Base):
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Indexed: funnel rollup refreshes find changed sessions by it
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
     
     # Relationships
     touchpoints = relationship("JourneyTouchpoint", back_populates="session", cascade="all, delete-orphan")
@@ -62,6 +66,8 @@ class JourneySession(Base):
     personalizations = relationship("PersonalizationData", back_populates="session", cascade="all, delete-orphan")
     scarcity_triggers = relationship("ScarcityTriggerEvent", back_populates="session", cascade="all, delete-orphan")
     optimizations = relationship("OptimizationEvent", back_populates="session", cascade="all, delete-orphan")
+    
+    __mapper_args__ = {"version_id_col": version}
 
 # =============================================================================
 # JOURNEY TOUCHPOINTS TABLE
@@ -339,6 +345,45 @@ class PersonalizationPerformanceAnalytics(Base):
     conversion_rate = Column(Float)
     avg_confidence = Column(Float)
 
+# =============================================================================
+# FUNNEL ROLLUP TABLES
+# =============================================================================
+
+class JourneyFunnelRollup(Base):
+    """Additive session aggregates per hour/day bucket of start_timestamp, refreshed incrementally"""
+    __tablename__ = "journey_funnel_rollups"
+    
+    # Surrogate key: the cell dimensions are nullable like their journey_sessions columns
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    resolution = Column(String(10), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)  # naive UTC
+    
+    # Cell dimensions
+    current_stage = Column(String(50), nullable=True)
+    persona_type = Column(String(50), nullable=True)
+    device_type = Column(String(20), nullable=True)
+    journey_path = Column(String(100), nullable=True)
+    
+    # Sums rather than averages so buckets merge exactly
+    sessions = Column(Integer, nullable=False, default=0)
+    session_time = Column(Float, nullable=False, default=0.0)
+    touchpoints = Column(Float, nullable=False, default=0.0)
+    probability_sum = Column(Float, nullable=False, default=0.0)
+    probability_count = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        Index("idx_journey_funnel_rollups_bucket", "resolution", "bucket_start"),
+    )
+
+class JourneyFunnelRollupState(Base):
+    """Refresh watermark of journey_funnel_rollups"""
+    __tablename__ = "journey_funnel_rollup_state"
+    
+    name = Column(String(50), primary_key=True)
+    # Latest journey_sessions.updated_at folded into the rollups
+    watermark = Column(DateTime(timezone=True), nullable=True)
+    refreshed_at = Column(DateTime, nullable=True)  # naive UTC
+
 # =============================================================================
 # MIGRATION LOG TABLE
 # =============================================================================
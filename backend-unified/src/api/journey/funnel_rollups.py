@@ -0,0 +1,379 @@
+# Funnel Rollups for Dynamic Customer Journey Engine
+# Module: 2B - Dynamic Customer Journey Engine
+# Created: 2024-07-04
+
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, delete, func, insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database_models import JourneyFunnelRollup, JourneyFunnelRollupState, JourneySession
+from ...utils.time_buckets import BUCKET_WIDTHS, bucket_start, ceil_time, dialect_name, floor_time, time_bucket
+
+logger = logging.getLogger(__name__)
+
+FUNNEL_STAGES = ["awareness", "consideration", "decision", "conversion"]
+
+# Rollup cell key: (stage, persona, device, journey path)
+CellKey = Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]
+
+ROLLUP_STATE_NAME = "journey_funnel"
+HOUR, DAY = BUCKET_WIDTHS["hour"], BUCKET_WIDTHS["day"]
+
+# Sessions updated this close to the watermark count as changed: covers commit delay and clock skew
+ROLLUP_REFRESH_LAG = timedelta(seconds=int(os.getenv("FUNNEL_ROLLUP_REFRESH_LAG_SECONDS", "120")))
+ROLLUP_REFRESH_INTERVAL = timedelta(seconds=int(os.getenv("FUNNEL_ROLLUP_REFRESH_SECONDS", "60")))
+
+# Bound on IN-list sizes for bucket deletes
+_IN_CHUNK = 500
+
+# =============================================================================
+# ROLLUP CELLS
+# =============================================================================
+
+class RollupCell:
+    """Additive session aggregates; sums rather than averages so cells merge exactly"""
+
+    __slots__ = ("sessions", "session_time", "touchpoints", "probability_sum", "probability_count")
+
+    def __init__(self, sessions: int = 0, session_time: float = 0.0, touchpoints: float = 0.0,
+                 probability_sum: float = 0.0, probability_count: int = 0):
+        self.sessions = sessions
+        self.session_time = session_time
+        self.touchpoints = touchpoints
+        self.probability_sum = probability_sum
+        self.probability_count = probability_count
+
+    def merge(self, other: "RollupCell"):
+        self.sessions += other.sessions
+        self.session_time += other.session_time
+        self.touchpoints += other.touchpoints
+        self.probability_sum += other.probability_sum
+        self.probability_count += other.probability_count
+
+    @property
+    def average_duration(self) -> float:
+        return self.session_time / self.sessions if self.sessions > 0 else 0.0
+
+    @property
+    def average_touchpoints(self) -> float:
+        return self.touchpoints / self.sessions if self.sessions > 0 else 0.0
+
+    @property
+    def average_conversion_probability(self) -> float:
+        return self.probability_sum / self.probability_count if self.probability_count > 0 else 0.0
+
+class RollupView:
+    """Aggregated cells for one range query, with the group-bys the analytics need"""
+
+    def __init__(self, cells: Dict[CellKey, RollupCell], raw_ranges: Optional[List[Tuple[datetime, Optional[datetime]]]] = None):
+        self.cells = cells
+        # Start-time ranges answered from journey_sessions instead of rollup rows
+        self.raw_ranges = raw_ranges or []
+
+    def group_by(self, *dimensions: str) -> Dict[Any, RollupCell]:
+        """Merge cells by any of stage/persona/device/path"""
+        positions = [("stage", "persona", "device", "path").index(dimension) for dimension in dimensions]
+        grouped: Dict[Any, RollupCell] = defaultdict(RollupCell)
+        for key, cell in self.cells.items():
+            group = tuple(key[position] for position in positions)
+            grouped[group[0] if len(group) == 1 else group].merge(cell)
+        return dict(grouped)
+
+    def stage_counts(self) -> Dict[str, int]:
+        return {stage: cell.sessions for stage, cell in self.group_by("stage").items()}
+
+# =============================================================================
+# RANGE QUERIES
+# =============================================================================
+
+_SESSION_DIMENSIONS = (
+    JourneySession.current_stage,
+    JourneySession.persona_type,
+    JourneySession.device_type,
+    JourneySession.journey_path
+)
+
+_ROLLUP_DIMENSIONS = (
+    JourneyFunnelRollup.current_stage,
+    JourneyFunnelRollup.persona_type,
+    JourneyFunnelRollup.device_type,
+    JourneyFunnelRollup.journey_path
+)
+
+async def load_funnel_rollup(db: AsyncSession, since: datetime,
+                             persona_filter: Optional[str] = None) -> RollupView:
+    """Aggregate sessions started since `since` by stage, persona, device and path
+
+    Whole days and hours come from journey_funnel_rollups, so the cost
+    depends on the number of buckets rather than sessions in the range.
+    The partial hour at `since` and every hour with sessions updated since
+    the last refresh are read from journey_sessions and merged in, so the
+    figures always match the committed sessions. Before the first refresh
+    the whole range is read from journey_sessions.
+    """
+    since = bucket_start(since)
+    state = await db.get(JourneyFunnelRollupState, ROLLUP_STATE_NAME)
+    if state is None or state.watermark is None:
+        ranges = [(since, None)]
+        return RollupView(await _aggregate_sessions(db, ranges, persona_filter), ranges)
+
+    first_hour = ceil_time(since, "hour")
+    first_day = ceil_time(since, "day")
+    dirty_hours = await _changed_hours(db, state.watermark - ROLLUP_REFRESH_LAG, floor_time(since, "hour"))
+
+    raw_hours = sorted(hour for hour in dirty_hours if hour >= first_hour)
+    ranges = _coalesce_ranges([(since, first_hour)] + [(hour, hour + HOUR) for hour in raw_hours])
+
+    # Days holding a changed hour, or only partly in range, are served by their clean hours
+    hourly_days = {floor_time(hour, "day") for hour in raw_hours}
+    day_rows = and_(
+        JourneyFunnelRollup.resolution == "day",
+        JourneyFunnelRollup.bucket_start >= first_day,
+        JourneyFunnelRollup.bucket_start.notin_(sorted(hourly_days))
+    )
+    hour_windows = [(first_hour, first_day)] + [(day, day + DAY) for day in sorted(hourly_days) if day >= first_day]
+    hour_rows = and_(
+        JourneyFunnelRollup.resolution == "hour",
+        or_(*[
+            and_(JourneyFunnelRollup.bucket_start >= start, JourneyFunnelRollup.bucket_start < end)
+            for start, end in hour_windows
+        ]),
+        JourneyFunnelRollup.bucket_start.notin_(raw_hours)
+    )
+
+    query = select(
+        *_ROLLUP_DIMENSIONS,
+        func.sum(JourneyFunnelRollup.sessions),
+        func.sum(JourneyFunnelRollup.session_time),
+        func.sum(JourneyFunnelRollup.touchpoints),
+        func.sum(JourneyFunnelRollup.probability_sum),
+        func.sum(JourneyFunnelRollup.probability_count)
+    ).where(or_(day_rows, hour_rows))
+    if persona_filter:
+        query = query.where(JourneyFunnelRollup.persona_type == persona_filter)
+    query = query.group_by(*_ROLLUP_DIMENSIONS)
+
+    cells = _cells_from_rows(await db.execute(query))
+    for key, cell in (await _aggregate_sessions(db, ranges, persona_filter)).items():
+        cells.setdefault(key, RollupCell()).merge(cell)
+    return RollupView(cells, ranges)
+
+async def _aggregate_sessions(db: AsyncSession, ranges: List[Tuple[datetime, Optional[datetime]]],
+                              persona_filter: Optional[str]) -> Dict[CellKey, RollupCell]:
+    """One grouped scan of journey_sessions started within any of the ranges"""
+    query = select(*_SESSION_DIMENSIONS, *_session_sums()).where(_start_within(ranges))
+    if persona_filter:
+        query = query.where(JourneySession.persona_type == persona_filter)
+    query = query.group_by(*_SESSION_DIMENSIONS)
+    return _cells_from_rows(await db.execute(query))
+
+async def _changed_hours(db: AsyncSession, updated_since: datetime, started_since: datetime) -> Set[datetime]:
+    """Start hours of sessions updated since a watermark"""
+    hour = time_bucket(JourneySession.start_timestamp, "hour", dialect_name(db))
+    result = await db.execute(
+        select(hour).where(
+            JourneySession.updated_at >= updated_since,
+            JourneySession.start_timestamp >= started_since
+        ).group_by(hour)
+    )
+    return {bucket_start(value) for value, in result if value is not None}
+
+def _session_sums() -> Tuple[Any, ...]:
+    return (
+        func.count(JourneySession.id),
+        func.coalesce(func.sum(JourneySession.total_session_time), 0),
+        func.coalesce(func.sum(JourneySession.total_touchpoints), 0),
+        func.coalesce(func.sum(JourneySession.conversion_probability), 0),
+        func.count(JourneySession.conversion_probability)
+    )
+
+def _start_within(ranges: Iterable[Tuple[datetime, Optional[datetime]]]) -> Any:
+    conditions = []
+    for start, end in ranges:
+        condition = JourneySession.start_timestamp >= start
+        if end is not None:
+            condition = and_(condition, JourneySession.start_timestamp < end)
+        conditions.append(condition)
+    return or_(*conditions)
+
+def _coalesce_ranges(ranges: List[Tuple[datetime, datetime]]) -> List[Tuple[datetime, datetime]]:
+    merged: List[Tuple[datetime, datetime]] = []
+    for start, end in sorted(ranges):
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def _cells_from_rows(rows: Iterable[Any]) -> Dict[CellKey, RollupCell]:
+    cells: Dict[CellKey, RollupCell] = {}
+    for stage, persona, device, path, sessions, session_time, touchpoints, probability_sum, probability_count in rows:
+        cells[(stage, persona, device, path)] = RollupCell(
+            sessions=int(sessions or 0),
+            session_time=float(session_time or 0),
+            touchpoints=float(touchpoints or 0),
+            probability_sum=float(probability_sum or 0),
+            probability_count=int(probability_count or 0)
+        )
+    return cells
+
+# =============================================================================
+# INCREMENTAL REFRESH
+# =============================================================================
+
+_refresh_lock = asyncio.Lock()
+
+async def refresh_funnel_rollups(db: AsyncSession, now: Optional[datetime] = None) -> int:
+    """Rebuild the hour and day buckets of sessions updated since the watermark; returns hours rebuilt
+
+    The state row is locked for the transaction, so concurrent refreshes
+    from other workers wait for each other (or fail on creating it) rather
+    than double count. Commits on success.
+    """
+    now = now or datetime.utcnow()
+    dialect = dialect_name(db)
+
+    state = (await db.execute(
+        select(JourneyFunnelRollupState)
+        .where(JourneyFunnelRollupState.name == ROLLUP_STATE_NAME)
+        .with_for_update()
+    )).scalar_one_or_none()
+    if state is None:
+        state = JourneyFunnelRollupState(name=ROLLUP_STATE_NAME)
+        db.add(state)
+        await db.flush()
+
+    hour = time_bucket(JourneySession.start_timestamp, "hour", dialect)
+    changed = select(hour, func.max(JourneySession.updated_at)).group_by(hour)
+    if state.watermark is not None:
+        changed = changed.where(JourneySession.updated_at >= state.watermark - ROLLUP_REFRESH_LAG)
+
+    dirty_hours: Set[datetime] = set()
+    watermark = state.watermark
+    for value, updated_at in await db.execute(changed):
+        if value is None:
+            continue
+        dirty_hours.add(bucket_start(value))
+        if updated_at is not None and (watermark is None or updated_at > watermark):
+            watermark = updated_at
+
+    if dirty_hours:
+        await _rebuild_hours(db, sorted(dirty_hours), dialect)
+        await _rebuild_days(db, sorted({floor_time(dirty, "day") for dirty in dirty_hours}))
+
+    state.watermark = watermark
+    state.refreshed_at = now
+    await db.commit()
+
+    if dirty_hours:
+        logger.debug(f"Refreshed {len(dirty_hours)} funnel rollup hours")
+    return len(dirty_hours)
+
+async def refresh_funnel_rollups_if_stale(session_factory: Optional[Callable[[], AsyncSession]],
+                                          now: Optional[datetime] = None) -> bool:
+    """Refresh on a separate session once the rollups are older than the refresh interval
+
+    Only an optimization: queries stay exact without it, since every
+    changed hour is read from journey_sessions until it is refreshed.
+    """
+    if session_factory is None or _refresh_lock.locked():
+        return False
+
+    now = now or datetime.utcnow()
+    async with _refresh_lock:
+        async with session_factory() as db:
+            try:
+                state = await db.get(JourneyFunnelRollupState, ROLLUP_STATE_NAME)
+                if state is not None and state.refreshed_at is not None and \
+                        now - bucket_start(state.refreshed_at) < ROLLUP_REFRESH_INTERVAL:
+                    return False
+                await refresh_funnel_rollups(db, now)
+                return True
+            except IntegrityError:
+                # Another worker created the state row first and is building the rollups
+                await db.rollback()
+                return False
+            except Exception as e:
+                await db.rollback()
+                logger.warning(f"Funnel rollup refresh failed: {e}")
+                return False
+
+async def _rebuild_hours(db: AsyncSession, hours: List[datetime], dialect: str):
+    for offset in range(0, len(hours), _IN_CHUNK):
+        chunk = hours[offset:offset + _IN_CHUNK]
+        await db.execute(delete(JourneyFunnelRollup).where(
+            JourneyFunnelRollup.resolution == "hour",
+            JourneyFunnelRollup.bucket_start.in_(chunk)
+        ))
+
+        hour = time_bucket(JourneySession.start_timestamp, "hour", dialect)
+        ranges = _coalesce_ranges([(start, start + HOUR) for start in chunk])
+        result = await db.execute(
+            select(hour, *_SESSION_DIMENSIONS, *_session_sums())
+            .where(_start_within(ranges))
+            .group_by(hour, *_SESSION_DIMENSIONS)
+        )
+        rows = [
+            _rollup_row("hour", bucket_start(value), key, cell)
+            for value, *cell_row in result
+            for key, cell in _cells_from_rows([cell_row]).items()
+        ]
+        if rows:
+            await db.execute(insert(JourneyFunnelRollup), rows)
+
+async def _rebuild_days(db: AsyncSession, days: List[datetime]):
+    """Day buckets are re-summed from their (already rebuilt) hour buckets"""
+    for offset in range(0, len(days), _IN_CHUNK):
+        chunk = days[offset:offset + _IN_CHUNK]
+        await db.execute(delete(JourneyFunnelRollup).where(
+            JourneyFunnelRollup.resolution == "day",
+            JourneyFunnelRollup.bucket_start.in_(chunk)
+        ))
+
+        result = await db.execute(
+            select(
+                JourneyFunnelRollup.bucket_start, *_ROLLUP_DIMENSIONS,
+                JourneyFunnelRollup.sessions, JourneyFunnelRollup.session_time,
+                JourneyFunnelRollup.touchpoints, JourneyFunnelRollup.probability_sum,
+                JourneyFunnelRollup.probability_count
+            ).where(
+                JourneyFunnelRollup.resolution == "hour",
+                or_(*[
+                    and_(JourneyFunnelRollup.bucket_start >= day, JourneyFunnelRollup.bucket_start < day + DAY)
+                    for day in chunk
+                ])
+            )
+        )
+        day_cells: Dict[Tuple[datetime, CellKey], RollupCell] = defaultdict(RollupCell)
+        for start, *cell_row in result:
+            for key, cell in _cells_from_rows([cell_row]).items():
+                day_cells[(floor_time(start, "day"), key)].merge(cell)
+
+        rows = [_rollup_row("day", day, key, cell) for (day, key), cell in day_cells.items()]
+        if rows:
+            await db.execute(insert(JourneyFunnelRollup), rows)
+
+def _rollup_row(resolution: str, start: datetime, key: CellKey, cell: RollupCell) -> Dict[str, Any]:
+    stage, persona, device, path = key
+    return {
+        "resolution": resolution,
+        "bucket_start": start,
+        "current_stage": stage,
+        "persona_type": persona,
+        "device_type": device,
+        "journey_path": path,
+        "sessions": cell.sessions,
+        "session_time": cell.session_time,
+        "touchpoints": cell.touchpoints,
+        "probability_sum": cell.probability_sum,
+        "probability_count": cell.probability_count
+    }
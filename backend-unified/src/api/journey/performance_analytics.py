@@ -17,6 +17,8 @@ from sqlalchemy.orm import selectinload
 
 from .models import *
 from .database_models import *
+from .funnel_rollups import FUNNEL_STAGES, RollupView, load_funnel_rollup, refresh_funnel_rollups_if_stale
+from .analytics_executor import analytics_executor, current_analytics_session, session_factory_for
 from ...utils.redis_client import get_redis_client
 from ...config import settings
 
@@ -30,9 +32,15 @@ class PerformanceAnalyticsEngine:
     """Advanced performance monitoring and analytics for journey systems"""
     
     def __init__(self, db: AsyncSession):
-        self.db = db
+        self._db = db
         self.redis_client = get_redis_client()
         
+        # Independent sub-queries run concurrently, each on its own pooled session
+        self.session_factory = session_factory_for(db)
+        
+        # Funnel aggregates per (since, persona_filter), shared by the funnel calculations
+        self._rollup_views: Dict[Tuple[datetime, Optional[str]], RollupView] = {}
+        
         # Analytics configuration
         self.analytics_config = {
             "real_time_window": 300,      # 5 minutes for real-time metrics
@@ -47,6 +55,11 @@ class PerformanceAnalyticsEngine:
             }
         }
     
+    @property
+    def db(self) -> AsyncSession:
+        """Sub-query session inside the analytics executor, else the request session"""
+        return current_analytics_session(self._db)
+    
     async def get_real_time_performance_metrics(self, time_window_minutes: int = 5) -> Dict[str, Any]:
         """Get real-time performance metrics for the last N minutes"""
         try:
@@ -54,17 +67,21 @@ class PerformanceAnalyticsEngine:
             
             since = datetime.utcnow() - timedelta(minutes=time_window_minutes)
             
-            # Get real-time session metrics
-            session_metrics = await self._get_real_time_session_metrics(since)
-            
-            # Get real-time conversion metrics
-            conversion_metrics = await self._get_real_time_conversion_metrics(since)
-            
-            # Get real-time optimization metrics
-            optimization_metrics = await self._get_real_time_optimization_metrics(since)
-            
-            # Get real-time personalization metrics
-            personalization_metrics = await self._get_real_time_personalization_metrics(since)
+            # Session, conversion, optimization and personalization metrics are independent
+            batch = await analytics_executor.run(
+                {
+                    "session_metrics": lambda: self._get_real_time_session_metrics(since),
+                    "conversion_metrics": lambda: self._get_real_time_conversion_metrics(since),
+                    "optimization_metrics": lambda: self._get_real_time_optimization_metrics(since),
+                    "personalization_metrics": lambda: self._get_real_time_personalization_metrics(since)
+                },
+                session_factory=self.session_factory,
+                memo_scope=f"real_time:{time_window_minutes}"
+            )
+            session_metrics = batch.values["session_metrics"]
+            conversion_metrics = batch.values["conversion_metrics"]
+            optimization_metrics = batch.values["optimization_metrics"]
+            personalization_metrics = batch.values["personalization_metrics"]
             
             # Calculate system health scores
             system_health = await self._calculate_system_health_scores(
@@ -79,7 +96,8 @@ class PerformanceAnalyticsEngine:
                 "optimization_metrics": optimization_metrics,
                 "personalization_metrics": personalization_metrics,
                 "system_health": system_health,
-                "alerts": await self._generate_real_time_alerts(system_health)
+                "alerts": await self._generate_real_time_alerts(system_health),
+                "query_status": batch.status()
             }
             
         except Exception as e:
@@ -200,20 +218,23 @@ class PerformanceAnalyticsEngine:
         try:
             logger.info(f"Generating {report_type} performance report for {time_range}")
             
-            # Get all analytics components
-            tasks = [
-                self.get_real_time_performance_metrics(5),
-                self.get_journey_funnel_analytics(time_range),
-                self.get_optimization_effectiveness_analytics(time_range),
-                self.get_cross_device_analytics(time_range)
-            ]
-            
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            # Get all analytics components, each on its own session; missing ones stay empty
+            batch = await analytics_executor.run(
+                {
+                    "real_time_metrics": lambda: self.get_real_time_performance_metrics(5),
+                    "funnel_analytics": lambda: self.get_journey_funnel_analytics(time_range),
+                    "optimization_analytics": lambda: self.get_optimization_effectiveness_analytics(time_range),
+                    "cross_device_analytics": lambda: self.get_cross_device_analytics(time_range)
+                },
+                session_factory=self.session_factory,
+                memo_scope=f"report:{time_range}",
+                timeout_seconds=analytics_executor.query_timeout_seconds * 2
+            )
             
-            real_time_metrics = results[0] if not isinstance(results[0], Exception) else {}
-            funnel_analytics = results[1] if not isinstance(results[1], Exception) else {}
-            optimization_analytics = results[2] if not isinstance(results[2], Exception) else {}
-            cross_device_analytics = results[3] if not isinstance(results[3], Exception) else {}
+            real_time_metrics = batch.values["real_time_metrics"]
+            funnel_analytics = batch.values["funnel_analytics"]
+            optimization_analytics = batch.values["optimization_analytics"]
+            cross_device_analytics = batch.values["cross_device_analytics"]
             
             # Generate executive summary
             executive_summary = await self._generate_executive_summary(
@@ -235,7 +256,8 @@ class PerformanceAnalyticsEngine:
                 "optimization_analytics": optimization_analytics,
                 "cross_device_analytics": cross_device_analytics,
                 "strategic_recommendations": strategic_recommendations,
-                "next_review_date": (datetime.utcnow() + timedelta(days=7)).isoformat()
+                "next_review_date": (datetime.utcnow() + timedelta(days=7)).isoformat(),
+                "query_status": batch.status()
             }
             
         except Exception as e:
@@ -407,24 +429,21 @@ class PerformanceAnalyticsEngine:
     # ANALYTICS CALCULATION METHODS
     # =============================================================================
     
+    async def _get_funnel_rollup(self, since: datetime, persona_filter: Optional[str]) -> RollupView:
+        """Funnel aggregates for sessions started since `since` from the rollup tables, once per request"""
+        cache_key = (since, persona_filter)
+        if cache_key not in self._rollup_views:
+            await refresh_funnel_rollups_if_stale(self.session_factory)
+            self._rollup_views[cache_key] = await load_funnel_rollup(self.db, since, persona_filter)
+        return self._rollup_views[cache_key]
+    
     async def _calculate_funnel_conversion_rates(self, since: datetime, persona_filter: Optional[str]) -> Dict[str, Any]:
         """Calculate journey funnel conversion rates"""
-        # Build base query
-        base_query = select(
-            JourneySession.current_stage,
-            func.count(JourneySession.id).label("session_count")
-        ).where(JourneySession.start_timestamp >= since)
-        
-        if persona_filter:
-            base_query = base_query.where(JourneySession.persona_type == persona_filter)
-        
-        base_query = base_query.group_by(JourneySession.current_stage)
-        
-        stage_counts_result = await self.db.execute(base_query)
-        stage_counts = dict(stage_counts_result.fetchall())
+        rollup = await self._get_funnel_rollup(since, persona_filter)
+        stage_counts = rollup.stage_counts()
         
         # Calculate conversion rates between stages
-        stages = ["awareness", "consideration", "decision", "conversion"]
+        stages = FUNNEL_STAGES
         funnel_data = {}
         
         for i in range(len(stages) - 1):
@@ -457,62 +476,34 @@ class PerformanceAnalyticsEngine:
     
     async def _calculate_stage_performance_metrics(self, since: datetime, persona_filter: Optional[str]) -> Dict[str, Any]:
         """Calculate performance metrics for each journey stage"""
-        stages = ["awareness", "consideration", "decision", "conversion"]
+        rollup = await self._get_funnel_rollup(since, persona_filter)
+        by_stage = rollup.group_by("stage")
         stage_performance = {}
         
-        for stage in stages:
-            # Build query for stage
-            query = select(
-                func.count(JourneySession.id).label("session_count"),
-                func.avg(JourneySession.total_session_time).label("avg_duration"),
-                func.avg(JourneySession.conversion_probability).label("avg_conversion_prob"),
-                func.avg(JourneySession.total_touchpoints).label("avg_touchpoints")
-            ).where(
-                and_(
-                    JourneySession.current_stage == stage,
-                    JourneySession.start_timestamp >= since
-                )
-            )
-            
-            if persona_filter:
-                query = query.where(JourneySession.persona_type == persona_filter)
-            
-            result = await self.db.execute(query)
-            metrics = result.fetchone()
+        for stage in FUNNEL_STAGES:
+            metrics = by_stage.get(stage)
             
             stage_performance[stage] = {
-                "session_count": metrics.session_count or 0,
-                "average_duration": round(metrics.avg_duration or 0, 2),
-                "average_conversion_probability": round(metrics.avg_conversion_prob or 0, 4),
-                "average_touchpoints": round(metrics.avg_touchpoints or 0, 2)
+                "session_count": metrics.sessions if metrics else 0,
+                "average_duration": round(metrics.average_duration, 2) if metrics else 0,
+                "average_conversion_probability": round(metrics.average_conversion_probability, 4) if metrics else 0,
+                "average_touchpoints": round(metrics.average_touchpoints, 2) if metrics else 0
             }
         
         return stage_performance
     
     async def _analyze_journey_paths(self, since: datetime, persona_filter: Optional[str]) -> Dict[str, Any]:
         """Analyze journey path performance"""
-        query = select(
-            JourneySession.journey_path,
-            func.count(JourneySession.id).label("session_count"),
-            func.avg(JourneySession.conversion_probability).label("avg_conversion_prob"),
-            func.avg(JourneySession.total_session_time).label("avg_duration")
-        ).where(JourneySession.start_timestamp >= since)
-        
-        if persona_filter:
-            query = query.where(JourneySession.persona_type == persona_filter)
-        
-        query = query.group_by(JourneySession.journey_path).order_by(func.count(JourneySession.id).desc())
-        
-        result = await self.db.execute(query)
-        paths = result.fetchall()
+        rollup = await self._get_funnel_rollup(since, persona_filter)
+        paths = sorted(rollup.group_by("path").items(), key=lambda item: item[1].sessions, reverse=True)
         
         journey_paths = []
-        for path in paths:
+        for path, metrics in paths:
             journey_paths.append({
-                "path": path.journey_path,
-                "session_count": path.session_count,
-                "average_conversion_probability": round(path.avg_conversion_prob or 0, 4),
-                "average_duration": round(path.avg_duration or 0, 2)
+                "path": path,
+                "session_count": metrics.sessions,
+                "average_conversion_probability": round(metrics.average_conversion_probability, 4),
+                "average_duration": round(metrics.average_duration, 2)
             })
         
         return {
@@ -602,11 +593,58 @@ class PerformanceAnalyticsEngine:
     # Placeholder methods for comprehensive analytics
     async def _analyze_journey_dropoffs(self, since: datetime, persona_filter: Optional[str]) -> Dict[str, Any]:
         """Analyze journey drop-off points"""
-        return {"dropoff_analysis": "placeholder"}
+        rollup = await self._get_funnel_rollup(since, persona_filter)
+        stage_counts = rollup.stage_counts()
+        by_stage_device = rollup.group_by("stage", "device")
+        
+        stage_dropoffs = {}
+        for i, stage in enumerate(FUNNEL_STAGES[:-1]):
+            # Sessions still sitting at this stage never advanced past it
+            reached = sum(stage_counts.get(later, 0) for later in FUNNEL_STAGES[i:])
+            stopped = stage_counts.get(stage, 0)
+            
+            stage_dropoffs[stage] = {
+                "sessions_reached": reached,
+                "sessions_stopped": stopped,
+                "dropoff_rate": round(stopped / reached, 4) if reached > 0 else 0,
+                "stopped_by_device": {
+                    device: cell.sessions for (cell_stage, device), cell in by_stage_device.items()
+                    if cell_stage == stage
+                }
+            }
+        
+        worst_stage = max(stage_dropoffs, key=lambda stage: stage_dropoffs[stage]["dropoff_rate"]) if stage_dropoffs else None
+        
+        return {
+            "stage_dropoffs": stage_dropoffs,
+            "highest_dropoff_stage": worst_stage
+        }
     
     async def _compare_persona_performance(self, since: datetime) -> Dict[str, Any]:
         """Compare performance across personas"""
-        return {"persona_comparison": "placeholder"}
+        rollup = await self._get_funnel_rollup(since, None)
+        by_persona_stage = rollup.group_by("persona", "stage")
+        
+        personas: Dict[str, Dict[str, Any]] = {}
+        for persona, metrics in rollup.group_by("persona").items():
+            conversions = by_persona_stage.get((persona, "conversion"))
+            conversion_count = conversions.sessions if conversions else 0
+            
+            personas[persona or "unknown"] = {
+                "session_count": metrics.sessions,
+                "conversions": conversion_count,
+                "conversion_rate": round(conversion_count / metrics.sessions, 4) if metrics.sessions > 0 else 0,
+                "average_conversion_probability": round(metrics.average_conversion_probability, 4),
+                "average_duration": round(metrics.average_duration, 2),
+                "average_touchpoints": round(metrics.average_touchpoints, 2)
+            }
+        
+        best_persona = max(personas, key=lambda persona: personas[persona]["conversion_rate"]) if personas else None
+        
+        return {
+            "personas": personas,
+            "best_performing_persona": best_persona
+        }
     
     async def _analyze_optimization_performance(self, since: datetime) -> Dict[str, Any]:
         """Analyze optimization performance by type"""
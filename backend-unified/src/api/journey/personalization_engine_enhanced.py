@@ -16,6 +16,7 @@ from sqlalchemy.orm import selectinload
 
 from .models import *
 from .database_models import JourneySession, PersonalizationData
+from .session_cache import journey_session_cache
 from ...utils.redis_client import get_redis_client
 from ...utils.ml_models import PersonalizationModel, RecommendationEngine, RealTimeOptimizer, ContentVariantGenerator, ml_model_manager
 from ...config import settings
@@ -595,10 +596,12 @@ class EnhancedPersonalizationEngine:
             ).values(
                 persona_type=persona_data.type,
                 persona_confidence=persona_data.confidence,
-                last_updated=datetime.utcnow()
+                last_updated=datetime.utcnow(),
+                version=JourneySession.version + 1
             )
             await self.db.execute(stmt)
             await self.db.commit()
+            await journey_session_cache.invalidate(session.session_id)
         except Exception as e:
             logger.error(f"Error updating session persona: {str(e)}")
     
@@ -11,7 +11,6 @@ from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 import statistics
-from scipy import stats
 import uuid
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -24,8 +23,11 @@ from .ab_testing_framework import (
     TestStatus, TestType, OptimizationGoal, StatisticalSignificance
 )
 from ...utils.redis_client import get_redis_client
+from ...utils.lazy_import import lazy_module
 from ...config import settings
 
+stats = lazy_module("scipy.stats")
+
 logger = logging.getLogger(__name__)
 
 # =============================================================================
@@ -16,6 +16,7 @@ from sqlalchemy.orm import selectinload
 
 from .models import *
 from .database_models import JourneySession, OptimizationEvent
+from .session_cache import journey_session_cache
 from .personalization_engine import PersonalizationEngine
 from .scarcity_engine import ScarcityTriggerEngine
 from .ux_integration_bridge import UXIntelligenceIntegrationBridge
@@ -762,12 +763,14 @@ class RealTimeOptimizer:
     
     async def _update_session_conversion_probability(self, session_id: str, new_probability: float) -> None:
         """Update session conversion probability"""
+        # Bump the version so queued coalesced writes re-read the row instead of overwriting it
         await self.db.execute(
             update(JourneySession)
             .where(JourneySession.session_id == session_id)
-            .values(conversion_probability=new_probability)
+            .values(conversion_probability=new_probability, version=JourneySession.version + 1)
         )
         await self.db.commit()
+        await journey_session_cache.invalidate(session_id)
     
     async def _analyze_device_switch(self, session: JourneySession, device_switch_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze device switch context"""
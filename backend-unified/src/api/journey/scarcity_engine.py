@@ -9,6 +9,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from uuid import uuid4
 import random
+import time
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, insert, func, and_, or_
@@ -16,6 +17,7 @@ from sqlalchemy.orm import selectinload
 
 from .models import *
 from .database_models import JourneySession, ScarcityTriggerEvent
+from .trigger_ledger import trigger_ledger
 from ...utils.redis_client import get_redis_client
 from ...utils.ml_models import ScarcityOptimizationModel
 from ...config import settings
@@ -32,6 +34,7 @@ class ScarcityTriggerEngine:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.redis_client = get_redis_client()
+        self.trigger_ledger = trigger_ledger
         self.scarcity_model = ScarcityOptimizationModel()
         
         # Scarcity trigger configurations
@@ -66,8 +69,9 @@ class ScarcityTriggerEngine:
             # Step 1: Get user scarcity sensitivity profile
             scarcity_sensitivity = await self._get_scarcity_sensitivity(session)
             
-            # Step 2: Check trigger eligibility and cooldowns
-            eligible_triggers = await self._check_trigger_eligibility(session, stage)
+            # Step 2: Check cooldowns and frequency caps and reserve the eligible triggers (atomic)
+            reserved_at = time.time()
+            eligible_triggers = await self._check_trigger_eligibility(session, stage, reserved_at)
             
             # Step 3: Generate triggers based on user psychology and journey stage
             triggers = []
@@ -75,6 +79,8 @@ class ScarcityTriggerEngine:
                 trigger = await self._generate_trigger_by_type(session, trigger_type, scarcity_sensitivity)
                 if trigger:
                     triggers.append(trigger)
+                else:
+                    await self.trigger_ledger.release(session.session_id, trigger_type, reserved_at)
             
             # Step 4: Optimize trigger timing and intensity
             optimized_triggers = await self._optimize_trigger_timing(session, triggers)
@@ -101,6 +107,15 @@ class ScarcityTriggerEngine:
             trigger = await self._generate_trigger_by_type(session, trigger_type, scarcity_sensitivity, custom_params)
             
             if trigger:
+                # Count it against the cooldown and frequency cap of evaluated triggers
+                config = self.trigger_configs.get(trigger_type)
+                if config:
+                    await self.trigger_ledger.reserve(
+                        session.session_id,
+                        {trigger_type: (config["cooldown"], config["max_frequency"])},
+                        force=True
+                    )
+                
                 # Record trigger event
                 await self._record_trigger_events(session, [trigger])
                 
@@ -402,31 +417,19 @@ class ScarcityTriggerEngine:
         await self.redis_client.setex(cache_key, 1800, json.dumps(sensitivity_profile))
         return sensitivity_profile
     
-    async def _check_trigger_eligibility(self, session: JourneySession, stage: JourneyStage) -> List[str]:
-        """Check which trigger types are eligible based on cooldowns and frequency"""
-        eligible_triggers = []
-        
-        # Get recent trigger history
-        recent_triggers = await self._get_recent_triggers(session.session_id)
-        
-        for trigger_type, config in self.trigger_configs.items():
-            # Check frequency limit
-            recent_count = len([t for t in recent_triggers if t.trigger_type == trigger_type])
-            if recent_count >= config["max_frequency"]:
-                continue
-            
-            # Check cooldown
-            last_trigger = next((t for t in recent_triggers if t.trigger_type == trigger_type), None)
-            if last_trigger:
-                time_since_last = (datetime.utcnow() - last_trigger.trigger_timestamp).total_seconds()
-                if time_since_last < config["cooldown"]:
-                    continue
-            
-            # Stage-specific eligibility
-            if self._is_trigger_appropriate_for_stage(trigger_type, stage):
-                eligible_triggers.append(trigger_type)
+    async def _check_trigger_eligibility(self, session: JourneySession, stage: JourneyStage, reserved_at: float) -> List[str]:
+        """Reserve the stage-appropriate trigger types that are off cooldown and under their frequency cap
+        
+        One atomic ledger call for all types, so concurrent evaluations of the
+        same session cannot both fire a trigger.
+        """
+        limits = {
+            trigger_type: (config["cooldown"], config["max_frequency"])
+            for trigger_type, config in self.trigger_configs.items()
+            if self._is_trigger_appropriate_for_stage(trigger_type, stage)
+        }
         
-        return eligible_triggers
+        return await self.trigger_ledger.reserve(session.session_id, limits, now=reserved_at)
     
     async def _generate_trigger_by_type(self, session: JourneySession, trigger_type: str, sensitivity: Dict[str, Any], custom_params: Dict[str, Any] = None) -> Optional[ScarcityTrigger]:
         """Generate a specific type of scarcity trigger"""
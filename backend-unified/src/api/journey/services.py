@@ -15,6 +15,7 @@ from sqlalchemy.orm import selectinload
 
 from .models import *
 from .database_models import JourneySession, JourneyTouchpoint, ConversionEvent, PersonalizationData, CrossDeviceSession
+from .session_cache import CachedJourneySession, journey_session_cache
 from ..ux_intelligence.services import UXIntelligenceService
 from ...utils.redis_client import get_redis_client
 from ...utils.ml_models import ConversionPredictionModel, PersonalizationModel
@@ -112,7 +113,7 @@ class JourneySessionService:
         try:
             logger.info(f"Updating journey stage for session: {session_id}")
             
-            # Step 1: Get current session
+            # Step 1: Get current session (cached state; a private copy)
             session = await self._get_session(session_id)
             if not session:
                 raise ValueError(f"Journey session not found: {session_id}")
@@ -127,7 +128,7 @@ class JourneySessionService:
             session.current_stage = stage_update.new_stage.value
             session.updated_at = datetime.utcnow()
             
-            # Step 4: Record touchpoint for stage transition
+            # Step 4: Prepare touchpoint for stage transition
             touchpoint = await self._create_stage_transition_touchpoint(
                 session, previous_stage, stage_update
             )
@@ -155,7 +156,17 @@ class JourneySessionService:
             # Step 9: Apply real-time adaptations
             adaptations = await self._apply_real_time_adaptations(session, stage_update)
             
-            await self.db.commit()
+            # Write stage, metrics and touchpoint in one version-checked commit;
+            # replayed on the current row if another writer got there first
+            def apply_stage_update(state: CachedJourneySession) -> Dict[str, Any]:
+                state.current_stage = session.current_stage
+                state.updated_at = session.updated_at
+                state.total_touchpoints += 1
+                state.total_session_time = session.total_session_time
+                state.conversion_probability = session.conversion_probability
+                return {**touchpoint, "touchpoint_sequence": state.total_touchpoints}
+            
+            session = await journey_session_cache.apply(self.db, session_id, apply_stage_update, flush_now=True)
             
             # Step 10: Update real-time analytics
             await self._update_real_time_analytics(session_id, stage_update.new_stage, new_probability)
@@ -181,6 +192,47 @@ class JourneySessionService:
             await self.db.rollback()
             raise
     
+    async def track_touchpoint(self, touchpoint_data: TouchpointCreate) -> Dict[str, Any]:
+        """Record a touchpoint; coalesced with other engagement updates for the session"""
+        try:
+            touchpoint_id = uuid4()
+            touchpoint = touchpoint_data.touchpoint
+            interaction_data = touchpoint.interaction_data or {}
+            now = datetime.utcnow()
+            
+            def apply_touchpoint(state: CachedJourneySession) -> Dict[str, Any]:
+                state.total_touchpoints += 1
+                state.updated_at = now
+                if state.start_timestamp:
+                    state.total_session_time = int((now - state.start_timestamp.replace(tzinfo=None)).total_seconds())
+                return {
+                    "id": touchpoint_id,
+                    "session_id": touchpoint_data.session_id,
+                    "touchpoint_sequence": state.total_touchpoints,
+                    "touchpoint_type": touchpoint.type.value,
+                    "page_url": touchpoint.page_url,
+                    "interaction_data": interaction_data,
+                    "engagement_score": interaction_data.get("engagement_score"),
+                    "duration_seconds": interaction_data.get("time_on_page"),
+                    "scroll_depth": interaction_data.get("scroll_depth"),
+                    "click_count": interaction_data.get("interaction_count", 0),
+                    "performance_metrics": touchpoint.performance_metrics
+                }
+            
+            session = await journey_session_cache.apply(self.db, touchpoint_data.session_id, apply_touchpoint)
+            if not session:
+                raise ValueError(f"Journey session not found: {touchpoint_data.session_id}")
+            
+            return {
+                "touchpoint_id": str(touchpoint_id),
+                "touchpoint_sequence": session.total_touchpoints,
+                "session": session
+            }
+            
+        except Exception as e:
+            logger.error(f"Error tracking touchpoint: {str(e)}")
+            raise
+    
     async def get_journey_state(self, session_id: str) -> Dict[str, Any]:
         """Get current journey state"""
         try:
@@ -270,18 +322,8 @@ class JourneySessionService:
     
     async def _initialize_real_time_tracking(self, session: JourneySession) -> None:
         """Initialize real-time tracking for the session"""
-        cache_key = f"journey_session:{session.session_id}"
-        session_data = {
-            "session_id": session.session_id,
-            "current_stage": session.current_stage,
-            "conversion_probability": session.conversion_probability,
-            "journey_path": session.journey_path,
-            "start_time": session.start_timestamp.isoformat(),
-            "touchpoint_count": 0
-        }
-        
-        # Cache session data for 1 hour
-        await self.redis_client.setex(cache_key, 3600, json.dumps(session_data))
+        # Seed the session state cache (local + Redis) so the next calls skip the database
+        await journey_session_cache.prime(session)
     
     async def _generate_initial_personalized_content(self, session: JourneySession, session_data: JourneySessionCreate) -> PersonalizedContent:
         """Generate initial personalized content"""
@@ -365,18 +407,14 @@ class JourneySessionService:
         cache_key = f"ux_journey_bridge:{session.session_id}"
         await self.redis_client.setex(cache_key, 3600, json.dumps(bridge_data, default=str))
     
-    async def _get_session(self, session_id: str) -> Optional[JourneySession]:
-        """Get journey session by ID"""
-        result = await self.db.execute(
-            select(JourneySession).where(JourneySession.session_id == session_id)
-        )
-        return result.scalar_one_or_none()
+    async def _get_session(self, session_id: str) -> Optional[CachedJourneySession]:
+        """Get journey session state by ID (read-through cache)"""
+        return await journey_session_cache.get(self.db, session_id)
     
-    async def _create_stage_transition_touchpoint(self, session: JourneySession, previous_stage: str, stage_update: JourneyStageUpdate) -> JourneyTouchpoint:
-        """Create touchpoint record for stage transition"""
-        touchpoint = JourneyTouchpoint(
+    async def _create_stage_transition_touchpoint(self, session: CachedJourneySession, previous_stage: str, stage_update: JourneyStageUpdate) -> Dict[str, Any]:
+        """Build the touchpoint record for a stage transition (written with the session update)"""
+        return dict(
             session_id=session.session_id,
-            touchpoint_sequence=session.total_touchpoints + 1,
             touchpoint_type=TouchpointType.STAGE_TRANSITION.value,
             interaction_data={
                 "previous_stage": previous_stage,
@@ -389,9 +427,6 @@ class JourneySessionService:
             scroll_depth=stage_update.engagement_metrics.scroll_depth,
             click_count=stage_update.engagement_metrics.interaction_count
         )
-        
-        self.db.add(touchpoint)
-        return touchpoint
     
     async def _recalculate_conversion_probability(self, session: JourneySession, engagement_metrics: EngagementMetrics) -> float:
         """Recalculate conversion probability based on new data"""
@@ -595,16 +630,5 @@ class JourneySessionService:
             "timestamp": datetime.utcnow().isoformat()
         }
         
-        # Publish to analytics stream
-        await self.redis_client.lpush("journey_analytics_stream", json.dumps(analytics_data))
-        
-        # Update session cache
-        cache_key = f"journey_session:{session_id}"
-        cached_data = await self.redis_client.get(cache_key)
-        if cached_data:
-            session_data = json.loads(cached_data)
-            session_data["current_stage"] = new_stage.value
-            session_data["conversion_probability"] = conversion_probability
-            session_data["last_update"] = datetime.utcnow().isoformat()
-            
-            await self.redis_client.setex(cache_key, 3600, json.dumps(session_data))
\ No newline at end of file
+        # Publish to analytics stream (the session cache was refreshed by the flush)
+        await self.redis_client.lpush("journey_analytics_stream", json.dumps(analytics_data))
\ No newline at end of file
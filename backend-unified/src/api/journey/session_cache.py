@@ -0,0 +1,376 @@
+# Journey Session State Cache for Dynamic Customer Journey Engine
+# Module: 2B - Dynamic Customer Journey Engine
+# Created: 2024-07-04
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import select, update, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database_models import JourneySession, JourneyTouchpoint
+from .analytics_executor import session_factory_for
+from ...utils.redis_client import get_redis_client
+from ...utils.shutdown_hooks import register_shutdown_hook
+
+logger = logging.getLogger(__name__)
+
+# Pending change: mutates the state and optionally returns JourneyTouchpoint kwargs
+SessionOp = Callable[["CachedJourneySession"], Optional[Dict[str, Any]]]
+
+# =============================================================================
+# CACHED SESSION STATE
+# =============================================================================
+
+class CachedJourneySession:
+    """Hot JourneySession fields; attribute-compatible with the ORM row for readers"""
+
+    FIELDS = (
+        "session_id", "user_id", "persona_type", "persona_confidence", "device_type",
+        "start_timestamp", "current_stage", "journey_path", "conversion_probability",
+        "total_touchpoints", "total_session_time", "updated_at", "version"
+    )
+    TIMESTAMP_FIELDS = ("start_timestamp", "updated_at")
+
+    __slots__ = FIELDS
+
+    def __init__(self, **values):
+        for field in self.FIELDS:
+            setattr(self, field, values.get(field))
+        self.total_touchpoints = self.total_touchpoints or 0
+        self.total_session_time = self.total_session_time or 0
+        self.version = self.version or 1
+
+    @classmethod
+    def from_row(cls, row: Any) -> "CachedJourneySession":
+        values = {field: getattr(row, field, None) for field in cls.FIELDS}
+        if values["user_id"] is not None:
+            values["user_id"] = str(values["user_id"])
+        return cls(**values)
+
+    @classmethod
+    def from_json(cls, payload: str) -> "CachedJourneySession":
+        values = json.loads(payload)
+        for field in cls.TIMESTAMP_FIELDS:
+            if values.get(field):
+                values[field] = datetime.fromisoformat(values[field])
+        return cls(**values)
+
+    def to_json(self) -> str:
+        values = {field: getattr(self, field) for field in self.FIELDS}
+        for field in self.TIMESTAMP_FIELDS:
+            if values[field] is not None:
+                values[field] = values[field].isoformat()
+        return json.dumps(values, default=str)
+
+    def copy(self) -> "CachedJourneySession":
+        return CachedJourneySession(**{field: getattr(self, field) for field in self.FIELDS})
+
+class _CacheEntry:
+    __slots__ = ("state", "loaded_at", "pending_ops", "pending_touchpoints", "dirty_since")
+
+    def __init__(self, state: CachedJourneySession):
+        self.state = state
+        self.loaded_at = time.monotonic()
+        self.pending_ops: List[SessionOp] = []
+        self.pending_touchpoints: List[Dict[str, Any]] = []
+        self.dirty_since: Optional[float] = None
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.pending_ops)
+
+# =============================================================================
+# SESSION STATE CACHE
+# =============================================================================
+
+class JourneySessionCache:
+    """Read-through JourneySession cache: in-process LRU, shared Redis tier, database
+
+    Updates are applied to the cached state immediately and queued as ops.
+    Queued ops are written in one transaction when the stage changes or
+    once the oldest is flush_interval_seconds old, with
+    `UPDATE ... WHERE version = expected`. On a version conflict the row is
+    reloaded and the queued ops are replayed on top of it, so concurrent
+    writers never overwrite each other. The Redis tier only ever holds
+    flushed state, so other workers read what the database will return.
+    """
+
+    def __init__(self, max_entries: int = 10000, local_ttl_seconds: float = 5.0,
+                 redis_ttl_seconds: int = 3600, flush_interval_seconds: float = 5.0,
+                 max_conflict_retries: int = 3):
+        self.max_entries = max_entries
+        self.local_ttl_seconds = local_ttl_seconds
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_conflict_retries = max_conflict_retries
+
+        self.redis_client = get_redis_client()
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._session_factory: Optional[Callable[[], AsyncSession]] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+        self.stats = {
+            "local_hits": 0, "redis_hits": 0, "db_loads": 0, "updates": 0,
+            "flushes": 0, "coalesced_updates": 0, "conflicts": 0, "flush_errors": 0
+        }
+
+    # -------------------------------------------------------------------------
+    # Reads
+    # -------------------------------------------------------------------------
+
+    async def get(self, db: AsyncSession, session_id: str) -> Optional[CachedJourneySession]:
+        """Session state from the nearest tier; a private copy the caller may mutate"""
+        entry = await self._load(db, session_id)
+        return entry.state.copy() if entry else None
+
+    async def prime(self, session: Any):
+        """Seed both tiers with a freshly written session"""
+        state = CachedJourneySession.from_row(session)
+        self._store_local(session.session_id, _CacheEntry(state))
+        await self._store_redis(state)
+
+    async def invalidate(self, session_id: str):
+        """Drop clean cached state after an out-of-band write to the row"""
+        entry = self._entries.get(session_id)
+        if entry is not None and not entry.dirty:
+            del self._entries[session_id]
+        await self.redis_client.delete(self._redis_key(session_id))
+
+    # -------------------------------------------------------------------------
+    # Writes
+    # -------------------------------------------------------------------------
+
+    async def apply(self, db: AsyncSession, session_id: str, op: SessionOp,
+                    flush_now: bool = False) -> Optional[CachedJourneySession]:
+        """Apply an update to the cached state and queue it for the coalesced write"""
+        async with self._lock(session_id):
+            entry = await self._load(db, session_id)
+            if entry is None:
+                return None
+
+            before = (entry.state.copy(), list(entry.pending_ops), list(entry.pending_touchpoints), entry.dirty_since)
+            touchpoint = op(entry.state)
+            entry.pending_ops.append(op)
+            if touchpoint:
+                entry.pending_touchpoints.append(touchpoint)
+            if entry.dirty_since is None:
+                entry.dirty_since = time.monotonic()
+            else:
+                self.stats["coalesced_updates"] += 1
+            self.stats["updates"] += 1
+
+            if flush_now or time.monotonic() - entry.dirty_since >= self.flush_interval_seconds:
+                try:
+                    await self._flush_entry(db, session_id, entry)
+                except Exception:
+                    # The caller sees this update fail, so it must not be written later
+                    entry.state, entry.pending_ops, entry.pending_touchpoints, entry.dirty_since = before
+                    raise
+            else:
+                self._ensure_flusher(db)
+
+            return entry.state.copy()
+
+    async def flush(self, db: AsyncSession, session_id: str):
+        """Write a session's queued updates now"""
+        async with self._lock(session_id):
+            entry = self._entries.get(session_id)
+            if entry is not None and entry.dirty:
+                await self._flush_entry(db, session_id, entry)
+
+    async def flush_due(self, db: AsyncSession, force: bool = False) -> int:
+        """Write every session whose oldest queued update is due (or all, with force)"""
+        now = time.monotonic()
+        due = [
+            session_id for session_id, entry in list(self._entries.items())
+            if entry.dirty and (force or now - entry.dirty_since >= self.flush_interval_seconds)
+        ]
+        for session_id in due:
+            try:
+                await self.flush(db, session_id)
+            except Exception as e:
+                logger.error(f"Coalesced flush failed for session {session_id}: {str(e)}")
+        return len(due)
+
+    async def shutdown(self):
+        """Stop the background flusher and write everything still queued"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        if self._session_factory is not None:
+            async with self._session_factory() as db:
+                await self.flush_due(db, force=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "dirty_entries": sum(1 for entry in self._entries.values() if entry.dirty)
+        }
+
+    # -------------------------------------------------------------------------
+    # Internals
+    # -------------------------------------------------------------------------
+
+    async def _load(self, db: AsyncSession, session_id: str) -> Optional[_CacheEntry]:
+        entry = self._entries.get(session_id)
+        if entry is not None and (entry.dirty or time.monotonic() - entry.loaded_at < self.local_ttl_seconds):
+            self._entries.move_to_end(session_id)
+            self.stats["local_hits"] += 1
+            return entry
+
+        cached = await self.redis_client.get(self._redis_key(session_id))
+        if cached:
+            try:
+                state = CachedJourneySession.from_json(cached)
+                self.stats["redis_hits"] += 1
+                return self._store_local(session_id, _CacheEntry(state))
+            except Exception as e:
+                logger.warning(f"Discarding unreadable cached session {session_id}: {str(e)}")
+
+        state = await self._read_row(db, session_id)
+        if state is None:
+            return None
+        self.stats["db_loads"] += 1
+        await self._store_redis(state)
+        return self._store_local(session_id, _CacheEntry(state))
+
+    async def _read_row(self, db: AsyncSession, session_id: str) -> Optional[CachedJourneySession]:
+        result = await db.execute(
+            select(JourneySession)
+            .where(JourneySession.session_id == session_id)
+            .execution_options(populate_existing=True)
+        )
+        row = result.scalar_one_or_none()
+        return CachedJourneySession.from_row(row) if row is not None else None
+
+    async def _flush_entry(self, db: AsyncSession, session_id: str, entry: _CacheEntry):
+        """Version-checked write of the queued ops plus their touchpoints, in one commit"""
+        state = entry.state
+        touchpoints = entry.pending_touchpoints
+
+        for attempt in range(self.max_conflict_retries + 1):
+            expected_version = state.version
+            result = await db.execute(
+                update(JourneySession)
+                .where(and_(
+                    JourneySession.session_id == session_id,
+                    JourneySession.version == expected_version
+                ))
+                .values(
+                    current_stage=state.current_stage,
+                    conversion_probability=state.conversion_probability,
+                    total_touchpoints=state.total_touchpoints,
+                    total_session_time=state.total_session_time,
+                    updated_at=state.updated_at or datetime.utcnow(),
+                    version=expected_version + 1
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+            if result.rowcount:
+                for touchpoint in touchpoints:
+                    db.add(JourneyTouchpoint(**touchpoint))
+                try:
+                    await db.commit()
+                except Exception:
+                    self.stats["flush_errors"] += 1
+                    await db.rollback()
+                    raise
+
+                state.version = expected_version + 1
+                self.stats["flushes"] += 1
+                entry.pending_ops = []
+                entry.pending_touchpoints = []
+                entry.dirty_since = None
+                entry.loaded_at = time.monotonic()
+                entry.state = state
+                await self._store_redis(state)
+                return
+
+            # Someone else wrote the row: replay our queued ops on the current version
+            self.stats["conflicts"] += 1
+            fresh = await self._read_row(db, session_id)
+            if fresh is None:
+                self._entries.pop(session_id, None)
+                raise ValueError(f"Journey session not found: {session_id}")
+
+            touchpoints = []
+            for op in entry.pending_ops:
+                touchpoint = op(fresh)
+                if touchpoint:
+                    touchpoints.append(touchpoint)
+            state = fresh
+            entry.state = fresh
+            entry.pending_touchpoints = touchpoints
+
+        self.stats["flush_errors"] += 1
+        raise RuntimeError(f"Journey session {session_id} kept changing; gave up after "
+                           f"{self.max_conflict_retries} version conflicts")
+
+    def _store_local(self, session_id: str, entry: _CacheEntry) -> _CacheEntry:
+        self._entries[session_id] = entry
+        self._entries.move_to_end(session_id)
+
+        while len(self._entries) > self.max_entries:
+            # Evict the least recently used clean entry; dirty ones wait for their flush
+            victim = next((key for key, candidate in self._entries.items() if not candidate.dirty), None)
+            if victim is None:
+                break
+            del self._entries[victim]
+            lock = self._locks.get(victim)
+            if lock is not None and not lock.locked() and not getattr(lock, "_waiters", None):
+                # A held or awaited lock stays, or a second caller would get a fresh one
+                del self._locks[victim]
+        return entry
+
+    async def _store_redis(self, state: CachedJourneySession):
+        try:
+            await self.redis_client.setex(self._redis_key(state.session_id), self.redis_ttl_seconds, state.to_json())
+        except Exception as e:
+            logger.warning(f"Failed to cache session {state.session_id} in Redis: {str(e)}")
+
+    def _lock(self, session_id: str) -> asyncio.Lock:
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        return lock
+
+    def _ensure_flusher(self, db: AsyncSession):
+        if self._session_factory is None:
+            self._session_factory = session_factory_for(db)
+        if self._session_factory is None or (self._flusher is not None and not self._flusher.done()):
+            return
+        self._flusher = asyncio.ensure_future(self._flush_loop())
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                async with self._session_factory() as db:
+                    await self.flush_due(db)
+            except Exception as e:
+                logger.error(f"Background session flush failed: {str(e)}")
+
+    @staticmethod
+    def _redis_key(session_id: str) -> str:
+        return f"journey_session:{session_id}"
+
+# Process-wide session state cache shared by all JourneySessionService instances
+journey_session_cache = JourneySessionCache(
+    max_entries=int(os.getenv("JOURNEY_SESSION_CACHE_MAX_ENTRIES", "10000")),
+    local_ttl_seconds=float(os.getenv("JOURNEY_SESSION_CACHE_LOCAL_TTL_SECONDS", "5")),
+    redis_ttl_seconds=int(os.getenv("JOURNEY_SESSION_CACHE_REDIS_TTL_SECONDS", "3600")),
+    flush_interval_seconds=float(os.getenv("JOURNEY_SESSION_FLUSH_INTERVAL_SECONDS", "5"))
+)
+
+# Coalesced touchpoints are written before the process exits
+register_shutdown_hook("journey_session_cache", journey_session_cache.shutdown)
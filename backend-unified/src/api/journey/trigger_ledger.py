@@ -0,0 +1,209 @@
+# Scarcity Trigger Ledger for Dynamic Customer Journey Engine
+# Module: 2B - Dynamic Customer Journey Engine
+# Created: 2024-07-04
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ...utils.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Frequency caps count fires within this window (matches the 24h event history)
+DEFAULT_WINDOW_SECONDS = 24 * 3600
+
+# trigger_type -> (cooldown seconds, max fires per window)
+TriggerLimits = Dict[str, Tuple[float, int]]
+
+# =============================================================================
+# SERVER-SIDE SCRIPT
+# =============================================================================
+
+# One hash per session: field = trigger type, value = comma-separated fire
+# timestamps inside the window. Checks every candidate's cooldown and cap and
+# reserves the eligible ones in the same atomic step.
+#
+# KEYS[1] = ledger key
+# ARGV    = now, window, force (0/1), then (type, cooldown, max_frequency) triples
+# Returns the reserved trigger types
+RESERVE_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local force = ARGV[3] == "1"
+local reserved = {}
+
+for i = 4, #ARGV, 3 do
+    local trigger_type = ARGV[i]
+    local cooldown = tonumber(ARGV[i + 1])
+    local max_frequency = tonumber(ARGV[i + 2])
+
+    local fires = {}
+    local last = nil
+    local stored = redis.call("HGET", key, trigger_type)
+    if stored then
+        for value in string.gmatch(stored, "[^,]+") do
+            local fired_at = tonumber(value)
+            if now - fired_at < window then
+                table.insert(fires, fired_at)
+                if last == nil or fired_at > last then
+                    last = fired_at
+                end
+            end
+        end
+    end
+
+    local eligible = force or (#fires < max_frequency and (last == nil or now - last >= cooldown))
+    if eligible then
+        table.insert(fires, now)
+        table.insert(reserved, trigger_type)
+    end
+
+    if #fires > 0 then
+        local parts = {}
+        for _, fired_at in ipairs(fires) do
+            table.insert(parts, string.format("%.3f", fired_at))
+        end
+        redis.call("HSET", key, trigger_type, table.concat(parts, ","))
+    else
+        redis.call("HDEL", key, trigger_type)
+    end
+end
+
+if #reserved > 0 then
+    redis.call("EXPIRE", key, math.ceil(window))
+end
+return reserved
+"""
+
+# Returns an unused reservation (trigger generation failed after reserving)
+RELEASE_SCRIPT = """
+local stored = redis.call("HGET", KEYS[1], ARGV[1])
+if not stored then
+    return 0
+end
+local target = string.format("%.3f", tonumber(ARGV[2]))
+local kept = {}
+local removed = 0
+for value in string.gmatch(stored, "[^,]+") do
+    if removed == 0 and value == target then
+        removed = 1
+    else
+        table.insert(kept, value)
+    end
+end
+if #kept > 0 then
+    redis.call("HSET", KEYS[1], ARGV[1], table.concat(kept, ","))
+else
+    redis.call("HDEL", KEYS[1], ARGV[1])
+end
+return removed
+"""
+
+# =============================================================================
+# TRIGGER LEDGER
+# =============================================================================
+
+class TriggerLedger:
+    """Atomic per-session eligibility check and reservation for scarcity triggers
+
+    With a Redis client that supports scripting, reserve() is one EVALSHA
+    round-trip and concurrent requests for the same session (on any worker)
+    can never both reserve a trigger past its cooldown or frequency cap.
+    Without scripting (the development mock client) an in-process
+    implementation with identical semantics is used instead.
+    """
+
+    def __init__(self, redis_client: Any = None, window_seconds: float = DEFAULT_WINDOW_SECONDS):
+        self.redis_client = redis_client if redis_client is not None else get_redis_client()
+        self.window_seconds = window_seconds
+
+        self._scripted = hasattr(self.redis_client, "register_script")
+        self._reserve_script = None
+        self._release_script = None
+        if self._scripted:
+            self._reserve_script = self.redis_client.register_script(RESERVE_SCRIPT)
+            self._release_script = self.redis_client.register_script(RELEASE_SCRIPT)
+
+        # In-process fallback: ledger key -> trigger type -> fire timestamps
+        self._local: Dict[str, Dict[str, List[float]]] = {}
+        self._local_lock = asyncio.Lock()
+        self._local_pruned_at = time.time()
+
+    async def reserve(self, session_id: str, limits: TriggerLimits, now: Optional[float] = None,
+                      force: bool = False) -> List[str]:
+        """Reserve every trigger type in limits that is off cooldown and under its cap
+
+        force=True records the fires regardless of limits (explicitly applied triggers).
+        """
+        if not limits:
+            return []
+        now = time.time() if now is None else now
+
+        if self._scripted:
+            args: List[Any] = [now, self.window_seconds, 1 if force else 0]
+            for trigger_type, (cooldown, max_frequency) in limits.items():
+                args.extend([trigger_type, cooldown, max_frequency])
+            reserved = await self._reserve_script(keys=[self._key(session_id)], args=args)
+            return [value.decode() if isinstance(value, bytes) else value for value in reserved]
+
+        async with self._local_lock:
+            return self._reserve_local(self._key(session_id), limits, now, force)
+
+    async def release(self, session_id: str, trigger_type: str, reserved_at: float) -> bool:
+        """Give back a reservation that did not turn into a shown trigger"""
+        if self._scripted:
+            removed = await self._release_script(keys=[self._key(session_id)],
+                                                 args=[trigger_type, reserved_at])
+            return bool(removed)
+
+        async with self._local_lock:
+            fires = self._local.get(self._key(session_id), {}).get(trigger_type, [])
+            for index, fired_at in enumerate(fires):
+                if round(fired_at, 3) == round(reserved_at, 3):
+                    del fires[index]
+                    return True
+            return False
+
+    def _reserve_local(self, key: str, limits: TriggerLimits, now: float, force: bool) -> List[str]:
+        if now - self._local_pruned_at > self.window_seconds / 24:
+            self._prune_local(now)
+
+        ledger = self._local.setdefault(key, {})
+        reserved = []
+
+        for trigger_type, (cooldown, max_frequency) in limits.items():
+            fires = [fired_at for fired_at in ledger.get(trigger_type, []) if now - fired_at < self.window_seconds]
+            last = max(fires) if fires else None
+
+            if force or (len(fires) < max_frequency and (last is None or now - last >= cooldown)):
+                fires.append(now)
+                reserved.append(trigger_type)
+
+            if fires:
+                ledger[trigger_type] = fires
+            else:
+                ledger.pop(trigger_type, None)
+
+        if not ledger:
+            self._local.pop(key, None)
+        return reserved
+
+    def _prune_local(self, now: float):
+        """Drop sessions whose fires have all left the window (what EXPIRE does in Redis)"""
+        self._local_pruned_at = now
+        expired = [
+            key for key, ledger in self._local.items()
+            if all(now - fired_at >= self.window_seconds for fires in ledger.values() for fired_at in fires)
+        ]
+        for key in expired:
+            del self._local[key]
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"scarcity_triggers:{session_id}"
+
+# Shared so the in-process fallback sees every engine instance's reservations
+trigger_ledger = TriggerLedger()
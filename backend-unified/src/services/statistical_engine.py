@@ -8,13 +8,18 @@ confidence intervals, power analysis, and early stopping rules.
 """
 
 import numpy as np
-from scipy import stats
-from scipy.stats import beta
 import math
-from typing import Dict, Tuple, Optional, List
+from collections import defaultdict
+from typing import Dict, Tuple, Optional, List, Sequence
 from dataclasses import dataclass
 from enum import Enum
 
+from ..utils.lazy_import import lazy_module
+
+# scipy is imported on first statistical call, not at API startup
+stats = lazy_module("scipy.stats")
+special = lazy_module("scipy.special")
+
 class TestType(str, Enum):
     FREQUENTIST = "frequentist"
     BAYESIAN = "bayesian"
@@ -213,8 +218,8 @@ class StatisticalEngine:
         # Calculate probability that variant is better than control
         # Using Monte Carlo sampling
         n_samples = 10000
-        control_samples = beta.rvs(alpha_control, beta_control, size=n_samples)
-        variant_samples = beta.rvs(alpha_variant, beta_variant, size=n_samples)
+        control_samples = stats.beta.rvs(alpha_control, beta_control, size=n_samples)
+        variant_samples = stats.beta.rvs(alpha_variant, beta_variant, size=n_samples)
         
         prob_variant_better = np.mean(variant_samples > control_samples)
         
@@ -376,69 +381,153 @@ class StatisticalEngine:
         spent_beta = beta * (t - 0.5) / 0.5
         return stats.norm.ppf(spent_beta)
     
-    def meta_analysis(self, test_results: List[Dict]) -> Dict:
-        """Perform meta-analysis across multiple A/B tests"""
+    def meta_analysis(self, test_results: List[Dict], group_by: Optional[str] = None) -> Dict:
+        """
+        Perform meta-analysis across multiple A/B tests
+        
+        Args:
+            test_results: Test results with effect_size and participant counts
+            group_by: Optional result key (e.g. "category"); returns one analysis per group value
+        
+        Returns:
+            Fixed- and random-effects meta-analysis, or {group: analysis} when grouped
+        """
         
         if not test_results:
             return {"error": "No test results provided"}
         
-        # Extract effect sizes and standard errors
-        effect_sizes = []
-        standard_errors = []
-        sample_sizes = []
-        
-        for result in test_results:
-            if 'effect_size' in result and 'control_participants' in result and 'variant_participants' in result:
-                effect_sizes.append(result['effect_size'])
-                
-                # Estimate standard error from sample size
-                n_total = result['control_participants'] + result['variant_participants']
-                se = math.sqrt(2 / n_total)  # Approximate SE for Cohen's h
-                standard_errors.append(se)
-                sample_sizes.append(n_total)
-        
-        if not effect_sizes:
+        valid = [
+            result for result in test_results
+            if 'effect_size' in result and 'control_participants' in result and 'variant_participants' in result
+        ]
+        if not valid:
             return {"error": "No valid effect sizes found"}
         
-        # Fixed-effects meta-analysis
-        weights = [1/se**2 for se in standard_errors]
-        weighted_mean = sum(es * w for es, w in zip(effect_sizes, weights)) / sum(weights)
-        pooled_se = 1 / math.sqrt(sum(weights))
+        effects = np.array([result['effect_size'] for result in valid], dtype=float)
+        sample_sizes = np.array(
+            [result['control_participants'] + result['variant_participants'] for result in valid], dtype=float
+        )
+        groups = [result.get(group_by) for result in valid] if group_by else None
+        
+        # Approximate variance of Cohen's h from the total sample size
+        return self.meta_analysis_arrays(effects, 2 / sample_sizes, sample_sizes, groups)
+    
+    def meta_analysis_arrays(self,
+                             effects: np.ndarray,
+                             variances: np.ndarray,
+                             sample_sizes: Optional[np.ndarray] = None,
+                             groups: Optional[Sequence] = None,
+                             confidence_level: float = 0.95) -> Dict:
+        """
+        Vectorized fixed- and random-effects (DerSimonian-Laird) meta-analysis
+        
+        Args:
+            effects: Effect size per test
+            variances: Sampling variance of each effect size
+            sample_sizes: Optional participants per test (reported as total_sample_size)
+            groups: Optional group label per test; all groups are analyzed in one pass
+            confidence_level: Significance level used for is_significant
         
-        # Test for overall effect
-        z_stat = weighted_mean / pooled_se
-        p_value = 2 * (1 - stats.norm.cdf(abs(z_stat)))
+        Returns:
+            Analysis dictionary, or {group: analysis} when groups are given
+        """
         
-        # Heterogeneity test (Q statistic)
-        q_stat = sum(w * (es - weighted_mean)**2 for es, w in zip(effect_sizes, weights))
-        df = len(effect_sizes) - 1
-        heterogeneity_p = 1 - stats.chi2.cdf(q_stat, df) if df > 0 else 1.0
+        effects = np.asarray(effects, dtype=float)
+        variances = np.asarray(variances, dtype=float)
+        sample_sizes = np.zeros_like(effects) if sample_sizes is None else np.asarray(sample_sizes, dtype=float)
         
-        # I² statistic
-        i_squared = max(0, (q_stat - df) / q_stat) if q_stat > 0 else 0
+        # Tests without a usable variance carry no weight
+        usable = np.isfinite(effects) & np.isfinite(variances) & (variances > 0)
+        if not usable.any():
+            return {"error": "No valid effect sizes found"}
+        effects, variances, sample_sizes = effects[usable], variances[usable], sample_sizes[usable]
         
-        return {
-            "pooled_effect_size": weighted_mean,
-            "standard_error": pooled_se,
-            "z_statistic": z_stat,
-            "p_value": p_value,
-            "is_significant": p_value < 0.05,
-            "heterogeneity": {
-                "q_statistic": q_stat,
-                "p_value": heterogeneity_p,
-                "i_squared": i_squared,
-                "interpretation": "low" if i_squared < 0.25 else "moderate" if i_squared < 0.75 else "high"
-            },
-            "number_of_tests": len(effect_sizes),
-            "total_sample_size": sum(sample_sizes)
-        }
+        if groups is None:
+            labels = [None]
+            index = np.zeros(len(effects), dtype=np.intp)
+        else:
+            labels, index = np.unique(np.asarray(groups, dtype=object)[usable].astype(str), return_inverse=True)
+            labels = [str(label) for label in labels]
+        n_groups = len(labels)
+        
+        def group_sum(values: np.ndarray) -> np.ndarray:
+            return np.bincount(index, weights=values, minlength=n_groups)
+        
+        # Fixed effects: inverse-variance weighting
+        weights = 1 / variances
+        sum_w = group_sum(weights)
+        pooled = group_sum(weights * effects) / sum_w
+        pooled_se = 1 / np.sqrt(sum_w)
+        
+        # Heterogeneity (Cochran's Q)
+        k = np.bincount(index, minlength=n_groups)
+        df = k - 1
+        q_stat = group_sum(weights * (effects - pooled[index]) ** 2)
+        # scipy.special ufuncs: the stats distribution wrappers cost more than the math here
+        heterogeneity_p = np.where(df > 0, special.chdtrc(np.maximum(df, 1), q_stat), 1.0)
+        
+        # I-squared and DerSimonian-Laird between-test variance
+        c = sum_w - group_sum(weights ** 2) / sum_w
+        with np.errstate(divide="ignore", invalid="ignore"):
+            i_squared = np.where(q_stat > 0, np.maximum(0, (q_stat - df) / q_stat), 0.0)
+            tau_squared = np.where(c > 0, np.maximum(0, (q_stat - df) / c), 0.0)
+        re_weights = 1 / (variances + tau_squared[index])
+        re_sum_w = group_sum(re_weights)
+        re_pooled = group_sum(re_weights * effects) / re_sum_w
+        re_se = 1 / np.sqrt(re_sum_w)
+        
+        z_stat = pooled / pooled_se
+        p_value = 2 * special.ndtr(-np.abs(z_stat))
+        re_z_stat = re_pooled / re_se
+        re_p_value = 2 * special.ndtr(-np.abs(re_z_stat))
+        total_sample_size = group_sum(sample_sizes)
+        alpha = self.alpha_levels[confidence_level]
+        
+        results = {}
+        for g, label in enumerate(labels):
+            interpretation = "low" if i_squared[g] < 0.25 else "moderate" if i_squared[g] < 0.75 else "high"
+            results[label] = {
+                "pooled_effect_size": float(pooled[g]),
+                "standard_error": float(pooled_se[g]),
+                "z_statistic": float(z_stat[g]),
+                "p_value": float(p_value[g]),
+                "is_significant": bool(p_value[g] < alpha),
+                "heterogeneity": {
+                    "q_statistic": float(q_stat[g]),
+                    "p_value": float(heterogeneity_p[g]),
+                    "i_squared": float(i_squared[g]),
+                    "interpretation": interpretation
+                },
+                "random_effects": {
+                    "pooled_effect_size": float(re_pooled[g]),
+                    "standard_error": float(re_se[g]),
+                    "z_statistic": float(re_z_stat[g]),
+                    "p_value": float(re_p_value[g]),
+                    "is_significant": bool(re_p_value[g] < alpha),
+                    "tau_squared": float(tau_squared[g])
+                },
+                "number_of_tests": int(k[g]),
+                "total_sample_size": int(total_sample_size[g])
+            }
+        
+        return results[None] if groups is None else results
     
-    def bayesian_meta_analysis(self, test_results: List[Dict]) -> Dict:
-        """Perform Bayesian meta-analysis across multiple A/B tests"""
+    def bayesian_meta_analysis(self, test_results: List[Dict], group_by: Optional[str] = None) -> Dict:
+        """Perform Bayesian meta-analysis across multiple A/B tests (per group value when group_by is set)"""
         
         # Simplified Bayesian meta-analysis
         # In production, use proper hierarchical Bayesian models
         
+        if not group_by:
+            return self._pooled_bayesian_test(test_results)
+        
+        grouped = defaultdict(list)
+        for result in test_results:
+            grouped[str(result.get(group_by))].append(result)
+        
+        return {label: self._pooled_bayesian_test(results) for label, results in grouped.items()}
+    
+    def _pooled_bayesian_test(self, test_results: List[Dict]) -> Dict:
         all_control_conversions = sum(r.get('control_conversions', 0) for r in test_results)
         all_control_participants = sum(r.get('control_participants', 0) for r in test_results)
         all_variant_conversions = sum(r.get('variant_conversions', 0) for r in test_results)
@@ -0,0 +1,41 @@
+"""
+Deferred module imports
+
+Heavy scientific libraries (scipy, sklearn) are only needed once a statistical
+or ML code path actually runs. lazy_module returns a proxy that imports the
+real module on first attribute access, keeping them off the import path of
+API workers at startup.
+"""
+
+import importlib
+import threading
+from types import ModuleType
+from typing import Any, Optional
+
+
+class LazyModule:
+    """Module proxy that imports the target on first attribute access"""
+
+    def __init__(self, module_path: str):
+        self._module_path = module_path
+        self._module: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._module_path)
+        return self._module
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._load(), name)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._module_path} ({state})>"
+
+
+def lazy_module(module_path: str) -> LazyModule:
+    """Proxy for module_path; the import happens on first use"""
+    return LazyModule(module_path)
@@ -9,13 +9,15 @@ import numpy as np
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, precision_score, recall_score
-import joblib
-import pandas as pd
 from ..config import settings
+from .lazy_import import lazy_module
+
+# sklearn/joblib are imported when a model is first built, trained or loaded
+sklearn_ensemble = lazy_module("sklearn.ensemble")
+sklearn_preprocessing = lazy_module("sklearn.preprocessing")
+sklearn_model_selection = lazy_module("sklearn.model_selection")
+sklearn_metrics = lazy_module("sklearn.metrics")
+joblib = lazy_module("joblib")
 
 logger = logging.getLogger(__name__)
 
@@ -62,17 +64,38 @@ class PersonalizationModel:
     """Enhanced ML model for personalization decisions"""
     
     def __init__(self):
-        self.model = GradientBoostingRegressor(
-            n_estimators=100,
-            learning_rate=0.1,
-            max_depth=6,
-            random_state=42
-        )
-        self.feature_scaler = StandardScaler()
+        self._model = None
+        self._feature_scaler = None
         self.label_encoders = {}
         self.is_trained = False
         self.model_version = "v2.0"
         self.performance_metrics = {}
+    
+    @property
+    def model(self):
+        """Gradient boosting regressor, built on first use"""
+        if self._model is None:
+            self._model = sklearn_ensemble.GradientBoostingRegressor(
+                n_estimators=100,
+                learning_rate=0.1,
+                max_depth=6,
+                random_state=42
+            )
+        return self._model
+    
+    @model.setter
+    def model(self, value):
+        self._model = value
+    
+    @property
+    def feature_scaler(self):
+        if self._feature_scaler is None:
+            self._feature_scaler = sklearn_preprocessing.StandardScaler()
+        return self._feature_scaler
+    
+    @feature_scaler.setter
+    def feature_scaler(self, value):
+        self._feature_scaler = value
         
     async def score_variant(self, features: Dict[str, Any], variant_content: Dict[str, Any]) -> float:
         """Score a content variant based on features"""
@@ -127,7 +150,7 @@ class PersonalizationModel:
     def _encode_feature(self, feature_name: str, value: str) -> float:
         """Encode categorical feature"""
         if feature_name not in self.label_encoders:
-            self.label_encoders[feature_name] = LabelEncoder()
+            self.label_encoders[feature_name] = sklearn_preprocessing.LabelEncoder()
             # Fit with common values
             common_values = {
                 'persona_type': ['TechEarlyAdopter', 'RemoteDad', 'StudentHustler', 'BusinessOwner'],
@@ -195,7 +218,7 @@ class PersonalizationModel:
             y = np.array(y)
             
             # Split data
-            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+            X_train, X_test, y_train, y_test = sklearn_model_selection.train_test_split(X, y, test_size=0.2, random_state=42)
             
             # Scale features
             X_train_scaled = self.feature_scaler.fit_transform(X_train)
@@ -258,15 +281,36 @@ class RecommendationEngine:
     """Enhanced recommendation engine for personalization"""
     
     def __init__(self):
-        self.model = RandomForestClassifier(
-            n_estimators=100,
-            max_depth=10,
-            random_state=42
-        )
-        self.feature_scaler = StandardScaler()
+        self._model = None
+        self._feature_scaler = None
         self.label_encoders = {}
         self.is_trained = False
         self.recommendation_patterns = {}
+    
+    @property
+    def model(self):
+        """Random forest classifier, built on first use"""
+        if self._model is None:
+            self._model = sklearn_ensemble.RandomForestClassifier(
+                n_estimators=100,
+                max_depth=10,
+                random_state=42
+            )
+        return self._model
+    
+    @model.setter
+    def model(self, value):
+        self._model = value
+    
+    @property
+    def feature_scaler(self):
+        if self._feature_scaler is None:
+            self._feature_scaler = sklearn_preprocessing.StandardScaler()
+        return self._feature_scaler
+    
+    @feature_scaler.setter
+    def feature_scaler(self, value):
+        self._feature_scaler = value
         
     async def score_recommendation(self, session_features: Dict[str, Any], recommendation: Dict[str, Any]) -> float:
         """Score a recommendation based on session context"""
@@ -315,7 +359,7 @@ class RecommendationEngine:
     def _encode_feature(self, feature_name: str, value: str) -> float:
         """Encode categorical feature for recommendations"""
         if feature_name not in self.label_encoders:
-            self.label_encoders[feature_name] = LabelEncoder()
+            self.label_encoders[feature_name] = sklearn_preprocessing.LabelEncoder()
             # Fit with common values
             common_values = {
                 'persona_type': ['TechEarlyAdopter', 'RemoteDad', 'StudentHustler', 'BusinessOwner'],
@@ -384,7 +428,7 @@ class RecommendationEngine:
             y = np.array(y)
             
             # Split data
-            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+            X_train, X_test, y_train, y_test = sklearn_model_selection.train_test_split(X, y, test_size=0.2, random_state=42)
             
             # Scale features
             X_train_scaled = self.feature_scaler.fit_transform(X_train)
@@ -395,7 +439,7 @@ class RecommendationEngine:
             
             # Evaluate model
             y_pred = self.model.predict(X_test_scaled)
-            accuracy = accuracy_score(y_test, y_pred)
+            accuracy = sklearn_metrics.accuracy_score(y_test, y_pred)
             
             self.is_trained = True
             logger.info(f"Recommendation model trained successfully. Accuracy: {accuracy:.4f}")
@@ -3,58 +3,810 @@
 # Created: 2025-07-04
 
 import asyncio
-import json
+import bisect
+import fnmatch
 import logging
-from typing import Optional, Any
-from unittest.mock import AsyncMock
+import math
+import os
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
-class MockRedisClient:
-    """Mock Redis client for development/testing"""
-    
+class ResponseError(Exception):
+    """Command error, mirroring redis.exceptions.ResponseError"""
+
+WRONGTYPE = "WRONGTYPE Operation against a key holding the wrong kind of value"
+
+# =============================================================================
+# EXPIRY WHEEL
+# =============================================================================
+
+class ExpiryWheel:
+    """Hashed timing wheel for key deadlines
+
+    Scheduling and cancelling are O(1). advance() visits only the slots whose
+    ticks have passed since the last call; keys due in a later rotation stay
+    in their slot until then.
+    """
+
+    def __init__(self, slots: int = 512, tick_seconds: float = 0.1):
+        self.tick_seconds = tick_seconds
+        self._slots: List[Set[str]] = [set() for _ in range(slots)]
+        self._deadlines: Dict[str, float] = {}
+        self._tick = math.floor(time.time() / tick_seconds)
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def deadline(self, key: str) -> Optional[float]:
+        return self._deadlines.get(key)
+
+    def schedule(self, key: str, deadline: float):
+        self.cancel(key)
+        self._deadlines[key] = deadline
+        self._slots[self._slot(deadline)].add(key)
+
+    def cancel(self, key: str):
+        deadline = self._deadlines.pop(key, None)
+        if deadline is not None:
+            self._slots[self._slot(deadline)].discard(key)
+
+    def advance(self, now: float) -> List[str]:
+        """Remove and return the keys whose deadline has passed"""
+        now_tick = math.floor(now / self.tick_seconds)
+        if now_tick <= self._tick:
+            return []
+
+        ticks = min(now_tick - self._tick, len(self._slots))
+        expired = []
+        for offset in range(1, ticks + 1):
+            slot = self._slots[(self._tick + offset) % len(self._slots)]
+            due = [key for key in slot if self._deadlines[key] <= now]
+            for key in due:
+                slot.discard(key)
+                del self._deadlines[key]
+            expired.extend(due)
+        self._tick = now_tick
+        return expired
+
+    def _slot(self, deadline: float) -> int:
+        return math.ceil(deadline / self.tick_seconds) % len(self._slots)
+
+# =============================================================================
+# SORTED SET
+# =============================================================================
+
+class _SortedSet:
+    __slots__ = ("scores", "ordered")
+
     def __init__(self):
-        self.data = {}
-        self.expiry = {}
-    
-    async def get(self, key: str) -> Optional[str]:
-        """Get value by key"""
-        if key in self.expiry:
-            import time
-            if time.time() > self.expiry[key]:
-                del self.data[key]
-                del self.expiry[key]
-                return None
-        return self.data.get(key)
-    
-    async def set(self, key: str, value: str) -> bool:
-        """Set key-value pair"""
-        self.data[key] = value
-        return True
-    
-    async def setex(self, key: str, ttl: int, value: str) -> bool:
-        """Set key-value pair with expiry"""
-        import time
-        self.data[key] = value
-        self.expiry[key] = time.time() + ttl
-        return True
-    
-    async def delete(self, key: str) -> int:
-        """Delete key"""
-        if key in self.data:
-            del self.data[key]
-            if key in self.expiry:
-                del self.expiry[key]
-            return 1
-        return 0
-    
-    async def exists(self, key: str) -> bool:
-        """Check if key exists"""
+        self.scores: Dict[str, float] = {}
+        self.ordered: List[Tuple[float, str]] = []
+
+    def add(self, member: str, score: float) -> bool:
+        previous = self.scores.get(member)
+        if previous is not None:
+            self.ordered.pop(bisect.bisect_left(self.ordered, (previous, member)))
+        self.scores[member] = score
+        bisect.insort(self.ordered, (score, member))
+        return previous is None
+
+    def remove(self, member: str) -> bool:
+        score = self.scores.pop(member, None)
+        if score is None:
+            return False
+        self.ordered.pop(bisect.bisect_left(self.ordered, (score, member)))
+        return True
+
+    def range_by_score(self, minimum: float, maximum: float) -> List[Tuple[float, str]]:
+        low = bisect.bisect_left(self.ordered, (minimum, ""))
+        return [entry for entry in self.ordered[low:] if entry[0] <= maximum]
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+# =============================================================================
+# KEYSPACE
+# =============================================================================
+
+class _Keyspace:
+    """Synchronous command implementations; one command runs at a time"""
+
+    def __init__(self, wheel: ExpiryWheel):
+        self.data: Dict[str, Any] = {}
+        self.wheel = wheel
+        self.channels: Dict[str, Set["InMemoryPubSub"]] = {}
+        self.patterns: Dict[str, Set["InMemoryPubSub"]] = {}
+
+    # -- housekeeping ----------------------------------------------------------
+
+    def expire_due(self, now: float):
+        for key in self.wheel.advance(now):
+            self.data.pop(key, None)
+
+    def _live(self, key: str) -> bool:
+        deadline = self.wheel.deadline(key)
+        if deadline is not None and deadline <= time.time():
+            self.wheel.cancel(key)
+            self.data.pop(key, None)
+            return False
         return key in self.data
 
-# Global mock Redis client instance
-_redis_client = MockRedisClient()
+    def _fetch(self, key: str, kind: type, create: bool = False) -> Any:
+        if not self._live(key):
+            if not create:
+                return None
+            self.data[key] = kind()
+        value = self.data[key]
+        if not isinstance(value, kind):
+            raise ResponseError(WRONGTYPE)
+        return value
+
+    def _drop_if_empty(self, key: str, value: Any):
+        if not value:
+            self.data.pop(key, None)
+            self.wheel.cancel(key)
+
+    # -- keys ------------------------------------------------------------------
+
+    def ping(self) -> bool:
+        return True
+
+    def delete(self, *names: str) -> int:
+        removed = 0
+        for name in names:
+            if self._live(name):
+                del self.data[name]
+                removed += 1
+            self.wheel.cancel(name)
+        return removed
+
+    unlink = delete
+
+    def exists(self, *names: str) -> int:
+        return sum(1 for name in names if self._live(name))
+
+    def expire(self, name: str, time_: Union[int, float, timedelta]) -> bool:
+        return self.pexpire(name, _seconds(time_) * 1000)
+
+    def pexpire(self, name: str, time_: Union[int, float, timedelta]) -> bool:
+        if not self._live(name):
+            return False
+        milliseconds = _seconds(time_) * 1000 if isinstance(time_, timedelta) else time_
+        if milliseconds <= 0:
+            self.delete(name)
+        else:
+            self.wheel.schedule(name, time.time() + milliseconds / 1000)
+        return True
+
+    def expireat(self, name: str, when: float) -> bool:
+        return self.expire(name, when - time.time())
+
+    def persist(self, name: str) -> bool:
+        if not self._live(name) or self.wheel.deadline(name) is None:
+            return False
+        self.wheel.cancel(name)
+        return True
+
+    def ttl(self, name: str) -> int:
+        remaining = self.pttl(name)
+        return remaining if remaining < 0 else math.ceil(remaining / 1000)
+
+    def pttl(self, name: str) -> int:
+        if not self._live(name):
+            return -2
+        deadline = self.wheel.deadline(name)
+        return -1 if deadline is None else max(0, int((deadline - time.time()) * 1000))
+
+    def keys(self, pattern: str = "*") -> List[str]:
+        return [key for key in list(self.data) if self._live(key) and fnmatch.fnmatchcase(key, pattern)]
+
+    def type(self, name: str) -> str:
+        if not self._live(name):
+            return "none"
+        return {str: "string", deque: "list", set: "set", dict: "hash", _SortedSet: "zset"}[type(self.data[name])]
+
+    def dbsize(self) -> int:
+        return len(self.data)
+
+    def flushdb(self) -> bool:
+        self.data.clear()
+        for key in list(self.wheel._deadlines):
+            self.wheel.cancel(key)
+        return True
+
+    flushall = flushdb
+
+    # -- strings ---------------------------------------------------------------
+
+    def get(self, name: str) -> Optional[str]:
+        return self._fetch(name, str)
+
+    def set(self, name: str, value: Any, ex: Any = None, px: Any = None,
+            nx: bool = False, xx: bool = False, keepttl: bool = False) -> Optional[bool]:
+        exists = self._live(name)
+        if (nx and exists) or (xx and not exists):
+            return None
+        self.data[name] = _encode(value)
+        if ex is not None:
+            self.wheel.schedule(name, time.time() + _seconds(ex))
+        elif px is not None:
+            self.wheel.schedule(name, time.time() + (_seconds(px) if isinstance(px, timedelta) else px / 1000))
+        elif not keepttl:
+            self.wheel.cancel(name)
+        return True
+
+    def setex(self, name: str, time_: Any, value: Any) -> bool:
+        return self.set(name, value, ex=time_)
+
+    def psetex(self, name: str, time_ms: Any, value: Any) -> bool:
+        return self.set(name, value, px=time_ms)
+
+    def setnx(self, name: str, value: Any) -> bool:
+        return bool(self.set(name, value, nx=True))
+
+    def getdel(self, name: str) -> Optional[str]:
+        value = self.get(name)
+        if value is not None:
+            self.delete(name)
+        return value
+
+    def mget(self, keys: Union[str, Iterable[str]], *args: str) -> List[Optional[str]]:
+        names = [keys, *args] if isinstance(keys, str) else [*keys, *args]
+        return [self.get(name) for name in names]
+
+    def mset(self, mapping: Dict[str, Any]) -> bool:
+        for name, value in mapping.items():
+            self.set(name, value)
+        return True
+
+    def incrby(self, name: str, amount: int = 1) -> int:
+        current = self._fetch(name, str)
+        try:
+            value = int(current or 0) + int(amount)
+        except ValueError:
+            raise ResponseError("value is not an integer or out of range")
+        self.data[name] = str(value)
+        return value
+
+    def incr(self, name: str, amount: int = 1) -> int:
+        return self.incrby(name, amount)
+
+    def decrby(self, name: str, amount: int = 1) -> int:
+        return self.incrby(name, -amount)
+
+    def decr(self, name: str, amount: int = 1) -> int:
+        return self.incrby(name, -amount)
+
+    def incrbyfloat(self, name: str, amount: float = 1.0) -> float:
+        current = self._fetch(name, str)
+        try:
+            value = float(current or 0) + float(amount)
+        except ValueError:
+            raise ResponseError("value is not a valid float")
+        self.data[name] = _encode(value)
+        return value
+
+    # -- lists -----------------------------------------------------------------
+
+    def lpush(self, name: str, *values: Any) -> int:
+        items = self._fetch(name, deque, create=True)
+        items.extendleft(_encode(value) for value in values)
+        return len(items)
+
+    def rpush(self, name: str, *values: Any) -> int:
+        items = self._fetch(name, deque, create=True)
+        items.extend(_encode(value) for value in values)
+        return len(items)
+
+    def lpop(self, name: str) -> Optional[str]:
+        items = self._fetch(name, deque)
+        if not items:
+            return None
+        value = items.popleft()
+        self._drop_if_empty(name, items)
+        return value
+
+    def rpop(self, name: str) -> Optional[str]:
+        items = self._fetch(name, deque)
+        if not items:
+            return None
+        value = items.pop()
+        self._drop_if_empty(name, items)
+        return value
+
+    def lrange(self, name: str, start: int, end: int) -> List[str]:
+        items = self._fetch(name, deque)
+        if not items:
+            return []
+        start, stop = _bounds(start, end, len(items))
+        return [items[index] for index in range(start, stop)]
+
+    def ltrim(self, name: str, start: int, end: int) -> bool:
+        items = self._fetch(name, deque)
+        if items:
+            start, stop = _bounds(start, end, len(items))
+            self.data[name] = deque(items[index] for index in range(start, stop))
+            self._drop_if_empty(name, self.data[name])
+        return True
+
+    def llen(self, name: str) -> int:
+        items = self._fetch(name, deque)
+        return len(items) if items else 0
+
+    # -- sets ------------------------------------------------------------------
+
+    def sadd(self, name: str, *values: Any) -> int:
+        members = self._fetch(name, set, create=True)
+        before = len(members)
+        members.update(_encode(value) for value in values)
+        return len(members) - before
+
+    def srem(self, name: str, *values: Any) -> int:
+        members = self._fetch(name, set)
+        if not members:
+            return 0
+        before = len(members)
+        members.difference_update(_encode(value) for value in values)
+        self._drop_if_empty(name, members)
+        return before - len(members)
+
+    def smembers(self, name: str) -> Set[str]:
+        return set(self._fetch(name, set) or ())
+
+    def sismember(self, name: str, value: Any) -> bool:
+        return _encode(value) in (self._fetch(name, set) or ())
+
+    def scard(self, name: str) -> int:
+        return len(self._fetch(name, set) or ())
+
+    # -- hashes ----------------------------------------------------------------
+
+    def hset(self, name: str, key: Optional[str] = None, value: Any = None,
+             mapping: Optional[Dict[str, Any]] = None, items: Optional[List[Any]] = None) -> int:
+        fields = self._fetch(name, dict, create=True)
+        pairs = list((mapping or {}).items())
+        if key is not None:
+            pairs.append((key, value))
+        if items:
+            pairs.extend(zip(items[::2], items[1::2]))
+        added = 0
+        for field, field_value in pairs:
+            added += field not in fields
+            fields[field] = _encode(field_value)
+        self._drop_if_empty(name, fields)
+        return added
+
+    def hsetnx(self, name: str, key: str, value: Any) -> bool:
+        fields = self._fetch(name, dict, create=True)
+        if key in fields:
+            return False
+        fields[key] = _encode(value)
+        return True
+
+    def hget(self, name: str, key: str) -> Optional[str]:
+        return (self._fetch(name, dict) or {}).get(key)
+
+    def hmget(self, name: str, keys: Union[str, Iterable[str]], *args: str) -> List[Optional[str]]:
+        fields = self._fetch(name, dict) or {}
+        names = [keys, *args] if isinstance(keys, str) else [*keys, *args]
+        return [fields.get(field) for field in names]
+
+    def hgetall(self, name: str) -> Dict[str, str]:
+        return dict(self._fetch(name, dict) or {})
+
+    def hdel(self, name: str, *keys: str) -> int:
+        fields = self._fetch(name, dict)
+        if not fields:
+            return 0
+        removed = sum(1 for key in keys if fields.pop(key, None) is not None)
+        self._drop_if_empty(name, fields)
+        return removed
+
+    def hexists(self, name: str, key: str) -> bool:
+        return key in (self._fetch(name, dict) or {})
+
+    def hlen(self, name: str) -> int:
+        return len(self._fetch(name, dict) or {})
+
+    def hkeys(self, name: str) -> List[str]:
+        return list(self._fetch(name, dict) or {})
+
+    def hvals(self, name: str) -> List[str]:
+        return list((self._fetch(name, dict) or {}).values())
+
+    def hincrby(self, name: str, key: str, amount: int = 1) -> int:
+        fields = self._fetch(name, dict, create=True)
+        try:
+            value = int(fields.get(key, 0)) + int(amount)
+        except ValueError:
+            raise ResponseError("hash value is not an integer")
+        fields[key] = str(value)
+        return value
+
+    def hincrbyfloat(self, name: str, key: str, amount: float = 1.0) -> float:
+        fields = self._fetch(name, dict, create=True)
+        try:
+            value = float(fields.get(key, 0)) + float(amount)
+        except ValueError:
+            raise ResponseError("hash value is not a float")
+        fields[key] = _encode(value)
+        return value
+
+    # -- sorted sets -----------------------------------------------------------
+
+    def zadd(self, name: str, mapping: Dict[str, float], nx: bool = False, xx: bool = False,
+             ch: bool = False, incr: bool = False) -> Union[int, float, None]:
+        zset = self._fetch(name, _SortedSet, create=True)
+        if incr:
+            (member, amount), = mapping.items()
+            if (nx and member in zset.scores) or (xx and member not in zset.scores):
+                self._drop_if_empty(name, zset)
+                return None
+            return self.zincrby(name, amount, member)
+
+        changed = 0
+        for member, score in mapping.items():
+            member = _encode(member)
+            exists = member in zset.scores
+            if (nx and exists) or (xx and not exists):
+                continue
+            if not exists or (ch and zset.scores[member] != float(score)):
+                changed += 1
+            zset.add(member, float(score))
+        self._drop_if_empty(name, zset)
+        return changed
+
+    def zincrby(self, name: str, amount: float, value: Any) -> float:
+        zset = self._fetch(name, _SortedSet, create=True)
+        member = _encode(value)
+        score = zset.scores.get(member, 0.0) + float(amount)
+        zset.add(member, score)
+        return score
+
+    def zrem(self, name: str, *values: Any) -> int:
+        zset = self._fetch(name, _SortedSet)
+        if not zset:
+            return 0
+        removed = sum(1 for value in values if zset.remove(_encode(value)))
+        self._drop_if_empty(name, zset)
+        return removed
+
+    def zscore(self, name: str, value: Any) -> Optional[float]:
+        zset = self._fetch(name, _SortedSet)
+        return zset.scores.get(_encode(value)) if zset else None
+
+    def zcard(self, name: str) -> int:
+        return len(self._fetch(name, _SortedSet) or ())
+
+    def zcount(self, name: str, min: Any, max: Any) -> int:
+        zset = self._fetch(name, _SortedSet)
+        return len(zset.range_by_score(_score(min), _score(max, upper=True))) if zset else 0
+
+    def zrange(self, name: str, start: int, end: int, desc: bool = False,
+               withscores: bool = False, score_cast_func: Callable = float) -> List[Any]:
+        zset = self._fetch(name, _SortedSet)
+        if not zset:
+            return []
+        ordered = zset.ordered[::-1] if desc else zset.ordered
+        start, stop = _bounds(start, end, len(ordered))
+        return _members(ordered[start:stop], withscores, score_cast_func)
+
+    def zrevrange(self, name: str, start: int, end: int, withscores: bool = False,
+                  score_cast_func: Callable = float) -> List[Any]:
+        return self.zrange(name, start, end, desc=True, withscores=withscores, score_cast_func=score_cast_func)
+
+    def zrangebyscore(self, name: str, min: Any, max: Any, start: Optional[int] = None,
+                      num: Optional[int] = None, withscores: bool = False,
+                      score_cast_func: Callable = float) -> List[Any]:
+        zset = self._fetch(name, _SortedSet)
+        if not zset:
+            return []
+        entries = zset.range_by_score(_score(min), _score(max, upper=True))
+        if start is not None and num is not None:
+            entries = entries[start:start + num] if num >= 0 else entries[start:]
+        return _members(entries, withscores, score_cast_func)
+
+    def zrevrangebyscore(self, name: str, max: Any, min: Any, start: Optional[int] = None,
+                         num: Optional[int] = None, withscores: bool = False,
+                         score_cast_func: Callable = float) -> List[Any]:
+        zset = self._fetch(name, _SortedSet)
+        if not zset:
+            return []
+        entries = zset.range_by_score(_score(min), _score(max, upper=True))[::-1]
+        if start is not None and num is not None:
+            entries = entries[start:start + num] if num >= 0 else entries[start:]
+        return _members(entries, withscores, score_cast_func)
+
+    def zremrangebyscore(self, name: str, min: Any, max: Any) -> int:
+        zset = self._fetch(name, _SortedSet)
+        if not zset:
+            return 0
+        entries = zset.range_by_score(_score(min), _score(max, upper=True))
+        for _, member in entries:
+            zset.remove(member)
+        self._drop_if_empty(name, zset)
+        return len(entries)
+
+    # -- pub/sub ---------------------------------------------------------------
+
+    def publish(self, channel: str, message: Any) -> int:
+        message = _encode(message)
+        receivers = 0
+        for subscriber in self.channels.get(channel, ()):
+            subscriber._deliver({"type": "message", "pattern": None, "channel": channel, "data": message})
+            receivers += 1
+        for pattern, subscribers in self.patterns.items():
+            if fnmatch.fnmatchcase(channel, pattern):
+                for subscriber in subscribers:
+                    subscriber._deliver({"type": "pmessage", "pattern": pattern, "channel": channel, "data": message})
+                    receivers += 1
+        return receivers
+
+# Commands exposed on the client and queueable on pipelines
+COMMANDS = frozenset(
+    name for name, member in vars(_Keyspace).items()
+    if callable(member) and not name.startswith("_") and name != "expire_due"
+)
+
+# =============================================================================
+# PUB/SUB
+# =============================================================================
+
+class InMemoryPubSub:
+    """Subscription handle with redis-py's PubSub interface"""
+
+    def __init__(self, client: "InMemoryRedis"):
+        self.client = client
+        self.channels: Set[str] = set()
+        self.patterns: Set[str] = set()
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+    @property
+    def subscribed(self) -> bool:
+        return bool(self.channels or self.patterns)
+
+    async def subscribe(self, *channels: str):
+        with self.client._lock:
+            for channel in channels:
+                self.client._keyspace.channels.setdefault(channel, set()).add(self)
+                self.channels.add(channel)
+                self._deliver({"type": "subscribe", "pattern": None, "channel": channel, "data": len(self.channels)})
+
+    async def psubscribe(self, *patterns: str):
+        with self.client._lock:
+            for pattern in patterns:
+                self.client._keyspace.patterns.setdefault(pattern, set()).add(self)
+                self.patterns.add(pattern)
+                self._deliver({"type": "psubscribe", "pattern": None, "channel": pattern, "data": len(self.patterns)})
+
+    async def unsubscribe(self, *channels: str):
+        with self.client._lock:
+            for channel in channels or list(self.channels):
+                self._detach(self.client._keyspace.channels, channel)
+                self.channels.discard(channel)
+                self._deliver({"type": "unsubscribe", "pattern": None, "channel": channel, "data": len(self.channels)})
+
+    async def punsubscribe(self, *patterns: str):
+        with self.client._lock:
+            for pattern in patterns or list(self.patterns):
+                self._detach(self.client._keyspace.patterns, pattern)
+                self.patterns.discard(pattern)
+                self._deliver({"type": "punsubscribe", "pattern": None, "channel": pattern, "data": len(self.patterns)})
+
+    async def get_message(self, ignore_subscribe_messages: bool = False,
+                          timeout: Optional[float] = 0.0) -> Optional[Dict[str, Any]]:
+        """Next message, waiting up to timeout seconds (None waits indefinitely)"""
+        while True:
+            try:
+                if timeout == 0:
+                    message = self._queue.get_nowait()
+                else:
+                    message = await asyncio.wait_for(self._queue.get(), timeout)
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                return None
+            if ignore_subscribe_messages and message["type"] not in ("message", "pmessage"):
+                continue
+            return message
+
+    async def listen(self):
+        while self.subscribed or not self._queue.empty():
+            yield await self._queue.get()
+
+    async def close(self):
+        await self.unsubscribe()
+        await self.punsubscribe()
+
+    aclose = close
+    reset = close
+
+    async def __aenter__(self) -> "InMemoryPubSub":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _deliver(self, message: Dict[str, Any]):
+        self._queue.put_nowait(message)
+
+    def _detach(self, registry: Dict[str, Set["InMemoryPubSub"]], name: str):
+        subscribers = registry.get(name)
+        if subscribers is not None:
+            subscribers.discard(self)
+            if not subscribers:
+                del registry[name]
+
+# =============================================================================
+# PIPELINE
+# =============================================================================
+
+class InMemoryPipeline:
+    """Queues commands and runs them back to back in execute()
+
+    The batch runs under the client lock, so like MULTI/EXEC no other command
+    interleaves with it.
+    """
+
+    def __init__(self, client: "InMemoryRedis", transaction: bool = True):
+        self.client = client
+        self.transaction = transaction
+        self._queue: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        if name not in COMMANDS:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        def queue(*args, **kwargs) -> "InMemoryPipeline":
+            self._queue.append((name, args, kwargs))
+            return self
+        return queue
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    async def execute(self, raise_on_error: bool = True) -> List[Any]:
+        queued, self._queue = self._queue, []
+        results: List[Any] = []
+        with self.client._lock:
+            self.client._keyspace.expire_due(time.time())
+            for name, args, kwargs in queued:
+                try:
+                    results.append(getattr(self.client._keyspace, name)(*args, **kwargs))
+                except ResponseError as e:
+                    results.append(e)
+        self.client.stats["pipelines"] += 1
+        self.client.stats["commands"] += len(queued)
+
+        if raise_on_error:
+            for result in results:
+                if isinstance(result, ResponseError):
+                    raise result
+        return results
+
+    def reset(self):
+        self._queue = []
+
+    async def __aenter__(self) -> "InMemoryPipeline":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.reset()
+
+# =============================================================================
+# CLIENT
+# =============================================================================
+
+class InMemoryRedis:
+    """In-process Redis stand-in for single-node deployments, tests and benchmarks
+
+    Implements the asyncio redis-py interface for the command subset the
+    services use: strings and counters, expiry, lists, sets, hashes, sorted
+    sets, pub/sub and pipelines. Values are stored and returned as str (as
+    with decode_responses=True). Expired keys are reclaimed actively by an
+    expiry wheel advanced on every command, and lazily on access. Lua
+    scripting is not available; callers check for register_script and use
+    their in-process path instead.
+    """
+
+    def __init__(self, expiry_slots: int = 512, expiry_tick_seconds: float = 0.1):
+        self._keyspace = _Keyspace(ExpiryWheel(expiry_slots, expiry_tick_seconds))
+        self._lock = threading.RLock()
+        self.stats = {"commands": 0, "pipelines": 0}
+
+    def __getattr__(self, name: str):
+        if name not in COMMANDS:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        async def command(*args, **kwargs):
+            with self._lock:
+                self._keyspace.expire_due(time.time())
+                self.stats["commands"] += 1
+                return getattr(self._keyspace, name)(*args, **kwargs)
+        command.__name__ = name
+        return command
+
+    def pipeline(self, transaction: bool = True) -> InMemoryPipeline:
+        return InMemoryPipeline(self, transaction)
+
+    def pubsub(self) -> InMemoryPubSub:
+        return InMemoryPubSub(self)
+
+    async def close(self):
+        return None
+
+    aclose = close
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "keys": len(self._keyspace.data),
+                "keys_with_ttl": len(self._keyspace.wheel),
+                "channels": len(self._keyspace.channels)
+            }
+
+# Kept for code that still refers to the old development client
+MockRedisClient = InMemoryRedis
+
+def _encode(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bytes):
+        return value.decode()
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+def _seconds(value: Union[int, float, timedelta]) -> float:
+    return value.total_seconds() if isinstance(value, timedelta) else float(value)
+
+def _score(value: Any, upper: bool = False) -> float:
+    """Score bound, accepting redis-style '-inf', '+inf' and '(' exclusive prefixes"""
+    if isinstance(value, str):
+        if value.startswith("("):
+            return math.nextafter(float(value[1:]), -math.inf if upper else math.inf)
+        return float(value.replace("+inf", "inf"))
+    return float(value)
+
+def _bounds(start: int, end: int, length: int) -> Tuple[int, int]:
+    """Redis inclusive (possibly negative) indexes to a Python range"""
+    if start < 0:
+        start = max(length + start, 0)
+    if end < 0:
+        end = length + end
+    return min(start, length), max(min(end + 1, length), 0)
+
+def _members(entries: List[Tuple[float, str]], withscores: bool, score_cast_func: Callable) -> List[Any]:
+    if withscores:
+        return [(member, score_cast_func(score)) for score, member in entries]
+    return [member for _, member in entries]
+
+# =============================================================================
+# CLIENT FACTORY
+# =============================================================================
+
+def redis_from_url(url: str, **kwargs) -> Any:
+    """redis.asyncio client for redis:// URLs, the in-process backend for memory://"""
+    if url.startswith("memory://"):
+        return _redis_client
+    import redis.asyncio as redis
+    return redis.from_url(url, **kwargs)
+
+# Shared in-process backend
+_redis_client = InMemoryRedis()
+_shared_client: Optional[Any] = None
 
 def get_redis_client():
-    """Get Redis client instance"""
-    return _redis_client
\ No newline at end of file
+    """Get Redis client instance (REDIS_BACKEND_URL selects a server, default in-process)"""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = redis_from_url(
+            os.getenv("REDIS_BACKEND_URL", "memory://"),
+            encoding="utf-8",
+            decode_responses=True
+        )
+    return _shared_client
@@ -0,0 +1,28 @@
+"""
+Shutdown hooks
+
+Flush callbacks of process-wide write buffers, registered by the modules that
+own them and run once from the app's shutdown. utils.startup re-exports both
+functions for the entry points and services outside the src package.
+"""
+
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+_shutdown_hooks: Dict[str, Callable[[], Awaitable[Any]]] = {}
+
+
+def register_shutdown_hook(name: str, hook: Callable[[], Awaitable[Any]]):
+    """Run hook from the app's shutdown; registering a name again replaces its hook"""
+    _shutdown_hooks[name] = hook
+
+
+async def run_shutdown_hooks():
+    """Run every registered shutdown hook; one failing does not stop the others"""
+    for name, hook in list(_shutdown_hooks.items()):
+        try:
+            await hook()
+        except Exception as e:
+            logger.error(f"Shutdown hook {name} failed: {e}")
@@ -0,0 +1,68 @@
+"""
+SQL time buckets
+
+Truncates timestamps to minute/hour/day buckets inside the database so
+time-series queries GROUP BY the bucket instead of returning raw rows.
+PostgreSQL truncates the UTC wall clock of timestamptz columns with
+date_trunc; SQLite (local and test databases) stores UTC text, which
+strftime truncates. Bucket starts come back as naive UTC datetimes, like
+the datetime.utcnow() bounds the journey services query with.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import func, literal_column
+from sqlalchemy.ext.asyncio import AsyncSession
+
+BUCKET_WIDTHS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1)
+}
+
+_SQLITE_FORMATS = {
+    "minute": "%Y-%m-%d %H:%M:00",
+    "hour": "%Y-%m-%d %H:00:00",
+    "day": "%Y-%m-%d 00:00:00"
+}
+
+
+def dialect_name(db: AsyncSession) -> str:
+    return db.get_bind().dialect.name
+
+
+def time_bucket(column: Any, unit: str, dialect: str) -> Any:
+    """SQL expression for the start of the `unit` bucket containing a timestamptz column"""
+    if unit not in BUCKET_WIDTHS:
+        raise ValueError(f"Unsupported time bucket: {unit}")
+
+    # Literal (not bound) arguments so the same expression can appear in SELECT and GROUP BY
+    if dialect == "sqlite":
+        return func.strftime(literal_column(f"'{_SQLITE_FORMATS[unit]}'"), column)
+    return func.date_trunc(literal_column(f"'{unit}'"), func.timezone(literal_column("'UTC'"), column))
+
+
+def bucket_start(value: Any) -> datetime:
+    """Naive UTC datetime for a time_bucket() value or a stored timestamp"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def floor_time(moment: datetime, unit: str) -> datetime:
+    """Start of the `unit` bucket containing a naive UTC datetime"""
+    moment = bucket_start(moment).replace(second=0, microsecond=0)
+    if unit in ("hour", "day"):
+        moment = moment.replace(minute=0)
+    if unit == "day":
+        moment = moment.replace(hour=0)
+    return moment
+
+
+def ceil_time(moment: datetime, unit: str) -> datetime:
+    """First bucket boundary at or after a naive UTC datetime"""
+    floor = floor_time(moment, unit)
+    return floor if floor == bucket_start(moment) else floor + BUCKET_WIDTHS[unit]
@@ -0,0 +1,181 @@
+# Analytics Executor Tests
+# Module: 2B - concurrent analytics sub-queries with timeouts, memoization and per-query sessions
+
+import asyncio
+import time
+
+import pytest
+
+from src.api.journey.analytics_executor import AnalyticsExecutor, current_analytics_session
+
+class FakeSession:
+    def __init__(self, factory):
+        self.factory = factory
+
+    async def __aenter__(self):
+        self.factory.open += 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.factory.open -= 1
+        return False
+
+class FakeSessionFactory:
+    """Stands in for async_sessionmaker; counts sessions still open"""
+
+    def __init__(self):
+        self.open = 0
+        self.created = 0
+
+    def __call__(self):
+        self.created += 1
+        return FakeSession(self)
+
+def sleeper(seconds, value=None):
+    async def query():
+        await asyncio.sleep(seconds)
+        return value
+    return query
+
+# =============================================================================
+# CONCURRENCY AND SESSION TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_sub_queries_run_concurrently_each_with_its_own_session():
+    factory = FakeSessionFactory()
+    seen = []
+
+    def query(name):
+        async def run():
+            seen.append(current_analytics_session())
+            await asyncio.sleep(0.05)
+            return name
+        return run
+
+    started = time.perf_counter()
+    result = await AnalyticsExecutor().run({name: query(name) for name in ("a", "b", "c")},
+                                           session_factory=factory)
+
+    assert time.perf_counter() - started < 0.12
+    assert result.values == {"a": "a", "b": "b", "c": "c"}
+    assert len({id(session) for session in seen}) == 3
+    assert (factory.created, factory.open) == (3, 0)
+    assert current_analytics_session("request") == "request"
+
+@pytest.mark.asyncio
+async def test_without_session_factory_sub_queries_share_the_caller_session_one_at_a_time():
+    running, peak = 0, 0
+
+    async def query():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return current_analytics_session("request")
+
+    result = await AnalyticsExecutor().run({"a": query, "b": query})
+
+    assert peak == 1
+    assert result.values == {"a": "request", "b": "request"}
+
+# =============================================================================
+# TIMEOUT AND PARTIAL RESULT TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_timeouts_and_failures_return_fallbacks_and_mark_the_batch_partial():
+    async def broken():
+        raise RuntimeError("relation does not exist")
+
+    executor = AnalyticsExecutor(query_timeout_seconds=0.05)
+    started = time.perf_counter()
+    result = await executor.run(
+        {"fast": sleeper(0, 1), "slow": sleeper(1, 2), "broken": broken},
+        session_factory=FakeSessionFactory(),
+        fallbacks={"slow": []}
+    )
+
+    assert time.perf_counter() - started < 0.5
+    assert result.values == {"fast": 1, "slow": [], "broken": {}}
+    assert result.timed_out == ["slow"]
+    assert result.failed == {"broken": "relation does not exist"}
+    assert result.status()["partial"]
+    assert executor.get_stats()["timeouts"] == 1
+    assert executor.get_stats()["failures"] == 1
+
+# =============================================================================
+# MEMOIZATION TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_concurrent_batches_share_one_computation_per_scope():
+    calls = []
+
+    async def summary():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return len(calls)
+
+    executor = AnalyticsExecutor(memo_ttl_seconds=60)
+    factory = FakeSessionFactory()
+    first, second = await asyncio.gather(
+        executor.run({"summary": summary}, session_factory=factory, memo_scope="dashboard:24h"),
+        executor.run({"summary": summary}, session_factory=factory, memo_scope="dashboard:24h")
+    )
+    other_scope = await executor.run({"summary": summary}, session_factory=factory, memo_scope="dashboard:7d")
+
+    assert first.values == second.values == {"summary": 1}
+    assert second.memo_hits == ["summary"]
+    assert other_scope.values == {"summary": 2}
+
+@pytest.mark.asyncio
+async def test_expired_and_failed_results_are_recomputed():
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("connection reset")
+        return len(attempts)
+
+    executor = AnalyticsExecutor(memo_ttl_seconds=0.05)
+    factory = FakeSessionFactory()
+    failed = await executor.run({"q": flaky}, session_factory=factory, memo_scope="s")
+    retried = await executor.run({"q": flaky}, session_factory=factory, memo_scope="s")
+    memoized = await executor.run({"q": flaky}, session_factory=factory, memo_scope="s")
+    await asyncio.sleep(0.06)
+    expired = await executor.run({"q": flaky}, session_factory=factory, memo_scope="s")
+
+    assert failed.failed and retried.values == {"q": 2}
+    assert memoized.memo_hits == ["q"]
+    assert expired.values == {"q": 3}
+
+# =============================================================================
+# NESTED BATCH TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_nested_batches_do_not_deadlock_on_the_concurrency_limit():
+    executor = AnalyticsExecutor(max_concurrency=1)
+    factory = FakeSessionFactory()
+    sessions = {}
+
+    async def inner():
+        sessions["inner"] = current_analytics_session()
+        return "inner"
+
+    async def outer():
+        sessions["outer"] = current_analytics_session()
+        nested = await executor.run({"inner": inner}, session_factory=factory)
+        return nested.values["inner"]
+
+    result = await asyncio.wait_for(
+        executor.run({"outer": outer, "sibling": sleeper(0, "sibling")}, session_factory=factory),
+        timeout=1
+    )
+
+    assert result.values == {"outer": "inner", "sibling": "sibling"}
+    assert sessions["inner"] is not sessions["outer"]
+    assert factory.open == 0
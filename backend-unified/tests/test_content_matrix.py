@@ -0,0 +1,90 @@
+# Content Matrix Tests
+# Module: 3A - bulk niche x persona x device generation, shared research and checkpoints
+
+import json
+
+import pytest
+
+from core.agents.content_matrix import ContentMatrixGenerator, ContentMatrixSpec, checkpoint_path_for
+from core.agents.content_outline import ContentOutlineAgent
+from core.agents.content_writer import ContentWriterAgent
+
+RESEARCH = {
+    "research_id": "research_1",
+    "data": {"opportunity_analysis": {"emerging_trends": ["Privacy-first fitness solutions"]}},
+    "insights": ["Buyers compare battery life first"]
+}
+
+class FakeOrchestrator:
+    """Real outline agent; research and writer tasks are recorded instead of run"""
+
+    def __init__(self):
+        self.content_outline_agent = ContentOutlineAgent()
+        self.research_calls = 0
+        self.writer_tasks = []
+
+    async def conduct_research(self, niche, research_type, keywords):
+        self.research_calls += 1
+        return RESEARCH
+
+    async def execute_task(self, task):
+        self.writer_tasks.append(task)
+        return {"content": {"title": task.data["outline"]["title"]}}
+
+def make_spec(**overrides):
+    return ContentMatrixSpec(niches=["fitness"], personas=["tech_early_adopter"],
+                             devices=["mobile", "desktop"], **overrides)
+
+# =============================================================================
+# CHECKPOINT TESTS
+# =============================================================================
+
+@pytest.mark.parametrize("checkpoint_id", ["../etc/passwd", "/tmp/x", "a/b", "", "x" * 65])
+def test_checkpoint_ids_cannot_escape_directory(tmp_path, checkpoint_id):
+    with pytest.raises(ValueError):
+        checkpoint_path_for(checkpoint_id, str(tmp_path))
+
+def test_checkpoint_path_resolves_under_directory(tmp_path):
+    assert checkpoint_path_for("run_1", str(tmp_path)) == str(tmp_path.resolve() / "run_1.jsonl")
+
+@pytest.mark.asyncio
+async def test_resume_skips_completed_items(tmp_path):
+    orchestrator = FakeOrchestrator()
+    first = await ContentMatrixGenerator(orchestrator, checkpoint_id="run", checkpoint_dir=str(tmp_path)).run(make_spec())
+    second = await ContentMatrixGenerator(orchestrator, checkpoint_id="run", checkpoint_dir=str(tmp_path)).run(make_spec())
+
+    assert first["progress"]["completed"] == 2
+    assert second["progress"]["resumed"] == 2
+    assert second["items"] == []
+    records = [json.loads(line) for line in (tmp_path / "run.jsonl").read_text().splitlines()]
+    assert all("research" not in record for record in records)
+
+# =============================================================================
+# SHARED RESEARCH TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_research_is_generation_context():
+    orchestrator = FakeOrchestrator()
+    result = await ContentMatrixGenerator(orchestrator).run(make_spec(quality_level="premium"))
+
+    assert orchestrator.research_calls == 1
+    assert result["research"] == {"fitness": RESEARCH}
+    for item in result["items"]:
+        assert "research" not in item
+        assert item["research_id"] == "research_1"
+        assert "privacy-first fitness solutions" in item["outline"]["seo_strategy"]["semantic_keywords"]
+
+    assert len(orchestrator.writer_tasks) == 2
+    for task in orchestrator.writer_tasks:
+        assert task.data["context"] == {"research": RESEARCH}
+        assert task.data["quality_level"] == "premium"
+
+@pytest.mark.asyncio
+async def test_writer_uses_research_insights():
+    outline = await ContentOutlineAgent().generate_outline("fitness", "TechEarlyAdopter", "desktop", "guide")
+    content = await ContentWriterAgent().generate_content(
+        outline.dict(), "fitness", "TechEarlyAdopter", "desktop", context={"research": RESEARCH}
+    )
+
+    assert "Buyers compare battery life first" in content.full_content
@@ -0,0 +1,96 @@
+# Embedding Cache Tests
+# Module: RAG embedding cache, batching and request coalescing
+
+import pytest
+import asyncio
+import numpy as np
+
+from app.services.embedding_cache import CachedEmbedder, EmbeddingCache, embedding_key
+
+# =============================================================================
+# TEST HELPERS
+# =============================================================================
+
+class RecordingProvider:
+    """Fake batch embedding provider that records every call"""
+
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.calls = []
+        self.delay = delay
+        self.fail = fail
+
+    async def __call__(self, texts):
+        self.calls.append(list(texts))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("provider down")
+        return [[float(len(text)), 1.0, 2.0] for text in texts]
+
+# =============================================================================
+# CACHE TESTS
+# =============================================================================
+
+def test_key_ignores_whitespace_but_not_model():
+    assert embedding_key("hello   world ") == embedding_key("hello world")
+    assert embedding_key("hello world", "a") != embedding_key("hello world", "b")
+
+def test_lru_eviction():
+    cache = EmbeddingCache(max_entries=2)
+    cache.put("a", [1.0])
+    cache.put("b", [2.0])
+    cache.get("a")
+    cache.put("c", [3.0])
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get_stats()["evictions"] == 1
+
+def test_disk_store_survives_new_instance(tmp_path):
+    EmbeddingCache(disk_path=str(tmp_path)).put("k", [0.5, 0.25])
+
+    cache = EmbeddingCache(disk_path=str(tmp_path))
+    vector = cache.get("k")
+
+    assert vector.dtype == np.float32
+    assert vector.tolist() == [0.5, 0.25]
+    assert cache.get_stats()["disk_hits"] == 1
+
+# =============================================================================
+# EMBEDDER TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_embed_many_batches_only_misses():
+    provider = RecordingProvider()
+    embedder = CachedEmbedder(provider, dimension=3)
+
+    await embedder.embed("cached")
+    result = await embedder.embed_many(["cached", "new one", "new one", "other"])
+
+    assert provider.calls == [["cached"], ["new one", "other"]]
+    assert result[1] == result[2]
+    assert len(result) == 4
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_coalesced():
+    provider = RecordingProvider(delay=0.01)
+    embedder = CachedEmbedder(provider, dimension=3)
+
+    results = await asyncio.gather(*[embedder.embed("same query") for _ in range(5)])
+
+    assert len(provider.calls) == 1
+    assert all(result == results[0] for result in results)
+    assert embedder.get_stats()["coalesced"] == 4
+
+@pytest.mark.asyncio
+async def test_provider_failure_returns_uncached_fallback():
+    provider = RecordingProvider(fail=True)
+    embedder = CachedEmbedder(provider, dimension=3)
+
+    first = await embedder.embed("query")
+    await embedder.embed("query")
+
+    assert first == pytest.approx([0.1, 0.1, 0.1])
+    assert len(provider.calls) == 2
+    assert len(embedder.cache) == 0
@@ -0,0 +1,124 @@
+# Feedback Aggregates Tests
+# Module: 3A - per-group feedback aggregation, anomaly flags and processed-event expiry
+
+import importlib.util
+import os
+import random
+import statistics
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import pytest
+
+# Loaded by path: core.improvement.feedback_system pulls in the whole framework
+_SPEC = importlib.util.spec_from_file_location(
+    "feedback_aggregates",
+    os.path.join(os.path.dirname(__file__), "..", "core", "improvement", "feedback_aggregates.py")
+)
+feedback_aggregates = importlib.util.module_from_spec(_SPEC)
+_SPEC.loader.exec_module(feedback_aggregates)
+
+ProcessedFeedbackStore = feedback_aggregates.ProcessedFeedbackStore
+
+@dataclass
+class Event:
+    event_id: str
+    processed: bool = False
+
+def per_event_is_anomaly(history, data, z_threshold=2.5):
+    """The per-event z-score check the group path replaced"""
+    if len(history) < 5:
+        return False
+    for key, value in data.items():
+        if isinstance(value, (int, float)):
+            historical_values = [
+                item['data'].get(key) for item in history
+                if isinstance(item['data'].get(key), (int, float))
+            ]
+            if len(historical_values) >= 5:
+                hist_std = statistics.stdev(historical_values)
+                if hist_std > 0 and abs((value - statistics.mean(historical_values)) / hist_std) > z_threshold:
+                    return True
+    return False
+
+def random_rows(rng, count):
+    rows = []
+    for _ in range(count):
+        row = {'label': rng.choice(['a', 'b'])}
+        if rng.random() < 0.9:
+            row['conversion_rate'] = rng.gauss(0.1, 0.02)
+        if rng.random() < 0.8:
+            # Occasional slow page loads are the anomalies
+            row['load_time'] = rng.gauss(6.0, 0.5) if rng.random() < 0.05 else rng.gauss(1.2, 0.3)
+        rows.append(row)
+    return rows
+
+# =============================================================================
+# GROUP AGGREGATE TESTS
+# =============================================================================
+
+def test_group_aggregates_match_per_field_statistics():
+    rows = random_rows(random.Random(3), 40)
+    columns = feedback_aggregates.build_numeric_columns(rows)
+    aggregates = feedback_aggregates.compute_group_aggregates(len(rows), columns)
+
+    assert aggregates['event_count'] == 40
+    assert set(aggregates['fields']) == {'conversion_rate', 'load_time'}
+    for key, field in aggregates['fields'].items():
+        values = [row[key] for row in rows if key in row]
+        assert field['count'] == len(values)
+        assert field['mean'] == pytest.approx(statistics.mean(values))
+        assert field['std'] == pytest.approx(statistics.stdev(values))
+        assert (field['min'], field['max']) == (min(values), max(values))
+
+def test_booleans_and_strings_are_not_numeric_columns():
+    columns = feedback_aggregates.build_numeric_columns([{'converted': True, 'label': 'x', 'score': 2}])
+    assert list(columns) == ['score']
+
+# =============================================================================
+# ANOMALY TESTS
+# =============================================================================
+
+def test_group_anomaly_flags_match_per_event_checks():
+    rng = random.Random(11)
+    for _ in range(20):
+        history = [{'data': row} for row in random_rows(rng, rng.randint(3, 60))]
+        batch = random_rows(rng, 25)
+
+        columns = feedback_aggregates.build_numeric_columns(batch)
+        flagged = feedback_aggregates.detect_group_anomalies(history, columns)
+
+        assert flagged == [index for index, row in enumerate(batch) if per_event_is_anomaly(history, row)]
+
+def test_short_or_constant_history_flags_nothing():
+    columns = feedback_aggregates.build_numeric_columns([{'load_time': 50.0}])
+    assert feedback_aggregates.detect_group_anomalies([{'data': {'load_time': 1.0}}] * 4, columns) == []
+    assert feedback_aggregates.detect_group_anomalies([{'data': {'load_time': 1.0}}] * 10, columns) == []
+
+# =============================================================================
+# PROCESSED EVENT EXPIRY TESTS
+# =============================================================================
+
+def test_processed_events_expire_after_ttl():
+    store = ProcessedFeedbackStore(ttl_seconds=60, max_events=100)
+    start = datetime(2025, 7, 4, 12, 0, 0)
+    early = [Event("e1"), Event("e2")]
+    store.store(early, now=start)
+    store.store([Event("e3")], now=start + timedelta(seconds=30))
+
+    assert all(event.processed for event in early)
+    store.evict_expired(now=start + timedelta(seconds=59))
+    assert len(store) == 3
+
+    store.evict_expired(now=start + timedelta(seconds=60))
+    assert [event.event_id for event in store.values()] == ["e3"]
+    assert "e1" not in store
+
+def test_size_cap_evicts_oldest_first():
+    store = ProcessedFeedbackStore(ttl_seconds=3600, max_events=2)
+    now = datetime(2025, 7, 4, 12, 0, 0)
+    for index in range(5):
+        store.store([Event(f"e{index}")], now=now + timedelta(seconds=index))
+
+    store.evict_expired(now=now + timedelta(seconds=10))
+    assert [event.event_id for event in store.values()] == ["e3", "e4"]
@@ -0,0 +1,169 @@
+# Funnel Rollup Tests
+# Module: 2B - funnel analytics served from hour/day rollup tables merged with changed sessions
+
+import random
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+
+from benchmarks.local_stand_ins import configure_environment, create_journey_database
+
+configure_environment()
+
+from sqlalchemy import func, select, update  # noqa: E402
+
+from src.api.journey import funnel_rollups  # noqa: E402
+from src.api.journey.database_models import JourneyFunnelRollup, JourneySession  # noqa: E402
+from src.api.journey.funnel_rollups import load_funnel_rollup, refresh_funnel_rollups  # noqa: E402
+
+SESSIONS = [
+    ("s1", "TechEarlyAdopter", "mobile", "awareness", 0.2, 60),
+    ("s2", "TechEarlyAdopter", "desktop", "consideration", 0.4, 120),
+    ("s3", "BudgetConscious", "mobile", "awareness", None, 30)
+]
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine, factory, _ = await create_journey_database(str(tmp_path / "journey.db"))
+    async with factory() as db:
+        for session_id, persona, device, stage, probability, session_time in SESSIONS:
+            db.add(JourneySession(
+                id=uuid.uuid4(), session_id=session_id, persona_type=persona, persona_confidence=0.8,
+                device_type=device, current_stage=stage, journey_path="default",
+                conversion_probability=probability, total_session_time=session_time, entry_point={}
+            ))
+        await db.commit()
+    yield factory
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_rollup_aggregates_sessions(session_factory):
+    since = datetime.utcnow() - timedelta(hours=1)
+    async with session_factory() as db:
+        rollup = await load_funnel_rollup(db, since)
+        filtered = await load_funnel_rollup(db, since, "TechEarlyAdopter")
+
+    assert rollup.stage_counts() == {"awareness": 2, "consideration": 1}
+    awareness = rollup.group_by("stage")["awareness"]
+    assert awareness.average_duration == pytest.approx(45)
+    # Sessions without a probability do not pull the average down
+    assert awareness.average_conversion_probability == pytest.approx(0.2)
+    assert filtered.group_by("persona")["TechEarlyAdopter"].sessions == 2
+    assert set(filtered.group_by("persona")) == {"TechEarlyAdopter"}
+
+@pytest.mark.asyncio
+async def test_rollup_reflects_writes_from_other_workers(session_factory):
+    since = datetime.utcnow() - timedelta(hours=1)
+    async with session_factory() as db:
+        await db.execute(
+            update(JourneySession).where(JourneySession.session_id == "s1").values(current_stage="decision")
+        )
+        await db.commit()
+
+    async with session_factory() as db:
+        rollup = await load_funnel_rollup(db, since)
+        future = await load_funnel_rollup(db, datetime.utcnow() + timedelta(hours=1))
+
+    assert rollup.stage_counts() == {"awareness": 1, "consideration": 1, "decision": 1}
+    assert future.cells == {}
+
+# =============================================================================
+# ROLLUP TABLE TESTS
+# =============================================================================
+
+PERSONAS = ["TechEarlyAdopter", "BudgetConscious", None]
+STAGES = ["awareness", "consideration", "decision", "conversion"]
+
+def cell_values(view):
+    return {
+        key: (cell.sessions, round(cell.session_time, 6), round(cell.touchpoints, 6),
+              round(cell.probability_sum, 6), cell.probability_count)
+        for key, cell in view.cells.items() if cell.sessions
+    }
+
+async def raw_view(db, since, persona_filter=None):
+    return funnel_rollups.RollupView(await funnel_rollups._aggregate_sessions(db, [(since, None)], persona_filter))
+
+async def add_history(factory, now, count=300, seed=3):
+    """Sessions over the last 40 days, last updated at least ten minutes ago"""
+    rng = random.Random(seed)
+    async with factory() as db:
+        for index in range(count):
+            started = now - timedelta(minutes=rng.randint(10, 40 * 24 * 60))
+            db.add(JourneySession(
+                id=uuid.uuid4(), session_id=f"h{index}", persona_type=rng.choice(PERSONAS),
+                device_type=rng.choice(["mobile", "desktop"]), current_stage=rng.choice(STAGES),
+                journey_path=rng.choice(["default", "fast"]), entry_point={},
+                conversion_probability=rng.choice([None, rng.random()]),
+                total_session_time=rng.randint(0, 600), total_touchpoints=rng.randint(0, 20),
+                start_timestamp=started, updated_at=started + timedelta(minutes=rng.randint(0, 9))
+            ))
+        await db.commit()
+
+@pytest.mark.asyncio
+async def test_rollups_match_raw_sessions_for_every_range(session_factory):
+    now = datetime.utcnow()
+    await add_history(session_factory, now)
+    async with session_factory() as db:
+        assert await refresh_funnel_rollups(db) > 0
+
+    async with session_factory() as db:
+        for since in [now - timedelta(hours=1), now - timedelta(hours=30), now - timedelta(days=7), now - timedelta(days=30)]:
+            for persona in [None, "BudgetConscious"]:
+                view = await load_funnel_rollup(db, since, persona)
+                assert cell_values(view) == cell_values(await raw_view(db, since, persona))
+
+@pytest.mark.asyncio
+async def test_closed_buckets_are_not_rescanned(session_factory):
+    now = datetime.utcnow()
+    await add_history(session_factory, now)
+    async with session_factory() as db:
+        await refresh_funnel_rollups(db)
+        view = await load_funnel_rollup(db, now - timedelta(days=30))
+        day_rows = await db.scalar(select(func.count()).where(JourneyFunnelRollup.resolution == "day"))
+
+    # Only the partial first hour and the hour of the fixture sessions (updated just now) are read raw
+    since = now - timedelta(days=30)
+    assert view.raw_ranges[0][0] == since
+    assert all(end - start <= timedelta(hours=1) for start, end in view.raw_ranges)
+    assert len(view.raw_ranges) <= 3
+    assert day_rows > 0
+
+@pytest.mark.asyncio
+async def test_sessions_updated_after_refresh_are_merged_until_refreshed(session_factory):
+    now = datetime.utcnow()
+    await add_history(session_factory, now)
+    since = now - timedelta(days=30)
+    async with session_factory() as db:
+        await refresh_funnel_rollups(db)
+        old_session = await db.scalar(
+            select(JourneySession).where(JourneySession.start_timestamp < now - timedelta(days=3)).limit(1)
+        )
+        old_id, old_stage = old_session.session_id, old_session.current_stage
+
+    new_stage = next(stage for stage in STAGES if stage != old_stage)
+    async with session_factory() as db:
+        await db.execute(
+            update(JourneySession).where(JourneySession.session_id == old_id).values(current_stage=new_stage)
+        )
+        await db.commit()
+
+    async with session_factory() as db:
+        stale_free = await load_funnel_rollup(db, since)
+        assert cell_values(stale_free) == cell_values(await raw_view(db, since))
+        assert len(stale_free.raw_ranges) > 1
+
+        assert await refresh_funnel_rollups(db) >= 1
+        refreshed = await load_funnel_rollup(db, since)
+        assert cell_values(refreshed) == cell_values(await raw_view(db, since))
+
+@pytest.mark.asyncio
+async def test_refresh_if_stale_runs_once_per_interval(session_factory):
+    now = datetime.utcnow()
+    assert await funnel_rollups.refresh_funnel_rollups_if_stale(session_factory, now)
+    assert not await funnel_rollups.refresh_funnel_rollups_if_stale(session_factory, now + timedelta(seconds=1))
+    later = now + funnel_rollups.ROLLUP_REFRESH_INTERVAL
+    assert await funnel_rollups.refresh_funnel_rollups_if_stale(session_factory, later)
+    assert not await funnel_rollups.refresh_funnel_rollups_if_stale(None)
@@ -0,0 +1,95 @@
+# Journey Session Cache Tests
+# Module: 2B - coalesced session writes, out-of-band updates and shutdown flush
+
+import asyncio
+import uuid
+
+import pytest
+import pytest_asyncio
+
+from benchmarks.local_stand_ins import configure_environment, create_journey_database
+
+configure_environment()
+
+from sqlalchemy import select, update  # noqa: E402
+
+from src.api.journey.database_models import JourneySession  # noqa: E402
+from src.api.journey.session_cache import JourneySessionCache, _CacheEntry  # noqa: E402
+from src.utils import shutdown_hooks  # noqa: E402
+
+def add_touchpoint(state):
+    state.total_touchpoints += 1
+    return None
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine, factory, _ = await create_journey_database(str(tmp_path / "journey.db"))
+    async with factory() as db:
+        db.add(JourneySession(
+            id=uuid.uuid4(), session_id="s1", persona_type="TechEarlyAdopter", persona_confidence=0.8,
+            device_type="mobile", current_stage="awareness", journey_path="default",
+            conversion_probability=0.2, entry_point={}
+        ))
+        await db.commit()
+    yield factory
+    await engine.dispose()
+
+async def read_row(factory):
+    async with factory() as db:
+        return (await db.execute(select(JourneySession).where(JourneySession.session_id == "s1"))).scalar_one()
+
+@pytest.mark.asyncio
+async def test_out_of_band_update_survives_coalesced_flush(session_factory):
+    cache = JourneySessionCache(flush_interval_seconds=60)
+    async with session_factory() as db:
+        await cache.apply(db, "s1", add_touchpoint)
+
+        # What RealTimeOptimizer does: bump the version, then invalidate the cached entry
+        await db.execute(
+            update(JourneySession)
+            .where(JourneySession.session_id == "s1")
+            .values(conversion_probability=0.9, version=JourneySession.version + 1)
+        )
+        await db.commit()
+        await cache.invalidate("s1")
+
+        await cache.flush(db, "s1")
+    await cache.shutdown()
+
+    row = await read_row(session_factory)
+    assert row.conversion_probability == pytest.approx(0.9)
+    assert row.total_touchpoints == 1
+    assert cache.stats["conflicts"] == 1
+
+@pytest.mark.asyncio
+async def test_shutdown_hooks_write_coalesced_updates(session_factory, monkeypatch):
+    monkeypatch.setattr(shutdown_hooks, "_shutdown_hooks", {})
+    cache = JourneySessionCache(flush_interval_seconds=60)
+    shutdown_hooks.register_shutdown_hook("journey_session_cache", cache.shutdown)
+
+    async with session_factory() as db:
+        await cache.apply(db, "s1", add_touchpoint)
+        await cache.apply(db, "s1", add_touchpoint)
+    assert (await read_row(session_factory)).total_touchpoints == 0
+
+    await shutdown_hooks.run_shutdown_hooks()
+    assert (await read_row(session_factory)).total_touchpoints == 2
+
+@pytest.mark.asyncio
+async def test_eviction_keeps_locks_that_are_held_or_awaited():
+    cache = JourneySessionCache(max_entries=1, flush_interval_seconds=60)
+    held, idle = cache._lock("held"), cache._lock("idle")
+    await held.acquire()
+    waiter = asyncio.ensure_future(held.acquire())
+    await asyncio.sleep(0)
+
+    for session_id in ("held", "idle", "next"):
+        cache._store_local(session_id, _CacheEntry(None))
+
+    # The queued caller and any later one must still serialize on the same lock
+    assert cache._lock("held") is held
+    assert "idle" not in cache._locks and cache._lock("idle") is not idle
+
+    held.release()
+    await waiter
+    held.release()
@@ -0,0 +1,183 @@
+# Neo4j Manager Tests
+# Milestone 1C: batched graph writes, the read cache and materialized neighborhoods against a fake driver
+
+import os
+
+import pytest
+
+pytest.importorskip("neo4j")
+pytest.importorskip("aiofiles")
+
+from app.services.sync_listeners import ensure_repository_root_on_path
+
+ensure_repository_root_on_path()
+os.environ.setdefault("NEO4J_PASSWORD", "test-password")
+
+from database.neo4j_manager import GraphEntity, GraphRelationship, Neo4jConfig, Neo4jManager  # noqa: E402
+
+class FakeResult:
+    def __init__(self, records):
+        self.records = records
+
+    async def data(self):
+        return self.records
+
+class FakeSession:
+    """Stands in for neo4j.AsyncSession; write transactions run on the session itself"""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def run(self, query, parameters=None):
+        parameters = dict(parameters or {})
+        self.driver.calls.append((query, parameters))
+        return FakeResult(self.driver.respond(query, parameters))
+
+    async def execute_write(self, work, *args):
+        self.driver.write_transactions += 1
+        return await work(self, *args)
+
+class FakeDriver:
+    """Answers each Cypher statement kind with canned records and records every call"""
+
+    def __init__(self, neighbors=None):
+        self.calls = []
+        self.write_transactions = 0
+        self.neighbors = neighbors or []
+
+    def session(self, database=None):
+        return FakeSession(self)
+
+    def respond(self, query, parameters):
+        if "UNWIND $entity_uuids" in query:
+            return [{"entity_uuid": uuid, "neighbors": self.neighbors} for uuid in parameters["entity_uuids"]]
+        if "MATCH path" in query:
+            return [dict(neighbor) for neighbor in self.neighbors]
+        if "CREATE (e:Entity)" in query:
+            return [{"uuid": row["uuid"]} for row in parameters["rows"]]
+        if "HAS_SNAPSHOT" in query:
+            return [{"updated_uuid": row["entity_uuid"]} for row in parameters["rows"]]
+        if "RELATIONSHIP" in query and "CREATE" in query:
+            rows = parameters.get("rows") or [parameters]
+            return [{"relationship_id": row["properties"]["id"]} for row in rows]
+        return []
+
+    def reads(self, fragment):
+        return [parameters for query, parameters in self.calls if fragment in query]
+
+NEIGHBORS = [
+    {"uuid": "b", "name": "B", "type": "document", "properties": "{}", "distance": 1,
+     "path_confidence": 0.9, "performance": 0.5, "relevance_score": 0.8},
+    {"uuid": "c", "name": "C", "type": "document", "properties": "{}", "distance": 2,
+     "path_confidence": 0.8, "performance": 0.1, "relevance_score": 0.5}
+]
+
+def make_manager(neighbors=NEIGHBORS, **config):
+    manager = Neo4jManager(Neo4jConfig(password="test-password", **config))
+    manager.driver = FakeDriver(neighbors)
+    manager.is_initialized = True
+    return manager
+
+# =============================================================================
+# BATCH WRITE TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_add_entities_runs_one_transaction_per_batch():
+    manager = make_manager()
+    entities = [GraphEntity(f"e{i}", f"Entity {i}", "document") for i in range(5)]
+
+    uuids = await manager.add_entities(entities, batch_size=2)
+
+    assert uuids == [f"e{i}" for i in range(5)]
+    assert manager.driver.write_transactions == 3
+    assert [len(call["rows"]) for call in manager.driver.reads("CREATE (e:Entity)")] == [2, 2, 1]
+
+@pytest.mark.asyncio
+async def test_performance_updates_coalesce_per_entity():
+    manager = make_manager()
+
+    updated = await manager.update_entities_performance([
+        {"entity_uuid": "a", "performance_score": 0.2},
+        {"entity_uuid": "b", "confidence_score": 0.4},
+        {"entity_uuid": "a", "performance_score": 0.6}
+    ])
+
+    (call,) = manager.driver.reads("HAS_SNAPSHOT")
+    rows = {row["entity_uuid"]: row for row in call["rows"]}
+    assert updated == 2
+    assert rows["a"]["performance_score"] == 0.6
+    assert rows["a"]["interactions"] == 2
+    assert call["bucket"] % manager.config.snapshot_bucket_seconds == 0
+
+# =============================================================================
+# READ CACHE TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_related_entities_are_cached_until_a_write_touches_them():
+    manager = make_manager()
+
+    first = await manager.find_related_entities("a", max_depth=2)
+    first[0]["name"] = "mutated by caller"
+    second = await manager.find_related_entities("a", max_depth=2)
+    assert len(manager.driver.reads("MATCH path")) == 1
+    assert second[0]["name"] == "B"
+
+    await manager.create_relationships([GraphRelationship("c", "d", "related_to")])
+    await manager.find_related_entities("a", max_depth=2)
+    assert len(manager.driver.reads("MATCH path")) == 2
+
+# =============================================================================
+# MATERIALIZED NEIGHBORHOOD TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_neighborhood_serves_only_the_identical_request():
+    manager = make_manager(neighborhood_top_k=20)
+    assert await manager.materialize_neighborhoods(["a"], max_depth=2, min_confidence=0.7) == 1
+
+    served = await manager.find_related_entities("a", max_depth=2, min_confidence=0.7)
+    assert served == NEIGHBORS
+    assert manager.neighborhood_hits == 1
+    assert manager.driver.reads("MATCH path") == [
+        call for call in manager.driver.reads("MATCH path") if "entity_uuids" in call
+    ]
+
+    # Stricter threshold or shallower depth can change membership and scores: run live
+    await manager.find_related_entities("a", max_depth=2, min_confidence=0.8)
+    await manager.find_related_entities("a", max_depth=1, min_confidence=0.7)
+    live = [call for call in manager.driver.reads("MATCH path") if "entity_uuid" in call]
+    assert [call["min_confidence"] for call in live] == [0.8, 0.7]
+    assert manager.neighborhood_hits == 1
+
+@pytest.mark.asyncio
+async def test_truncated_neighborhood_is_not_served():
+    manager = make_manager(neighborhood_top_k=2)
+    await manager.materialize_neighborhoods(["a"], max_depth=3, min_confidence=0.7)
+
+    # Two of at most two neighbors were kept: the live top 20 could hold more
+    await manager.find_related_entities("a", max_depth=3, min_confidence=0.7)
+    assert manager.neighborhood_hits == 0
+
+@pytest.mark.asyncio
+async def test_access_counts_stay_bounded_and_decay():
+    manager = make_manager(access_count_max_entries=10)
+    for _ in range(30):
+        manager._record_access("hot")
+    for index in range(50):
+        manager._record_access(f"cold-{index}")
+
+    assert len(manager.entity_access_counts) <= 10
+    assert manager.entity_access_counts.most_common(1)[0] == ("hot", 30)
+
+    # Selecting hot entities halves the counts, so rankings follow recent traffic
+    await manager.materialize_neighborhoods(hot_limit=1)
+    assert list(manager.neighborhoods) == ["hot"]
+    assert manager.entity_access_counts == {"hot": 15}
@@ -0,0 +1,136 @@
+# Outcome Writer Tests
+# Module: RAG write-behind outcome logging - batching, flush triggers, shutdown and failed writes
+
+import asyncio
+
+import pytest
+
+from app.services.outcome_writer import OutcomeWriteBehindLogger
+
+class RecordingWriter:
+    """Batch writer that records batches and fails while `failures` is positive"""
+
+    def __init__(self, failures: int = 0):
+        self.batches = []
+        self.failures = failures
+
+    async def __call__(self, rows):
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        self.batches.append([row["n"] for row in rows])
+        return len(rows)
+
+def rows(start, stop):
+    return [{"n": n} for n in range(start, stop)]
+
+# =============================================================================
+# BATCHING TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_without_waiting_for_the_interval():
+    writer = RecordingWriter()
+    logger = OutcomeWriteBehindLogger(writer, batch_size=3, flush_interval_seconds=60)
+    for row in rows(0, 7):
+        assert logger.enqueue_nowait(row)
+    await asyncio.sleep(0.01)
+
+    # Reaching the batch size wakes the flusher, which drains the queue in batch-sized writes
+    assert writer.batches == [[0, 1, 2], [3, 4, 5], [6]]
+    assert logger.get_stats()["batches"] == 3
+    await logger.stop()
+
+@pytest.mark.asyncio
+async def test_partial_batch_flushes_on_the_interval():
+    writer = RecordingWriter()
+    logger = OutcomeWriteBehindLogger(writer, batch_size=100, flush_interval_seconds=0.05)
+    for row in rows(0, 3):
+        logger.enqueue_nowait(row)
+    await asyncio.sleep(0.01)
+    assert writer.batches == []
+
+    await asyncio.sleep(0.1)
+    assert writer.batches == [[0, 1, 2]]
+    assert logger.queue_depth == 0
+    await logger.stop()
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_or_applies_backpressure():
+    writer = RecordingWriter()
+    logger = OutcomeWriteBehindLogger(writer, max_queue_size=2, batch_size=10, flush_interval_seconds=60)
+    assert logger.enqueue_nowait({"n": 0}) and logger.enqueue_nowait({"n": 1})
+    assert not logger.enqueue_nowait({"n": 2})
+
+    # Waiting for space wakes the flusher, which drains the queue
+    assert await logger.enqueue({"n": 3}, timeout=1)
+    stats = logger.get_stats()
+    assert (stats["dropped"], stats["backpressure_waits"]) == (1, 1)
+    await logger.stop()
+    assert writer.batches == [[0, 1], [3]]
+
+# =============================================================================
+# SHUTDOWN TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_stop_flushes_queued_rows_and_rejects_new_ones():
+    writer = RecordingWriter()
+    logger = OutcomeWriteBehindLogger(writer, batch_size=100, flush_interval_seconds=60)
+    for row in rows(0, 5):
+        logger.enqueue_nowait(row)
+
+    await logger.stop()
+
+    assert writer.batches == [[0, 1, 2, 3, 4]]
+    assert not logger.enqueue_nowait({"n": 5})
+    assert not logger.get_stats()["running"]
+
+# =============================================================================
+# FAILED WRITE TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_requeued_ahead_of_newer_rows():
+    writer = RecordingWriter(failures=1)
+    logger = OutcomeWriteBehindLogger(writer, batch_size=100, flush_interval_seconds=60, max_retries=0)
+    for row in rows(0, 3):
+        logger.enqueue_nowait(row)
+
+    assert await logger.flush() == 0
+    assert logger.queue_depth == 3
+
+    logger.enqueue_nowait({"n": 3})
+    assert await logger.flush() == 4
+    assert writer.batches == [[0, 1, 2, 3]]
+    assert logger.get_stats()["requeued"] == 3
+    assert logger.get_stats()["dropped"] == 0
+    await logger.stop()
+
+@pytest.mark.asyncio
+async def test_batch_failing_past_max_requeues_is_dropped():
+    writer = RecordingWriter(failures=10)
+    logger = OutcomeWriteBehindLogger(writer, batch_size=100, flush_interval_seconds=60,
+                                      max_retries=0, max_requeues=2)
+    for row in rows(0, 2):
+        logger.enqueue_nowait(row)
+
+    for _ in range(3):
+        await logger.flush()
+
+    stats = logger.get_stats()
+    assert (stats["requeued"], stats["dropped"]) == (4, 2)
+    assert logger.queue_depth == 0
+    await logger.stop()
+
+@pytest.mark.asyncio
+async def test_rows_still_failing_at_shutdown_are_counted_as_dropped():
+    writer = RecordingWriter(failures=10)
+    logger = OutcomeWriteBehindLogger(writer, batch_size=100, flush_interval_seconds=60, max_retries=0)
+    for row in rows(0, 2):
+        logger.enqueue_nowait(row)
+
+    await logger.stop()
+
+    assert logger.queue_depth == 0
+    assert logger.get_stats()["dropped"] == 2
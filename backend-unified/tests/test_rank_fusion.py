@@ -0,0 +1,83 @@
+# Rank Fusion Engine Tests
+# Module: Concurrent multi-retriever search with rank fusion
+
+import pytest
+import asyncio
+import time
+
+from app.models.rag_models import SearchResult
+from app.services.rank_fusion import RankFusionEngine, RetrieverSpec, FusionMethod
+
+# =============================================================================
+# TEST HELPERS
+# =============================================================================
+
+def make_results(*chunk_ids):
+    return [
+        SearchResult(content=chunk_id, relevance_score=1.0 - index * 0.1,
+                     confidence_score=0.5, chunk_id=chunk_id)
+        for index, chunk_id in enumerate(chunk_ids)
+    ]
+
+def retriever(results, delay=0.0):
+    async def search():
+        if delay:
+            await asyncio.sleep(delay)
+        return results
+    return search
+
+# =============================================================================
+# FUSION TESTS
+# =============================================================================
+
+def test_rrf_prefers_results_found_by_several_retrievers():
+    engine = RankFusionEngine(weights={"vector": 1.0, "semantic": 1.0})
+
+    fused = engine.fuse({
+        "vector": make_results("a", "b", "c"),
+        "semantic": make_results("c", "d")
+    })
+
+    assert fused[0].chunk_id == "c"
+    assert set(fused[0].metadata["coordination_sources"]) == {"vector", "semantic"}
+    assert all(0.0 <= result.relevance_score <= 1.0 for result in fused)
+
+def test_weighted_fusion_respects_weights():
+    engine = RankFusionEngine(weights={"vector": 0.9, "semantic": 0.1}, method=FusionMethod.WEIGHTED)
+
+    fused = engine.fuse({
+        "vector": make_results("a", "b"),
+        "semantic": make_results("b", "a")
+    })
+
+    assert [result.chunk_id for result in fused] == ["a", "b"]
+
+@pytest.mark.asyncio
+async def test_retrievers_run_concurrently_and_timeouts_return_partial_results():
+    engine = RankFusionEngine(weights={"fast": 1.0, "medium": 1.0, "slow": 1.0})
+
+    started = time.perf_counter()
+    outcome = await engine.run([
+        RetrieverSpec("fast", retriever(make_results("a"), delay=0.05)),
+        RetrieverSpec("medium", retriever(make_results("b"), delay=0.05)),
+        RetrieverSpec("slow", retriever(make_results("c"), delay=1.0), deadline_seconds=0.1)
+    ])
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.3
+    assert outcome.partial
+    assert outcome.reports["slow"].status == "timeout"
+    assert {result.chunk_id for result in outcome.results} == {"a", "b"}
+    assert engine.get_stats()["retrievers"]["slow"]["timeouts"] == 1
+
+def test_learned_weights_follow_observed_performance():
+    engine = RankFusionEngine(weights={"vector": 0.5, "semantic": 0.5}, learning_rate=1.0,
+                              min_queries_for_learning=1)
+
+    engine.update_learned_weights({
+        "vector": {"avg_satisfaction": 0.9, "conversion_rate": 0.0, "total_queries": 10},
+        "semantic": {"avg_satisfaction": 0.3, "conversion_rate": 0.0, "total_queries": 10}
+    })
+
+    assert engine.weights["vector"] > engine.weights["semantic"]
+    assert engine.weights["vector"] + engine.weights["semantic"] == pytest.approx(1.0)
@@ -0,0 +1,143 @@
+# Rate Limit Engine Tests
+# Module: Auth - sliding-window counters, local pre-filter and Lua/in-memory parity
+
+import importlib.util
+import os
+import random
+
+import pytest
+
+from src.utils.redis_client import InMemoryRedis
+
+# Loaded by path: the core.auth package __init__ needs the full application settings
+_SPEC = importlib.util.spec_from_file_location(
+    "rate_limit_engine",
+    os.path.join(os.path.dirname(__file__), "..", "core", "auth", "rate_limit_engine.py")
+)
+rate_limit_engine = importlib.util.module_from_spec(_SPEC)
+_SPEC.loader.exec_module(rate_limit_engine)
+
+RateLimitEngine = rate_limit_engine.RateLimitEngine
+
+WINDOWS = {"minute": (60, 10), "hour": (3600, 25)}
+
+# =============================================================================
+# SLIDING WINDOW TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_denies_at_limit_with_retry_after():
+    engine = RateLimitEngine(InMemoryRedis())
+    decisions = [await engine.hit("user:1", WINDOWS, now=600.0 + i) for i in range(11)]
+
+    assert all(decision.allowed for decision in decisions[:10])
+    assert decisions[9].remaining == 0
+    assert not decisions[10].allowed
+    assert decisions[10].denied_window == "minute"
+    assert decisions[10].retry_after_seconds == pytest.approx(50.0)
+    assert (await engine.usage("user:1", WINDOWS, now=611.0))["minute"] == 10
+
+@pytest.mark.asyncio
+async def test_previous_bucket_is_weighted_across_the_edge():
+    engine = RateLimitEngine(InMemoryRedis())
+    for i in range(10):
+        assert (await engine.hit("user:1", {"minute": (60, 10)}, now=650.0 + i)).allowed
+
+    # Just after the edge the full previous bucket still counts: no 2x burst
+    assert not (await engine.hit("user:1", {"minute": (60, 10)}, now=661.0)).allowed
+    # Half way through the next bucket half of it has slid out
+    admitted = [(await engine.hit("user:1", {"minute": (60, 10)}, now=690.0)).allowed for _ in range(10)]
+    assert admitted.count(True) == 5
+
+@pytest.mark.asyncio
+async def test_concurrent_limit_and_release():
+    engine = RateLimitEngine(InMemoryRedis())
+    first = await engine.hit("user:1", WINDOWS, "user:1:running", max_concurrent=1, now=600.0)
+    second = await engine.hit("user:1", WINDOWS, "user:1:running", max_concurrent=1, now=600.0)
+    await engine.release_concurrent("user:1:running")
+    third = await engine.hit("user:1", WINDOWS, "user:1:running", max_concurrent=1, now=600.0)
+
+    assert (first.allowed, second.allowed, third.allowed) == (True, False, True)
+    assert second.denied_window == "concurrent"
+
+# =============================================================================
+# LOCAL PRE-FILTER TESTS
+# =============================================================================
+
+def test_local_pre_filter_is_opt_in(monkeypatch):
+    monkeypatch.delenv("RATE_LIMIT_LOCAL_FRACTION", raising=False)
+    assert rate_limit_engine.local_fraction_from_env() == 0.0
+
+@pytest.mark.asyncio
+async def test_locally_admitted_requests_are_charged():
+    engine = RateLimitEngine(InMemoryRedis(), local_fraction=0.5, local_ttl_seconds=5)
+    decisions = [await engine.hit("user:1", WINDOWS, now=600.0) for _ in range(10)]
+
+    assert any(decision.local for decision in decisions)
+    assert (await engine.usage("user:1", WINDOWS, now=600.0))["minute"] == 10
+    # The next round-trip charges the local admits and sees the window full
+    assert not (await engine.hit("user:1", WINDOWS, now=600.0)).allowed
+
+# =============================================================================
+# LUA PARITY TESTS
+# =============================================================================
+
+class LuaRedis:
+    """Runs SLIDING_WINDOW_SCRIPT in Lua against a dict standing in for the Redis keyspace"""
+
+    def __init__(self, lupa):
+        self.lua = lupa.LuaRuntime()
+        self.data = {}
+        self.lua.globals().redis = self.lua.table(call=self.call)
+
+    def call(self, command, key, *args):
+        if command == "HMGET":
+            stored = self.data.get(key, {})
+            return self.lua.table(*[stored.get(field, False) for field in args])
+        if command == "HSET":
+            stored = self.data.setdefault(key, {})
+            for field, value in zip(args[::2], args[1::2]):
+                stored[field] = "%.17g" % value if isinstance(value, float) else str(value)
+            return len(args) // 2
+        if command == "GET":
+            return self.data.get(key, False)
+        if command == "INCR":
+            self.data[key] = str(int(self.data.get(key, 0)) + 1)
+            return int(self.data[key])
+        if command == "DECR":
+            self.data[key] = str(int(self.data.get(key, 0)) - 1)
+            return int(self.data[key])
+        if command == "EXPIRE":
+            return 1
+        raise ValueError(f"Unexpected command {command}")
+
+    def run(self, keys, args):
+        self.lua.globals().KEYS = self.lua.table(*keys)
+        self.lua.globals().ARGV = self.lua.table(*[str(arg) for arg in args])
+        allowed, denied, retry_after_ms, remaining = self.lua.execute(rate_limit_engine.SLIDING_WINDOW_SCRIPT).values()
+        # Redis truncates Lua numbers to integers in replies
+        return int(allowed), denied, int(retry_after_ms), int(remaining)
+
+def test_lua_script_matches_in_memory_path():
+    lupa = pytest.importorskip("lupa")
+    lua = LuaRedis(lupa)
+    engine = RateLimitEngine(InMemoryRedis())
+    keys = ["user:1", "user:1:running"]
+    # Limits chosen so every window, the concurrent check and admits all occur
+    windows = {"minute": (60, 10), "hour": (3600, 120)}
+
+    rng = random.Random(7)
+    now = 3600.0 * 5
+    for _ in range(400):
+        now += rng.choice([0.0, 0.4, 1.7, 13.0, 45.0])
+        args = [now, rng.choice([0, 0, 0, 2]), rng.choice([0, 0, 2])]
+        for name, (period, limit) in windows.items():
+            args.extend([name, period, limit])
+
+        assert lua.run(keys, args) == engine._run_in_memory(keys, args)
+
+        # Requests holding a concurrent slot complete
+        running = engine._memory.setdefault(keys[1], {})
+        if running.get("count", 0) > 0 and rng.random() < 0.3:
+            lua.call("DECR", keys[1])
+            running["count"] -= 1
@@ -0,0 +1,138 @@
+# In-Memory Redis Tests
+# Module: Redis Client - in-process backend, expiry wheel, pipelines and pub/sub
+
+import pytest
+import asyncio
+
+from src.utils.redis_client import ExpiryWheel, InMemoryRedis, ResponseError
+
+# =============================================================================
+# EXPIRY TESTS
+# =============================================================================
+
+def test_wheel_returns_only_due_keys():
+    wheel = ExpiryWheel(slots=8, tick_seconds=1.0)
+    now = wheel._tick * 1.0
+    wheel.schedule("soon", now + 2)
+    wheel.schedule("next_rotation", now + 10)
+
+    assert wheel.advance(now + 3) == ["soon"]
+    assert wheel.advance(now + 9) == []
+    assert wheel.advance(now + 11) == ["next_rotation"]
+    assert len(wheel) == 0
+
+def test_wheel_reschedule_replaces_deadline():
+    wheel = ExpiryWheel(slots=8, tick_seconds=1.0)
+    now = wheel._tick * 1.0
+    wheel.schedule("key", now + 2)
+    wheel.schedule("key", now + 5)
+
+    assert wheel.advance(now + 3) == []
+    assert wheel.advance(now + 6) == ["key"]
+
+@pytest.mark.asyncio
+async def test_expired_keys_are_reclaimed_without_being_read():
+    client = InMemoryRedis(expiry_slots=16, expiry_tick_seconds=0.01)
+    await client.setex("session", 0.05, "data")
+    await client.set("kept", "data")
+
+    await asyncio.sleep(0.1)
+    await client.ping()
+
+    assert client.get_stats()["keys"] == 1
+    assert await client.ttl("session") == -2
+    assert await client.ttl("kept") == -1
+
+@pytest.mark.asyncio
+async def test_set_without_ttl_clears_expiry():
+    client = InMemoryRedis()
+    await client.setex("key", 60, "a")
+    await client.set("key", "b")
+    assert await client.ttl("key") == -1
+
+# =============================================================================
+# COMMAND TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_counters_and_conditional_set():
+    client = InMemoryRedis()
+    assert await client.incr("count") == 1
+    assert await client.incrby("count", 4) == 5
+    assert await client.decr("count") == 4
+    assert await client.get("count") == "4"
+
+    assert await client.set("lock", "a", nx=True) is True
+    assert await client.set("lock", "b", nx=True) is None
+    assert await client.get("lock") == "a"
+
+@pytest.mark.asyncio
+async def test_hashes_and_sorted_sets():
+    client = InMemoryRedis()
+    assert await client.hset("h", mapping={"a": 1, "b": "x"}) == 2
+    assert await client.hincrby("h", "a", 2) == 3
+    assert await client.hgetall("h") == {"a": "3", "b": "x"}
+
+    await client.zadd("z", {"low": 1, "mid": 5, "high": 9})
+    assert await client.zrange("z", 0, -1) == ["low", "mid", "high"]
+    assert await client.zrangebyscore("z", "(1", "+inf") == ["mid", "high"]
+    assert await client.zremrangebyscore("z", "-inf", 5) == 2
+    assert await client.zrevrange("z", 0, 0, withscores=True) == [("high", 9.0)]
+
+@pytest.mark.asyncio
+async def test_wrong_type_is_rejected():
+    client = InMemoryRedis()
+    await client.set("plain", "value")
+    with pytest.raises(ResponseError):
+        await client.lpush("plain", "item")
+
+@pytest.mark.asyncio
+async def test_empty_collections_are_removed():
+    client = InMemoryRedis()
+    await client.sadd("members", "a")
+    await client.srem("members", "a")
+    assert await client.exists("members") == 0
+
+# =============================================================================
+# PIPELINE AND PUB/SUB TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_pipeline_runs_queued_commands_in_order():
+    client = InMemoryRedis()
+    pipe = client.pipeline()
+    pipe.incr("minute").expire("minute", 120)
+    pipe.incr("hour").expire("hour", 7200)
+
+    assert await pipe.execute() == [1, True, 1, True]
+    assert 0 < await client.ttl("minute") <= 120
+    assert len(pipe) == 0
+
+@pytest.mark.asyncio
+async def test_pipeline_reports_errors_after_running_batch():
+    client = InMemoryRedis()
+    await client.set("plain", "value")
+    pipe = client.pipeline()
+    pipe.lpush("plain", "x").incr("after")
+
+    with pytest.raises(ResponseError):
+        await pipe.execute()
+    assert await client.get("after") == "1"
+
+@pytest.mark.asyncio
+async def test_publish_reaches_channel_and_pattern_subscribers():
+    client = InMemoryRedis()
+    pubsub = client.pubsub()
+    await pubsub.subscribe("events")
+    await pubsub.psubscribe("journey:*")
+
+    assert await client.publish("events", "a") == 1
+    assert await client.publish("journey:stage", "b") == 1
+
+    first = await pubsub.get_message(ignore_subscribe_messages=True, timeout=0.1)
+    second = await pubsub.get_message(ignore_subscribe_messages=True, timeout=0.1)
+    assert (first["channel"], first["data"]) == ("events", "a")
+    assert (second["type"], second["channel"]) == ("pmessage", "journey:stage")
+
+    await pubsub.close()
+    assert await client.publish("events", "c") == 0
@@ -0,0 +1,107 @@
+# Startup Tests
+# Module: startup profiling, once-only lazy services and deferred module imports
+
+import asyncio
+import sys
+
+import pytest
+
+from src.utils.lazy_import import lazy_module
+from utils.startup import LazyService, StartupProfiler
+
+# =============================================================================
+# STARTUP PROFILER TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_profiler_times_imports_and_parallel_init():
+    profiler = StartupProfiler()
+    profiler.import_module("json", "json")
+
+    async def service(delay, value):
+        await asyncio.sleep(delay)
+        return value
+
+    started = asyncio.get_running_loop().time()
+    instances = await profiler.init_parallel({
+        "slow": lambda: service(0.05, "slow"),
+        "fast": lambda: service(0.05, "fast")
+    })
+    elapsed = asyncio.get_running_loop().time() - started
+    profiler.mark_ready()
+    report = profiler.report()
+
+    assert instances == {"slow": "slow", "fast": "fast"}
+    assert elapsed < 0.09
+    assert "import_ms" in report["components"]["json"]
+    assert report["components"]["slow"]["init_ms"] >= 40
+    assert report["time_to_ready_ms"] is not None
+
+@pytest.mark.asyncio
+async def test_profiler_records_failed_init():
+    profiler = StartupProfiler()
+
+    async def broken():
+        raise RuntimeError("no connection")
+
+    with pytest.raises(RuntimeError):
+        await profiler.init_parallel({"broken": broken})
+    assert profiler.report()["components"]["broken"]["error"] == "no connection"
+
+# =============================================================================
+# LAZY SERVICE TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_lazy_service_is_created_once_under_concurrent_use():
+    created = []
+
+    async def factory():
+        created.append(object())
+        await asyncio.sleep(0.01)
+        return created[-1]
+
+    profiler = StartupProfiler()
+    service = LazyService("search_service", factory, profiler)
+    assert not service.initialized
+    assert created == []
+
+    instances = await asyncio.gather(*(service.get() for _ in range(10)))
+
+    assert len(created) == 1
+    assert all(instance is created[0] for instance in instances)
+    assert service.initialized
+    assert "lazy_init_ms" in profiler.report()["components"]["search_service"]
+
+@pytest.mark.asyncio
+async def test_lazy_service_retries_after_failed_creation():
+    attempts = []
+
+    async def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("not yet")
+        return "service"
+
+    service = LazyService("rag_service", factory)
+    with pytest.raises(RuntimeError):
+        await service.get()
+    assert not service.initialized
+    assert await service.get() == "service"
+
+# =============================================================================
+# LAZY MODULE TESTS
+# =============================================================================
+
+def test_lazy_module_defers_import_until_first_attribute(tmp_path, monkeypatch):
+    (tmp_path / "heavy_dependency.py").write_text("VALUE = 42\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "heavy_dependency", raising=False)
+
+    proxy = lazy_module("heavy_dependency")
+    assert "heavy_dependency" not in sys.modules
+    assert "not loaded" in repr(proxy)
+
+    assert proxy.VALUE == 42
+    assert "heavy_dependency" in sys.modules
+    assert "(loaded)" in repr(proxy)
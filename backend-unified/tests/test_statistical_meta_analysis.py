@@ -0,0 +1,123 @@
+# Statistical Meta-Analysis Tests
+# Module: 2C - vectorized fixed/random-effects meta-analysis in StatisticalEngine
+
+import math
+
+import numpy as np
+import pytest
+
+from src.services.statistical_engine import StatisticalEngine
+
+# Classic DerSimonian-Laird example data (log odds ratios and variances)
+EFFECTS = np.array([-0.89, -1.59, -1.35, -1.44, -0.22, -0.79, -1.63, 0.01, -0.47, -1.40])
+VARIANCES = np.array([0.36, 0.22, 0.04, 0.15, 0.01, 0.32, 0.44, 0.06, 0.05, 0.27])
+
+def dersimonian_laird(effects, variances):
+    """Straightforward loop implementation used as the reference"""
+    weights = [1 / v for v in variances]
+    pooled = sum(w * y for w, y in zip(weights, effects)) / sum(weights)
+    q = sum(w * (y - pooled) ** 2 for w, y in zip(weights, effects))
+    c = sum(weights) - sum(w * w for w in weights) / sum(weights)
+    tau_squared = max(0.0, (q - (len(effects) - 1)) / c)
+    re_weights = [1 / (v + tau_squared) for v in variances]
+    re_pooled = sum(w * y for w, y in zip(re_weights, effects)) / sum(re_weights)
+    return pooled, q, tau_squared, re_pooled, 1 / math.sqrt(sum(re_weights))
+
+# =============================================================================
+# ARRAY API TESTS
+# =============================================================================
+
+def test_fixed_and_random_effects_match_reference():
+    result = StatisticalEngine().meta_analysis_arrays(EFFECTS, VARIANCES)
+    pooled, q, tau_squared, re_pooled, re_se = dersimonian_laird(EFFECTS, VARIANCES)
+
+    assert result["pooled_effect_size"] == pytest.approx(pooled)
+    assert result["heterogeneity"]["q_statistic"] == pytest.approx(q)
+    assert result["random_effects"]["tau_squared"] == pytest.approx(tau_squared)
+    assert result["random_effects"]["pooled_effect_size"] == pytest.approx(re_pooled)
+    assert result["random_effects"]["standard_error"] == pytest.approx(re_se)
+    assert tau_squared > 0
+    assert result["heterogeneity"]["interpretation"] == "high"
+
+def test_homogeneous_tests_have_no_between_test_variance():
+    result = StatisticalEngine().meta_analysis_arrays(np.full(5, 0.2), np.full(5, 0.01))
+
+    assert result["random_effects"]["tau_squared"] == 0
+    assert result["random_effects"]["pooled_effect_size"] == pytest.approx(result["pooled_effect_size"])
+    assert result["heterogeneity"]["i_squared"] == 0
+
+def test_grouped_analysis_matches_separate_calls():
+    engine = StatisticalEngine()
+    groups = ["mobile"] * 4 + ["desktop"] * 6
+    grouped = engine.meta_analysis_arrays(EFFECTS, VARIANCES, groups=groups)
+
+    assert set(grouped) == {"mobile", "desktop"}
+    for label, rows in (("mobile", slice(0, 4)), ("desktop", slice(4, 10))):
+        separate = engine.meta_analysis_arrays(EFFECTS[rows], VARIANCES[rows])
+        assert grouped[label]["number_of_tests"] == separate["number_of_tests"]
+        assert grouped[label]["pooled_effect_size"] == pytest.approx(separate["pooled_effect_size"])
+        assert grouped[label]["random_effects"]["pooled_effect_size"] == pytest.approx(
+            separate["random_effects"]["pooled_effect_size"]
+        )
+
+def test_single_test_group_has_no_heterogeneity():
+    grouped = StatisticalEngine().meta_analysis_arrays(EFFECTS[:3], VARIANCES[:3], groups=["a", "a", "b"])
+
+    assert grouped["b"]["number_of_tests"] == 1
+    assert grouped["b"]["heterogeneity"]["p_value"] == 1.0
+    assert grouped["b"]["random_effects"]["tau_squared"] == 0
+
+def test_unusable_variances_are_ignored():
+    engine = StatisticalEngine()
+    result = engine.meta_analysis_arrays([0.1, 0.2, 5.0], [0.01, 0.02, 0.0])
+
+    assert result["number_of_tests"] == 2
+    assert engine.meta_analysis_arrays([0.1], [float("nan")]) == {"error": "No valid effect sizes found"}
+
+# =============================================================================
+# TEST RESULT API TESTS
+# =============================================================================
+
+def make_results():
+    rows = []
+    for index, (category, participants) in enumerate([("cta", 1000), ("cta", 4000), ("hero", 2000),
+                                                      ("hero", 3000), ("hero", 5000)]):
+        rows.append({
+            "category": category,
+            "effect_size": 0.02 * (index + 1),
+            "control_participants": participants,
+            "control_conversions": participants // 20,
+            "variant_participants": participants,
+            "variant_conversions": participants // 18
+        })
+    return rows
+
+def test_meta_analysis_uses_sample_size_variance():
+    rows = make_results()
+    result = StatisticalEngine().meta_analysis(rows)
+
+    totals = np.array([r["control_participants"] + r["variant_participants"] for r in rows])
+    effects = np.array([r["effect_size"] for r in rows])
+    assert result["pooled_effect_size"] == pytest.approx(np.dot(totals, effects) / totals.sum())
+    assert result["standard_error"] == pytest.approx(1 / math.sqrt(totals.sum() / 2))
+    assert result["total_sample_size"] == totals.sum()
+
+def test_meta_analysis_grouped_by_category():
+    grouped = StatisticalEngine().meta_analysis(make_results(), group_by="category")
+
+    assert grouped["cta"]["number_of_tests"] == 2
+    assert grouped["hero"]["number_of_tests"] == 3
+    assert grouped["hero"]["total_sample_size"] == 20000
+
+def test_bayesian_meta_analysis_pools_counts_per_group():
+    grouped = StatisticalEngine().bayesian_meta_analysis(make_results(), group_by="category")
+
+    # Posterior mean under a Beta(1, 1) prior over the pooled control counts
+    assert grouped["cta"]["control_rate"] == pytest.approx((1 + 50 + 200) / (2 + 5000))
+    assert grouped["hero"]["control_rate"] == pytest.approx((1 + 100 + 150 + 250) / (2 + 10000))
+
+def test_empty_inputs_report_errors():
+    engine = StatisticalEngine()
+    assert engine.meta_analysis([]) == {"error": "No test results provided"}
+    assert engine.meta_analysis([{"effect_size": 0.1}]) == {"error": "No valid effect sizes found"}
+    assert "error" in engine.bayesian_meta_analysis([])
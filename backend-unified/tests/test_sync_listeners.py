@@ -0,0 +1,79 @@
+# Sync Listener Tests
+# Milestone 1C: resolving the repository-level DatabaseSyncManager from backend-unified
+
+import os
+from uuid import uuid4
+
+import pytest
+
+from benchmarks.local_stand_ins import configure_environment
+
+configure_environment()
+
+from app.models.rag_models import SearchResponse, SearchResult
+from app.services import sync_listeners
+from app.services.response_cache import SearchResponseCache
+
+class FakeSyncManager:
+    def __init__(self):
+        self.listeners = []
+
+    def add_sync_listener(self, listener):
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+async def listener(entities):
+    return None
+
+def cached_response(chunk_id, source_id):
+    result = SearchResult(
+        content="chunk", relevance_score=0.9, confidence_score=0.8,
+        source_id=source_id, chunk_id=chunk_id
+    )
+    return SearchResponse(results=[result], total_results=1, confidence_score=0.8, strategy_used="hybrid")
+
+def test_shared_models_resolve_to_repository_module():
+    import models.unified_models
+
+    expected = os.path.join(sync_listeners.REPOSITORY_ROOT, "models", "unified_models.py")
+    assert models.unified_models.__file__ == expected
+
+@pytest.mark.asyncio
+async def test_synced_entity_evicts_cached_response(monkeypatch):
+    for module in ("asyncpg", "neo4j", "aiofiles"):
+        pytest.importorskip(module)
+    monkeypatch.setenv("NEON_PASSWORD", os.getenv("NEON_PASSWORD", "test-password"))
+    monkeypatch.setenv("NEO4J_PASSWORD", os.getenv("NEO4J_PASSWORD", "test-password"))
+
+    from models.unified_models import EntityType, UniversalEntity
+
+    sync_manager = sync_listeners.load_sync_manager()
+    assert sync_manager is not None
+    assert type(sync_manager).__module__ == "database.sync_manager"
+
+    cache = SearchResponseCache(semantic_enabled=False)
+    synced_id, other_id = uuid4(), uuid4()
+    cache.put("what is rag", "hybrid", None, cached_response("chunk-1", str(synced_id)))
+    cache.put("what is a funnel", "hybrid", None, cached_response("chunk-2", str(other_id)))
+
+    assert sync_listeners.attach_sync_listeners(cache.on_entities_synced)
+    try:
+        entity = UniversalEntity(id=synced_id, type=EntityType.DOCUMENT, name="RAG guide", content="updated")
+        await sync_manager._notify_listeners([entity])
+    finally:
+        sync_manager.remove_sync_listener(cache.on_entities_synced)
+
+    assert cache.get_exact("what is rag", "hybrid", None) is None
+    assert cache.get_exact("what is a funnel", "hybrid", None) is not None
+
+def test_attach_registers_listeners():
+    sync_manager = FakeSyncManager()
+
+    assert sync_listeners.attach_sync_listeners(listener, sync_manager=sync_manager)
+    assert sync_listeners.attach_sync_listeners(listener, sync_manager=sync_manager)
+    assert sync_manager.listeners == [listener]
+
+def test_attach_without_sync_manager(monkeypatch):
+    monkeypatch.setattr(sync_listeners, "load_sync_manager", lambda: None)
+
+    assert not sync_listeners.attach_sync_listeners(listener)
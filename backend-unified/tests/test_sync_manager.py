@@ -0,0 +1,206 @@
+# Sync Manager Tests
+# Milestone 1C: keyset change scans, watermarks and conflict handling of the PostgreSQL/Neo4j sync
+
+import json
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from uuid import UUID
+
+import pytest
+
+pytest.importorskip("asyncpg")
+pytest.importorskip("neo4j")
+pytest.importorskip("aiofiles")
+
+from benchmarks.local_stand_ins import configure_environment
+
+configure_environment()
+
+from app.services.sync_listeners import ensure_repository_root_on_path  # noqa: E402
+
+ensure_repository_root_on_path()
+os.environ.setdefault("NEON_PASSWORD", "test-password")
+os.environ.setdefault("NEO4J_PASSWORD", "test-password")
+
+from database import sync_manager as sync_module  # noqa: E402
+from database.sync_manager import (  # noqa: E402
+    ConflictResolution, DatabaseSyncManager, SyncConfiguration, SyncDirection, SyncWatermark
+)
+
+START = datetime(2025, 7, 5, 12, 0, 0)
+
+def document_id(index):
+    return str(UUID(int=index))
+
+def document_row(index, seconds, is_active=True):
+    return {
+        "id": document_id(index), "title": f"Doc {index}", "source": "test", "content": "body",
+        "content_type": "document", "metadata": json.dumps({}), "engagement_score": 0.1,
+        "conversion_rate": 0.2, "created_at": START, "updated_at": START + timedelta(seconds=seconds),
+        "content_vector": None, "is_active": is_active
+    }
+
+def entity_record(index, seconds):
+    return {
+        "uuid": document_id(index), "name": f"Entity {index}", "type": "document",
+        "performance_score": 0.5, "confidence_score": 0.6, "created_at": START,
+        "updated_at": START + timedelta(seconds=seconds), "properties": {"content_preview": "preview"}
+    }
+
+class FakeConnection:
+    def __init__(self, database):
+        self.database = database
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def fetch(self, query, since, last_id, limit):
+        """Keyset scan of the documents table ordered by (updated_at, id)"""
+        self.database.scans.append((since, last_id))
+        rows = sorted(self.database.documents, key=lambda row: (row["updated_at"], row["id"]))
+        return [row for row in rows if (row["updated_at"], row["id"]) > (since, last_id)][:limit]
+
+    async def executemany(self, query, rows):
+        self.database.upserts.extend(rows)
+
+    async def execute(self, query, *args):
+        if "sync_watermarks" in query:
+            self.database.saved_watermarks.append(args)
+
+class FakeDatabaseManager:
+    def __init__(self, documents=()):
+        self.documents = list(documents)
+        self.scans = []
+        self.upserts = []
+        self.saved_watermarks = []
+
+    @asynccontextmanager
+    async def get_connection(self):
+        yield FakeConnection(self)
+
+class FakeGraphManager:
+    def __init__(self, entities=()):
+        self.entities = list(entities)
+        self.scans = []
+        self.merged = []
+
+    async def execute_query(self, query, parameters):
+        """Keyset scan of Entity nodes ordered by (updated_at, uuid)"""
+        since, last_id = parameters["since"], parameters["last_id"]
+        self.scans.append((since, last_id))
+        records = sorted(self.entities, key=lambda record: (record["updated_at"], record["uuid"]))
+        return [dict(record) for record in records
+                if (record["updated_at"], record["uuid"]) > (since, last_id)][:parameters["limit"]]
+
+    async def execute_write_batches(self, query, rows, batch_size):
+        self.merged.extend(row["uuid"] for row in rows)
+        return [{"uuid": row["uuid"]} for row in rows]
+
+    def invalidate_cached_reads(self, entity_uuids, new_entities=False):
+        pass
+
+def make_sync_manager(monkeypatch, documents=(), entities=(), **config):
+    database, graph = FakeDatabaseManager(documents), FakeGraphManager(entities)
+    monkeypatch.setattr(sync_module, "db_manager", database)
+    monkeypatch.setattr(sync_module, "graph_manager", graph)
+
+    sync_config = SyncConfiguration()
+    sync_config.batch_size = 2
+    for name, value in config.items():
+        setattr(sync_config, name, value)
+
+    manager = DatabaseSyncManager(sync_config)
+    notified = []
+
+    async def listener(synced):
+        notified.extend(str(entity.id) for entity in synced)
+
+    manager.add_sync_listener(listener)
+    return manager, database, graph, notified
+
+# =============================================================================
+# KEYSET WATERMARK TESTS
+# =============================================================================
+
+def test_watermark_only_moves_forward():
+    watermark = SyncWatermark(START, document_id(5))
+    watermark.advance(START, document_id(3))
+    watermark.advance(START - timedelta(seconds=1), document_id(9))
+    assert (watermark.timestamp, watermark.last_id) == (START, document_id(5))
+
+    watermark.advance(START, document_id(6))
+    assert watermark.last_id == document_id(6)
+
+@pytest.mark.asyncio
+async def test_postgres_changes_stream_in_keyset_batches(monkeypatch):
+    # Rows 2 and 3 share a timestamp: the id tie-breaker keeps either from being skipped
+    documents = [document_row(1, 1), document_row(3, 2), document_row(2, 2),
+                 document_row(4, 3, is_active=False), document_row(5, 4)]
+    manager, database, graph, notified = make_sync_manager(monkeypatch, documents)
+
+    await manager._sync_changed_entities(SyncDirection.POSTGRES_TO_NEO4J, manager.watermarks)
+
+    watermark = manager.watermarks[manager.POSTGRES_DOCUMENTS]
+    assert graph.merged == [document_id(i) for i in (1, 2, 3, 5)]
+    assert notified == [document_id(i) for i in (1, 2, 3, 4, 5)]
+    assert (watermark.timestamp, watermark.last_id) == (START + timedelta(seconds=4), document_id(5))
+    assert database.scans[1] == (START + timedelta(seconds=2), document_id(2))
+    assert [saved[3] for saved in database.saved_watermarks] == [2, 2, 1]
+    assert manager.status.rows_read == 5
+
+@pytest.mark.asyncio
+async def test_incremental_pass_reads_only_rows_past_the_watermark(monkeypatch):
+    manager, database, graph, _ = make_sync_manager(monkeypatch, [document_row(1, 1), document_row(5, 2)])
+    await manager._sync_changed_entities(SyncDirection.POSTGRES_TO_NEO4J, manager.watermarks)
+    graph.merged.clear()
+
+    # A row sharing the mark's timestamp with a larger id, and a later row, are past the mark
+    database.documents += [document_row(6, 2), document_row(7, 5)]
+    await manager._sync_changed_entities(SyncDirection.POSTGRES_TO_NEO4J, manager.watermarks)
+
+    assert graph.merged == [document_id(6), document_id(7)]
+
+@pytest.mark.asyncio
+async def test_neo4j_changes_upsert_to_postgres_with_source_timestamps(monkeypatch):
+    entities = [entity_record(1, 1), entity_record(2, 1), entity_record(3, 7)]
+    manager, database, _, notified = make_sync_manager(monkeypatch, entities=entities)
+
+    await manager._sync_changed_entities(SyncDirection.NEO4J_TO_POSTGRES, manager.watermarks)
+
+    updated_at = DatabaseSyncManager.DOCUMENT_COLUMNS.index("updated_at")
+    assert [row[0] for row in database.upserts] == [document_id(i) for i in (1, 2, 3)]
+    assert [row[updated_at] for row in database.upserts] == [record["updated_at"] for record in entities]
+    assert notified == [document_id(i) for i in (1, 2, 3)]
+    assert manager.watermarks[manager.NEO4J_ENTITIES].last_id == document_id(3)
+
+# =============================================================================
+# CONFLICT RESOLUTION TESTS
+# =============================================================================
+
+def test_postgres_priority_skips_rows_already_at_the_source_timestamp():
+    config = SyncConfiguration()
+    config.conflict_resolution = ConflictResolution.POSTGRES_PRIORITY
+    manager = DatabaseSyncManager(config)
+
+    # A row synced back unchanged must not be rewritten, or it would bounce between the stores
+    assert "documents.updated_at IS DISTINCT FROM EXCLUDED.updated_at" in manager._document_upsert_query()
+    assert not manager._should_update(START, START)
+    assert manager._should_update(START + timedelta(seconds=1), START)
+
+@pytest.mark.asyncio
+async def test_postgres_priority_neo4j_merge_compares_source_timestamps(monkeypatch):
+    manager, _, graph, _ = make_sync_manager(
+        monkeypatch, conflict_resolution=ConflictResolution.POSTGRES_PRIORITY
+    )
+    queries = []
+
+    async def execute_write_batches(query, rows, batch_size):
+        queries.append(query)
+        return []
+
+    monkeypatch.setattr(graph, "execute_write_batches", execute_write_batches)
+    await manager._merge_entities_to_neo4j([manager._postgres_row_to_entity(document_row(1, 1))])
+
+    assert "existing.updated_at <> row.updated_at" in queries[0]
@@ -0,0 +1,152 @@
+# Agent Task Retention Tests
+# Module: 3A - bounded in-memory agent tasks, TTL expiry and the on-disk result store
+
+import sys
+import types
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, List, Optional
+from uuid import UUID, uuid4
+
+import pytest
+
+from core.agents import task_retention
+from core.agents.task_retention import TaskResultStore, TaskRetention
+
+@dataclass
+class Task:
+    status: str = "completed"
+    result: Any = None
+    agent_type: str = "writer"
+    task_type: str = "draft"
+    priority: str = "medium"
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    dependencies: List[UUID] = field(default_factory=list)
+    error: Optional[str] = None
+    id: UUID = field(default_factory=uuid4)
+
+class Clock:
+    """Replaces the time module in task_retention so TTLs can be stepped"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+def add(retention, **kwargs):
+    task = Task(**kwargs)
+    retention[task.id] = task
+    return task
+
+# =============================================================================
+# RETENTION LIMIT TESTS
+# =============================================================================
+
+def test_finished_tasks_beyond_the_bound_are_evicted_lru_first(tmp_path):
+    retention = TaskRetention(max_tasks=3, store=TaskResultStore(str(tmp_path / "tasks.db")))
+    tasks = [add(retention, result={"n": n}) for n in range(3)]
+    retention.touch(tasks[0].id)
+    add(retention, result={"n": 3})
+    add(retention, result={"n": 4})
+
+    assert len(retention) == 3
+    assert tasks[0].id in retention
+    assert tasks[1].id not in retention and tasks[2].id not in retention
+    assert retention.get_memory_metrics()["evicted"] == 2
+
+def test_queued_and_running_tasks_are_never_evicted():
+    retention = TaskRetention(max_tasks=2)
+    running = [add(retention, status=status) for status in ("pending", "running", "running")]
+    finished = add(retention, status="failed", error="timeout")
+
+    assert all(task.id in retention for task in running)
+    assert finished.id not in retention
+    assert len(retention) == 3
+
+def test_finished_tasks_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(task_retention, "time", clock)
+    retention = TaskRetention(max_tasks=100, ttl_seconds=60)
+    done, running, touched = add(retention), add(retention, status="running"), add(retention)
+
+    clock.now += 45
+    retention.touch(touched.id)
+    clock.now += 30
+    assert retention.sweep() == 1
+
+    assert done.id not in retention
+    assert running.id in retention and touched.id in retention
+    assert retention.get_memory_metrics()["expired"] == 1
+
+# =============================================================================
+# DISK SPILL TESTS
+# =============================================================================
+
+def test_evicted_results_are_read_back_from_disk(tmp_path):
+    path = str(tmp_path / "tasks.db")
+    retention = TaskRetention(max_tasks=1, store=TaskResultStore(path, batch_size=1))
+    first = add(retention, result={"draft": "x" * 500}, dependencies=[uuid4()])
+    second = add(retention, result={"draft": "second"})
+
+    record = retention.lookup(first.id)
+    assert record["result"] == {"draft": "x" * 500}
+    assert record["dependencies"] == [str(first.dependencies[0])]
+    assert retention.lookup(second.id)["result"] == {"draft": "second"}
+    assert retention.get_memory_metrics()["store_hits"] == 1
+    retention.store.close()
+
+    # A new process reads the same file
+    reopened = TaskResultStore(path)
+    assert reopened.get(first.id)["status"] == "completed"
+    assert reopened.get(uuid4()) is None
+    stats = reopened.get_stats()
+    assert stats["rows"] == 1 and stats["file_bytes"] > 0
+
+def test_spilled_and_buffered_records_read_back(tmp_path):
+    store = TaskResultStore(str(tmp_path / "tasks.db"), batch_size=100)
+    retention = TaskRetention(max_tasks=10, store=store)
+    task = add(retention, result={"chunks": ["a"] * 200})
+
+    retention.spill_all()
+    assert task.id not in retention
+    assert store.get_stats()["pending"] == 0
+    assert retention.lookup(task.id)["result"] == {"chunks": ["a"] * 200}
+    assert store.get_stats()["compression_ratio"] > 1
+
+    store.put({"task_id": "pending-id", "status": "completed"})
+    assert store.get("pending-id")["status"] == "completed"
+    assert store.get_stats()["pending"] == 1
+    store.close()
+
+def test_prune_drops_records_past_the_retention_window(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(task_retention, "time", clock)
+    store = TaskResultStore(str(tmp_path / "tasks.db"), retention_days=1)
+    store.put({"task_id": "old", "status": "completed"})
+    clock.now += 2 * 86400
+    store.put({"task_id": "new", "status": "completed"})
+
+    assert store.prune() == 1
+    assert store.get("old") is None and store.get("new") is not None
+    store.close()
+
+# =============================================================================
+# PROCESS MEMORY TESTS
+# =============================================================================
+
+@pytest.mark.parametrize("platform, expected", [("linux", 2048 * 1024), ("darwin", 2048)])
+def test_peak_rss_units_follow_the_platform(monkeypatch, platform, expected):
+    def no_procfs(*args, **kwargs):
+        raise OSError("no /proc")
+
+    usage = types.SimpleNamespace(ru_maxrss=2048)
+    resource = types.SimpleNamespace(RUSAGE_SELF=0, getrusage=lambda who: usage)
+    monkeypatch.setattr(task_retention, "open", no_procfs, raising=False)
+    monkeypatch.setitem(sys.modules, "resource", resource)
+    monkeypatch.setattr(task_retention.sys, "platform", platform)
+
+    assert task_retention.process_rss_bytes() == expected
@@ -0,0 +1,141 @@
+# Agent Task Scheduler Tests
+# Module: 3A - priority queues, dependency gating and timeouts of the agent task scheduler
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from uuid import UUID, uuid4
+
+import pytest
+
+from core.agents.task_scheduler import AgentTaskScheduler, TaskDependencyError, TaskTimeoutError
+
+@dataclass
+class Task:
+    agent_type: str = "writer"
+    priority: str = "medium"
+    dependencies: List[UUID] = field(default_factory=list)
+    dependency_inputs: Dict[str, UUID] = field(default_factory=dict)
+    data: Dict[str, Any] = field(default_factory=dict)
+    id: UUID = field(default_factory=uuid4)
+    status: str = "pending"
+    error: Optional[str] = None
+
+class Agents:
+    """A pool of `capacity` interchangeable agents; records the order tasks start in"""
+
+    def __init__(self, capacity=1, run_seconds=0.0):
+        self.free = capacity
+        self.run_seconds = run_seconds
+        self.started: List[Task] = []
+
+    def acquire(self, agent_type):
+        if self.free == 0:
+            return None
+        self.free -= 1
+        return agent_type
+
+    def release(self, agent, success, elapsed):
+        self.free += 1
+
+    async def run(self, task, agent):
+        self.started.append(task)
+        await asyncio.sleep(self.run_seconds)
+        return {"task": task.data.get("name"), "inputs": dict(task.data)}
+
+def make_scheduler(agents, **kwargs):
+    return AgentTaskScheduler(agents.acquire, agents.release, agents.run, **kwargs)
+
+# =============================================================================
+# PRIORITY TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_priority_order_with_fifo_ties():
+    agents = Agents(capacity=0)
+    scheduler = make_scheduler(agents)
+    tasks = [
+        Task(priority="low", data={"name": "low"}),
+        Task(priority="high", data={"name": "high-1"}),
+        Task(priority="critical", data={"name": "critical"}),
+        Task(priority="high", data={"name": "high-2"})
+    ]
+    futures = [scheduler.submit_nowait(task) for task in tasks]
+    assert scheduler.queue_depth == 4
+
+    agents.free = 1
+    scheduler._dispatch()
+    await asyncio.gather(*futures)
+
+    assert [task.data["name"] for task in agents.started] == ["critical", "high-1", "high-2", "low"]
+    await scheduler.shutdown()
+
+# =============================================================================
+# DEPENDENCY TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_dependents_wait_and_receive_results():
+    agents = Agents(capacity=2)
+    scheduler = make_scheduler(agents)
+    outline = Task(agent_type="outline", data={"name": "outline"})
+    writer = Task(dependencies=[outline.id], dependency_inputs={"outline": outline.id}, data={"name": "writer"})
+
+    results = await scheduler.run_graph([writer, outline])
+
+    assert [task.data["name"] for task in agents.started] == ["outline", "writer"]
+    assert results[writer.id]["inputs"]["outline"] == results[outline.id]
+    await scheduler.shutdown()
+
+@pytest.mark.asyncio
+async def test_failed_dependency_fails_dependents():
+    agents = Agents(capacity=1)
+    scheduler = make_scheduler(agents)
+    first = Task(data={"name": "first"})
+    second = Task(dependencies=[first.id], data={"name": "second"})
+    futures = [scheduler.submit_nowait(first), scheduler.submit_nowait(second)]
+    scheduler.cancel(first.id)
+
+    outcomes = await asyncio.gather(*futures, return_exceptions=True)
+    assert isinstance(outcomes[1], TaskDependencyError)
+    assert agents.started == []
+    await scheduler.shutdown()
+
+# =============================================================================
+# TIMEOUT TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_timeout_starts_when_dependencies_complete():
+    agents = Agents(capacity=1, run_seconds=0.15)
+    scheduler = make_scheduler(agents)
+    first = Task(data={"name": "first"})
+    second = Task(dependencies=[first.id], data={"name": "second"})
+
+    # Counted from submission, second would have 0.05s left for its 0.15s run
+    results = await scheduler.run_graph([first, second], timeout_seconds=0.2)
+    assert results[second.id]["task"] == "second"
+    assert scheduler.metrics["timed_out"] == 0
+    await scheduler.shutdown()
+
+@pytest.mark.asyncio
+async def test_sweep_expires_tasks_waiting_for_an_agent():
+    agents = Agents(capacity=0)
+    scheduler = make_scheduler(agents, sweep_interval_seconds=0.02)
+    future = scheduler.submit_nowait(Task(), timeout_seconds=0.05)
+
+    with pytest.raises(TaskTimeoutError):
+        await asyncio.wait_for(future, timeout=1.0)
+    assert scheduler.metrics["timed_out"] == 1
+    assert scheduler.queue_depth == 0
+    await scheduler.shutdown()
+
+@pytest.mark.asyncio
+async def test_running_task_times_out():
+    agents = Agents(capacity=1, run_seconds=1.0)
+    scheduler = make_scheduler(agents)
+
+    with pytest.raises(TaskTimeoutError):
+        await scheduler.submit(Task(), timeout_seconds=0.05)
+    assert agents.free == 1
+    await scheduler.shutdown()
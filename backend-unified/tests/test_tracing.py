@@ -0,0 +1,132 @@
+# Request Tracing Tests
+# Module: request-level spans, per-span latency histograms and Prometheus export
+
+import asyncio
+
+import pytest
+
+from utils.tracing import DEFAULT_BUCKETS, Histogram, Tracer, traced
+from utils import tracing
+
+def stage(tracer, name, seconds=0.0):
+    async def run():
+        with tracer.span(name):
+            await asyncio.sleep(seconds)
+            with tracer.span(f"{name}.inner"):
+                pass
+    return run
+
+# =============================================================================
+# SPAN NESTING TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_spans_started_under_gather_nest_under_the_request_span():
+    tracer = Tracer()
+
+    with tracer.span("request") as root:
+        await asyncio.gather(stage(tracer, "search", 0.02)(), stage(tracer, "validate", 0.01)())
+        assert tracer.current_span() is root
+
+    assert tracer.current_span() is None
+    assert sorted(child.name for child in root.children) == ["search", "validate"]
+    for child in root.children:
+        # Each gathered task keeps its own current span, so inner spans do not cross over
+        assert [grandchild.name for grandchild in child.children] == [f"{child.name}.inner"]
+    assert root.duration >= max(child.duration for child in root.children)
+
+def test_failed_span_records_the_error_and_restores_the_parent():
+    tracer = Tracer()
+
+    with tracer.span("request") as root:
+        with pytest.raises(ValueError):
+            with tracer.span("validate", {"content_id": "c1"}):
+                raise ValueError("bad content")
+        assert tracer.current_span() is root
+
+    failed = root.children[0]
+    assert failed.error == "ValueError"
+    assert failed.to_dict()["attributes"] == {"content_id": "c1"}
+    assert "validate" in root.format_tree() and "error=ValueError" in root.format_tree()
+    assert tracer.get_summary()["validate"]["errors"] == 1
+
+# =============================================================================
+# DISABLED TRACING TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_disabled_tracer_is_a_shared_no_op(monkeypatch):
+    tracer = Tracer(enabled=False)
+    monkeypatch.setattr(tracing, "tracer", tracer)
+
+    @traced("decorated")
+    async def decorated():
+        return tracer.current_span()
+
+    with tracer.span("request") as root:
+        assert root is None
+        assert await decorated() is None
+
+    assert tracer.span("a") is tracer.span("b")
+    assert tracer.get_summary() == {}
+    assert "span_duration_seconds_bucket" not in tracer.render_prometheus()
+
+# =============================================================================
+# HISTOGRAM TESTS
+# =============================================================================
+
+def test_histogram_counts_each_observation_in_its_smallest_bucket():
+    histogram = Histogram((0.01, 0.1, 1.0))
+    for seconds in (0.005, 0.01, 0.05, 0.5, 0.7, 3.0):
+        histogram.observe(seconds)
+    histogram.observe(0.2, error=True)
+
+    assert histogram.counts == [2, 1, 3]
+    assert (histogram.count, histogram.errors) == (7, 1)
+    assert histogram.sum == pytest.approx(4.465)
+    assert histogram.quantile(0.25) == 0.01
+    assert histogram.quantile(0.5) == 1.0
+    assert histogram.quantile(1.0) == float("inf")
+    assert Histogram(DEFAULT_BUCKETS).quantile(0.5) is None
+
+def test_tracer_accumulates_one_histogram_per_span_name():
+    tracer = Tracer(buckets=(0.01, 0.1))
+    for seconds in (0.001, 0.002, 0.05):
+        tracer.observe("search", seconds)
+    tracer.observe("validate", 0.5, error=True)
+
+    summary = tracer.get_summary()
+    assert list(summary) == ["search", "validate"]
+    assert summary["search"]["count"] == 3
+    assert summary["search"]["mean_ms"] == pytest.approx(17.67)
+    assert (summary["search"]["p50_le_ms"], summary["search"]["p99_le_ms"]) == (10.0, 100.0)
+    assert summary["validate"]["p50_le_ms"] == float("inf")
+
+    tracer.reset()
+    assert tracer.get_summary() == {}
+
+# =============================================================================
+# PROMETHEUS EXPORT TESTS
+# =============================================================================
+
+def test_render_prometheus_emits_cumulative_buckets_and_error_counters():
+    tracer = Tracer(buckets=(0.01, 0.1))
+    tracer.observe("search", 0.005)
+    tracer.observe("search", 0.05)
+    tracer.observe("search", 0.5, error=True)
+    tracer.observe('say "hi"', 0.001)
+
+    lines = tracer.render_prometheus().splitlines()
+
+    assert lines[:2] == [
+        "# HELP span_duration_seconds Duration of instrumented request stages",
+        "# TYPE span_duration_seconds histogram"
+    ]
+    assert 'span_duration_seconds_bucket{span="search",le="0.01"} 1' in lines
+    assert 'span_duration_seconds_bucket{span="search",le="0.1"} 2' in lines
+    assert 'span_duration_seconds_bucket{span="search",le="+Inf"} 3' in lines
+    assert 'span_duration_seconds_sum{span="search"} 0.555' in lines
+    assert 'span_duration_seconds_count{span="search"} 3' in lines
+    assert "# TYPE span_errors_total counter" in lines
+    assert 'span_errors_total{span="search"} 1' in lines
+    assert 'span_errors_total{span="say \\"hi\\""} 0' in lines
@@ -0,0 +1,120 @@
+# Variant Statistics Tests
+# Module: 3A - running per-variant sufficient statistics for the A/B testing framework
+
+import asyncio
+import importlib.util
+import os
+import statistics as reference
+
+import pytest
+
+from src.utils import shutdown_hooks
+from utils import startup
+
+# Loaded by path: the core.testing package __init__ pulls in the whole framework
+_SPEC = importlib.util.spec_from_file_location(
+    "variant_statistics",
+    os.path.join(os.path.dirname(__file__), "..", "core", "testing", "variant_statistics.py")
+)
+variant_statistics = importlib.util.module_from_spec(_SPEC)
+_SPEC.loader.exec_module(variant_statistics)
+
+VariantStatistics = variant_statistics.VariantStatistics
+VariantStatisticsStore = variant_statistics.VariantStatisticsStore
+
+EVENTS = [
+    {"conversion": index % 3 == 0, "engagement_score": 0.1 * (index % 10), "revenue": 1e6 + index * 1.5}
+    for index in range(50)
+]
+
+# =============================================================================
+# STATISTICS TESTS
+# =============================================================================
+
+def test_statistics_match_recomputing_from_events():
+    statistics = VariantStatistics()
+    for event in EVENTS:
+        statistics.update(event)
+
+    conversions = [float(e["conversion"]) for e in EVENTS]
+    assert statistics.sessions == 50
+    assert statistics.mean("conversion") == pytest.approx(reference.mean(conversions))
+    assert statistics.variance("conversion") == pytest.approx(reference.variance(conversions))
+    assert statistics.mean("bounce_rate") == 0.5
+    # Welford stays exact for large offsets where sums of squares would cancel
+    assert statistics.revenue.variance == pytest.approx(reference.variance([e["revenue"] for e in EVENTS]))
+
+def test_merge_equals_single_pass():
+    whole, left, right = VariantStatistics(), VariantStatistics(), VariantStatistics()
+    for index, event in enumerate(EVENTS):
+        whole.update(event)
+        (left if index < 17 else right).update(event)
+    left.merge(right)
+
+    assert left.sessions == whole.sessions
+    assert left.mean("engagement_score") == pytest.approx(whole.mean("engagement_score"))
+    assert left.revenue.mean == pytest.approx(whole.revenue.mean)
+    assert left.revenue.m2 == pytest.approx(whole.revenue.m2)
+
+def test_round_trip_and_bad_values():
+    statistics = VariantStatistics()
+    statistics.update({"conversion": None, "time_on_page": "12"})
+    restored = VariantStatistics.from_dict(statistics.to_dict())
+
+    assert restored.mean("conversion") == 0.0
+    assert restored.mean("time_on_page") == 12.0
+    assert restored.revenue.count == 1
+
+# =============================================================================
+# STORE TESTS
+# =============================================================================
+
+def test_store_merges_persisted_workers(tmp_path):
+    path = str(tmp_path / "stats.sqlite3")
+    first = VariantStatisticsStore(path=path, worker_id="a", persist_interval_seconds=3600)
+    second = VariantStatisticsStore(path=path, worker_id="b", persist_interval_seconds=3600)
+    for index, event in enumerate(EVENTS):
+        (first if index % 2 else second).record("test", "control", event)
+
+    assert first.merged("test")["control"].sessions == 25
+    second.persist()
+    second.persist()  # rewriting a worker's totals never double counts
+
+    merged = first.merged("test")["control"]
+    assert merged.sessions == 50
+    assert merged.mean("engagement_score") == pytest.approx(reference.mean(e["engagement_score"] for e in EVENTS))
+
+def test_store_resumes_own_rows(tmp_path):
+    path = str(tmp_path / "stats.sqlite3")
+    store = VariantStatisticsStore(path=path, worker_id="a", persist_interval_seconds=0)
+    store.record("test", "variant", EVENTS[0])
+    store.close()
+
+    restarted = VariantStatisticsStore(path=path, worker_id="a")
+    assert restarted.get("test", "variant").sessions == 1
+    assert restarted.merged("test")["variant"].sessions == 1
+
+def test_store_without_path_is_in_memory():
+    store = VariantStatisticsStore()
+    store.record("test", "variant", EVENTS[0])
+
+    assert store.persist() == 0
+    assert store.snapshot() == {"test": {"variant": store.get("test", "variant").to_dict()}}
+
+@pytest.mark.asyncio
+async def test_store_persists_in_background_and_on_shutdown(tmp_path, monkeypatch):
+    monkeypatch.setattr(shutdown_hooks, "_shutdown_hooks", {})
+    path = str(tmp_path / "stats.sqlite3")
+    store = VariantStatisticsStore(path=path, worker_id="a", persist_interval_seconds=0.05)
+    reader = VariantStatisticsStore(path=path, worker_id="b", persist_interval_seconds=0)
+    
+    store.record("test", "control", EVENTS[0])
+    assert store.get_stats()["background_persist"]
+    assert store.stats["persists"] == 0  # record() itself never writes inside the loop
+    await asyncio.sleep(0.2)
+    assert (await reader.merged_async("test"))["control"].sessions == 1
+    
+    store.record("test", "control", EVENTS[1])
+    await startup.run_shutdown_hooks()
+    assert not store.get_stats()["background_persist"]
+    assert (await reader.merged_async("test"))["control"].sessions == 2
@@ -0,0 +1,101 @@
+# Local Vector Index Tests
+# Module: In-process ANN index for vector search
+
+import pytest
+import numpy as np
+
+from app.services.vector_index import VectorIndex
+
+# =============================================================================
+# TEST FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def corpus():
+    """Clustered corpus large enough to train the IVF partition"""
+    rng = np.random.default_rng(7)
+    centers = rng.normal(size=(20, 32))
+    vectors = centers[rng.integers(0, 20, 3000)] + 0.3 * rng.normal(size=(3000, 32))
+    return vectors.astype(np.float32)
+
+@pytest.fixture
+def index(corpus):
+    index = VectorIndex(dimension=32, min_train_size=1000)
+    payloads = [
+        {"document_id": f"doc-{i % 50}", "metadata": {"domain": "a" if i % 5 == 0 else "b"}}
+        for i in range(len(corpus))
+    ]
+    index.add([f"c{i}" for i in range(len(corpus))], corpus, payloads)
+    return index
+
+# =============================================================================
+# INDEX TESTS
+# =============================================================================
+
+def test_ann_recall_matches_brute_force(index, corpus):
+    assert index.is_trained
+
+    recall = 0.0
+    for query in corpus[:50]:
+        approximate = {hit[0] for hit in index.search(query, k=10)}
+        exact = {hit[0] for hit in index.search(query, k=10, exact=True)}
+        recall += len(approximate & exact) / 10
+
+    assert recall / 50 >= 0.9
+
+def test_filtered_search_only_returns_matching_rows(index, corpus):
+    hits = index.search(corpus[1], k=5, filters={"domain": "a"})
+
+    assert len(hits) == 5
+    assert all(payload["metadata"]["domain"] == "a" for _, _, payload in hits)
+
+def test_upsert_and_remove(index, corpus):
+    index.add(["c1"], corpus[2:3], [{"document_id": "moved"}])
+    assert index.get_payload("c1") == {"document_id": "moved"}
+
+    index.remove(["c2"])
+    top_ids = [hit[0] for hit in index.search(corpus[2], k=2)]
+    assert "c2" not in top_ids
+    assert top_ids[0] == "c1"
+
+def test_save_and_memory_mapped_load(index, corpus, tmp_path):
+    index.save(str(tmp_path))
+    loaded = VectorIndex.load(str(tmp_path))
+
+    assert loaded.get_stats()["memory_mapped"]
+    assert loaded.search(corpus[3], k=3) == index.search(corpus[3], k=3)
+
+    loaded.add(["new"], corpus[4:5])
+    assert len(loaded) == len(index) + 1
+
+def test_snapshot_is_unaffected_by_later_writes(index, corpus, tmp_path):
+    snapshot = index.snapshot()
+    index.add(["late"], corpus[5:6])
+    index.remove(["c0"])
+    VectorIndex.save_snapshot(snapshot, str(tmp_path))
+
+    loaded = VectorIndex.load(str(tmp_path))
+    assert "late" not in loaded
+    assert "c0" in loaded
+    assert len(loaded) == len(corpus)
+
+# =============================================================================
+# BACKGROUND TRAINING TESTS
+# =============================================================================
+
+def test_training_reassigns_rows_written_during_fit(corpus):
+    index = VectorIndex(dimension=32, min_train_size=1000, auto_train=False)
+    index.add([f"c{i}" for i in range(2000)], corpus[:2000])
+    assert not index.is_trained and index.needs_training
+
+    snapshot = index.training_snapshot()
+    # Writes racing the fit: new rows, a moved vector and removals (one freed row reused)
+    index.remove(["c0", "c1"])
+    index.add([f"c{i}" for i in range(2000, 3000)], corpus[2000:3000])
+    index.add(["c5"], corpus[2500:2501])
+    index.apply_training(index.fit(snapshot))
+
+    assert index.is_trained and not index.needs_training
+    listed = [row for rows in index._lists for row in rows]
+    assert sorted(listed) == sorted(index._rows.values())
+    assert [hit[0] for hit in index.search(corpus[2500], k=2)] in (["c2500", "c5"], ["c5", "c2500"])
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Startup Profiling & Lazy Services
+Per-component import/init timing report and on-first-use service construction
+
+Executor: Claude Code
+Erstellt: 2025-07-03
+"""
+
+import asyncio
+import importlib
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# The registry lives with the src package so its modules reach it by relative import
+from src.utils.shutdown_hooks import register_shutdown_hook, run_shutdown_hooks  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+def lazy_services_from_env(default: str = "") -> List[str]:
+    """Names of services to create on first use (STARTUP_LAZY_SERVICES=a,b or 'all')"""
+    value = os.getenv("STARTUP_LAZY_SERVICES", default)
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+class StartupProfiler:
+    """Collects import and init timings per component"""
+
+    def __init__(self):
+        self.process_started = time.perf_counter()
+        self.timings: Dict[str, Dict[str, Any]] = {}
+        self.ready_at: Optional[float] = None
+
+    def _record(self, component: str, phase: str, seconds: float, error: Optional[str] = None):
+        entry = self.timings.setdefault(component, {})
+        entry[f"{phase}_ms"] = round(entry.get(f"{phase}_ms", 0.0) + seconds * 1000, 2)
+        if error:
+            entry["error"] = error
+
+    @contextmanager
+    def measure(self, component: str, phase: str = "import"):
+        """Time a block (imports, construction) for a component"""
+        started = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            self._record(component, phase, time.perf_counter() - started, error)
+
+    def import_module(self, component: str, module_path: str):
+        """Import a module and record its import cost"""
+        with self.measure(component, "import"):
+            return importlib.import_module(module_path)
+
+    async def init_parallel(self, factories: Dict[str, Callable[[], Awaitable[Any]]]) -> Dict[str, Any]:
+        """Run independent async initializers concurrently; raises the first failure"""
+
+        async def _timed(component: str, factory: Callable[[], Awaitable[Any]]):
+            started = time.perf_counter()
+            try:
+                instance = await factory()
+                self._record(component, "init", time.perf_counter() - started)
+                return instance
+            except Exception as e:
+                self._record(component, "init", time.perf_counter() - started, str(e))
+                raise
+
+        names = list(factories)
+        results = await asyncio.gather(*(_timed(name, factories[name]) for name in names))
+        return dict(zip(names, results))
+
+    def mark_ready(self):
+        self.ready_at = time.perf_counter()
+
+    def report(self) -> Dict[str, Any]:
+        """Per-component import/init cost, slowest first"""
+        components = sorted(
+            self.timings.items(),
+            key=lambda item: item[1].get("import_ms", 0.0) + item[1].get("init_ms", 0.0),
+            reverse=True
+        )
+        return {
+            "time_to_ready_ms": round((self.ready_at - self.process_started) * 1000, 2) if self.ready_at else None,
+            "total_import_ms": round(sum(t.get("import_ms", 0.0) for t in self.timings.values()), 2),
+            "total_init_ms": round(sum(t.get("init_ms", 0.0) for t in self.timings.values()), 2),
+            "components": dict(components)
+        }
+
+    def log_report(self):
+        report = self.report()
+        logger.info(f"⏱️ Startup ready in {report['time_to_ready_ms']}ms "
+                    f"(imports {report['total_import_ms']}ms, init {report['total_init_ms']}ms)")
+        for component, timing in report["components"].items():
+            logger.info(f"   {component}: import={timing.get('import_ms', 0.0)}ms "
+                        f"init={timing.get('init_ms', 0.0)}ms"
+                        + (f" lazy_init={timing['lazy_init_ms']}ms" if "lazy_init_ms" in timing else ""))
+
+class LazyService:
+    """Creates and initializes a service on first use, exactly once"""
+
+    def __init__(self, name: str, factory: Callable[[], Awaitable[Any]],
+                 profiler: Optional[StartupProfiler] = None):
+        self.name = name
+        self.factory = factory
+        self.profiler = profiler
+        self.instance: Optional[Any] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def initialized(self) -> bool:
+        return self.instance is not None
+
+    async def get(self) -> Any:
+        """Return the service, creating it on the first call"""
+        if self.instance is not None:
+            return self.instance
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if self.instance is None:
+                started = time.perf_counter()
+                self.instance = await self.factory()
+                if self.profiler:
+                    self.profiler._record(self.name, "lazy_init", time.perf_counter() - started)
+                logger.info(f"✅ {self.name} initialized on first use "
+                            f"({(time.perf_counter() - started) * 1000:.1f}ms)")
+        return self.instance
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Request Tracing
+Context-local spans, per-span latency histograms and Prometheus text export
+
+Executor: Claude Code
+Erstellt: 2025-07-03
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds (Prometheus convention)
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+class Span:
+    """A timed stage; children are the stages started while it was current"""
+
+    __slots__ = ("name", "attributes", "started", "duration", "error", "children")
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.attributes = attributes
+        self.started = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+        self.children: List["Span"] = []
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return round(self.duration * 1000, 2) if self.duration is not None else None
+
+    def set_attribute(self, key: str, value: Any):
+        if self.attributes is None:
+            self.attributes = {}
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "duration_ms": self.duration_ms,
+            "error": self.error,
+            "attributes": self.attributes or {},
+            "children": [child.to_dict() for child in self.children]
+        }
+
+    def format_tree(self, depth: int = 0) -> str:
+        """Indented one-line-per-span rendering for logs"""
+        line = f"{'  ' * depth}{self.name} {self.duration_ms}ms"
+        if self.error:
+            line += f" error={self.error}"
+        if self.attributes:
+            line += " " + " ".join(f"{key}={value}" for key, value in self.attributes.items())
+        return "\n".join([line] + [child.format_tree(depth + 1) for child in self.children])
+
+class Histogram:
+    """Cumulative-bucket latency histogram"""
+
+    __slots__ = ("buckets", "counts", "sum", "count", "errors")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self.errors = 0
+
+    def observe(self, seconds: float, error: bool = False):
+        for index, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[index] += 1
+                break
+        self.sum += seconds
+        self.count += 1
+        if error:
+            self.errors += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Bucket upper bound containing the q-quantile"""
+        if not self.count:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return bound
+        return float("inf")
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+class _NoopSpanContext:
+    """Shared context manager used while tracing is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP_SPAN = _NoopSpanContext()
+
+class _SpanContext:
+    __slots__ = ("tracer", "span", "token")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Optional[Dict[str, Any]]):
+        self.tracer = tracer
+        self.span = Span(name, attributes)
+        self.token = None
+
+    def __enter__(self) -> Span:
+        parent = _current_span.get()
+        if parent is not None:
+            parent.children.append(self.span)
+        self.token = _current_span.set(self.span)
+        self.span.started = time.perf_counter()
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        span = self.span
+        span.duration = time.perf_counter() - span.started
+        if exc_type is not None:
+            span.error = exc_type.__name__
+        _current_span.reset(self.token)
+        self.tracer.observe(span.name, span.duration, exc_type is not None)
+        return False
+
+class Tracer:
+    """Span factory and histogram registry"""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+        slow_request_threshold_ms: float = 1000.0,
+        slow_request_sample_rate: float = 0.0
+    ):
+        self.enabled = enabled
+        self.buckets = buckets
+        self.slow_request_threshold_ms = slow_request_threshold_ms
+        self.slow_request_sample_rate = slow_request_sample_rate
+
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def span(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        """Context manager timing a stage; a shared no-op while disabled"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _SpanContext(self, name, attributes)
+
+    def observe(self, name: str, seconds: float, error: bool = False):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(self.buckets)
+            histogram.observe(seconds, error)
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def finish_request(self, root: Optional[Span]):
+        """Log the span tree of a slow request, sampled"""
+        if root is None or root.duration is None or self.slow_request_sample_rate <= 0:
+            return
+        if root.duration * 1000 < self.slow_request_threshold_ms:
+            return
+        if random.random() >= self.slow_request_sample_rate:
+            return
+        logger.warning(f"Slow request trace ({root.duration_ms}ms):\n{root.format_tree()}")
+
+    def get_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Count, mean and bucketed p50/p95/p99 per span name"""
+        with self._lock:
+            snapshot = list(self._histograms.items())
+
+        return {
+            name: {
+                "count": histogram.count,
+                "errors": histogram.errors,
+                "mean_ms": round(histogram.sum / histogram.count * 1000, 2) if histogram.count else None,
+                "p50_le_ms": _to_ms(histogram.quantile(0.50)),
+                "p95_le_ms": _to_ms(histogram.quantile(0.95)),
+                "p99_le_ms": _to_ms(histogram.quantile(0.99))
+            }
+            for name, histogram in sorted(snapshot)
+        }
+
+    def render_prometheus(self) -> str:
+        """Histograms in Prometheus text exposition format (0.0.4)"""
+        with self._lock:
+            snapshot = [
+                (name, list(histogram.counts), histogram.sum, histogram.count, histogram.errors)
+                for name, histogram in sorted(self._histograms.items())
+            ]
+
+        lines = [
+            "# HELP span_duration_seconds Duration of instrumented request stages",
+            "# TYPE span_duration_seconds histogram"
+        ]
+        for name, counts, total, count, _ in snapshot:
+            label = _escape_label(name)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'span_duration_seconds_bucket{{span="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'span_duration_seconds_bucket{{span="{label}",le="+Inf"}} {count}')
+            lines.append(f'span_duration_seconds_sum{{span="{label}"}} {total}')
+            lines.append(f'span_duration_seconds_count{{span="{label}"}} {count}')
+
+        lines.append("# HELP span_errors_total Instrumented stages that raised")
+        lines.append("# TYPE span_errors_total counter")
+        for name, _, _, _, errors in snapshot:
+            lines.append(f'span_errors_total{{span="{_escape_label(name)}"}} {errors}')
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+def _to_ms(seconds: Optional[float]) -> Optional[float]:
+    if seconds is None or seconds == float("inf"):
+        return seconds
+    return round(seconds * 1000, 2)
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+tracer = Tracer(
+    enabled=os.getenv("TRACING_ENABLED", "true").lower() == "true",
+    slow_request_threshold_ms=float(os.getenv("TRACING_SLOW_REQUEST_MS", "1000")),
+    slow_request_sample_rate=float(os.getenv("TRACING_SLOW_REQUEST_SAMPLE_RATE", "0"))
+)
+
+def span(name: str, attributes: Optional[Dict[str, Any]] = None):
+    """Time a stage under the current request span: `with span("search.embed"): ...`"""
+    return tracer.span(name, attributes)
+
+def traced(name: str):
+    """Decorator wrapping a sync or async function in a span"""
+
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not tracer.enabled:
+                    return await func(*args, **kwargs)
+                with tracer.span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
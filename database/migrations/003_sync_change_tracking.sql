@@ -0,0 +1,45 @@
+-- Migration: Change Tracking for Incremental Database Sync
+-- Module: Agentic RAG - PostgreSQL <-> Neo4j synchronization
+-- Created: 2025-07-05
+-- Description: Adds the keyset index and watermark table used by
+--              DatabaseSyncManager.incremental_sync
+
+-- =============================================================================
+-- KEYSET INDEX FOR CHANGED-ROW SCANS
+-- =============================================================================
+
+-- Incremental sync reads documents ordered by (updated_at, id) after the last
+-- high-water mark; this index keeps each batch an index range scan
+CREATE INDEX IF NOT EXISTS idx_documents_updated_at_id ON documents(updated_at, id);
+
+-- =============================================================================
+-- SOURCE TIMESTAMPS ON SYNCED WRITES
+-- =============================================================================
+
+-- Rows synced from Neo4j are written with their Neo4j updated_at. Stamping
+-- them with NOW() instead would make every synced row look changed to the
+-- next PostgreSQL -> Neo4j pass, and the row would bounce between the stores.
+-- Updates that leave updated_at untouched are still stamped.
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.updated_at IS NOT DISTINCT FROM OLD.updated_at THEN
+        NEW.updated_at = NOW();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- =============================================================================
+-- SYNC WATERMARKS
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS sync_watermarks (
+    source VARCHAR(100) PRIMARY KEY,          -- e.g. 'postgres_documents', 'neo4j_entities'
+    high_water_mark TIMESTAMP NOT NULL,       -- updated_at of the last synced row
+    last_id TEXT NOT NULL DEFAULT '',         -- tie-breaker for rows sharing updated_at
+    rows_synced BIGINT DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+COMMENT ON TABLE sync_watermarks IS 'High-water marks for incremental PostgreSQL/Neo4j synchronization';
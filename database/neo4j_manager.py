@@ -7,11 +7,15 @@ Created: 2025-07-03
 
 import os
 import asyncio
+import copy
 import logging
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 import json
+import re
+import time
+from collections import OrderedDict, Counter
 from uuid import uuid4, UUID
 
 from neo4j import AsyncGraphDatabase, AsyncSession
@@ -39,6 +43,19 @@ class Neo4jConfig:
     enable_query_logging: bool = os.getenv("ENABLE_GRAPH_QUERY_LOGGING", "true").lower() == "true"
     slow_query_threshold_ms: int = int(os.getenv("SLOW_GRAPH_QUERY_THRESHOLD_MS", "2000"))
     
+    # Bulk write settings
+    write_batch_size: int = int(os.getenv("NEO4J_WRITE_BATCH_SIZE", "1000"))
+    snapshot_bucket_seconds: int = int(os.getenv("NEO4J_SNAPSHOT_BUCKET_SECONDS", "3600"))  # 1 hour
+    
+    # Read cache settings
+    query_cache_enabled: bool = os.getenv("GRAPH_QUERY_CACHE_ENABLED", "true").lower() == "true"
+    query_cache_max_entries: int = int(os.getenv("GRAPH_QUERY_CACHE_MAX_ENTRIES", "5000"))
+    query_cache_ttl_seconds: int = int(os.getenv("GRAPH_QUERY_CACHE_TTL_SECONDS", "300"))
+    neighborhood_top_k: int = int(os.getenv("GRAPH_NEIGHBORHOOD_TOP_K", "20"))
+    neighborhood_ttl_seconds: int = int(os.getenv("GRAPH_NEIGHBORHOOD_TTL_SECONDS", "3600"))
+    access_count_max_entries: int = int(os.getenv("GRAPH_ACCESS_COUNT_MAX_ENTRIES", "10000"))
+    fulltext_index_name: str = os.getenv("GRAPH_FULLTEXT_INDEX", "entity_content_search")
+    
     def __post_init__(self):
         if not self.password:
             raise ValueError("NEO4J_PASSWORD environment variable is required")
@@ -139,6 +156,113 @@ class GraphRelationship:
             "updated_at": self.updated_at
         }
 
+class GraphQueryCache:
+    """LRU + TTL cache for graph read queries with per-entity invalidation
+    
+    Every entry records the entity uuids it depends on (query parameters and
+    returned entities). Writes invalidate all entries touching the written
+    entities; transitive effects further out are bounded by the TTL.
+    """
+    
+    def __init__(self, max_entries: int = 5000, ttl_seconds: int = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._keys_by_entity: Dict[str, set] = {}
+        self._keys_by_tag: Dict[str, set] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    @staticmethod
+    def make_key(operation: str, parameters: Dict[str, Any]) -> str:
+        return f"{operation}:{json.dumps(parameters, sort_keys=True, default=str)}"
+    
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        expires_at, value, _, _ = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def set(self, key: str, value: Any, entity_uuids: set, tags: set = frozenset()) -> None:
+        if key in self._entries:
+            self._remove(key)
+        
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value, entity_uuids, tags)
+        for entity_uuid in entity_uuids:
+            self._keys_by_entity.setdefault(entity_uuid, set()).add(key)
+        for tag in tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+        
+        while len(self._entries) > self.max_entries:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+    
+    def invalidate_entities(self, entity_uuids) -> int:
+        removed = 0
+        for entity_uuid in entity_uuids:
+            for key in list(self._keys_by_entity.get(entity_uuid, ())):
+                self._remove(key)
+                removed += 1
+        self.invalidations += removed
+        return removed
+    
+    def invalidate_tag(self, tag: str) -> int:
+        keys = list(self._keys_by_tag.get(tag, ()))
+        for key in keys:
+            self._remove(key)
+        self.invalidations += len(keys)
+        return len(keys)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_entity.clear()
+        self._keys_by_tag.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+    
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        
+        _, _, entity_uuids, tags = entry
+        for entity_uuid in entity_uuids:
+            keys = self._keys_by_entity.get(entity_uuid)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_entity[entity_uuid]
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
 class Neo4jManager:
     """Manages Neo4j connections and operations with performance optimization"""
     
@@ -147,6 +271,13 @@ class Neo4jManager:
         self.driver = None
         self.is_initialized = False
         
+        # Read-path caching
+        self.query_cache = GraphQueryCache(config.query_cache_max_entries, config.query_cache_ttl_seconds)
+        self.neighborhoods: Dict[str, Dict[str, Any]] = {}
+        self.entity_access_counts: Counter = Counter()
+        self.neighborhood_hits = 0
+        self.fulltext_available = False
+        
     async def initialize(self) -> None:
         """Initialize Neo4j driver and verify connection"""
         if self.is_initialized:
@@ -169,6 +300,9 @@ class Neo4jManager:
             # Run setup script if needed
             await self._ensure_schema_setup()
             
+            # Prefer full-text index search over CONTAINS scans
+            await self._check_fulltext_index()
+            
             self.is_initialized = True
             logger.info("Neo4j driver initialized successfully")
             
@@ -226,6 +360,23 @@ class Neo4jManager:
             logger.error(f"Schema setup failed: {e}")
             raise
     
+    async def _check_fulltext_index(self) -> None:
+        """Detect whether the entity full-text index is online"""
+        try:
+            async with self.driver.session(database=self.config.database) as session:
+                result = await session.run(
+                    "SHOW INDEXES YIELD name, type, state WHERE name = $name RETURN type, state",
+                    {"name": self.config.fulltext_index_name}
+                )
+                record = await result.single()
+                self.fulltext_available = bool(record and record["type"] == "FULLTEXT" and record["state"] == "ONLINE")
+        except Exception as e:
+            logger.warning(f"Could not inspect full-text index: {e}")
+            self.fulltext_available = False
+        
+        if not self.fulltext_available:
+            logger.warning(f"Full-text index '{self.config.fulltext_index_name}' unavailable, entity search falls back to CONTAINS scans")
+    
     async def get_session(self) -> AsyncSession:
         """Get Neo4j session"""
         if not self.is_initialized:
@@ -238,7 +389,7 @@ class Neo4jManager:
         parameters = parameters or {}
         
         try:
-            async with self.get_session() as session:
+            async with await self.get_session() as session:
                 result = await session.run(query, parameters)
                 records = await result.data()
                 
@@ -254,6 +405,39 @@ class Neo4jManager:
             logger.error(f"Query: {query[:200]}...")
             raise
     
+    async def execute_write_batches(self, query: str, rows: List[Dict[str, Any]],
+                                    batch_size: Optional[int] = None,
+                                    parameters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Run an UNWIND $rows write query in chunks, one managed transaction per chunk"""
+        if not rows:
+            return []
+        
+        batch_size = batch_size or self.config.write_batch_size
+        parameters = parameters or {}
+        records: List[Dict[str, Any]] = []
+        
+        async def run_chunk(tx, chunk):
+            result = await tx.run(query, {**parameters, "rows": chunk})
+            return await result.data()
+        
+        async with await self.get_session() as session:
+            for start in range(0, len(rows), batch_size):
+                chunk = rows[start:start + batch_size]
+                start_time = datetime.now()
+                
+                try:
+                    records.extend(await session.execute_write(run_chunk, chunk))
+                except Exception as e:
+                    logger.error(f"Batch write failed ({len(chunk)} rows): {e}")
+                    logger.error(f"Query: {query[:200]}...")
+                    raise
+                
+                execution_time = (datetime.now() - start_time).total_seconds() * 1000
+                if execution_time > self.config.slow_query_threshold_ms:
+                    logger.warning(f"Slow batch write ({execution_time:.2f}ms, {len(chunk)} rows): {query[:100]}...")
+        
+        return records
+    
     async def add_entity(self, entity: GraphEntity) -> str:
         """Add entity to the knowledge graph"""
         query = """
@@ -262,47 +446,90 @@ class Neo4jManager:
         """
         
         result = await self.execute_query(query, {"properties": entity.to_dict()})
+        self.invalidate_cached_reads([], new_entities=True)
         return result[0]["uuid"]
     
+    async def add_entities(self, entities: List[GraphEntity], batch_size: Optional[int] = None) -> List[str]:
+        """Add many entities with UNWIND batches"""
+        query = """
+            UNWIND $rows AS row
+            CREATE (e:Entity)
+            SET e = row
+            RETURN e.uuid as uuid
+        """
+        
+        records = await self.execute_write_batches(
+            query, [entity.to_dict() for entity in entities], batch_size
+        )
+        self.invalidate_cached_reads([], new_entities=True)
+        return [record["uuid"] for record in records]
+    
     async def update_entity_performance(self, entity_uuid: str, performance_metrics: Dict[str, float]) -> bool:
         """Update entity performance metrics with temporal tracking"""
+        try:
+            updated = await self.update_entities_performance([
+                {"entity_uuid": entity_uuid, **performance_metrics}
+            ])
+            return updated > 0
+        except Exception as e:
+            logger.error(f"Failed to update entity performance: {e}")
+            return False
+    
+    async def update_entities_performance(self, updates: List[Dict[str, Any]],
+                                          batch_size: Optional[int] = None) -> int:
+        """Bulk performance update; snapshots are coalesced per entity and time bucket
+        
+        Each update is a dict with ``entity_uuid`` plus any of ``performance_score``,
+        ``confidence_score``, ``relevance_score`` and ``success_rate``.
+        """
+        # Collapse repeated updates for the same entity: latest metrics win,
+        # interactions are summed
+        rows_by_uuid: Dict[str, Dict[str, Any]] = {}
+        for update in updates:
+            entity_uuid = update["entity_uuid"]
+            row = rows_by_uuid.setdefault(entity_uuid, {"entity_uuid": entity_uuid, "interactions": 0})
+            row.update({key: value for key, value in update.items() if key != "entity_uuid"})
+            row["interactions"] += 1
+        
+        if not rows_by_uuid:
+            return 0
+        
+        bucket_seconds = self.config.snapshot_bucket_seconds
+        bucket = int(datetime.now().timestamp() // bucket_seconds) * bucket_seconds
+        
         query = """
-            MATCH (e:Entity {uuid: $entity_uuid})
-            SET e.performance_score = $performance_score,
-                e.confidence_score = coalesce($confidence_score, e.confidence_score),
-                e.relevance_score = coalesce($relevance_score, e.relevance_score),
-                e.success_rate = coalesce($success_rate, e.success_rate),
-                e.user_interaction_count = e.user_interaction_count + 1,
+            UNWIND $rows AS row
+            MATCH (e:Entity {uuid: row.entity_uuid})
+            SET e.performance_score = coalesce(row.performance_score, e.performance_score),
+                e.confidence_score = coalesce(row.confidence_score, e.confidence_score),
+                e.relevance_score = coalesce(row.relevance_score, e.relevance_score),
+                e.success_rate = coalesce(row.success_rate, e.success_rate),
+                e.user_interaction_count = coalesce(e.user_interaction_count, 0) + row.interactions,
                 e.updated_at = datetime()
-            CREATE (snapshot:TemporalSnapshot {
-                id: randomUUID(),
-                entity_uuid: $entity_uuid,
-                timestamp: datetime(),
-                state: e.properties,
-                performance_metrics: {
+            MERGE (e)-[:HAS_SNAPSHOT]->(snapshot:TemporalSnapshot {entity_uuid: row.entity_uuid, bucket: $bucket})
+            ON CREATE SET snapshot.id = randomUUID(),
+                          snapshot.changed_properties = ["performance_metrics"],
+                          snapshot.change_trigger = "performance_update",
+                          snapshot.validated = false,
+                          snapshot.validation_confidence = 0.0,
+                          snapshot.update_count = 0
+            SET snapshot.timestamp = datetime(),
+                snapshot.state = e.properties,
+                snapshot.performance_metrics = {
                     performance_score: e.performance_score,
                     confidence_score: e.confidence_score,
                     relevance_score: e.relevance_score,
                     success_rate: e.success_rate
                 },
-                changed_properties: ["performance_metrics"],
-                change_trigger: "performance_update",
-                validated: false,
-                validation_confidence: 0.0
-            })
-            CREATE (e)-[:HAS_SNAPSHOT]->(snapshot)
+                snapshot.update_count = snapshot.update_count + row.interactions
             RETURN e.uuid as updated_uuid
         """
         
-        try:
-            result = await self.execute_query(query, {
-                "entity_uuid": entity_uuid,
-                **performance_metrics
-            })
-            return len(result) > 0
-        except Exception as e:
-            logger.error(f"Failed to update entity performance: {e}")
-            return False
+        records = await self.execute_write_batches(
+            query, list(rows_by_uuid.values()), batch_size, {"bucket": bucket}
+        )
+        self.invalidate_cached_reads(rows_by_uuid.keys())
+        return len(records)
     
     async def create_relationship(self, relationship: GraphRelationship) -> str:
         """Create relationship between entities"""
@@ -318,51 +545,225 @@ class Neo4jManager:
             "target_uuid": relationship.target_uuid,
             "properties": relationship.to_dict()
         })
+        self.invalidate_cached_reads([relationship.source_uuid, relationship.target_uuid])
         return result[0]["relationship_id"]
     
+    async def create_relationships(self, relationships: List[GraphRelationship],
+                                   batch_size: Optional[int] = None) -> List[str]:
+        """Create many relationships with UNWIND batches"""
+        query = """
+            UNWIND $rows AS row
+            MATCH (source:Entity {uuid: row.source_uuid})
+            MATCH (target:Entity {uuid: row.target_uuid})
+            CREATE (source)-[r:RELATIONSHIP]->(target)
+            SET r = row.properties
+            RETURN r.id as relationship_id
+        """
+        
+        rows = [
+            {
+                "source_uuid": relationship.source_uuid,
+                "target_uuid": relationship.target_uuid,
+                "properties": relationship.to_dict()
+            }
+            for relationship in relationships
+        ]
+        
+        records = await self.execute_write_batches(query, rows, batch_size)
+        self.invalidate_cached_reads(
+            [row["source_uuid"] for row in rows] + [row["target_uuid"] for row in rows]
+        )
+        return [record["relationship_id"] for record in records]
+    
+    def invalidate_cached_reads(self, entity_uuids, new_entities: bool = False) -> None:
+        """Drop cached reads and neighborhoods that depend on written entities"""
+        entity_uuids = set(entity_uuids)
+        self.query_cache.invalidate_entities(entity_uuids)
+        
+        # Searches can start matching newly created entities
+        if new_entities:
+            self.query_cache.invalidate_tag("entity_search")
+        
+        for entity_uuid, neighborhood in list(self.neighborhoods.items()):
+            if entity_uuid in entity_uuids or entity_uuids & neighborhood["entity_uuids"]:
+                del self.neighborhoods[entity_uuid]
+    
+    async def _cached_query(self, operation: str, query: str, parameters: Dict[str, Any],
+                            entity_uuids: set, tags: set = frozenset()) -> List[Dict[str, Any]]:
+        """Execute a read query through the query-result cache"""
+        if not self.config.query_cache_enabled:
+            return await self.execute_query(query, parameters)
+        
+        key = GraphQueryCache.make_key(operation, parameters)
+        cached = self.query_cache.get(key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        
+        records = await self.execute_query(query, parameters)
+        
+        touched = set(entity_uuids)
+        for record in records:
+            if record.get("uuid"):
+                touched.add(record["uuid"])
+            for entity in record.get("entities") or []:
+                touched.add(entity["uuid"])
+        
+        self.query_cache.set(key, records, touched, tags)
+        return copy.deepcopy(records)
+    
+    # Result size of find_related_entities
+    RELATED_ENTITIES_LIMIT = 20
+    
+    @staticmethod
+    def _related_entities_query(max_depth: int, per_start: bool = False) -> str:
+        """Variable-length traversal query (depth must be a literal in Cypher)
+        
+        Each related entity is reported with its shortest distance and the
+        scores of its most relevant path. The per-start form runs the same
+        traversal for a list of start entities in one round trip.
+        """
+        depth = max(1, int(max_depth))
+        start_clause = "UNWIND $entity_uuids AS entity_uuid\n            MATCH (start:Entity {uuid: entity_uuid})" if per_start \
+            else "MATCH (start:Entity {uuid: $entity_uuid})"
+        
+        traversal = f"""
+                MATCH path = (start)-[r:RELATIONSHIP*1..{depth}]-(related:Entity)
+                WHERE related <> start
+                  AND ALL(rel in relationships(path) WHERE rel.confidence_score >= $min_confidence)
+                WITH related,
+                     length(path) as distance,
+                     reduce(total = 0.0, rel in relationships(path) | total + rel.confidence_score) / length(path) as path_confidence,
+                     coalesce(related.performance_score, 0.0) as performance
+                WITH related, distance, path_confidence, performance,
+                     (path_confidence * 0.5 + performance * 0.3 + (1.0/distance) * 0.2) as relevance_score
+                ORDER BY relevance_score DESC
+                WITH related,
+                     collect({{path_confidence: path_confidence, performance: performance,
+                               relevance_score: relevance_score}})[0] as best,
+                     min(distance) as distance
+                RETURN related.uuid as uuid,
+                       related.name as name,
+                       related.type as type,
+                       related.properties as properties,
+                       distance,
+                       best.path_confidence as path_confidence,
+                       best.performance as performance,
+                       best.relevance_score as relevance_score
+                ORDER BY relevance_score DESC
+                LIMIT $limit"""
+        
+        if not per_start:
+            return f"""
+            {start_clause}
+            {traversal.strip()}
+        """
+        
+        return f"""
+            {start_clause}
+            CALL {{
+                WITH start
+                {traversal.strip()}
+            }}
+            RETURN entity_uuid, collect({{uuid: uuid, name: name, type: type, properties: properties,
+                                         distance: distance, path_confidence: path_confidence,
+                                         performance: performance, relevance_score: relevance_score}}) as neighbors
+        """
+    
+    def _record_access(self, entity_uuid: str) -> None:
+        """Count a lookup for hot-entity selection; past the cap only the hottest entities are kept"""
+        self.entity_access_counts[entity_uuid] += 1
+        if len(self.entity_access_counts) > self.config.access_count_max_entries:
+            keep = max(1, self.config.access_count_max_entries * 3 // 4)
+            self.entity_access_counts = Counter(dict(self.entity_access_counts.most_common(keep)))
+    
+    def _decay_access_counts(self) -> None:
+        """Halve every count so hot-entity ranking follows recent traffic; counts reaching zero are dropped"""
+        self.entity_access_counts = Counter({
+            entity_uuid: count // 2 for entity_uuid, count in self.entity_access_counts.items() if count > 1
+        })
+    
     async def find_related_entities(self, entity_uuid: str, max_depth: int = 3, 
                                    min_confidence: float = 0.7) -> List[Dict[str, Any]]:
         """Find contextually related entities"""
-        query = """
-            MATCH (start:Entity {uuid: $entity_uuid})
-            MATCH path = (start)-[r:RELATIONSHIP*1..$max_depth]-(related:Entity)
-            WHERE ALL(rel in relationships(path) WHERE rel.confidence_score >= $min_confidence)
-            WITH related, 
-                 length(path) as distance,
-                 AVG([rel in relationships(path) | rel.confidence_score]) as path_confidence,
-                 related.performance_score as performance
-            RETURN related.uuid as uuid,
-                   related.name as name,
-                   related.type as type,
-                   related.properties as properties,
-                   distance,
-                   path_confidence,
-                   performance,
-                   (path_confidence * 0.5 + performance * 0.3 + (1.0/distance) * 0.2) as relevance_score
-            ORDER BY relevance_score DESC
-            LIMIT 20
-        """
+        self._record_access(entity_uuid)
+        limit = self.RELATED_ENTITIES_LIMIT
         
-        return await self.execute_query(query, {
+        # A materialized neighborhood is the same traversal, so only an identical request may use it
+        neighborhood = self.neighborhoods.get(entity_uuid)
+        if neighborhood and neighborhood["expires_at"] > time.monotonic() \
+                and neighborhood["max_depth"] == max(1, int(max_depth)) \
+                and neighborhood["min_confidence"] == min_confidence \
+                and (neighborhood["limit"] >= limit or len(neighborhood["neighbors"]) < neighborhood["limit"]):
+            self.neighborhood_hits += 1
+            return copy.deepcopy(neighborhood["neighbors"][:limit])
+        
+        parameters = {
             "entity_uuid": entity_uuid,
-            "max_depth": max_depth,
-            "min_confidence": min_confidence
-        })
+            "min_confidence": min_confidence,
+            "limit": limit
+        }
+        
+        return await self._cached_query(
+            f"find_related_entities:{int(max_depth)}",
+            self._related_entities_query(max_depth),
+            parameters,
+            {entity_uuid}
+        )
+    
+    async def materialize_neighborhoods(self, entity_uuids: List[str] = None, hot_limit: int = 100,
+                                        max_depth: int = 3, min_confidence: float = 0.7) -> int:
+        """Precompute top-K neighborhoods for hot entities in one batched query
+        
+        Without explicit ``entity_uuids`` the most frequently requested entities
+        from ``find_related_entities`` are materialized. A neighborhood only
+        serves requests with the same ``max_depth`` and ``min_confidence``.
+        """
+        if entity_uuids is None:
+            entity_uuids = [uuid for uuid, _ in self.entity_access_counts.most_common(hot_limit)]
+            self._decay_access_counts()
+        if not entity_uuids:
+            return 0
+        
+        records = await self.execute_query(
+            self._related_entities_query(max_depth, per_start=True),
+            {
+                "entity_uuids": list(entity_uuids),
+                "min_confidence": min_confidence,
+                "limit": self.config.neighborhood_top_k
+            }
+        )
+        
+        expires_at = time.monotonic() + self.config.neighborhood_ttl_seconds
+        for record in records:
+            neighbors = [neighbor for neighbor in record["neighbors"] if neighbor.get("uuid")]
+            self.neighborhoods[record["entity_uuid"]] = {
+                "neighbors": neighbors,
+                "entity_uuids": {neighbor["uuid"] for neighbor in neighbors},
+                "max_depth": max(1, int(max_depth)),
+                "min_confidence": min_confidence,
+                "limit": self.config.neighborhood_top_k,
+                "expires_at": expires_at,
+                "computed_at": datetime.now().isoformat()
+            }
+        
+        logger.info(f"Materialized neighborhoods for {len(records)} entities")
+        return len(records)
     
     async def semantic_path_search(self, start_entity: str, end_entity: str, 
                                   max_hops: int = 4) -> List[Dict[str, Any]]:
         """Find semantic paths between entities"""
-        query = """
-            MATCH (start:Entity {uuid: $start_entity})
-            MATCH (end:Entity {uuid: $end_entity})
-            MATCH path = shortestPath((start)-[r:RELATIONSHIP*1..$max_hops]-(end))
+        hops = max(1, int(max_hops))
+        query = f"""
+            MATCH (start:Entity {{uuid: $start_entity}})
+            MATCH (end:Entity {{uuid: $end_entity}})
+            MATCH path = shortestPath((start)-[r:RELATIONSHIP*1..{hops}]-(end))
             WHERE ALL(rel in relationships(path) WHERE rel.confidence_score >= 0.6)
             WITH path, 
                  length(path) as path_length,
-                 AVG([rel in relationships(path) | rel.confidence_score]) as avg_confidence,
+                 reduce(total = 0.0, rel in relationships(path) | total + rel.confidence_score) / length(path) as avg_confidence,
                  [rel in relationships(path) | rel.relationship_type] as relationship_types
-            RETURN [n in nodes(path) | {uuid: n.uuid, name: n.name, type: n.type}] as entities,
-                   [r in relationships(path) | {type: r.relationship_type, confidence: r.confidence_score}] as relationships,
+            RETURN [n in nodes(path) | {{uuid: n.uuid, name: n.name, type: n.type}}] as entities,
+                   [r in relationships(path) | {{type: r.relationship_type, confidence: r.confidence_score}}] as relationships,
                    path_length,
                    avg_confidence,
                    relationship_types,
@@ -371,43 +772,86 @@ class Neo4jManager:
             LIMIT 10
         """
         
-        return await self.execute_query(query, {
-            "start_entity": start_entity,
-            "end_entity": end_entity,
-            "max_hops": max_hops
-        })
+        return await self._cached_query(
+            f"semantic_path_search:{hops}",
+            query,
+            {"start_entity": start_entity, "end_entity": end_entity},
+            {start_entity, end_entity}
+        )
+    
+    @staticmethod
+    def _escape_fulltext(search_term: str) -> str:
+        """Escape Lucene query syntax so user input is matched literally"""
+        return re.sub(r'([+\-!(){}\[\]^"~*?:\\/]|&&|\|\|)', r'\\\1', search_term)
     
     async def intelligent_entity_search(self, search_term: str, limit: int = 20) -> List[Dict[str, Any]]:
         """Intelligent entity search with relevance scoring"""
-        query = """
-            MATCH (e:Entity)
-            WHERE e.name CONTAINS $search_term 
-               OR any(tag in e.tags WHERE tag CONTAINS $search_term)
-               OR e.description CONTAINS $search_term
-            WITH e, 
-                 CASE 
-                     WHEN e.name CONTAINS $search_term THEN 1.0
-                     WHEN any(tag in e.tags WHERE tag CONTAINS $search_term) THEN 0.8
-                     ELSE 0.6
-                 END as name_score,
-                 e.performance_score as performance_score,
-                 e.confidence_score as confidence_score
-            WITH e, (name_score * 0.4 + performance_score * 0.3 + confidence_score * 0.3) as relevance_score
-            ORDER BY relevance_score DESC
-            LIMIT $limit
-            RETURN e.uuid as uuid,
-                   e.name as name,
-                   e.type as type,
-                   e.properties as properties,
-                   e.performance_score as performance_score,
-                   e.confidence_score as confidence_score,
-                   relevance_score
-        """
+        if self.fulltext_available:
+            query = """
+                CALL db.index.fulltext.queryNodes($index_name, $fulltext_query, {limit: $candidate_limit})
+                YIELD node, score
+                WITH collect({e: node, score: score}) as hits, max(score) as top_score
+                UNWIND hits as hit
+                WITH hit.e as e,
+                     hit.score / top_score as name_score,
+                     coalesce(hit.e.performance_score, 0.0) as performance_score,
+                     coalesce(hit.e.confidence_score, 0.0) as confidence_score
+                WITH e, (name_score * 0.4 + performance_score * 0.3 + confidence_score * 0.3) as relevance_score
+                ORDER BY relevance_score DESC
+                LIMIT $limit
+                RETURN e.uuid as uuid,
+                       e.name as name,
+                       e.type as type,
+                       e.properties as properties,
+                       e.performance_score as performance_score,
+                       e.confidence_score as confidence_score,
+                       relevance_score
+            """
+            parameters = {
+                "index_name": self.config.fulltext_index_name,
+                "fulltext_query": self._escape_fulltext(search_term),
+                "candidate_limit": limit * 5,
+                "limit": limit
+            }
+        else:
+            query = """
+                MATCH (e:Entity)
+                WHERE e.name CONTAINS $search_term 
+                   OR any(tag in e.tags WHERE tag CONTAINS $search_term)
+                   OR e.description CONTAINS $search_term
+                WITH e, 
+                     CASE 
+                         WHEN e.name CONTAINS $search_term THEN 1.0
+                         WHEN any(tag in e.tags WHERE tag CONTAINS $search_term) THEN 0.8
+                         ELSE 0.6
+                     END as name_score,
+                     e.performance_score as performance_score,
+                     e.confidence_score as confidence_score
+                WITH e, (name_score * 0.4 + performance_score * 0.3 + confidence_score * 0.3) as relevance_score
+                ORDER BY relevance_score DESC
+                LIMIT $limit
+                RETURN e.uuid as uuid,
+                       e.name as name,
+                       e.type as type,
+                       e.properties as properties,
+                       e.performance_score as performance_score,
+                       e.confidence_score as confidence_score,
+                       relevance_score
+            """
+            parameters = {"search_term": search_term, "limit": limit}
         
-        return await self.execute_query(query, {
-            "search_term": search_term,
-            "limit": limit
-        })
+        return await self._cached_query(
+            "intelligent_entity_search", query, parameters, set(), {"entity_search"}
+        )
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Query cache and materialized neighborhood statistics"""
+        return {
+            "query_cache": self.query_cache.stats(),
+            "materialized_neighborhoods": len(self.neighborhoods),
+            "neighborhood_hits": self.neighborhood_hits,
+            "fulltext_search": self.fulltext_available
+        }
     
     async def analyze_relationship_patterns(self) -> Dict[str, Any]:
         """Analyze relationship patterns and effectiveness"""
@@ -499,6 +943,8 @@ class Neo4jManager:
     
     async def close(self) -> None:
         """Close Neo4j driver"""
+        self.query_cache.clear()
+        self.neighborhoods.clear()
         if self.driver:
             await self.driver.close()
             self.is_initialized = False
@@ -521,6 +967,10 @@ async def execute_graph_query(query: str, parameters: Dict[str, Any] = None):
     """Execute graph query with the global manager"""
     return await graph_manager.execute_query(query, parameters)
 
+async def execute_graph_write_batches(query: str, rows: List[Dict[str, Any]], batch_size: int = None):
+    """Execute an UNWIND $rows write query in batches with the global manager"""
+    return await graph_manager.execute_write_batches(query, rows, batch_size)
+
 async def close_graph():
     """Close graph connections"""
     await graph_manager.close()
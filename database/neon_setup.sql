@@ -200,6 +200,7 @@ CREATE INDEX idx_documents_engagement ON documents(engagement_score DESC);
 CREATE INDEX idx_documents_conversion ON documents(conversion_rate DESC);
 CREATE INDEX idx_documents_active ON documents(is_active);
 CREATE INDEX idx_documents_processing ON documents(chunks_generated, graph_entities_extracted);
+CREATE INDEX idx_documents_updated_at_id ON documents(updated_at, id);
 
 -- Vector similarity search index (HNSW for production)
 CREATE INDEX idx_documents_content_vector ON documents 
@@ -397,11 +398,14 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
--- Create update triggers for timestamps
+-- Create update triggers for timestamps; an UPDATE that sets updated_at itself
+-- (the sync manager writing the source timestamp) keeps its value
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
 BEGIN
-    NEW.updated_at = NOW();
+    IF NEW.updated_at IS NOT DISTINCT FROM OLD.updated_at THEN
+        NEW.updated_at = NOW();
+    END IF;
     RETURN NEW;
 END;
 $$ LANGUAGE plpgsql;
@@ -418,6 +422,15 @@ COMMENT ON TABLE search_outcomes IS 'Search outcomes for learning and optimizati
 COMMENT ON TABLE agent_performance IS 'Agent performance tracking and metrics';
 COMMENT ON TABLE system_metrics IS 'System-wide performance and health metrics';
 
+-- High-water marks for incremental PostgreSQL/Neo4j synchronization
+CREATE TABLE sync_watermarks (
+    source VARCHAR(100) PRIMARY KEY,
+    high_water_mark TIMESTAMP NOT NULL,
+    last_id TEXT NOT NULL DEFAULT '',
+    rows_synced BIGINT DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
 -- Create initial system metrics record
 INSERT INTO system_metrics (
     measurement_start,
@@ -7,7 +7,8 @@ Created: 2025-07-03
 
 import asyncio
 import logging
-from typing import Dict, List, Any, Optional, Set, Tuple
+import time
+from typing import Dict, List, Any, Optional, Set, Tuple, Callable, Awaitable
 from datetime import datetime, timedelta
 from uuid import UUID
 import json
@@ -22,6 +23,8 @@ from database.neo4j_manager import graph_manager
 
 logger = logging.getLogger(__name__)
 
+SyncListener = Callable[[List[UniversalEntity]], Awaitable[Any]]
+
 class SyncDirection(str, Enum):
     POSTGRES_TO_NEO4J = "postgres_to_neo4j"
     NEO4J_TO_POSTGRES = "neo4j_to_postgres"
@@ -46,28 +49,103 @@ class SyncConfiguration:
         self.sync_relationships = True
         self.max_retry_attempts = 3
         self.retry_delay_seconds = 5
+        
+        # Change-data-capture settings
+        self.incremental_sync = True
+        self.full_sync_every_n_cycles = 0  # 0 = only the first scheduled sync is full
+        self.persist_watermarks = True
+
+class SyncMode(str, Enum):
+    FULL = "full"
+    INCREMENTAL = "incremental"
+
+class SyncWatermark:
+    """High-water mark for keyset change scans: (updated_at, id)"""
+    
+    EPOCH = datetime(1970, 1, 1)
+    
+    def __init__(self, timestamp: datetime = None, last_id: str = ""):
+        self.timestamp = timestamp or self.EPOCH
+        self.last_id = last_id
+    
+    def advance(self, timestamp: datetime, last_id: str) -> None:
+        if (timestamp, last_id) > (self.timestamp, self.last_id):
+            self.timestamp = timestamp
+            self.last_id = last_id
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {"timestamp": self.timestamp.isoformat(), "last_id": self.last_id}
 
 class SyncStatus:
     """Track synchronization status"""
     
     def __init__(self):
         self.last_sync_timestamp = None
+        self.last_successful_sync = None
+        self.sync_mode = None
         self.entities_synced = 0
         self.relationships_synced = 0
+        self.rows_read = 0
+        self.rows_written = 0
+        self.batches_written = 0
         self.conflicts_detected = 0
         self.conflicts_resolved = 0
         self.errors_encountered = 0
         self.sync_duration_seconds = 0.0
+        self.rows_per_second = 0.0
         self.next_scheduled_sync = None
 
 class DatabaseSyncManager:
     """Manages synchronization between PostgreSQL and Neo4j databases"""
     
+    POSTGRES_DOCUMENTS = "postgres_documents"
+    NEO4J_ENTITIES = "neo4j_entities"
+    NEO4J_RELATIONSHIPS = "neo4j_relationships"
+    
+    MIN_UUID = "00000000-0000-0000-0000-000000000000"
+    
+    DOCUMENT_COLUMNS = (
+        "id", "title", "source", "content", "content_type", "metadata",
+        "engagement_score", "conversion_rate", "created_at", "updated_at",
+        "content_vector", "is_active"
+    )
+    
     def __init__(self, config: SyncConfiguration = None):
         self.config = config or SyncConfiguration()
         self.status = SyncStatus()
         self.is_syncing = False
         self.sync_lock = asyncio.Lock()
+        self.watermarks: Dict[str, SyncWatermark] = {
+            self.POSTGRES_DOCUMENTS: SyncWatermark(last_id=self.MIN_UUID),
+            self.NEO4J_ENTITIES: SyncWatermark(),
+            self.NEO4J_RELATIONSHIPS: SyncWatermark()
+        }
+        self._watermarks_persistable = self.config.persist_watermarks
+        self._sync_cycles = 0
+        self._listeners: List[SyncListener] = []
+        
+    def add_sync_listener(self, listener: SyncListener) -> None:
+        """Register a coroutine called with every batch of entities written by a sync"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+    
+    def remove_sync_listener(self, listener: SyncListener) -> None:
+        """Unregister a sync listener"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    async def _notify_listeners(self, entities: List[UniversalEntity]) -> None:
+        """Fan out synced entities (e.g. to search indexes); listener errors never fail a sync"""
+        if not entities or not self._listeners:
+            return
+        
+        results = await asyncio.gather(
+            *(listener(entities) for listener in self._listeners),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Sync listener failed: {result}")
         
     async def initialize(self):
         """Initialize sync manager"""
@@ -77,6 +155,8 @@ class DatabaseSyncManager:
         if not graph_manager.is_initialized:
             await graph_manager.initialize()
         
+        await self._load_watermarks()
+        
         logger.info("Database sync manager initialized")
     
     async def sync_entity(self, entity: UniversalEntity, 
@@ -89,6 +169,7 @@ class DatabaseSyncManager:
             if direction in [SyncDirection.NEO4J_TO_POSTGRES, SyncDirection.BIDIRECTIONAL]:
                 await self._sync_entity_to_postgres(entity)
             
+            await self._notify_listeners([entity])
             return True
             
         except Exception as e:
@@ -97,86 +178,91 @@ class DatabaseSyncManager:
     
     async def _sync_entity_to_postgres(self, entity: UniversalEntity) -> None:
         """Sync entity to PostgreSQL"""
-        postgres_data = entity.to_postgres_dict()
-        
-        async with db_manager.get_connection() as conn:
-            # Check if entity exists
-            existing = await conn.fetchrow(
-                "SELECT id, updated_at FROM documents WHERE id = $1",
-                postgres_data["id"]
-            )
-            
-            if existing:
-                # Update existing entity
-                if self._should_update(existing["updated_at"], entity.updated_at):
-                    await conn.execute("""
-                        UPDATE documents SET
-                            title = $2,
-                            source = $3,
-                            content = $4,
-                            content_type = $5,
-                            metadata = $6,
-                            engagement_score = $7,
-                            conversion_rate = $8,
-                            updated_at = $9,
-                            content_vector = $10,
-                            is_active = $11
-                        WHERE id = $1
-                    """, 
-                    postgres_data["id"], postgres_data["title"], postgres_data["source"],
-                    postgres_data["content"], postgres_data["content_type"], postgres_data["metadata"],
-                    postgres_data["engagement_score"], postgres_data["conversion_rate"],
-                    postgres_data["updated_at"], postgres_data["content_vector"],
-                    postgres_data["is_active"]
-                    )
-            else:
-                # Insert new entity
-                await conn.execute("""
-                    INSERT INTO documents (
-                        id, title, source, content, content_type, metadata,
-                        engagement_score, conversion_rate, created_at, updated_at,
-                        content_vector, is_active
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
-                """,
-                postgres_data["id"], postgres_data["title"], postgres_data["source"],
-                postgres_data["content"], postgres_data["content_type"], postgres_data["metadata"],
-                postgres_data["engagement_score"], postgres_data["conversion_rate"],
-                postgres_data["created_at"], postgres_data["updated_at"],
-                postgres_data["content_vector"], postgres_data["is_active"]
-                )
+        await self._upsert_entities_to_postgres([entity])
     
     async def _sync_entity_to_neo4j(self, entity: UniversalEntity) -> None:
         """Sync entity to Neo4j"""
-        neo4j_data = entity.to_neo4j_dict()
+        await self._merge_entities_to_neo4j([entity])
+    
+    async def _upsert_entities_to_postgres(self, entities: List[UniversalEntity]) -> int:
+        """Batch upsert entities with INSERT ... ON CONFLICT via executemany"""
+        if not entities:
+            return 0
+        
+        rows = []
+        for entity in entities:
+            postgres_data = entity.to_postgres_dict()
+            rows.append(tuple(postgres_data[column] for column in self.DOCUMENT_COLUMNS))
+        
+        query = self._document_upsert_query()
+        
+        async with db_manager.get_connection() as conn:
+            async with conn.transaction():
+                for start in range(0, len(rows), self.config.batch_size):
+                    await conn.executemany(query, rows[start:start + self.config.batch_size])
+                    self.status.batches_written += 1
         
-        # Check if entity exists in Neo4j
-        existing_query = "MATCH (e:Entity {uuid: $uuid}) RETURN e.updated_at as updated_at"
-        existing_result = await graph_manager.execute_query(
-            existing_query, {"uuid": neo4j_data["uuid"]}
+        self.status.rows_written += len(rows)
+        return len(rows)
+    
+    def _document_upsert_query(self) -> str:
+        """Build the documents upsert honoring the configured conflict resolution"""
+        columns = ", ".join(self.DOCUMENT_COLUMNS)
+        placeholders = ", ".join(f"${index}" for index in range(1, len(self.DOCUMENT_COLUMNS) + 1))
+        updates = ",\n                ".join(
+            f"{column} = EXCLUDED.{column}"
+            for column in self.DOCUMENT_COLUMNS if column not in ("id", "created_at")
         )
         
-        if existing_result:
-            # Update existing entity
-            existing_updated = existing_result[0]["updated_at"]
-            if self._should_update(existing_updated, entity.updated_at):
-                update_query = """
-                    MATCH (e:Entity {uuid: $uuid})
-                    SET e += $properties
-                    RETURN e.uuid as uuid
-                """
-                await graph_manager.execute_query(
-                    update_query, 
-                    {"uuid": neo4j_data["uuid"], "properties": neo4j_data}
-                )
+        if self.config.conflict_resolution == ConflictResolution.LATEST_WINS:
+            conflict_action = f"""DO UPDATE SET
+                {updates}
+            WHERE documents.updated_at < EXCLUDED.updated_at"""
+        elif self.config.conflict_resolution == ConflictResolution.POSTGRES_PRIORITY:
+            # Rows already carrying the source timestamp are echoes of an earlier sync
+            conflict_action = f"""DO UPDATE SET
+                {updates}
+            WHERE documents.updated_at IS DISTINCT FROM EXCLUDED.updated_at"""
         else:
-            # Create new entity
-            create_query = """
-                CREATE (e:Entity $properties)
-                RETURN e.uuid as uuid
-            """
-            await graph_manager.execute_query(
-                create_query, {"properties": neo4j_data}
-            )
+            # Neo4j priority / manual review never overwrite existing rows
+            conflict_action = "DO NOTHING"
+        
+        return f"""
+            INSERT INTO documents ({columns})
+            VALUES ({placeholders})
+            ON CONFLICT (id) {conflict_action}
+        """
+    
+    async def _merge_entities_to_neo4j(self, entities: List[UniversalEntity]) -> int:
+        """Batch merge entities into Neo4j with UNWIND"""
+        if not entities:
+            return 0
+        
+        rows = [entity.to_neo4j_dict() for entity in entities]
+        
+        if self.config.conflict_resolution == ConflictResolution.LATEST_WINS:
+            overwrite = "existing.updated_at IS NULL OR existing.updated_at < row.updated_at"
+        elif self.config.conflict_resolution == ConflictResolution.POSTGRES_PRIORITY:
+            overwrite = "existing.updated_at IS NULL OR existing.updated_at <> row.updated_at"
+        else:
+            overwrite = "false"
+        
+        query = f"""
+            UNWIND $rows AS row
+            OPTIONAL MATCH (existing:Entity {{uuid: row.uuid}})
+            WITH row, existing
+            WHERE existing IS NULL OR {overwrite}
+            MERGE (e:Entity {{uuid: row.uuid}})
+            SET e += row
+            RETURN e.uuid as uuid
+        """
+        
+        records = await graph_manager.execute_write_batches(query, rows, self.config.batch_size)
+        graph_manager.invalidate_cached_reads([row["uuid"] for row in rows], new_entities=True)
+        written = len(records)
+        self.status.batches_written += -(-len(rows) // self.config.batch_size)
+        self.status.rows_written += written
+        return written
     
     async def sync_relationship(self, relationship: EntityRelationship) -> bool:
         """Sync relationship to Neo4j (relationships are primarily stored in Neo4j)"""
@@ -268,6 +354,7 @@ class DatabaseSyncManager:
                 "relevance_score": metrics.relevance_score,
                 "success_rate": metrics.success_rate
             })
+            graph_manager.invalidate_cached_reads([str(entity_id)])
             
             return True
             
@@ -277,113 +364,244 @@ class DatabaseSyncManager:
     
     async def full_sync(self, direction: SyncDirection = SyncDirection.BIDIRECTIONAL) -> Dict[str, Any]:
         """Perform full database synchronization"""
+        return await self._run_sync(SyncMode.FULL, direction)
+    
+    async def incremental_sync(self, direction: SyncDirection = SyncDirection.BIDIRECTIONAL) -> Dict[str, Any]:
+        """Sync only rows changed since the last high-water marks"""
+        return await self._run_sync(SyncMode.INCREMENTAL, direction)
+    
+    async def _run_sync(self, mode: SyncMode, direction: SyncDirection) -> Dict[str, Any]:
+        """Run a full or incremental sync pass"""
         async with self.sync_lock:
             if self.is_syncing:
                 return {"status": "sync_already_in_progress"}
             
             self.is_syncing = True
             sync_start = datetime.now()
+            started = time.perf_counter()
+            last_successful_sync = self.status.last_successful_sync
             
             try:
                 self.status = SyncStatus()
                 self.status.last_sync_timestamp = sync_start
+                self.status.last_successful_sync = last_successful_sync
+                self.status.sync_mode = mode.value
+                
+                # Full sync rescans from the beginning but still advances the marks
+                if mode == SyncMode.FULL:
+                    watermarks = {
+                        self.POSTGRES_DOCUMENTS: SyncWatermark(last_id=self.MIN_UUID),
+                        self.NEO4J_ENTITIES: SyncWatermark(),
+                        self.NEO4J_RELATIONSHIPS: SyncWatermark()
+                    }
+                else:
+                    watermarks = self.watermarks
                 
                 # Sync entities
-                await self._sync_all_entities(direction)
+                await self._sync_changed_entities(direction, watermarks)
                 
                 # Sync relationships
                 if self.config.sync_relationships:
-                    await self._sync_all_relationships()
+                    await self._sync_changed_relationships(watermarks[self.NEO4J_RELATIONSHIPS])
                 
                 # Sync performance metrics
                 if self.config.sync_performance_metrics:
                     await self._sync_all_performance_metrics()
                 
-                self.status.sync_duration_seconds = (datetime.now() - sync_start).total_seconds()
+                self.watermarks = watermarks
+                
+                elapsed = time.perf_counter() - started
+                self.status.sync_duration_seconds = elapsed
+                self.status.rows_per_second = self.status.rows_written / elapsed if elapsed > 0 else 0.0
+                self.status.last_successful_sync = sync_start
                 self.status.next_scheduled_sync = datetime.now() + timedelta(
                     seconds=self.config.sync_frequency_seconds
                 )
                 
                 return {
                     "status": "sync_completed",
+                    "mode": mode.value,
                     "entities_synced": self.status.entities_synced,
                     "relationships_synced": self.status.relationships_synced,
+                    "rows_read": self.status.rows_read,
+                    "rows_written": self.status.rows_written,
+                    "rows_per_second": self.status.rows_per_second,
                     "conflicts_resolved": self.status.conflicts_resolved,
                     "duration_seconds": self.status.sync_duration_seconds
                 }
                 
             except Exception as e:
-                logger.error(f"Full sync failed: {e}")
+                logger.error(f"{mode.value.capitalize()} sync failed: {e}")
+                self.status.errors_encountered += 1
                 return {
                     "status": "sync_failed",
+                    "mode": mode.value,
                     "error": str(e),
                     "duration_seconds": (datetime.now() - sync_start).total_seconds()
                 }
             finally:
                 self.is_syncing = False
     
-    async def _sync_all_entities(self, direction: SyncDirection) -> None:
-        """Sync all entities between databases"""
+    async def _sync_changed_entities(self, direction: SyncDirection,
+                                     watermarks: Dict[str, SyncWatermark]) -> None:
+        """Stream changed entities in keyset batches and write them in bulk"""
         if direction in [SyncDirection.POSTGRES_TO_NEO4J, SyncDirection.BIDIRECTIONAL]:
-            # Get entities from PostgreSQL
-            async with db_manager.get_connection() as conn:
-                entities = await conn.fetch("""
-                    SELECT id, title, source, content, content_type, metadata,
-                           engagement_score, conversion_rate, created_at, updated_at,
-                           is_active
-                    FROM documents
-                    WHERE is_active = true
-                    ORDER BY updated_at DESC
-                """)
+            watermark = watermarks[self.POSTGRES_DOCUMENTS]
+            
+            while True:
+                # Get changed entities from PostgreSQL, including deactivated ones so
+                # sync listeners can drop them from their indexes
+                async with db_manager.get_connection() as conn:
+                    rows = await conn.fetch("""
+                        SELECT id, title, source, content, content_type, metadata,
+                               engagement_score, conversion_rate, created_at, updated_at,
+                               content_vector, is_active
+                        FROM documents
+                        WHERE (updated_at, id) > ($1, $2::uuid)
+                        ORDER BY updated_at, id
+                        LIMIT $3
+                    """, watermark.timestamp, watermark.last_id, self.config.batch_size)
                 
-                for entity_row in entities:
+                if not rows:
+                    break
+                
+                self.status.rows_read += len(rows)
+                entities = []
+                for entity_row in rows:
                     try:
-                        # Convert to UniversalEntity and sync to Neo4j
-                        entity = self._postgres_row_to_entity(entity_row)
-                        await self._sync_entity_to_neo4j(entity)
-                        self.status.entities_synced += 1
-                        
+                        entities.append(self._postgres_row_to_entity(entity_row))
                     except Exception as e:
-                        logger.error(f"Failed to sync entity {entity_row['id']}: {e}")
+                        logger.error(f"Failed to convert entity {entity_row['id']}: {e}")
                         self.status.errors_encountered += 1
+                
+                active_entities = [entity for entity in entities if entity.is_active]
+                await self._with_retry(self._merge_entities_to_neo4j, active_entities)
+                self.status.entities_synced += len(active_entities)
+                await self._notify_listeners(entities)
+                
+                last_row = rows[-1]
+                watermark.advance(last_row["updated_at"], str(last_row["id"]))
+                await self._save_watermark(self.POSTGRES_DOCUMENTS, watermark, len(rows))
+                
+                if len(rows) < self.config.batch_size:
+                    break
         
         if direction in [SyncDirection.NEO4J_TO_POSTGRES, SyncDirection.BIDIRECTIONAL]:
-            # Get entities from Neo4j
-            neo4j_entities = await graph_manager.execute_query("""
-                MATCH (e:Entity)
-                WHERE e.type IN ['document', 'chunk']
-                RETURN e.uuid as uuid, e.name as name, e.type as type,
-                       e.performance_score as performance_score,
-                       e.confidence_score as confidence_score,
-                       e.created_at as created_at,
-                       e.updated_at as updated_at,
-                       e.properties as properties
-                ORDER BY e.updated_at DESC
-            """)
+            watermark = watermarks[self.NEO4J_ENTITIES]
             
-            for entity_data in neo4j_entities:
-                try:
-                    # Convert to UniversalEntity and sync to PostgreSQL
-                    entity = self._neo4j_data_to_entity(entity_data)
-                    await self._sync_entity_to_postgres(entity)
-                    self.status.entities_synced += 1
-                    
-                except Exception as e:
-                    logger.error(f"Failed to sync entity {entity_data['uuid']}: {e}")
-                    self.status.errors_encountered += 1
-    
-    async def _sync_all_relationships(self) -> None:
-        """Sync all relationships from Neo4j"""
-        relationships = await graph_manager.execute_query("""
-            MATCH (source:Entity)-[r:RELATIONSHIP]->(target:Entity)
-            RETURN r.id as id, source.uuid as source_uuid, target.uuid as target_uuid,
-                   r.relationship_type as relationship_type, r.confidence_score as confidence,
-                   r.strength as strength, r.usage_count as usage_count,
-                   r.created_at as created_at, r.updated_at as updated_at
-        """)
+            while True:
+                # Get changed entities from Neo4j
+                neo4j_entities = await graph_manager.execute_query("""
+                    MATCH (e:Entity)
+                    WHERE e.type IN ['document', 'chunk']
+                      AND (e.updated_at > $since
+                           OR (e.updated_at = $since AND e.uuid > $last_id))
+                    RETURN e.uuid as uuid, e.name as name, e.type as type,
+                           e.performance_score as performance_score,
+                           e.confidence_score as confidence_score,
+                           e.created_at as created_at,
+                           e.updated_at as updated_at,
+                           e.properties as properties
+                    ORDER BY e.updated_at, e.uuid
+                    LIMIT $limit
+                """, {
+                    "since": watermark.timestamp,
+                    "last_id": watermark.last_id,
+                    "limit": self.config.batch_size
+                })
+                
+                if not neo4j_entities:
+                    break
+                
+                self.status.rows_read += len(neo4j_entities)
+                entities = []
+                for entity_data in neo4j_entities:
+                    try:
+                        entity_data["created_at"] = self._to_native_datetime(entity_data["created_at"])
+                        entity_data["updated_at"] = self._to_native_datetime(entity_data["updated_at"])
+                        entities.append(self._neo4j_data_to_entity(entity_data))
+                    except Exception as e:
+                        logger.error(f"Failed to convert entity {entity_data['uuid']}: {e}")
+                        self.status.errors_encountered += 1
+                
+                await self._with_retry(self._upsert_entities_to_postgres, entities)
+                self.status.entities_synced += len(entities)
+                await self._notify_listeners(entities)
+                
+                last_entity = neo4j_entities[-1]
+                watermark.advance(last_entity["updated_at"], last_entity["uuid"])
+                await self._save_watermark(self.NEO4J_ENTITIES, watermark, len(neo4j_entities))
+                
+                if len(neo4j_entities) < self.config.batch_size:
+                    break
+    
+    async def _sync_changed_relationships(self, watermark: SyncWatermark) -> None:
+        """Track relationships changed since the last high-water mark"""
+        result = await graph_manager.execute_query("""
+            MATCH (:Entity)-[r:RELATIONSHIP]->(:Entity)
+            WHERE r.updated_at > $since
+            RETURN count(r) as changed, max(r.updated_at) as latest
+        """, {"since": watermark.timestamp})
         
-        for rel_data in relationships:
-            self.status.relationships_synced += 1
+        if result and result[0]["changed"]:
+            self.status.relationships_synced += result[0]["changed"]
+            watermark.advance(self._to_native_datetime(result[0]["latest"]), "")
+            await self._save_watermark(self.NEO4J_RELATIONSHIPS, watermark, result[0]["changed"])
+    
+    async def _with_retry(self, operation, entities: List[UniversalEntity]) -> int:
+        """Run a batch write with the configured retry policy"""
+        for attempt in range(1, self.config.max_retry_attempts + 1):
+            try:
+                return await operation(entities)
+            except Exception as e:
+                if attempt >= self.config.max_retry_attempts:
+                    raise
+                logger.warning(f"Batch write failed (attempt {attempt}), retrying: {e}")
+                await asyncio.sleep(self.config.retry_delay_seconds)
+        return 0
+    
+    async def _load_watermarks(self) -> None:
+        """Restore persisted high-water marks"""
+        if not self._watermarks_persistable:
+            return
+        
+        try:
+            async with db_manager.get_connection() as conn:
+                rows = await conn.fetch("SELECT source, high_water_mark, last_id FROM sync_watermarks")
+            
+            for row in rows:
+                if row["source"] in self.watermarks:
+                    self.watermarks[row["source"]] = SyncWatermark(row["high_water_mark"], row["last_id"])
+            
+            logger.info(f"Loaded {len(rows)} sync watermarks")
+            
+        except Exception as e:
+            logger.warning(f"Sync watermarks unavailable, keeping them in memory only: {e}")
+            self._watermarks_persistable = False
+    
+    async def _save_watermark(self, source: str, watermark: SyncWatermark, rows_synced: int) -> None:
+        """Persist a high-water mark after each committed batch"""
+        if not self._watermarks_persistable:
+            return
+        
+        try:
+            async with db_manager.get_connection() as conn:
+                await conn.execute("""
+                    INSERT INTO sync_watermarks (source, high_water_mark, last_id, rows_synced, updated_at)
+                    VALUES ($1, $2, $3, $4, NOW())
+                    ON CONFLICT (source) DO UPDATE SET
+                        high_water_mark = EXCLUDED.high_water_mark,
+                        last_id = EXCLUDED.last_id,
+                        rows_synced = sync_watermarks.rows_synced + EXCLUDED.rows_synced,
+                        updated_at = NOW()
+                """, source, watermark.timestamp, watermark.last_id, rows_synced)
+        except Exception as e:
+            logger.warning(f"Failed to persist sync watermark for {source}: {e}")
+    
+    @staticmethod
+    def _to_native_datetime(value: Any) -> Any:
+        """Convert neo4j.time values to Python datetimes"""
+        return value.to_native() if hasattr(value, "to_native") else value
     
     async def _sync_all_performance_metrics(self) -> None:
         """Sync performance metrics between databases"""
@@ -396,7 +614,7 @@ class DatabaseSyncManager:
         if self.config.conflict_resolution == ConflictResolution.LATEST_WINS:
             return new_timestamp > existing_timestamp
         elif self.config.conflict_resolution == ConflictResolution.POSTGRES_PRIORITY:
-            return True  # Always update from PostgreSQL
+            return new_timestamp != existing_timestamp  # Update from PostgreSQL unless already synced
         elif self.config.conflict_resolution == ConflictResolution.NEO4J_PRIORITY:
             return False  # Never update from other source
         else:
@@ -411,6 +629,11 @@ class DatabaseSyncManager:
         
         metadata = json.loads(row['metadata']) if row['metadata'] else {}
         
+        # pgvector values arrive as '[0.1,0.2,...]' text without a registered codec
+        embedding = row.get('content_vector') if hasattr(row, 'get') else None
+        if isinstance(embedding, str):
+            embedding = json.loads(embedding)
+        
         performance = PerformanceMetrics(
             engagement_score=row['engagement_score'] or 0.0,
             conversion_rate=row['conversion_rate'] or 0.0
@@ -423,6 +646,7 @@ class DatabaseSyncManager:
             content=row['content'],
             metadata=metadata,
             performance=performance,
+            embedding=list(embedding) if embedding is not None else None,
             created_at=row['created_at'],
             updated_at=row['updated_at'],
             is_active=row['is_active']
@@ -460,7 +684,11 @@ class DatabaseSyncManager:
                 
                 if not self.is_syncing:
                     logger.info("Starting scheduled sync")
-                    result = await self.full_sync()
+                    if self._should_run_full_sync():
+                        result = await self.full_sync()
+                    else:
+                        result = await self.incremental_sync()
+                    self._sync_cycles += 1
                     logger.info(f"Scheduled sync completed: {result}")
                 else:
                     logger.info("Skipping scheduled sync - sync already in progress")
@@ -468,13 +696,32 @@ class DatabaseSyncManager:
             except Exception as e:
                 logger.error(f"Scheduled sync failed: {e}")
     
+    def _should_run_full_sync(self) -> bool:
+        """First scheduled cycle (and every Nth if configured) runs a full sync"""
+        if not self.config.incremental_sync or self._sync_cycles == 0:
+            return True
+        
+        every_n = self.config.full_sync_every_n_cycles
+        return every_n > 0 and self._sync_cycles % every_n == 0
+    
     async def get_sync_status(self) -> Dict[str, Any]:
         """Get current synchronization status"""
+        last_successful = self.status.last_successful_sync
+        sync_lag = (datetime.now() - last_successful).total_seconds() if last_successful else None
+        
         return {
             "is_syncing": self.is_syncing,
+            "sync_mode": self.status.sync_mode,
             "last_sync": self.status.last_sync_timestamp.isoformat() if self.status.last_sync_timestamp else None,
+            "last_successful_sync": last_successful.isoformat() if last_successful else None,
+            "sync_lag_seconds": sync_lag,
+            "high_water_marks": {source: mark.to_dict() for source, mark in self.watermarks.items()},
             "entities_synced": self.status.entities_synced,
             "relationships_synced": self.status.relationships_synced,
+            "rows_read": self.status.rows_read,
+            "rows_written": self.status.rows_written,
+            "batches_written": self.status.batches_written,
+            "rows_per_second": self.status.rows_per_second,
             "conflicts_detected": self.status.conflicts_detected,
             "conflicts_resolved": self.status.conflicts_resolved,
             "errors_encountered": self.status.errors_encountered,
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Pipeline Scheduler
+
+Staged async scheduler used by the opportunity-driven research pipeline.
+Work items flow through a fixed list of stages. Each stage has:
+1. Its own priority queue (bounded -> backpressure on the previous stage)
+2. A pool of workers with configurable concurrency
+3. Retry with exponential backoff and jitter
+4. Timing metrics (processed, failures, retries, avg/max duration)
+
+Independent items overlap stages: while one opportunity is in the
+creators stage, the next one can already run niche detection. An optional
+global limit caps how many items are in the pipeline at once, on top of
+the per-stage concurrency: an item takes a slot when the first stage
+dequeues it and gives it back when it completes or fails.
+"""
+
+import asyncio
+import itertools
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+StageHandler = Callable[[Any], Awaitable[None]]
+CompletionCallback = Callable[[Any], Awaitable[None]]
+FailureCallback = Callable[[Any, str, Exception], Awaitable[None]]
+
+
+@dataclass
+class StageSpec:
+    """Configuration of a single pipeline stage"""
+    name: str
+    handler: StageHandler
+    concurrency: int = 1
+    queue_size: int = 0  # 0 = unbounded
+    max_retries: int = 2
+    timeout_seconds: Optional[float] = None
+
+
+@dataclass
+class StageMetrics:
+    """Runtime metrics for a single pipeline stage"""
+    processed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    retries: int = 0
+    in_flight: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    last_error: Optional[str] = None
+
+    def record(self, duration: float, success: bool):
+        self.processed += 1
+        self.total_seconds += duration
+        self.max_seconds = max(self.max_seconds, duration)
+        if success:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'processed': self.processed,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'retries': self.retries,
+            'in_flight': self.in_flight,
+            'total_seconds': round(self.total_seconds, 4),
+            'average_seconds': round(self.total_seconds / self.processed, 4) if self.processed else 0.0,
+            'max_seconds': round(self.max_seconds, 4),
+            'last_error': self.last_error
+        }
+
+
+@dataclass(order=True)
+class _QueueEntry:
+    """Priority queue entry (lower sort key = served first)"""
+    sort_key: float
+    sequence: int
+    item: Any = field(compare=False)
+
+
+class PipelineScheduler:
+    """Priority-queue driven, multi-stage worker pool scheduler"""
+
+    def __init__(self,
+                 stages: List[StageSpec],
+                 on_complete: Optional[CompletionCallback] = None,
+                 on_failure: Optional[FailureCallback] = None,
+                 retry_base_delay: float = 1.0,
+                 retry_max_delay: float = 30.0,
+                 max_concurrent_items: Optional[int] = None):
+
+        if not stages:
+            raise ValueError("PipelineScheduler requires at least one stage")
+
+        self.stages = stages
+        self.on_complete = on_complete
+        self.on_failure = on_failure
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.max_concurrent_items = max_concurrent_items
+
+        self.metrics: Dict[str, StageMetrics] = {stage.name: StageMetrics() for stage in stages}
+
+        self._queues: Dict[str, asyncio.PriorityQueue] = {}
+        self._workers: List[asyncio.Task] = []
+        self._sequence = itertools.count()
+        self._pending = 0
+        self._idle_event: Optional[asyncio.Event] = None
+        self._item_slots: Optional[asyncio.Semaphore] = None
+        self._items_in_flight = 0
+        self._running = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    @property
+    def pending(self) -> int:
+        """Items submitted but not yet completed or failed"""
+        return self._pending
+
+    def start(self):
+        """Create stage queues and spawn workers (requires a running event loop)"""
+
+        if self._running:
+            return
+
+        self._idle_event = asyncio.Event()
+        self._idle_event.set()
+        self._items_in_flight = 0
+        if self.max_concurrent_items:
+            self._item_slots = asyncio.Semaphore(self.max_concurrent_items)
+
+        for stage in self.stages:
+            self._queues[stage.name] = asyncio.PriorityQueue(maxsize=stage.queue_size)
+
+        for index, stage in enumerate(self.stages):
+            for worker_number in range(max(1, stage.concurrency)):
+                task = asyncio.create_task(
+                    self._worker(index, stage),
+                    name=f"pipeline-{stage.name}-{worker_number}"
+                )
+                self._workers.append(task)
+
+        self._running = True
+        logger.info(f"Pipeline scheduler started with stages: "
+                    f"{', '.join(f'{s.name}x{max(1, s.concurrency)}' for s in self.stages)}")
+
+    async def stop(self):
+        """Cancel all workers; queued items are dropped"""
+
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+
+        self._workers.clear()
+        self._queues.clear()
+        self._running = False
+
+    def submit_nowait(self, item: Any, priority: float = 0.0):
+        """Submit an item to the first stage; raises asyncio.QueueFull on backpressure"""
+
+        self._ensure_started()
+        entry = self._make_entry(item, priority)
+        self._queues[self.stages[0].name].put_nowait(entry)
+        self._mark_pending()
+
+    async def submit(self, item: Any, priority: float = 0.0):
+        """Submit an item to the first stage, waiting for queue capacity"""
+
+        self._ensure_started()
+        entry = self._make_entry(item, priority)
+        await self._queues[self.stages[0].name].put(entry)
+        self._mark_pending()
+
+    async def wait_until_idle(self):
+        """Wait until every submitted item has completed or failed"""
+
+        if self._idle_event is not None:
+            await self._idle_event.wait()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Per-stage timing, throughput and queue depth"""
+
+        stages = {}
+        for stage in self.stages:
+            queue = self._queues.get(stage.name)
+            stage_metrics = self.metrics[stage.name].to_dict()
+            stage_metrics['queue_depth'] = queue.qsize() if queue else 0
+            stage_metrics['concurrency'] = max(1, stage.concurrency)
+            stages[stage.name] = stage_metrics
+
+        return {
+            'running': self._running,
+            'pending_items': self._pending,
+            'items_in_flight': self._items_in_flight,
+            'max_concurrent_items': self.max_concurrent_items,
+            'stages': stages
+        }
+
+    def _ensure_started(self):
+        if not self._running:
+            self.start()
+
+    def _make_entry(self, item: Any, priority: float) -> _QueueEntry:
+        # Higher priority is served first
+        return _QueueEntry(sort_key=-priority, sequence=next(self._sequence), item=item)
+
+    def _mark_pending(self):
+        self._pending += 1
+        self._idle_event.clear()
+
+    async def _take_item(self, queue: asyncio.PriorityQueue) -> _QueueEntry:
+        """Dequeue the next item for the first stage once a global slot is free"""
+
+        if self._item_slots is not None:
+            await self._item_slots.acquire()
+        try:
+            entry = await queue.get()
+        except BaseException:
+            if self._item_slots is not None:
+                self._item_slots.release()
+            raise
+
+        self._items_in_flight += 1
+        return entry
+
+    def _mark_done(self):
+        # Every finished item was admitted by the first stage and holds a slot
+        self._items_in_flight -= 1
+        if self._item_slots is not None:
+            self._item_slots.release()
+
+        self._pending -= 1
+        if self._pending <= 0:
+            self._pending = 0
+            self._idle_event.set()
+
+    def _retry_delay(self, attempt: int) -> float:
+        """Exponential backoff with equal jitter"""
+
+        delay = min(self.retry_max_delay, self.retry_base_delay * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def _worker(self, index: int, stage: StageSpec):
+        queue = self._queues[stage.name]
+        next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+        metrics = self.metrics[stage.name]
+
+        while True:
+            entry: _QueueEntry = await (self._take_item(queue) if index == 0 else queue.get())
+            try:
+                succeeded = await self._run_stage(stage, metrics, entry.item)
+
+                if not succeeded:
+                    self._mark_done()
+                elif next_stage is not None:
+                    # Blocks while the next stage is saturated (backpressure)
+                    await self._queues[next_stage.name].put(entry)
+                else:
+                    await self._notify_complete(entry.item)
+                    self._mark_done()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Pipeline worker error in stage '{stage.name}': {e}")
+                self._mark_done()
+            finally:
+                queue.task_done()
+
+    async def _run_stage(self, stage: StageSpec, metrics: StageMetrics, item: Any) -> bool:
+        attempt = 0
+
+        while True:
+            started = time.perf_counter()
+            metrics.in_flight += 1
+            try:
+                if stage.timeout_seconds:
+                    await asyncio.wait_for(stage.handler(item), timeout=stage.timeout_seconds)
+                else:
+                    await stage.handler(item)
+
+                metrics.record(time.perf_counter() - started, success=True)
+                return True
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                metrics.last_error = str(e)
+
+                if attempt < stage.max_retries:
+                    attempt += 1
+                    metrics.retries += 1
+                    delay = self._retry_delay(attempt - 1)
+                    logger.warning(f"Stage '{stage.name}' failed (attempt {attempt}), retrying in {delay:.2f}s: {e}")
+                    await asyncio.sleep(delay)
+                    continue
+
+                metrics.record(time.perf_counter() - started, success=False)
+                await self._notify_failure(item, stage.name, e)
+                return False
+            finally:
+                metrics.in_flight -= 1
+
+    async def _notify_complete(self, item: Any):
+        if self.on_complete:
+            await self.on_complete(item)
+
+    async def _notify_failure(self, item: Any, stage_name: str, error: Exception):
+        if self.on_failure:
+            try:
+                await self.on_failure(item, stage_name, error)
+            except Exception as callback_error:
+                logger.error(f"Pipeline failure callback error: {callback_error}")
@@ -27,6 +27,7 @@ import os
 from .analyzers.universal_niche_detector import UniversalNicheDetector, NicheDetectionResult, NicheCategory
 from .analyzers.universal_creator_analyzer import UniversalCreatorAnalyzer, NicheCreatorInsights, CreatorProfile, Platform
 from .analyzers.universal_pattern_extractor import UniversalPatternExtractor, PatternAnalysis
+from .core.pipeline_scheduler import PipelineScheduler, StageSpec
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -94,6 +95,16 @@ class PipelineExecution:
     error_message: Optional[str]
     progress_log: List[str]
 
+@dataclass
+class PipelineJob:
+    """Opportunity moving through the scheduler stages"""
+    opportunity: OpportunityInput
+    execution: PipelineExecution
+    niche_analysis: Optional[NicheDetectionResult] = None
+    creator_insights: Optional[NicheCreatorInsights] = None
+    pattern_analysis: Optional[PatternAnalysis] = None
+    result: Optional[CreatorIntelligenceResult] = None
+
 class OpportunityDrivenPipeline:
     """Main pipeline orchestrator"""
     
@@ -127,8 +138,8 @@ class OpportunityDrivenPipeline:
         self.active_executions: Dict[str, PipelineExecution] = {}
         self.max_concurrent_executions = self.config.get('max_concurrent_executions', 3)
         
-        # Queue for pending opportunities
-        self.opportunity_queue: List[OpportunityInput] = []
+        # Staged scheduler: niche -> creators -> patterns -> strategy
+        self.scheduler = self._create_scheduler()
         
         # Statistics
         self.stats = {
@@ -148,6 +159,15 @@ class OpportunityDrivenPipeline:
             'analysis_timeout_minutes': 30,
             'retry_failed_analyses': True,
             'max_retries': 2,
+            'retry_base_delay_seconds': 2.0,
+            'retry_max_delay_seconds': 60.0,
+            'stage_concurrency': {
+                'niche': 3,
+                'creators': 2,
+                'patterns': 2,
+                'strategy': 3
+            },
+            'stage_queue_size': 20,
             'save_detailed_logs': True,
             'auto_generate_reports': True,
             'notification_webhooks': [],
@@ -255,6 +275,45 @@ class OpportunityDrivenPipeline:
         with sqlite3.connect(self.database_path) as conn:
             conn.executescript(create_tables_sql)
     
+    def _create_scheduler(self) -> PipelineScheduler:
+        """Build the stage scheduler from configuration"""
+        
+        concurrency = self.config.get('stage_concurrency', {})
+        default_concurrency = self.config.get('max_concurrent_executions', 3)
+        queue_size = self.config.get('stage_queue_size', 20)
+        max_retries = self.config.get('max_retries', 2) if self.config.get('retry_failed_analyses', True) else 0
+        timeout = self.config.get('analysis_timeout_minutes', 30) * 60
+        
+        stage_handlers = [
+            ('niche', self._run_niche_stage),
+            ('creators', self._run_creators_stage),
+            ('patterns', self._run_patterns_stage),
+            ('strategy', self._run_strategy_stage)
+        ]
+        
+        stages = [
+            StageSpec(
+                name=name,
+                handler=handler,
+                concurrency=concurrency.get(name, default_concurrency),
+                # First stage is the intake queue and stays unbounded
+                queue_size=0 if index == 0 else queue_size,
+                max_retries=max_retries,
+                timeout_seconds=timeout
+            )
+            for index, (name, handler) in enumerate(stage_handlers)
+        ]
+        
+        return PipelineScheduler(
+            stages,
+            on_complete=self._on_job_completed,
+            on_failure=self._on_job_failed,
+            retry_base_delay=self.config.get('retry_base_delay_seconds', 2.0),
+            retry_max_delay=self.config.get('retry_max_delay_seconds', 60.0),
+            # Opportunities executing at once across all stages
+            max_concurrent_items=self.max_concurrent_executions
+        )
+    
     def add_opportunity(self, opportunity: OpportunityInput) -> str:
         """Add opportunity to processing queue"""
         
@@ -263,17 +322,40 @@ class OpportunityDrivenPipeline:
             logger.info(f"Opportunity {opportunity.opportunity_id} already processed, skipping")
             return opportunity.opportunity_id
         
-        # Add to queue
-        self.opportunity_queue.append(opportunity)
+        # Add to queue (highest priority_score is served first)
+        self.scheduler.submit_nowait(self._create_job(opportunity), priority=opportunity.priority_score)
         
         logger.info(f"Added opportunity '{opportunity.title}' to processing queue")
         
-        # Start processing if under concurrent limit
-        if len(self.active_executions) < self.max_concurrent_executions:
-            asyncio.create_task(self._process_next_opportunity())
-        
         return opportunity.opportunity_id
     
+    async def add_opportunities(self, opportunities: List[OpportunityInput]) -> List[str]:
+        """Bulk import opportunities; stages overlap across opportunities"""
+        
+        opportunity_ids = []
+        
+        for opportunity in opportunities:
+            if self._opportunity_exists(opportunity.opportunity_id):
+                logger.info(f"Opportunity {opportunity.opportunity_id} already processed, skipping")
+                continue
+            
+            await self.scheduler.submit(self._create_job(opportunity), priority=opportunity.priority_score)
+            opportunity_ids.append(opportunity.opportunity_id)
+        
+        logger.info(f"Queued {len(opportunity_ids)} of {len(opportunities)} opportunities for processing")
+        
+        return opportunity_ids
+    
+    async def wait_until_idle(self):
+        """Wait until all queued opportunities have been processed"""
+        
+        await self.scheduler.wait_until_idle()
+    
+    async def shutdown(self):
+        """Stop scheduler workers"""
+        
+        await self.scheduler.stop()
+    
     def _opportunity_exists(self, opportunity_id: str) -> bool:
         """Check if opportunity has already been processed"""
         
@@ -285,19 +367,9 @@ class OpportunityDrivenPipeline:
             count = cursor.fetchone()[0]
             return count > 0
     
-    async def _process_next_opportunity(self):
-        """Process the next opportunity in the queue"""
-        
-        if not self.opportunity_queue:
-            return
+    def _create_job(self, opportunity: OpportunityInput) -> PipelineJob:
+        """Create execution tracking for a queued opportunity"""
         
-        if len(self.active_executions) >= self.max_concurrent_executions:
-            return
-        
-        # Get next opportunity
-        opportunity = self.opportunity_queue.pop(0)
-        
-        # Create execution tracking
         execution_id = f"exec_{opportunity.opportunity_id}_{int(time.time())}"
         execution = PipelineExecution(
             execution_id=execution_id,
@@ -311,47 +383,85 @@ class OpportunityDrivenPipeline:
             progress_log=[]
         )
         
-        self.active_executions[execution_id] = execution
+        return PipelineJob(opportunity=opportunity, execution=execution)
+    
+    async def _run_niche_stage(self, job: PipelineJob):
+        """Stage 1: detect niche"""
         
-        try:
-            # Process the opportunity
-            result = await self._execute_pipeline(opportunity, execution)
-            
-            # Update execution
-            execution.status = PipelineStatus.COMPLETED
-            execution.completed_at = datetime.now()
-            execution.duration_seconds = (execution.completed_at - execution.started_at).total_seconds()
-            execution.result = result
-            
-            # Update statistics
-            self.stats['successful_analyses'] += 1
-            self.stats['total_opportunities_processed'] += 1
-            
-            logger.info(f"Successfully processed opportunity '{opportunity.title}' in {execution.duration_seconds:.1f}s")
-            
-        except Exception as e:
-            # Handle error
-            execution.status = PipelineStatus.FAILED
-            execution.completed_at = datetime.now()
-            execution.duration_seconds = (execution.completed_at - execution.started_at).total_seconds()
-            execution.error_message = str(e)
-            
-            # Update statistics
-            self.stats['failed_analyses'] += 1
-            self.stats['total_opportunities_processed'] += 1
-            
-            logger.error(f"Failed to process opportunity '{opportunity.title}': {e}")
+        execution = job.execution
+        if execution.status == PipelineStatus.PENDING:
+            execution.status = PipelineStatus.RUNNING
+            execution.started_at = datetime.now()
+            execution.progress_log.append(f"Starting pipeline for opportunity: {job.opportunity.title}")
+            self.active_executions[execution.execution_id] = execution
         
-        finally:
-            # Save execution to database
-            self._save_execution(execution)
-            
-            # Remove from active executions
-            del self.active_executions[execution_id]
-            
-            # Process next opportunity if queue not empty
-            if self.opportunity_queue:
-                asyncio.create_task(self._process_next_opportunity())
+        execution.progress_log.append("Step 1: Detecting niche...")
+        job.niche_analysis = await self._detect_opportunity_niche(job.opportunity, execution)
+    
+    async def _run_creators_stage(self, job: PipelineJob):
+        """Stage 2: find and analyze creators in the niche"""
+        
+        job.execution.progress_log.append(f"Step 2: Finding creators in niche: {job.niche_analysis.primary_niche.value}")
+        job.creator_insights = await self._analyze_niche_creators(job.niche_analysis, job.execution)
+    
+    async def _run_patterns_stage(self, job: PipelineJob):
+        """Stage 3: extract patterns from creators"""
+        
+        job.execution.progress_log.append("Step 3: Extracting universal patterns...")
+        job.pattern_analysis = await self._extract_creator_patterns(job.creator_insights, job.execution)
+    
+    async def _run_strategy_stage(self, job: PipelineJob):
+        """Stage 4: strategy, implementation plan, insights and persistence"""
+        
+        job.result = await self._build_result(
+            job.opportunity, job.niche_analysis, job.creator_insights, job.pattern_analysis, job.execution
+        )
+    
+    async def _on_job_completed(self, job: PipelineJob):
+        """Finalize a successfully processed opportunity"""
+        
+        execution = job.execution
+        execution.status = PipelineStatus.COMPLETED
+        execution.completed_at = datetime.now()
+        execution.duration_seconds = (execution.completed_at - execution.started_at).total_seconds()
+        execution.result = job.result
+        
+        self._record_processing_time(execution.duration_seconds)
+        self.stats['successful_analyses'] += 1
+        self.stats['total_opportunities_processed'] += 1
+        
+        logger.info(f"Successfully processed opportunity '{job.opportunity.title}' in {execution.duration_seconds:.1f}s")
+        
+        self._finish_execution(execution)
+    
+    async def _on_job_failed(self, job: PipelineJob, stage_name: str, error: Exception):
+        """Finalize an opportunity that exhausted its retries"""
+        
+        execution = job.execution
+        execution.status = PipelineStatus.FAILED
+        execution.completed_at = datetime.now()
+        execution.duration_seconds = (execution.completed_at - execution.started_at).total_seconds()
+        execution.error_message = f"{stage_name}: {error}"
+        
+        self.stats['failed_analyses'] += 1
+        self.stats['total_opportunities_processed'] += 1
+        
+        logger.error(f"Failed to process opportunity '{job.opportunity.title}' in stage '{stage_name}': {error}")
+        
+        self._finish_execution(execution)
+    
+    def _finish_execution(self, execution: PipelineExecution):
+        """Persist execution and drop it from active tracking"""
+        
+        self._save_execution(execution)
+        self.active_executions.pop(execution.execution_id, None)
+    
+    def _record_processing_time(self, duration_seconds: float):
+        """Update running average processing time"""
+        
+        completed = self.stats['successful_analyses']
+        average = self.stats['average_processing_time']
+        self.stats['average_processing_time'] = (average * completed + duration_seconds) / (completed + 1)
     
     async def _execute_pipeline(self, opportunity: OpportunityInput, execution: PipelineExecution) -> CreatorIntelligenceResult:
         """Execute the complete pipeline for an opportunity"""
@@ -371,6 +481,16 @@ class OpportunityDrivenPipeline:
         execution.progress_log.append("Step 3: Extracting universal patterns...")
         pattern_analysis = await self._extract_creator_patterns(creator_insights, execution)
         
+        return await self._build_result(opportunity, niche_analysis, creator_insights, pattern_analysis, execution)
+    
+    async def _build_result(self,
+                            opportunity: OpportunityInput,
+                            niche_analysis: NicheDetectionResult,
+                            creator_insights: NicheCreatorInsights,
+                            pattern_analysis: PatternAnalysis,
+                            execution: PipelineExecution) -> CreatorIntelligenceResult:
+        """Steps 4-7: strategy, plan, success metrics and insights"""
+        
         # Step 4: Generate strategy recommendations
         execution.progress_log.append("Step 4: Generating strategy recommendations...")
         strategy = await self._generate_strategy(opportunity, niche_analysis, creator_insights, pattern_analysis, execution)
@@ -780,9 +900,12 @@ class OpportunityDrivenPipeline:
     def get_pipeline_status(self) -> Dict[str, Any]:
         """Get current pipeline status"""
         
+        scheduler_metrics = self.scheduler.get_metrics()
+        
         return {
             'active_executions': len(self.active_executions),
-            'queued_opportunities': len(self.opportunity_queue),
+            'queued_opportunities': scheduler_metrics['pending_items'] - len(self.active_executions),
+            'stages': scheduler_metrics['stages'],
             'statistics': dict(self.stats),
             'configuration': self.config,
             'database_path': self.database_path
@@ -863,7 +986,7 @@ if __name__ == "__main__":
         print(f"Processing opportunity: {opportunity_id}")
         
         # Wait for processing
-        await asyncio.sleep(2)
+        await pipeline.wait_until_idle()
         
         # Check status
         status = pipeline.get_pipeline_status()
@@ -875,6 +998,7 @@ if __name__ == "__main__":
             result = results[0]
             print(f"Analysis completed with {result['success_probability']:.0%} success probability")
         
+        await pipeline.shutdown()
         return pipeline
     
     # Run test
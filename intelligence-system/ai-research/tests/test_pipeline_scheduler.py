@@ -0,0 +1,190 @@
+# Pipeline Scheduler Tests
+# Module: AI Research - staged priority scheduling of the opportunity-driven pipeline
+
+import asyncio
+import importlib.util
+import os
+
+import pytest
+
+# Loaded by path: ai-research is not an importable package
+_SPEC = importlib.util.spec_from_file_location(
+    "pipeline_scheduler",
+    os.path.join(os.path.dirname(__file__), "..", "core", "pipeline_scheduler.py")
+)
+pipeline_scheduler = importlib.util.module_from_spec(_SPEC)
+_SPEC.loader.exec_module(pipeline_scheduler)
+
+PipelineScheduler = pipeline_scheduler.PipelineScheduler
+StageSpec = pipeline_scheduler.StageSpec
+
+
+class Tracker:
+    """Stage handler that records start order and peak concurrency per stage and overall"""
+
+    def __init__(self, seconds=0.01):
+        self.seconds = seconds
+        self.started = []
+        self.running = {}
+        self.peak = {}
+        self.items = set()
+        self.peak_items = 0
+
+    def stage(self, name):
+        async def handler(item):
+            self.started.append((name, item))
+            self.items.add(item)
+            self.peak_items = max(self.peak_items, len(self.items))
+            self.running[name] = self.running.get(name, 0) + 1
+            self.peak[name] = max(self.peak.get(name, 0), self.running[name])
+            await asyncio.sleep(self.seconds)
+            self.running[name] -= 1
+        return handler
+
+    async def complete(self, item):
+        self.items.discard(item)
+
+
+# =============================================================================
+# PRIORITY TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_higher_priority_served_first_fifo_within():
+    started = []
+    gate = asyncio.Event()
+
+    async def handler(item):
+        started.append(item)
+        # The first item occupies the single worker so the rest queue up
+        if item == "blocker":
+            await gate.wait()
+
+    scheduler = PipelineScheduler([StageSpec("only", handler)])
+    scheduler.submit_nowait("blocker")
+    await asyncio.sleep(0.01)
+    for item, priority in [("low", 1), ("high-1", 5), ("mid", 3), ("high-2", 5)]:
+        scheduler.submit_nowait(item, priority=priority)
+
+    gate.set()
+    await scheduler.wait_until_idle()
+    await scheduler.stop()
+
+    assert started == ["blocker", "high-1", "high-2", "mid", "low"]
+
+
+# =============================================================================
+# CONCURRENCY TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_per_stage_concurrency_and_global_limit():
+    tracker = Tracker()
+    scheduler = PipelineScheduler(
+        [
+            StageSpec("niche", tracker.stage("niche"), concurrency=3),
+            StageSpec("creators", tracker.stage("creators"), concurrency=1),
+            StageSpec("strategy", tracker.stage("strategy"), concurrency=3)
+        ],
+        on_complete=tracker.complete,
+        max_concurrent_items=2
+    )
+    for index in range(8):
+        scheduler.submit_nowait(f"item-{index}")
+    await scheduler.wait_until_idle()
+    metrics = scheduler.get_metrics()
+    await scheduler.stop()
+
+    assert tracker.peak_items == 2
+    assert tracker.peak["niche"] <= 2
+    assert tracker.peak["creators"] == 1
+    assert metrics["items_in_flight"] == 0
+    assert all(stage["succeeded"] == 8 for stage in metrics["stages"].values())
+
+
+@pytest.mark.asyncio
+async def test_without_global_limit_stages_overlap():
+    tracker = Tracker()
+    scheduler = PipelineScheduler(
+        [StageSpec("niche", tracker.stage("niche"), concurrency=3),
+         StageSpec("creators", tracker.stage("creators"), concurrency=3)],
+        on_complete=tracker.complete
+    )
+    for index in range(6):
+        scheduler.submit_nowait(f"item-{index}")
+    await scheduler.wait_until_idle()
+    await scheduler.stop()
+
+    assert tracker.peak["niche"] == 3
+    assert tracker.peak_items > 3
+
+
+@pytest.mark.asyncio
+async def test_bounded_stage_queue_applies_backpressure():
+    gate = asyncio.Event()
+
+    async def slow(item):
+        await gate.wait()
+
+    async def fast(item):
+        pass
+
+    scheduler = PipelineScheduler([
+        StageSpec("first", fast, queue_size=1),
+        StageSpec("second", slow, queue_size=1)
+    ])
+    scheduler.submit_nowait("a")
+    await asyncio.sleep(0.01)
+    scheduler.submit_nowait("b")
+    await asyncio.sleep(0.01)
+    scheduler.submit_nowait("c")
+    await asyncio.sleep(0.01)
+
+    # a runs in second, b waits in second's queue, c is held by first's worker
+    with pytest.raises(asyncio.QueueFull):
+        for index in range(3):
+            scheduler.submit_nowait(f"overflow-{index}")
+
+    gate.set()
+    await scheduler.wait_until_idle()
+    await scheduler.stop()
+
+
+# =============================================================================
+# RETRY TESTS
+# =============================================================================
+
+@pytest.mark.asyncio
+async def test_failed_items_retry_then_release_their_slot():
+    attempts = []
+    failures = []
+
+    async def flaky(item):
+        attempts.append(item)
+        if item == "broken":
+            raise RuntimeError("upstream unavailable")
+
+    async def on_failure(item, stage_name, error):
+        failures.append((item, stage_name, str(error)))
+
+    tracker = Tracker()
+    scheduler = PipelineScheduler(
+        [StageSpec("flaky", flaky, max_retries=2), StageSpec("after", tracker.stage("after"))],
+        on_failure=on_failure,
+        retry_base_delay=0.001,
+        retry_max_delay=0.002,
+        max_concurrent_items=1
+    )
+    scheduler.submit_nowait("broken")
+    await scheduler.wait_until_idle()
+
+    # The failed item gave its slot back, so the next one still runs
+    scheduler.submit_nowait("healthy")
+    await scheduler.wait_until_idle()
+    metrics = scheduler.get_metrics()
+    await scheduler.stop()
+
+    assert attempts == ["broken"] * 3 + ["healthy"]
+    assert failures == [("broken", "flaky", "upstream unavailable")]
+    assert ("after", "healthy") in tracker.started
+    assert metrics["stages"]["flaky"]["retries"] == 2
@@ -6,7 +6,7 @@ Created: 2025-07-03
 """
 
 from pydantic import BaseModel, Field, validator
-from typing import List, Dict, Optional, Any, Union
+from typing import List, Dict, Optional, Any, Literal, Union
 from datetime import datetime
 from enum import Enum
 from uuid import UUID, uuid4
@@ -232,7 +232,7 @@ class UniversalEntity(BaseModel):
 # Specialized Entity Models
 class DocumentEntity(UniversalEntity):
     """Document-specific entity model"""
-    type: EntityType = Field(default=EntityType.DOCUMENT, const=True)
+    type: Literal[EntityType.DOCUMENT] = EntityType.DOCUMENT
     
     # Document-specific fields
     title: str = Field(min_length=1, max_length=1000, description="Document title")
@@ -260,7 +260,7 @@ class DocumentEntity(UniversalEntity):
 
 class ChunkEntity(UniversalEntity):
     """Chunk-specific entity model"""
-    type: EntityType = Field(default=EntityType.CHUNK, const=True)
+    type: Literal[EntityType.CHUNK] = EntityType.CHUNK
     
     # Chunk-specific fields
     document_id: UUID = Field(description="Parent document ID")
@@ -288,7 +288,7 @@ class ChunkEntity(UniversalEntity):
 
 class QueryEntity(UniversalEntity):
     """Query-specific entity model"""
-    type: EntityType = Field(default=EntityType.QUERY, const=True)
+    type: Literal[EntityType.QUERY] = EntityType.QUERY
     
     # Query-specific fields
     original_query: str = Field(min_length=1, description="Original user query")
@@ -316,7 +316,7 @@ class QueryEntity(UniversalEntity):
 
 class ResponseEntity(UniversalEntity):
     """Response-specific entity model"""
-    type: EntityType = Field(default=EntityType.RESPONSE, const=True)
+    type: Literal[EntityType.RESPONSE] = EntityType.RESPONSE
     
     # Response-specific fields
     query_id: UUID = Field(description="Associated query ID")
@@ -525,7 +525,7 @@ def validate_entity_consistency(entity: UniversalEntity) -> List[str]:
 # Module 3A: Content Generation Specialized Entities
 class ContentOutlineEntity(UniversalEntity):
     """Content outline specific entity model"""
-    type: EntityType = Field(default=EntityType.CONTENT_OUTLINE, const=True)
+    type: Literal[EntityType.CONTENT_OUTLINE] = EntityType.CONTENT_OUTLINE
     
     # Outline specific fields
     niche: str = Field(description="Target niche")
@@ -538,7 +538,7 @@ class ContentOutlineEntity(UniversalEntity):
 
 class ContentPieceEntity(UniversalEntity):
     """Generated content piece entity model"""
-    type: EntityType = Field(default=EntityType.CONTENT_PIECE, const=True)
+    type: Literal[EntityType.CONTENT_PIECE] = EntityType.CONTENT_PIECE
     
     # Content specific fields
     outline_id: Optional[UUID] = Field(default=None, description="Source outline ID")
@@ -565,7 +565,7 @@ class ContentPieceEntity(UniversalEntity):
 
 class VisualAssetEntity(UniversalEntity):
     """Visual content asset entity model"""
-    type: EntityType = Field(default=EntityType.VISUAL_ASSET, const=True)
+    type: Literal[EntityType.VISUAL_ASSET] = EntityType.VISUAL_ASSET
     
     # Visual specific fields
     content_piece_id: Optional[UUID] = Field(default=None, description="Associated content piece")
@@ -581,7 +581,7 @@ class VisualAssetEntity(UniversalEntity):
 
 class SocialAdaptationEntity(UniversalEntity):
     """Social media adaptation entity model"""
-    type: EntityType = Field(default=EntityType.SOCIAL_ADAPTATION, const=True)
+    type: Literal[EntityType.SOCIAL_ADAPTATION] = EntityType.SOCIAL_ADAPTATION
     
     # Social adaptation fields
     source_content_id: UUID = Field(description="Source content piece ID")
@@ -600,7 +600,7 @@ class SocialAdaptationEntity(UniversalEntity):
 
 class ContentTemplateEntity(UniversalEntity):
     """Content template entity model"""
-    type: EntityType = Field(default=EntityType.CONTENT_TEMPLATE, const=True)
+    type: Literal[EntityType.CONTENT_TEMPLATE] = EntityType.CONTENT_TEMPLATE
     
     # Template fields
     template_name: str = Field(description="Template name")
@@ -619,7 +619,7 @@ class ContentTemplateEntity(UniversalEntity):
 
 class ContentPipelineEntity(UniversalEntity):
     """Content generation pipeline execution entity model"""
-    type: EntityType = Field(default=EntityType.CONTENT_PIPELINE, const=True)
+    type: Literal[EntityType.CONTENT_PIPELINE] = EntityType.CONTENT_PIPELINE
     
     # Pipeline execution data
     pipeline_id: UUID = Field(description="Pipeline execution ID")